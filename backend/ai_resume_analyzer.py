@@ -10,6 +10,7 @@ from datetime import datetime
 from typing import Dict, List, Optional, Tuple
 from extensions import mongo
 from flask_pymongo import ObjectId
+from jobs.enrichment import extract_job_keywords
 
 # Database collections
 ai_analysis_db = mongo.db.ai_resume_analysis
@@ -423,7 +424,8 @@ def calculate_ats_score(resume_text: str, parsed_data: Dict) -> Dict:
             "error": str(e)
         }
 
-def match_resume_to_job(resume_text: str, job_description: str, parsed_data: Dict) -> Dict:
+def match_resume_to_job(resume_text: str, job_description: str, parsed_data: Dict,
+                        job_keywords: Optional[List[str]] = None) -> Dict:
     """
     Match resume to specific job description
     
@@ -431,13 +433,15 @@ def match_resume_to_job(resume_text: str, job_description: str, parsed_data: Dic
         resume_text: Resume text
         job_description: Job description text
         parsed_data: Parsed resume data
+        job_keywords: Keywords stored on the job at write time, if available
     
     Returns:
         Dictionary with job match analysis
     """
     try:
-        # Extract keywords from job description
-        job_keywords = extract_job_keywords(job_description)
+        # Extract keywords from job description unless the job already carries them
+        if job_keywords is None:
+            job_keywords = extract_job_keywords(job_description)
         resume_skills = [skill.lower() for skill in parsed_data.get('skills', [])]
         
         # Calculate keyword match
@@ -479,32 +483,6 @@ def match_resume_to_job(resume_text: str, job_description: str, parsed_data: Dic
             "error": str(e)
         }
 
-def extract_job_keywords(job_description: str) -> List[str]:
-    """Extract important keywords from job description"""
-    
-    # Common technical and business keywords
-    important_keywords = [
-        'python', 'java', 'javascript', 'react', 'nodejs', 'html', 'css', 'sql',
-        'aws', 'azure', 'docker', 'kubernetes', 'git', 'agile', 'scrum',
-        'project management', 'leadership', 'communication', 'teamwork',
-        'analysis', 'problem solving', 'customer service', 'sales', 'marketing'
-    ]
-    
-    job_lower = job_description.lower()
-    found_keywords = []
-    
-    for keyword in important_keywords:
-        if keyword in job_lower:
-            found_keywords.append(keyword)
-    
-    # Extract degree requirements
-    degree_patterns = ['bachelor', 'master', 'phd', 'degree', 'diploma']
-    for pattern in degree_patterns:
-        if pattern in job_lower:
-            found_keywords.append(pattern)
-    
-    return found_keywords
-
 def save_ai_analysis(user_id: str, analysis_data: Dict) -> str:
     """
     Save AI analysis results to database
@@ -2,10 +2,13 @@
 Job Applications Blueprint
 Handles job application functionality including submission, tracking, and management
 """
-from flask import Blueprint, jsonify, request, session
+from flask import Blueprint, jsonify, request, session, g
 from extensions import mongo, fs
 from flask_pymongo import ObjectId
 from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor
+from pymongo.errors import DuplicateKeyError, PyMongoError
+import click
 import sys
 import os
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -13,11 +16,40 @@ from utils import (
     validate_required_fields, validate_json_request, 
     standardize_error_response, standardize_success_response, require_auth
 )
+from archive import archive_of, find_one_with_archive, restore_document
+from hydration import hydrate
+from applications.snapshots import (
+    PROPAGATION_BATCH_SIZE, SNAPSHOT_PROJECTION, job_snapshot, with_job_snapshots,
+    propagate_job_snapshots, backfill_job_snapshots
+)
+from applications.counters import ApplicationCounters
+from applications.events import record_status_event, status_history_page, migrate_status_history
+from applications.duplicates import UNIQUE_APPLICATION_KEYS, remove_duplicate_applications
+from indexes import has_unique_index
+from jobs.backfill import BACKFILL_BATCH_SIZE
+from jobs.pagination import InvalidCursorError, parse_page_size
 
-applications_bp = Blueprint("applications_bp", __name__)
+applications_bp = Blueprint("applications_bp", __name__, cli_group="applications")
 applications_db = mongo.db.applications
 jobs_db = mongo.db.jobs
 users_db = mongo.db.users
+job_snapshot_outbox_db = mongo.db.job_snapshot_outbox
+application_events_db = mongo.db.application_events
+backfill_checkpoints_db = mongo.db.backfill_checkpoints
+# Counter writes do not change any response, so they are sent off the request thread
+application_counters = ApplicationCounters(
+    mongo.db.job_application_stats, mongo.db.employer_application_stats,
+    executor=ThreadPoolExecutor(max_workers=4, thread_name_prefix="application-counters")
+)
+
+# Set once the unique (applicant_id, job_id) index is seen; until then submissions check
+# for an existing application themselves
+unique_application_index_confirmed = False
+
+# Fields of the job that a submission stores on the application
+SUBMIT_JOB_PROJECTION = {**SNAPSHOT_PROJECTION, "employer_id": 1}
+# Fields of the applicants that application listings show
+APPLICANT_PROJECTION = {"name": 1, "email": 1, "role": 1}
 
 # Application status constants
 APPLICATION_STATUSES = [
@@ -29,6 +61,22 @@ APPLICATION_STATUSES = [
     'withdrawn'     # Application withdrawn by candidate
 ]
 
+def unique_application_index_ready():
+    """
+    Whether the unique (applicant_id, job_id) index exists to reject duplicate submissions
+
+    The index is built in the background and cannot be built while duplicates exist, so
+    it is looked up on every submission until it is seen once.
+    """
+    global unique_application_index_confirmed
+    if not unique_application_index_confirmed:
+        try:
+            unique_application_index_confirmed = has_unique_index(applications_db, UNIQUE_APPLICATION_KEYS)
+        except PyMongoError as e:
+            print(f"Error checking the applications indexes: {e}")
+    return unique_application_index_confirmed
+
+
 @applications_bp.route("/submit", methods=["POST"])
 @validate_json_request
 @require_auth
@@ -54,29 +102,24 @@ def submit_application():
         except:
             return standardize_error_response("Invalid job ID format", 400)
         
-        # Check if job exists
-        job = jobs_db.find_one({"_id": job_object_id})
-        if not job:
-            return standardize_error_response("Job not found", 404)
-        
-        # Check if user already applied for this job
-        existing_application = applications_db.find_one({
-            "applicant_id": ObjectId(user_id),
-            "job_id": job_object_id
-        })
-        
-        if existing_application:
-            return standardize_error_response("You have already applied for this job", 409)
-        
-        # Get user information
-        user = users_db.find_one({"_id": ObjectId(user_id)})
-        if not user:
-            return standardize_error_response("User not found", 404)
+        # The user was loaded when the request was authenticated
+        user = g.current_user
         
         # Check if user has verified email (optional requirement)
         if not user.get("email_verified", False):
             return standardize_error_response("Please verify your email before applying for jobs", 403)
         
+        # Check if job exists; the snapshot embedded below is as of this read
+        job_read_at = datetime.utcnow()
+        job = jobs_db.find_one({"_id": job_object_id}, SUBMIT_JOB_PROJECTION)
+        if not job:
+            return standardize_error_response("Job not found", 404)
+        
+        # Without the unique index a second application is only caught by looking for it
+        if not unique_application_index_ready() and applications_db.find_one(
+                {"applicant_id": ObjectId(user_id), "job_id": job_object_id}, {"_id": 1}):
+            return standardize_error_response("You have already applied for this job", 409)
+        
         # Create application
         now = datetime.utcnow()
         application = {
@@ -86,24 +129,20 @@ def submit_application():
             "status": "pending",
             "cover_letter": cover_letter,
             "additional_notes": additional_notes,
+            # Listings show these job fields without reading the job
+            "job": job_snapshot(job, job_read_at),
             "applied_at": now,
-            "updated_at": now,
-            "status_history": [{
-                "status": "pending",
-                "changed_at": now,
-                "changed_by": ObjectId(user_id),
-                "notes": "Application submitted"
-            }]
+            "updated_at": now
         }
         
-        result = applications_db.insert_one(application)
+        # The unique (applicant_id, job_id) index rejects a second application, even from
+        # a concurrent double submit
+        try:
+            result = applications_db.insert_one(application)
+        except DuplicateKeyError:
+            return standardize_error_response("You have already applied for this job", 409)
         application_id = str(result.inserted_id)
-        
-        # Update job with application count (optional)
-        jobs_db.update_one(
-            {"_id": job_object_id},
-            {"$inc": {"application_count": 1}}
-        )
+        application_counters.record_submission(job_object_id, application["employer_id"], title=job.get("title"))
         
         return standardize_success_response({
             "application": {
@@ -143,12 +182,9 @@ def get_my_applications():
         skip = (page - 1) * limit
         applications = applications_db.find(query).sort("applied_at", -1).skip(skip).limit(limit)
         
-        # Format applications with job details
+        # Format applications with their job snapshots
         formatted_applications = []
-        for app in applications:
-            # Get job details
-            job = jobs_db.find_one({"_id": app["job_id"]})
-            
+        for app, job in with_job_snapshots(applications, jobs_db):
             formatted_app = {
                 "id": str(app["_id"]),
                 "job_id": str(app["job_id"]),
@@ -201,7 +237,7 @@ def get_application_details(application_id):
             return standardize_error_response("Invalid application ID format", 400)
         
         # Get application
-        application = applications_db.find_one({"_id": app_object_id})
+        application = find_one_with_archive(applications_db, {"_id": app_object_id})
         
         if not application:
             return standardize_error_response("Application not found", 404)
@@ -217,7 +253,7 @@ def get_application_details(application_id):
             return standardize_error_response("Access denied", 403)
         
         # Get job details
-        job = jobs_db.find_one({"_id": application["job_id"]})
+        job = find_one_with_archive(jobs_db, {"_id": application["job_id"]})
         
         # Get applicant details (for employers)
         applicant = None
@@ -232,15 +268,7 @@ def get_application_details(application_id):
             "cover_letter": application.get("cover_letter", ""),
             "additional_notes": application.get("additional_notes", ""),
             "applied_at": application["applied_at"].isoformat(),
-            "updated_at": application["updated_at"].isoformat(),
-            "status_history": [
-                {
-                    "status": history["status"],
-                    "changed_at": history["changed_at"].isoformat(),
-                    "notes": history.get("notes", "")
-                }
-                for history in application.get("status_history", [])
-            ]
+            "updated_at": application["updated_at"].isoformat()
         }
         
         # Add job details
@@ -273,6 +301,59 @@ def get_application_details(application_id):
         return standardize_error_response("Failed to fetch application details", 500)
 
 
+@applications_bp.route("/<application_id>/history", methods=["GET"])
+@require_auth
+def get_application_history(application_id):
+    """Get a page of an application's status history, oldest first"""
+    try:
+        user_id = session.get("user_id")
+        
+        # Validate application_id format
+        try:
+            app_object_id = ObjectId(application_id)
+        except:
+            return standardize_error_response("Invalid application ID format", 400)
+        
+        application = find_one_with_archive(
+            applications_db, {"_id": app_object_id}, {"applicant_id": 1, "employer_id": 1, "applied_at": 1}
+        )
+        if not application:
+            return standardize_error_response("Application not found", 404)
+        
+        # Same access as the application details
+        user = g.current_user
+        is_owner = str(application["applicant_id"]) == user_id
+        is_employer = (user.get("role") == "employer" and
+                      application.get("employer_id") and
+                      str(application["employer_id"]) == user_id)
+        if not (is_owner or is_employer):
+            return standardize_error_response("Access denied", 403)
+        
+        try:
+            events, next_cursor = status_history_page(
+                application_events_db, application, parse_page_size(request.args.get("limit")),
+                request.args.get("cursor")
+            )
+        except InvalidCursorError as e:
+            return standardize_error_response(str(e), 400)
+        
+        return standardize_success_response({
+            "status_history": [
+                {
+                    "status": event["status"],
+                    "changed_at": event["changed_at"].isoformat(),
+                    "notes": event.get("notes", "")
+                }
+                for event in events
+            ],
+            "next_cursor": next_cursor
+        }, status_code=200)
+        
+    except Exception as e:
+        print(f"Error fetching application history: {e}")
+        return standardize_error_response("Failed to fetch application history", 500)
+
+
 @applications_bp.route("/<application_id>/withdraw", methods=["POST"])
 @require_auth
 def withdraw_application(application_id):
@@ -287,7 +368,7 @@ def withdraw_application(application_id):
             return standardize_error_response("Invalid application ID format", 400)
         
         # Get application
-        application = applications_db.find_one({"_id": app_object_id})
+        application = find_one_with_archive(applications_db, {"_id": app_object_id})
         
         if not application:
             return standardize_error_response("Application not found", 404)
@@ -300,25 +381,23 @@ def withdraw_application(application_id):
         if application["status"] in ["withdrawn", "accepted", "rejected"]:
             return standardize_error_response("Cannot withdraw application in current status", 400)
         
-        # Update application status
+        # Update application status, unless it changed since it was read
         now = datetime.utcnow()
-        applications_db.update_one(
-            {"_id": app_object_id},
+        result = applications_db.update_one(
+            {"_id": app_object_id, "status": application["status"]},
             {
                 "$set": {
                     "status": "withdrawn",
                     "updated_at": now
-                },
-                "$push": {
-                    "status_history": {
-                        "status": "withdrawn",
-                        "changed_at": now,
-                        "changed_by": ObjectId(user_id),
-                        "notes": "Application withdrawn by candidate"
-                    }
                 }
             }
         )
+        if result.modified_count == 0:
+            return standardize_error_response("Application status changed, please try again", 409)
+        record_status_event(application_events_db, app_object_id, "withdrawn", ObjectId(user_id),
+                            "Application withdrawn by candidate", now)
+        application_counters.record_status_change(application["job_id"], application.get("employer_id"),
+                                                  application["status"], "withdrawn")
         
         return standardize_success_response({
             "message": "Application withdrawn successfully"
@@ -358,7 +437,7 @@ def update_application_status(application_id):
             return standardize_error_response("Invalid application ID format", 400)
         
         # Get application
-        application = applications_db.find_one({"_id": app_object_id})
+        application = find_one_with_archive(applications_db, {"_id": app_object_id})
         
         if not application:
             return standardize_error_response("Application not found", 404)
@@ -369,29 +448,31 @@ def update_application_status(application_id):
             return standardize_error_response("Only employers can update application status", 403)
         
         # Additional authorization check - ensure employer owns the job
-        job = jobs_db.find_one({"_id": application["job_id"]})
+        job = find_one_with_archive(jobs_db, {"_id": application["job_id"]})
         if not job:
             return standardize_error_response("Associated job not found", 404)
         
-        # Update application status
+        # An application closed long ago goes back to the live collection before it changes
+        if application.get("archived_at"):
+            restore_document(applications_db, {"_id": app_object_id})
+        
+        # Update application status, unless it changed since it was read
         now = datetime.utcnow()
-        applications_db.update_one(
-            {"_id": app_object_id},
+        result = applications_db.update_one(
+            {"_id": app_object_id, "status": application["status"]},
             {
                 "$set": {
                     "status": new_status,
                     "updated_at": now
-                },
-                "$push": {
-                    "status_history": {
-                        "status": new_status,
-                        "changed_at": now,
-                        "changed_by": ObjectId(user_id),
-                        "notes": notes or f"Status changed to {new_status}"
-                    }
                 }
             }
         )
+        if result.modified_count == 0:
+            return standardize_error_response("Application status changed, please try again", 409)
+        record_status_event(application_events_db, app_object_id, new_status, ObjectId(user_id),
+                            notes or f"Status changed to {new_status}", now)
+        application_counters.record_status_change(application["job_id"], application.get("employer_id"),
+                                                  application["status"], new_status)
         
         return standardize_success_response({
             "message": f"Application status updated to {new_status}",
@@ -443,12 +524,9 @@ def get_job_applications(job_id):
         skip = (page - 1) * limit
         applications = applications_db.find(query).sort("applied_at", -1).skip(skip).limit(limit)
         
-        # Format applications with applicant details
+        # Format applications with applicant details, fetched for the whole page at once
         formatted_applications = []
-        for app in applications:
-            # Get applicant details
-            applicant = users_db.find_one({"_id": app["applicant_id"]})
-            
+        for app, applicant in hydrate(applications, "applicant_id", users_db, APPLICANT_PROJECTION):
             formatted_app = {
                 "id": str(app["_id"]),
                 "status": app["status"],
@@ -514,8 +592,7 @@ def get_application_statistics():
             ).sort("applied_at", -1).limit(5)
             
             recent_apps = []
-            for app in recent_applications:
-                job = jobs_db.find_one({"_id": app["job_id"]})
+            for app, job in with_job_snapshots(recent_applications, jobs_db):
                 recent_apps.append({
                     "id": str(app["_id"]),
                     "job_title": job.get("title") if job else "Unknown",
@@ -531,51 +608,13 @@ def get_application_statistics():
             }, status_code=200)
         
         elif user.get("role") == "employer":
-            # Statistics for employers
-            # Get all jobs posted by this employer
-            employer_jobs = list(jobs_db.find({"employer_id": ObjectId(user_id)}))
-            job_ids = [job["_id"] for job in employer_jobs]
-            
-            if not job_ids:
-                return standardize_success_response({
-                    "total_received": 0,
-                    "status_breakdown": {},
-                    "jobs_with_applications": []
-                }, status_code=200)
-            
-            # Total applications received
-            total_received = applications_db.count_documents({"job_id": {"$in": job_ids}})
-            
-            # Count by status
-            pipeline = [
-                {"$match": {"job_id": {"$in": job_ids}}},
-                {"$group": {"_id": "$status", "count": {"$sum": 1}}}
-            ]
-            status_counts = list(applications_db.aggregate(pipeline))
-            status_breakdown = {item["_id"]: item["count"] for item in status_counts}
-            
-            # Applications per job
-            pipeline = [
-                {"$match": {"job_id": {"$in": job_ids}}},
-                {"$group": {"_id": "$job_id", "count": {"$sum": 1}}}
-            ]
-            job_counts = list(applications_db.aggregate(pipeline))
-            job_application_counts = {str(item["_id"]): item["count"] for item in job_counts}
-            
-            jobs_with_applications = []
-            for job in employer_jobs:
-                job_id = str(job["_id"])
-                count = job_application_counts.get(job_id, 0)
-                jobs_with_applications.append({
-                    "job_id": job_id,
-                    "title": job.get("title"),
-                    "application_count": count
-                })
+            # Statistics for employers, read from the application counters alone
+            statistics = application_counters.employer_statistics(ObjectId(user_id))
             
             return standardize_success_response({
-                "total_received": total_received,
-                "status_breakdown": status_breakdown,
-                "jobs_with_applications": jobs_with_applications
+                "total_received": statistics["total_received"],
+                "status_breakdown": statistics["status_breakdown"],
+                "jobs_with_applications": statistics["jobs"]
             }, status_code=200)
         
         else:
@@ -583,4 +622,57 @@ def get_application_statistics():
         
     except Exception as e:
         print(f"Error fetching statistics: {e}")
-        return standardize_error_response("Failed to fetch statistics", 500) 
\ No newline at end of file
+        return standardize_error_response("Failed to fetch statistics", 500) 
+
+
+@applications_bp.cli.command("propagate-job-snapshots")
+@click.option("--batch-size", default=PROPAGATION_BATCH_SIZE, show_default=True, type=click.IntRange(1),
+              help="Queued job edits applied per bulk write.")
+def propagate_job_snapshots_command(batch_size):
+    """Apply queued job edits to the job snapshots embedded in applications"""
+    report = propagate_job_snapshots(job_snapshot_outbox_db, applications_db, batch_size,
+                                     counters=application_counters)
+    print(f"Applied {report['entries']} job edits to {report['modified']} applications "
+          f"({report['jobs']} jobs, {report['batches']} batches)")
+
+
+@applications_bp.cli.command("backfill-job-snapshots")
+@click.option("--batch-size", default=BACKFILL_BATCH_SIZE, show_default=True, type=click.IntRange(1),
+              help="Applications read and written per round trip.")
+def backfill_job_snapshots_command(batch_size):
+    """Embed a job snapshot in applications submitted before snapshots existed"""
+    report = backfill_job_snapshots(applications_db, jobs_db, batch_size, checkpoints=backfill_checkpoints_db,
+                                    progress=lambda totals: print(f"  {totals['scanned']} applications scanned, "
+                                                                  f"{totals['modified']} updated"))
+    print(f"Added job snapshots to {report['modified']} applications "
+          f"({report['skipped']} whose job no longer exists) in {report['seconds']:.1f}s")
+
+
+@applications_bp.cli.command("rebuild-counters")
+def rebuild_counters_command():
+    """Recompute the per-job and per-employer application counters from scratch"""
+    report = application_counters.rebuild([applications_db, archive_of(applications_db)], jobs_db)
+    print(f"Rebuilt application counters for {report['jobs']} jobs and {report['employers']} employers")
+
+
+@applications_bp.cli.command("migrate-status-history")
+@click.option("--batch-size", default=BACKFILL_BATCH_SIZE, show_default=True, type=click.IntRange(1),
+              help="Applications read and written per round trip.")
+def migrate_status_history_command(batch_size):
+    """Move the status_history arrays of live and archived applications to application_events"""
+    for collection, name in ((applications_db, "status-history"),
+                             (archive_of(applications_db), "status-history-archive")):
+        report = migrate_status_history(collection, application_events_db, batch_size, name=name,
+                                        checkpoints=backfill_checkpoints_db)
+        print(f"Moved the status history of {report['modified']} applications from {collection.name} "
+              f"in {report['seconds']:.1f}s")
+
+
+@applications_bp.cli.command("remove-duplicates")
+def remove_duplicates_command():
+    """Keep one application per applicant and job so the unique index can be built"""
+    report = remove_duplicate_applications(applications_db, application_events_db)
+    print(f"Removed {report['removed']} duplicate applications of {report['pairs']} applicants and jobs")
+    if report["removed"]:
+        counters = application_counters.rebuild([applications_db, archive_of(applications_db)], jobs_db)
+        print(f"Rebuilt application counters for {counters['jobs']} jobs and {counters['employers']} employers")
@@ -0,0 +1,133 @@
+"""
+Application counters
+Per-job and per-employer application counts by status, maintained with $inc on every status
+change so employer statistics are read instead of aggregated
+"""
+from concurrent.futures import Executor
+from datetime import datetime
+from typing import Dict, Iterable, Optional
+
+from pymongo import ReplaceOne, UpdateOne
+from pymongo.errors import PyMongoError
+
+from hydration import fetch_by_ids
+
+
+class ApplicationCounters:
+    """
+    Application counts by status for each job and each employer
+
+    Every submission and status change applies the same transition to the job's and
+    the employer's counter documents with an upserted $inc, so the counters never need
+    a read first. Archived applications stay counted. Job counters also carry the
+    job's title, so the dashboard lists an employer's jobs without reading them.
+    rebuild() recomputes every counter from the applications themselves, for data
+    written before the counters existed or after a failed write.
+
+    With an executor the counter writes are sent concurrently on its threads and the
+    caller does not wait for them; a failed write is logged and left for rebuild().
+    """
+
+    def __init__(self, job_stats, employer_stats, executor: Optional[Executor] = None):
+        self.job_stats = job_stats
+        self.employer_stats = employer_stats
+        self.executor = executor
+
+    @staticmethod
+    def _write(collection, query: Dict, update: Dict):
+        try:
+            collection.update_one(query, update, upsert=True)
+        except PyMongoError as e:
+            print(f"Error updating application counter {query}: {e}")
+
+    def _apply(self, job_id, employer_id, increments: Dict[str, int], title: Optional[str] = None):
+        fields = {"employer_id": employer_id} if title is None else {"employer_id": employer_id, "title": title}
+        writes = [(self.job_stats, {"_id": job_id}, {"$inc": increments, "$set": fields})]
+        if employer_id is not None:
+            writes.append((self.employer_stats, {"_id": employer_id}, {"$inc": increments}))
+        for write in writes:
+            if self.executor is not None:
+                self.executor.submit(self._write, *write)
+            else:
+                self._write(*write)
+
+    def record_submission(self, job_id, employer_id, status: str = "pending", title: Optional[str] = None):
+        """Count a new application, storing the job's title on its counter"""
+        self._apply(job_id, employer_id, {"total": 1, f"statuses.{status}": 1}, title)
+
+    def record_status_change(self, job_id, employer_id, old_status: str, new_status: str):
+        """Move an application from one status count to another"""
+        if old_status != new_status:
+            self._apply(job_id, employer_id, {f"statuses.{old_status}": -1, f"statuses.{new_status}": 1})
+
+    def employer_statistics(self, employer_id) -> Dict:
+        """
+        Totals for an employer's dashboard from their counter documents
+
+        Returns:
+            Dictionary with total_received, status_breakdown and the jobs that received
+            applications, each with its id, title and application_count
+        """
+        employer = self.employer_stats.find_one({"_id": employer_id}) or {}
+        jobs = self.job_stats.find({"employer_id": employer_id}, {"total": 1, "title": 1})
+        return {
+            "total_received": employer.get("total", 0),
+            "status_breakdown": {status: count for status, count in employer.get("statuses", {}).items() if count},
+            "jobs": [{"job_id": str(job["_id"]), "title": job.get("title"), "application_count": job.get("total", 0)}
+                     for job in jobs]
+        }
+
+    def record_titles(self, titles: Dict):
+        """Store the titles of edited jobs on their counters in one bulk_write; jobs without counters are skipped"""
+        if titles:
+            self.job_stats.bulk_write([UpdateOne({"_id": job_id}, {"$set": {"title": title}})
+                                       for job_id, title in titles.items()], ordered=False)
+
+    def rebuild(self, application_collections: Iterable, jobs_collection=None,
+                now: Optional[datetime] = None) -> Dict:
+        """
+        Recompute every counter from the applications
+
+        Counts are grouped on the server, then each counter document is replaced in one
+        unordered bulk_write per counter collection. Counters left over from a previous
+        run are removed. Submissions made while the rebuild runs may be missed, so run it
+        when application traffic is low.
+
+        Args:
+            application_collections: Collections holding applications, live and archived
+            jobs_collection: Jobs to take the counters' titles from, falling through to the archive
+
+        Returns:
+            Number of job and employer counter documents written
+        """
+        now = now or datetime.utcnow()
+        jobs: Dict = {}
+        employers: Dict = {}
+        pipeline = [{"$group": {
+            "_id": {"job_id": "$job_id", "employer_id": "$employer_id", "status": "$status"},
+            "count": {"$sum": 1}
+        }}]
+        for collection in application_collections:
+            for group in collection.aggregate(pipeline):
+                key = group["_id"]
+                counters = [jobs.setdefault(key["job_id"], {"employer_id": key.get("employer_id")})]
+                if key.get("employer_id") is not None:
+                    counters.append(employers.setdefault(key["employer_id"], {}))
+                for counter in counters:
+                    counter["total"] = counter.get("total", 0) + group["count"]
+                    statuses = counter.setdefault("statuses", {})
+                    statuses[key["status"]] = statuses.get(key["status"], 0) + group["count"]
+
+        if jobs_collection is not None:
+            titles = fetch_by_ids(jobs_collection, jobs.keys(), {"title": 1}, with_archive=True)
+            for job_id, counter in jobs.items():
+                counter["title"] = titles.get(job_id, {}).get("title")
+
+        for stats, counters in ((self.job_stats, jobs), (self.employer_stats, employers)):
+            if counters:
+                stats.bulk_write([
+                    ReplaceOne({"_id": owner_id}, {**counter, "rebuilt_at": now}, upsert=True)
+                    for owner_id, counter in counters.items()
+                ], ordered=False)
+            stats.delete_many({"rebuilt_at": {"$ne": now}})
+        return {"jobs": len(jobs), "employers": len(employers)}
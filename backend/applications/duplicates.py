@@ -0,0 +1,46 @@
+"""
+Duplicate applications
+One application per applicant and job is enforced by a unique index; this removes the
+duplicates written before it existed so that it can be built
+"""
+from typing import Dict
+
+# Keys of the unique index on applications
+UNIQUE_APPLICATION_KEYS = [("applicant_id", 1), ("job_id", 1)]
+REMOVAL_BATCH_SIZE = 500
+
+
+def remove_duplicate_applications(applications_collection, events, batch_size: int = REMOVAL_BATCH_SIZE) -> Dict:
+    """
+    Keep one application per applicant and job, deleting the others and their status events
+
+    The application updated most recently is kept, since it is the one an employer last
+    acted on. Counters still count the deleted applications until they are rebuilt.
+
+    Returns:
+        Number of applicant and job pairs that had duplicates and of applications removed
+    """
+    pipeline = [
+        {"$sort": {"updated_at": -1, "_id": -1}},
+        {"$group": {
+            "_id": {"applicant_id": "$applicant_id", "job_id": "$job_id"},
+            "ids": {"$push": "$_id"}
+        }},
+        {"$match": {"ids.1": {"$exists": True}}}
+    ]
+    report = {"pairs": 0, "removed": 0}
+    pending = []
+
+    def remove(ids):
+        report["removed"] += applications_collection.delete_many({"_id": {"$in": ids}}).deleted_count
+        events.delete_many({"application_id": {"$in": ids}})
+
+    for group in applications_collection.aggregate(pipeline, allowDiskUse=True):
+        report["pairs"] += 1
+        pending.extend(group["ids"][1:])
+        if len(pending) >= batch_size:
+            remove(pending)
+            pending = []
+    if pending:
+        remove(pending)
+    return report
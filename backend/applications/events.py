@@ -0,0 +1,119 @@
+"""
+Application status history
+Status changes are appended to their own collection instead of a status_history array on
+the application, so applications stay the same size and history is read a page at a time
+"""
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+
+from flask_pymongo import ObjectId
+from pymongo import UpdateOne
+
+from jobs.backfill import BACKFILL_BATCH_SIZE, run_backfill
+from jobs.pagination import encode_cursor, decode_cursor
+
+# Oldest first; (changed_at, _id) is unique so pages never overlap
+HISTORY_SORT = [("changed_at", 1), ("_id", 1)]
+HISTORY_CURSOR_MODE = "history"
+# Applications still carrying the array the events replaced
+LEGACY_HISTORY_QUERY = {"status_history": {"$exists": True}}
+SUBMISSION_NOTES = "Application submitted"
+
+
+def status_event(application_id, status: str, changed_by, notes: str, changed_at: datetime) -> Dict:
+    """A status change of an application as stored in the events collection"""
+    return {
+        "application_id": application_id,
+        "status": status,
+        "changed_at": changed_at,
+        "changed_by": changed_by,
+        "notes": notes
+    }
+
+
+def submission_event(application: Dict) -> Dict:
+    """
+    The first entry of every history, derived from the application itself
+
+    Submissions are not written as events; applied_at already records them. The entry
+    takes the application's _id, which sorts before the ids of its later events, so a
+    page ending on it resumes at the first of them.
+    """
+    return {
+        **status_event(application["_id"], "pending", application["applicant_id"], SUBMISSION_NOTES,
+                       application["applied_at"]),
+        "_id": application["_id"]
+    }
+
+
+def record_status_event(events, application_id, status: str, changed_by, notes: str,
+                        changed_at: Optional[datetime] = None):
+    """Append a status change to an application's history"""
+    events.insert_one(status_event(application_id, status, changed_by, notes, changed_at or datetime.utcnow()))
+
+
+def status_history_page(events, application: Dict, page_size: int,
+                        cursor: Optional[str] = None) -> Tuple[List[Dict], Optional[str]]:
+    """
+    One page of an application's history, oldest first
+
+    The first page starts with the submission. Pages after it are read from the
+    (application_id, changed_at, _id) index after the cursor.
+
+    Raises:
+        InvalidCursorError: If the cursor cannot be decoded
+
+    Returns:
+        Tuple of (events, cursor of the next page or None on the last page)
+    """
+    query = {"application_id": application["_id"]}
+    entries = []
+    if cursor:
+        changed_at, last_id = decode_cursor(cursor, HISTORY_CURSOR_MODE)
+        last_id = ObjectId(last_id)
+        query["$or"] = [
+            {"changed_at": {"$gt": changed_at}},
+            {"changed_at": changed_at, "_id": {"$gt": last_id}}
+        ]
+    else:
+        entries.append(submission_event(application))
+
+    entries += events.find(query).sort(HISTORY_SORT).limit(page_size + 1 - len(entries))
+    next_cursor = None
+    if len(entries) > page_size:
+        entries = entries[:page_size]
+        next_cursor = encode_cursor(HISTORY_CURSOR_MODE, entries[-1]["changed_at"], entries[-1]["_id"])
+    return entries, next_cursor
+
+
+def migrate_status_history(applications_collection, events, batch_size: int = BACKFILL_BATCH_SIZE,
+                           name: str = "status-history", **options) -> Dict:
+    """
+    Move the status_history arrays of existing applications into the events collection
+
+    Each batch upserts its events in one unordered bulk_write keyed on the application,
+    status and time, so a rerun after a failure never duplicates them, then unsets the
+    arrays. The submission entry is left out since submission_event() derives it. Extra
+    keyword arguments are passed to run_backfill.
+
+    Returns:
+        The run_backfill totals
+    """
+    def build_operations(batch):
+        writes = [
+            UpdateOne(
+                {"application_id": application["_id"], "status": entry["status"], "changed_at": entry["changed_at"]},
+                {"$setOnInsert": status_event(application["_id"], entry["status"], entry.get("changed_by"),
+                                              entry.get("notes", ""), entry["changed_at"])},
+                upsert=True
+            )
+            for application in batch
+            for entry in application["status_history"]
+            if not (entry["status"] == "pending" and entry["changed_at"] == application.get("applied_at"))
+        ]
+        if writes:
+            events.bulk_write(writes, ordered=False)
+        return [UpdateOne({"_id": application["_id"]}, {"$unset": {"status_history": ""}}) for application in batch]
+
+    return run_backfill(applications_collection, LEGACY_HISTORY_QUERY, {"status_history": 1, "applied_at": 1},
+                        build_operations, batch_size, name=name, **options)
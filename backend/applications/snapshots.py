@@ -0,0 +1,159 @@
+"""
+Job snapshots embedded in applications
+Copies the job fields application listings show into each application at submit time, and
+propagates later job edits to the applications through an outbox collection in batches
+"""
+import os
+import threading
+import time
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from pymongo import UpdateMany, UpdateOne
+
+from hydration import fetch_by_ids
+from jobs.backfill import BACKFILL_BATCH_SIZE, run_backfill
+
+# Configuration
+PROPAGATION_BATCH_SIZE = int(os.getenv('JOB_SNAPSHOT_BATCH_SIZE', '100'))
+PROPAGATION_INTERVAL_SECONDS = float(os.getenv('JOB_SNAPSHOT_INTERVAL_SECONDS', '5'))
+
+# Job fields copied into application["job"]
+SNAPSHOT_FIELDS = ("title", "firm", "location", "jobtype", "remuneration_amount", "remuneration_period")
+SNAPSHOT_PROJECTION = {field: 1 for field in SNAPSHOT_FIELDS}
+MISSING_SNAPSHOT_QUERY = {"job": None}
+
+
+def job_snapshot(job: Dict, synced_at: Optional[datetime] = None) -> Dict:
+    """
+    Compact copy of the job fields an application listing shows
+
+    synced_at must not be later than the read of the job the snapshot is taken from, and a
+    queued edit must be stamped after its write; propagation never replaces a snapshot
+    with an older one, so an edit racing a submission is never lost.
+    """
+    snapshot = {field: job.get(field) for field in SNAPSHOT_FIELDS}
+    snapshot["synced_at"] = synced_at or datetime.utcnow()
+    return snapshot
+
+
+def snapshot_changed(job: Dict, update_fields: Dict) -> bool:
+    """Whether an update to a job changes any field of its snapshot"""
+    return any(field in update_fields and update_fields[field] != job.get(field) for field in SNAPSHOT_FIELDS)
+
+
+def record_job_change(outbox, job_id, job: Dict, changed_at: Optional[datetime] = None):
+    """Queue the new snapshot of an edited job for the applications to it"""
+    changed_at = changed_at or datetime.utcnow()
+    outbox.insert_one({"job_id": job_id, "snapshot": job_snapshot(job, changed_at), "created_at": changed_at})
+
+
+def propagate_job_snapshots(outbox, applications_collection, batch_size: int = PROPAGATION_BATCH_SIZE,
+                            max_batches: Optional[int] = None, counters=None) -> Dict:
+    """
+    Apply queued job snapshots to the applications of each job
+
+    Outbox entries are read in insertion order, a batch at a time. Several edits of one
+    job in a batch collapse into its latest snapshot, and each batch is written with a
+    single unordered bulk_write of one update_many per job. An application only takes a
+    snapshot newer than the one it has, so a batch that is applied twice, or by two
+    workers at once, leaves the same result. Entries are removed once applied. With
+    application counters, each batch's titles are stored on the job counters too.
+
+    Returns:
+        Totals with the entries processed, jobs propagated and applications modified
+    """
+    report = {"entries": 0, "jobs": 0, "modified": 0, "batches": 0}
+    while max_batches is None or report["batches"] < max_batches:
+        entries = list(outbox.find({}).sort("_id", 1).limit(batch_size))
+        if not entries:
+            break
+
+        latest = {}
+        for entry in entries:
+            latest[entry["job_id"]] = entry["snapshot"]
+        operations = [
+            UpdateMany(
+                {"job_id": job_id, "job.synced_at": {"$not": {"$gt": snapshot["synced_at"]}}},
+                {"$set": {"job": snapshot}}
+            )
+            for job_id, snapshot in latest.items()
+        ]
+        result = applications_collection.bulk_write(operations, ordered=False)
+        if counters is not None:
+            counters.record_titles({job_id: snapshot["title"] for job_id, snapshot in latest.items()})
+        outbox.delete_many({"_id": {"$in": [entry["_id"] for entry in entries]}})
+
+        report["entries"] += len(entries)
+        report["jobs"] += len(latest)
+        report["modified"] += result.modified_count
+        report["batches"] += 1
+    return report
+
+
+_propagation_thread: Optional[threading.Thread] = None
+_propagation_lock = threading.Lock()
+
+
+def start_snapshot_propagation(outbox, applications_collection,
+                               interval: float = PROPAGATION_INTERVAL_SECONDS, counters=None) -> threading.Thread:
+    """
+    Propagate queued job snapshots on a background thread every interval seconds
+
+    One thread runs per worker; later calls return it. A failed run is logged and
+    retried at the next interval, leaving its entries in the outbox.
+    """
+    global _propagation_thread
+
+    def run():
+        while True:
+            try:
+                propagate_job_snapshots(outbox, applications_collection, counters=counters)
+            except Exception as e:
+                print(f"Error propagating job snapshots: {e}")
+            time.sleep(interval)
+
+    with _propagation_lock:
+        if _propagation_thread is None:
+            _propagation_thread = threading.Thread(target=run, name="job-snapshot-propagation", daemon=True)
+            _propagation_thread.start()
+        return _propagation_thread
+
+
+def with_job_snapshots(applications: Iterable[Dict], jobs_collection) -> List[Tuple[Dict, Optional[Dict]]]:
+    """
+    Pair each application with the job fields to list it with
+
+    Applications carry their job snapshot; the jobs of applications submitted before
+    snapshots existed are fetched with one $in query, falling through to the archive.
+    """
+    applications = list(applications)
+    unsnapshotted = [application["job_id"] for application in applications if not application.get("job")]
+    jobs = fetch_by_ids(jobs_collection, unsnapshotted, SNAPSHOT_PROJECTION, with_archive=True)
+    return [(application, application.get("job") or jobs.get(application["job_id"])) for application in applications]
+
+
+def backfill_job_snapshots(applications_collection, jobs_collection, batch_size: int = BACKFILL_BATCH_SIZE,
+                           **options) -> Dict:
+    """
+    Embed the job snapshot in applications submitted before snapshots existed
+
+    The jobs of each batch are fetched in one query; applications whose job no longer
+    exists anywhere are skipped. Extra keyword arguments are passed to run_backfill.
+
+    Returns:
+        The run_backfill totals
+    """
+    def build_operations(batch):
+        now = datetime.utcnow()
+        jobs = fetch_by_ids(jobs_collection, (application["job_id"] for application in batch), SNAPSHOT_PROJECTION,
+                            with_archive=True)
+        # Only fill snapshots that are still missing so a propagated edit is never overwritten
+        return [
+            UpdateOne({"_id": application["_id"], **MISSING_SNAPSHOT_QUERY},
+                      {"$set": {"job": job_snapshot(jobs[application["job_id"]], now)}})
+            for application in batch if application["job_id"] in jobs
+        ]
+
+    return run_backfill(applications_collection, MISSING_SNAPSHOT_QUERY, {"job_id": 1}, build_operations,
+                        batch_size, name="job-snapshots", **options)
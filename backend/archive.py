@@ -0,0 +1,153 @@
+"""
+Hot/cold tiering for AusJobs
+Moves expired jobs and closed applications into archive collections in batches, and looks single
+documents up in the archive when they are no longer in the live collection
+"""
+import os
+import time
+from datetime import datetime, timedelta
+from typing import Callable, Dict, Optional
+
+import click
+from flask.cli import AppGroup
+from pymongo import ReplaceOne
+
+from extensions import mongo
+from jobs.result_cache import job_result_cache
+
+# Configuration
+JOB_ARCHIVE_AFTER_DAYS = int(os.getenv('JOB_ARCHIVE_AFTER_DAYS', '90'))
+APPLICATION_ARCHIVE_AFTER_DAYS = int(os.getenv('APPLICATION_ARCHIVE_AFTER_DAYS', '180'))
+ARCHIVE_BATCH_SIZE = int(os.getenv('ARCHIVE_BATCH_SIZE', '500'))
+
+ARCHIVE_SUFFIX = "_archive"
+# Applications in these statuses can no longer change
+TERMINAL_APPLICATION_STATUSES = ["withdrawn", "rejected", "accepted"]
+
+
+def archive_of(collection):
+    """Archive collection paired with a live collection"""
+    return collection.database[f"{collection.name}{ARCHIVE_SUFFIX}"]
+
+
+def expired_jobs_query(now: Optional[datetime] = None) -> Dict:
+    """Jobs posted more than JOB_ARCHIVE_AFTER_DAYS ago"""
+    now = now or datetime.utcnow()
+    return {"created_at": {"$lt": now - timedelta(days=JOB_ARCHIVE_AFTER_DAYS)}}
+
+
+def closed_applications_query(now: Optional[datetime] = None) -> Dict:
+    """Applications in a terminal status that have not changed for APPLICATION_ARCHIVE_AFTER_DAYS"""
+    now = now or datetime.utcnow()
+    return {
+        "status": {"$in": TERMINAL_APPLICATION_STATUSES},
+        "updated_at": {"$lt": now - timedelta(days=APPLICATION_ARCHIVE_AFTER_DAYS)}
+    }
+
+
+def archive_documents(collection, query: Dict, batch_size: int = ARCHIVE_BATCH_SIZE,
+                      max_batches: Optional[int] = None, archive=None,
+                      progress: Optional[Callable[[Dict], None]] = None) -> Dict:
+    """
+    Move the documents matching a query into the collection's archive, one batch at a time
+
+    Each batch is copied first and only then deleted from the live collection, again
+    under the query, so a crash never loses a document and one that changed in the
+    meantime stays live. Copies are upserts, which makes re-running after a failure safe.
+
+    Args:
+        collection: Live collection
+        query: Filter selecting the documents to archive
+        batch_size: Documents moved per round trip
+        max_batches: Stop after this many batches
+        archive: Archive collection, defaults to archive_of(collection)
+        progress: Called with the running totals after each batch
+
+    Returns:
+        Totals with the archived count, the elapsed seconds and whether every matching
+        document was moved
+    """
+    archive = archive if archive is not None else archive_of(collection)
+    report = {"archived": 0, "seconds": 0.0, "completed": False}
+    started = time.monotonic()
+    last_id = None
+    batches = 0
+
+    while max_batches is None or batches < max_batches:
+        batch_query = dict(query)
+        if last_id is not None:
+            batch_query["_id"] = {"$gt": last_id}
+        batch = list(collection.find(batch_query).sort("_id", 1).limit(batch_size))
+        if not batch:
+            report["completed"] = True
+            break
+
+        now = datetime.utcnow()
+        archive.bulk_write(
+            [ReplaceOne({"_id": document["_id"]}, {**document, "archived_at": now}, upsert=True)
+             for document in batch],
+            ordered=False
+        )
+        ids = [document["_id"] for document in batch]
+        report["archived"] += collection.delete_many({**query, "_id": {"$in": ids}}).deleted_count
+        last_id = ids[-1]
+        batches += 1
+        report["seconds"] = time.monotonic() - started
+        if progress:
+            progress(report)
+
+    report["seconds"] = time.monotonic() - started
+    return report
+
+
+def find_one_with_archive(collection, query: Dict, projection: Optional[Dict] = None):
+    """
+    Find a single document in the live collection, falling through to its archive
+
+    Archived documents carry an archived_at field.
+    """
+    document = collection.find_one(query, projection)
+    if document is None:
+        document = archive_of(collection).find_one(query, projection)
+    return document
+
+
+def restore_document(collection, query: Dict):
+    """
+    Move an archived document back into the live collection so it can be changed again
+
+    Returns:
+        The restored document, or None if it is not archived
+    """
+    archive = archive_of(collection)
+    document = archive.find_one(query)
+    if document is None:
+        return None
+    document.pop("archived_at", None)
+    collection.replace_one({"_id": document["_id"]}, document, upsert=True)
+    archive.delete_one({"_id": document["_id"]})
+    return document
+
+
+archive_cli = AppGroup("archive", help="Move expired jobs and closed applications to archive collections.")
+
+
+def print_archive_progress(report):
+    print(f"  {report['archived']} archived ({report['seconds']:.1f}s)")
+
+
+@archive_cli.command("run")
+@click.option("--batch-size", default=ARCHIVE_BATCH_SIZE, show_default=True, type=click.IntRange(1),
+              help="Documents moved per round trip.")
+@click.option("--max-batches", type=click.IntRange(1), help="Stop after this many batches per collection.")
+def archive_command(batch_size, max_batches):
+    """Archive jobs older than JOB_ARCHIVE_AFTER_DAYS and closed applications older than APPLICATION_ARCHIVE_AFTER_DAYS"""
+    jobs_report = archive_documents(mongo.db.jobs, expired_jobs_query(), batch_size, max_batches,
+                                    progress=print_archive_progress)
+    print(f"Archived {jobs_report['archived']} expired jobs")
+    if jobs_report["archived"]:
+        job_result_cache.invalidate()
+
+    applications_report = archive_documents(mongo.db.applications, closed_applications_query(), batch_size,
+                                            max_batches, progress=print_archive_progress)
+    print(f"Archived {applications_report['archived']} closed applications")
@@ -0,0 +1,186 @@
+#!/usr/bin/env python3
+"""
+Application listing round-trip benchmark
+========================================
+
+Counts the MongoDB round trips behind one page of /applications/my-applications,
+/applications/job/<id>/applications and /applications/statistics, and compares
+them with the per-row find_one lookups the batched hydration replaced.
+
+The collections are in-memory stand-ins that count every find, find_one,
+count_documents and aggregate call and sleep for a simulated network round trip,
+so the timings show what the round trips cost at a given latency rather than
+the speed of the queries themselves.
+
+Applications submitted since job snapshots were added carry the job fields
+themselves; --with-snapshots measures listings of such applications, which
+need no job query at all.
+
+Usage:
+    python benchmarks/hydration_benchmark.py --page-size 50 --rtt-ms 1 [--with-snapshots]
+"""
+import argparse
+import os
+import sys
+import time
+from datetime import datetime, timedelta
+from unittest.mock import patch
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from flask import Flask
+from flask_pymongo import ObjectId
+
+with patch('extensions.mongo'), patch('extensions.fs'):
+    from applications import applications as applications_module
+    from applications.applications import applications_bp
+from applications.snapshots import job_snapshot
+
+
+class RoundTrips:
+    def __init__(self, rtt_ms):
+        self.rtt = rtt_ms / 1000
+        self.count = 0
+
+    def hit(self):
+        self.count += 1
+        if self.rtt:
+            time.sleep(self.rtt)
+
+
+def _matches(document, query):
+    for field, condition in (query or {}).items():
+        if isinstance(condition, dict) and "$in" in condition:
+            if document.get(field) not in condition["$in"]:
+                return False
+        elif document.get(field) != condition:
+            return False
+    return True
+
+
+class Cursor(list):
+    def sort(self, field, direction=1):
+        return Cursor(sorted(self, key=lambda document: document[field], reverse=direction < 0))
+
+    def skip(self, count):
+        return Cursor(self[count:])
+
+    def limit(self, count):
+        return Cursor(self[:count])
+
+
+class CountingCollection:
+    """Just enough of a pymongo collection for the application routes, counting round trips"""
+
+    def __init__(self, name, documents, round_trips):
+        self.name = name
+        self.database = {}
+        self.documents = documents
+        self.round_trips = round_trips
+
+    def find(self, query=None, projection=None):
+        self.round_trips.hit()
+        return Cursor(document for document in self.documents if _matches(document, query))
+
+    def find_one(self, query, projection=None):
+        self.round_trips.hit()
+        return next((document for document in self.documents if _matches(document, query)), None)
+
+    def count_documents(self, query):
+        self.round_trips.hit()
+        return sum(_matches(document, query) for document in self.documents)
+
+    def aggregate(self, pipeline):
+        self.round_trips.hit()
+        return []
+
+
+def build_data(page_size):
+    employer = {"_id": ObjectId(), "name": "Employer", "email": "boss@example.com", "role": "employer"}
+    seeker = {"_id": ObjectId(), "name": "Seeker", "email": "seeker@example.com", "role": "job_seeker"}
+    applicants = [seeker] + [
+        {"_id": ObjectId(), "name": f"Applicant {i}", "email": f"applicant{i}@example.com", "role": "job_seeker"}
+        for i in range(page_size)
+    ]
+    jobs = [{"_id": ObjectId(), "title": f"Job {i}", "firm": "Tech Corp", "location": "Sydney",
+             "employer_id": employer["_id"]} for i in range(page_size)]
+    now = datetime.utcnow()
+    applications = [
+        {"_id": ObjectId(), "job_id": job["_id"], "applicant_id": seeker["_id"], "status": "pending",
+         "applied_at": now - timedelta(minutes=i), "updated_at": now} for i, job in enumerate(jobs)
+    ] + [
+        {"_id": ObjectId(), "job_id": jobs[0]["_id"], "applicant_id": applicant["_id"], "status": "pending",
+         "applied_at": now - timedelta(minutes=i), "updated_at": now} for i, applicant in enumerate(applicants[1:])
+    ]
+    return employer, seeker, [employer] + applicants, jobs, applications
+
+
+def per_row_lookups(collections, applications, field, target):
+    """The lookups the routes did before: one find_one per listed application"""
+    for application in applications:
+        collections[target].find_one({"_id": application[field]})
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Count round trips per page of application listings")
+    parser.add_argument("--page-size", type=int, default=50, help="Applications per page")
+    parser.add_argument("--rtt-ms", type=float, default=1.0, help="Simulated network round trip in ms")
+    parser.add_argument("--with-snapshots", action="store_true", help="Embed job snapshots in the applications")
+    args = parser.parse_args()
+
+    round_trips = RoundTrips(args.rtt_ms)
+    employer, seeker, users, jobs, applications = build_data(args.page_size)
+    if args.with_snapshots:
+        jobs_by_id = {job["_id"]: job for job in jobs}
+        for application in applications:
+            application["job"] = job_snapshot(jobs_by_id[application["job_id"]])
+    collections = {
+        "users": CountingCollection("users", users, round_trips),
+        "jobs": CountingCollection("jobs", jobs, round_trips),
+        "applications": CountingCollection("applications", applications, round_trips)
+    }
+
+    app = Flask(__name__)
+    app.secret_key = "benchmark"
+    app.register_blueprint(applications_bp, url_prefix="/applications")
+    client = app.test_client()
+
+    scenarios = [
+        ("my-applications", seeker, f"/applications/my-applications?limit={args.page_size}",
+         "job_id", "jobs", [a for a in applications if a["applicant_id"] == seeker["_id"]][:args.page_size]),
+        ("job applications", employer, f"/applications/job/{jobs[0]['_id']}/applications?limit={args.page_size}",
+         "applicant_id", "users", [a for a in applications if a["job_id"] == jobs[0]["_id"]][:args.page_size]),
+        ("statistics", seeker, "/applications/statistics",
+         "job_id", "jobs", [a for a in applications if a["applicant_id"] == seeker["_id"]][:5]),
+    ]
+
+    with patch.object(applications_module, "users_db", collections["users"]), \
+            patch.object(applications_module, "jobs_db", collections["jobs"]), \
+            patch.object(applications_module, "applications_db", collections["applications"]), \
+            patch("utils.mongo") as mock_mongo:
+        mock_mongo.db.users = collections["users"]
+        print(f"{'endpoint':<17} {'rows':>5} {'batched':>8} {'per-row':>8} {'batched ms':>11} {'per-row ms':>11}")
+        for label, user, url, field, target, listed in scenarios:
+            with client.session_transaction() as session:
+                session["user_id"] = str(user["_id"])
+
+            round_trips.count = 0
+            started = time.perf_counter()
+            response = client.get(url)
+            batched_ms = (time.perf_counter() - started) * 1000
+            assert response.status_code == 200, response.get_json()
+            batched = round_trips.count
+
+            # Same route minus its hydration query (none when the jobs come from snapshots),
+            # plus the per-row lookups it replaced
+            started = time.perf_counter()
+            per_row_lookups(collections, listed, field, target)
+            hydration_queries = 0 if args.with_snapshots and target == "jobs" else 1
+            per_row = batched - hydration_queries + len(listed)
+            per_row_ms = batched_ms + (time.perf_counter() - started) * 1000 - args.rtt_ms * hydration_queries
+
+            print(f"{label:<17} {len(listed):>5} {batched:>8} {per_row:>8} {batched_ms:>11.1f} {per_row_ms:>11.1f}")
+
+
+if __name__ == "__main__":
+    main()
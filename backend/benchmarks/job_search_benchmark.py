@@ -0,0 +1,115 @@
+#!/usr/bin/env python3
+"""
+Job search benchmark
+====================
+
+Compares the in-memory BM25 index used by /jobs/get against the regex path it
+replaced, on a synthetic corpus of job listings.
+
+The regex path is reproduced in process: every query runs a case-insensitive,
+unanchored pattern over the title and description of every job, which is the
+same per-document work MongoDB does for a ``$regex`` collection scan (minus the
+BSON decoding and network transfer, so the real gap is larger).
+
+Usage:
+    python benchmarks/job_search_benchmark.py --jobs 100000 --queries 200
+"""
+import argparse
+import os
+import random
+import re
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from jobs.search_index import JobSearchIndex
+
+TITLES = [
+    "Barista", "Software Engineer", "Sales Associate", "Registered Nurse", "Chef",
+    "Data Analyst", "Project Manager", "Electrician", "Receptionist", "Warehouse Operator",
+    "Marketing Coordinator", "Accountant", "Retail Assistant", "Teacher", "Plumber",
+    "Customer Service Representative", "Truck Driver", "Web Developer", "Cleaner", "Carpenter"
+]
+SENIORITY = ["", "Junior", "Senior", "Lead", "Graduate", "Casual"]
+FIRMS = [
+    "Greeks Bar", "Tech Corp", "Harbour Health", "Outback Logistics", "Coastal Retail",
+    "Southern Cross Construction", "Koala Cafe", "Blue Mountains Accounting", "Reef Hospitality"
+]
+FILLER = (
+    "We are looking for a motivated team member to join our growing business. "
+    "You will work closely with customers and colleagues in a fast paced environment. "
+    "Experience with python react sql excel customer service sales coffee machines "
+    "forklift licence rostering inventory and communication is highly regarded."
+).split()
+QUERIES = [
+    "barista", "software engineer", "sales", "nurse", "senior chef", "data",
+    "project manager", "python", "customer service", "driver", "engin", "retail assistant"
+]
+
+
+def generate_corpus(size, seed=42):
+    rng = random.Random(seed)
+    corpus = []
+    for i in range(size):
+        title = f"{rng.choice(SENIORITY)} {rng.choice(TITLES)}".strip()
+        description = " ".join(rng.choice(FILLER) for _ in range(rng.randint(40, 120)))
+        corpus.append({
+            "_id": f"{i:024x}",
+            "title": title,
+            "description": f"{title}. {description}",
+            "firm": rng.choice(FIRMS)
+        })
+    return corpus
+
+
+def regex_search(corpus, query):
+    pattern = re.compile(query, re.IGNORECASE)
+    return [job["_id"] for job in corpus if pattern.search(job["title"]) or pattern.search(job["description"])]
+
+
+def percentile(samples, fraction):
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * fraction))]
+
+
+def time_queries(search, queries):
+    samples = []
+    for query in queries:
+        start = time.perf_counter()
+        search(query)
+        samples.append((time.perf_counter() - start) * 1000)
+    return samples
+
+
+def report(name, samples):
+    print(f"{name:<12} p50={statistics.median(samples):9.3f}ms  "
+          f"p99={percentile(samples, 0.99):9.3f}ms  max={max(samples):9.3f}ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark job search strategies")
+    parser.add_argument("--jobs", type=int, default=100000, help="Number of synthetic jobs")
+    parser.add_argument("--queries", type=int, default=100, help="Number of queries to time per strategy")
+    parser.add_argument("--seed", type=int, default=42, help="Random seed for the corpus and queries")
+    args = parser.parse_args()
+
+    print(f"Generating {args.jobs} synthetic jobs...")
+    corpus = generate_corpus(args.jobs, args.seed)
+    rng = random.Random(args.seed)
+    queries = [rng.choice(QUERIES) for _ in range(args.queries)]
+
+    index = JobSearchIndex()
+    start = time.perf_counter()
+    index.build(corpus)
+    build_seconds = time.perf_counter() - start
+    print(f"Index build: {build_seconds:.2f}s ({index.stats()['terms']} terms)")
+    print("-" * 70)
+
+    report("regex", time_queries(lambda query: regex_search(corpus, query), queries))
+    report("bm25 index", time_queries(lambda query: index.search(query, limit=2000), queries))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,69 @@
+#!/usr/bin/env python3
+"""
+Autocomplete benchmark
+======================
+
+Measures per-keystroke latency of the in-memory suggestion indexes behind
+/jobs/suggestions on a synthetic corpus. Every prefix of each query is timed,
+mimicking a user typing, plus a set of misspelled queries that exercise the
+n-gram fallback. The target is a p99 below 5ms per call.
+
+Usage:
+    python benchmarks/suggestion_benchmark.py --jobs 200000
+"""
+import argparse
+import os
+import random
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from jobs.suggestions import SUGGESTION_FIELDS, suggest_all
+from job_search_benchmark import generate_corpus, percentile
+
+CITIES = [
+    "Sydney", "Melbourne", "Brisbane", "Perth", "Adelaide", "Canberra", "Hobart", "Darwin",
+    "Gold Coast", "Newcastle", "Wollongong", "Geelong", "Townsville", "Cairns", "Toowoomba"
+]
+JOBTYPES = ["hospitality", "retail", "construction", "healthcare", "it", "education", "logistics"]
+TYPED_QUERIES = ["barista", "software engineer", "sydney", "melbourne", "retail", "nurse", "gold coast"]
+MISSPELLED_QUERIES = ["barsita", "sofware", "melbonre", "recepionist", "electirican"]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark job suggestion lookups")
+    parser.add_argument("--jobs", type=int, default=200000, help="Number of synthetic jobs")
+    parser.add_argument("--seed", type=int, default=42, help="Random seed")
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    corpus = generate_corpus(args.jobs, args.seed)
+    for job in corpus:
+        # Vary titles so the index holds many distinct values, as real listings do
+        job["title"] = f"{job['title']} {rng.choice(['', 'Level 2', 'Team Leader', 'Part Time', 'Casual', rng.choice(CITIES), f'Store {rng.randint(1, 500)}'])}".strip()
+        job["location"] = rng.choice(CITIES)
+        job["jobtype"] = rng.choice(JOBTYPES)
+
+    start = time.perf_counter()
+    for field, index in SUGGESTION_FIELDS.items():
+        index.build(job.get(field) for job in corpus)
+    print(f"Built suggestion indexes in {time.perf_counter() - start:.2f}s "
+          f"({len(SUGGESTION_FIELDS['title'])} distinct titles)")
+
+    keystrokes = [query[:length] for query in TYPED_QUERIES for length in range(2, len(query) + 1)]
+    for label, queries in (("typing", keystrokes), ("misspelled", MISSPELLED_QUERIES)):
+        for index in SUGGESTION_FIELDS.values():
+            index._cache.clear()
+        samples = []
+        for query in queries:
+            started = time.perf_counter()
+            suggest_all(query)
+            samples.append((time.perf_counter() - started) * 1000)
+        print(f"{label:<11} cold p50={statistics.median(samples):7.3f}ms  "
+              f"p99={percentile(samples, 0.99):7.3f}ms  max={max(samples):7.3f}ms")
+
+
+if __name__ == "__main__":
+    main()
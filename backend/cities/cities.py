@@ -3,6 +3,10 @@ from extensions import mongo, bcrypt  # Import from extensions
 from flask_pymongo import ObjectId
 from datetime import datetime
 import constants as c
+from pymongo import UpdateOne
+from utils import wants_ndjson_stream, stream_documents
+from jobs.geo import geo_point
+from http_cache import REFERENCE_CACHE_CONTROL, collection_versions, conditional_json, version_etag
 import stripe
 
 stripe.api_key = 'sk_test_51Q83DKRvr2lf43Pu7rxqSkBy9NfqFLffJ18wSKJphsL6fozICNjJ4sIR5pXsDfnfg4bIxqSyF7301eGMPjiuP97Z006wtOJpCl'
@@ -13,40 +17,50 @@ cities_db = mongo.db.cities
 @cities_bp.route("/", methods=["GET"])
 def get_cities():
     """Root route for /cities - returns all cities"""
-    cities = cities_db.find({})
+    return conditional_json(list_cities, REFERENCE_CACHE_CONTROL, cities_etag("all"))
+
+def list_cities(query=None):
     final_cities = []
-    for city in cities:
+    for city in cities_db.find(query or {}):
         city["_id"] = str(city["_id"])
         final_cities.append(city)
-    return jsonify(final_cities)
+    return final_cities
+
+def cities_etag(variant):
+    return version_etag("cities", collection_versions.get("cities"), variant)
 
 @cities_bp.route("/add_all", methods=["POST"])
 def add_all_cities():
     data = request.get_json()
-    for city in data:
-        cities_db.insert_one({"city":city["city"], "state": city["admin_name"]})
+    # Upsert on city and state so the data set can be reloaded to fill in coordinates
+    operations = [
+        UpdateOne(
+            {"city": city["city"], "state": city["admin_name"]},
+            {"$set": {"coordinates": geo_point(city.get("lat"), city.get("lng"))}},
+            upsert=True
+        )
+        for city in data
+    ]
+    if operations:
+        cities_db.bulk_write(operations, ordered=False)
+        collection_versions.bump("cities")
         
     return jsonify({"message": "Cities added correctly!"}), 200
 
 @cities_bp.route("/get_all", methods=["GET"])
 def get_all_cities():
-    cities = cities_db.find({})
-    final_cities = []
-    for city in cities:
-        city["_id"] = str(city["_id"])
-        final_cities.append(city)
-    return jsonify(final_cities)
+    if wants_ndjson_stream():
+        return stream_documents(cities_db.find({}))
+    response = conditional_json(list_cities, REFERENCE_CACHE_CONTROL, cities_etag("all"))
+    response.vary.add("Accept")
+    return response
 
 @cities_bp.route("/get_main", methods=["GET"])
 def get_main_cities():
     cities = ["Sydney", "Melbourne", "Brisbane", "Canberra"]
-    result = cities_db.find({"city": {"$in": cities}})
-    final_result = []
-    for city in result:
-        city["_id"] = str(city["_id"])
-        final_result.append(city)
-        
-    return jsonify(final_result)
+    return conditional_json(
+        lambda: list_cities({"city": {"$in": cities}}), REFERENCE_CACHE_CONTROL, cities_etag("main")
+    )
 
 @cities_bp.route('/create-payment-intent', methods=['POST'])
 def create_payment_intent():
@@ -0,0 +1,137 @@
+"""
+Conditional GET support for public read endpoints
+Derives strong ETags from per-collection version counters, answers matching If-None-Match requests with 304 and sets Cache-Control
+"""
+import hashlib
+import secrets
+from typing import Callable, Optional
+
+from flask import current_app, jsonify, request
+from redis.exceptions import RedisError
+
+KEY_PREFIX = "collections:version"
+# Version counters start from a random value below this, so a counter that Redis lost
+# (a flush, an eviction, a new instance) does not count through versions again whose
+# ETags clients still hold
+SEED_RANGE = 2 ** 48
+
+# Cache-Control policies per kind of resource
+# Cities, states and job types change a few times a year
+REFERENCE_CACHE_CONTROL = "public, max-age=3600, stale-while-revalidate=86400"
+# A job page can be edited or removed at any time, so browsers revalidate after a minute
+JOB_CACHE_CONTROL = "public, max-age=60"
+# Suggestions are ranked over every job and tolerate a few minutes of lag
+SUGGESTIONS_CACHE_CONTROL = "public, max-age=300"
+
+
+def read_counter(client, key: str) -> int:
+    """Read a version counter, seeding it at a random value when it does not exist"""
+    value = client.get(key)
+    if value is None:
+        client.set(key, secrets.randbelow(SEED_RANGE), nx=True)
+        value = client.get(key)
+    return int(value or 0)
+
+
+def increment_counter(client, key: str) -> int:
+    """Bump a version counter, seeding it at a random value first when it does not exist"""
+    client.set(key, secrets.randbelow(SEED_RANGE), nx=True)
+    return int(client.incr(key))
+
+
+class CollectionVersions:
+    """
+    Version counters for collections, shared by all workers on the Redis instance used for sessions
+
+    Every write to a collection bumps its counter, so an ETag built from the counter
+    changes exactly when the data behind a response may have changed. A request whose
+    ETag still matches can be answered without querying MongoDB at all.
+    """
+
+    @staticmethod
+    def _client():
+        return current_app.config.get("SESSION_REDIS")
+
+    def get(self, name: str) -> Optional[int]:
+        """Current version of a collection, or None when the counters are unavailable"""
+        client = self._client()
+        if client is None:
+            return None
+        try:
+            return read_counter(client, f"{KEY_PREFIX}:{name}")
+        except RedisError as e:
+            print(f"Error reading {name} version: {e}")
+            return None
+
+    def bump(self, name: str) -> Optional[int]:
+        """
+        Record that a collection changed, invalidating every ETag built from it
+
+        Returns:
+            The new version, or None when the counters are unavailable
+        """
+        client = self._client()
+        if client is None:
+            return None
+        try:
+            return increment_counter(client, f"{KEY_PREFIX}:{name}")
+        except RedisError as e:
+            print(f"Error bumping {name} version: {e}")
+            return None
+
+
+def version_etag(name: str, version: Optional[int], *variant) -> Optional[str]:
+    """
+    Build the ETag of a response derived from one version of a collection
+
+    Args:
+        name: Collection name
+        version: Collection version, None when unknown
+        variant: Values that select a different representation (route, query arguments)
+
+    Returns:
+        The ETag value, or None when the version is unknown
+    """
+    if version is None:
+        return None
+    digest = hashlib.sha1(repr(variant).encode("utf-8")).hexdigest()[:16]
+    return f"{name}-v{version}-{digest}"
+
+
+def _not_modified(etag: str, cache_control: str):
+    response = current_app.response_class(status=304)
+    response.set_etag(etag)
+    response.headers["Cache-Control"] = cache_control
+    return response
+
+
+def conditional_json(build: Callable[[], object], cache_control: str, etag: Optional[str] = None):
+    """
+    Return a JSON response that honours If-None-Match
+
+    With a version ETag a matching request gets a 304 before the body is built, so the
+    database is not queried. Without one the body is built and its SHA-1 becomes the
+    ETag, which still saves the transfer when nothing changed.
+
+    Args:
+        build: Function returning the JSON-serializable body
+        cache_control: Cache-Control header value
+        etag: ETag derived from the data version, if known
+
+    Returns:
+        A 200 response with ETag and Cache-Control, or an empty 304
+    """
+    if etag is not None and request.if_none_match.contains_weak(etag):
+        return _not_modified(etag, cache_control)
+
+    response = jsonify(build())
+    if etag is not None:
+        response.set_etag(etag)
+    else:
+        response.add_etag()
+    response.headers["Cache-Control"] = cache_control
+    return response.make_conditional(request)
+
+
+# Shared counters used by the reference data blueprints
+collection_versions = CollectionVersions()
@@ -0,0 +1,48 @@
+"""
+Batched hydration of referenced documents
+Resolves the ids referenced by a page of documents with one projected $in query per referenced collection
+"""
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from archive import archive_of
+
+
+def fetch_by_ids(collection, ids: Iterable, projection: Optional[Dict] = None, with_archive: bool = False) -> Dict:
+    """
+    Fetch the documents with the given ids in a single query
+
+    Args:
+        collection: Collection the ids refer to
+        ids: Referenced ids; repeated ids and None are ignored
+        projection: Fields to return
+        with_archive: Look ids missing from the live collection up in its archive, with one more query
+
+    Returns:
+        Dictionary of id to document, without the ids that were not found
+    """
+    wanted = list(dict.fromkeys(doc_id for doc_id in ids if doc_id is not None))
+    if not wanted:
+        return {}
+    found = {document["_id"]: document for document in collection.find({"_id": {"$in": wanted}}, projection)}
+    missing = [doc_id for doc_id in wanted if doc_id not in found]
+    if with_archive and missing:
+        found.update(
+            (document["_id"], document)
+            for document in archive_of(collection).find({"_id": {"$in": missing}}, projection)
+        )
+    return found
+
+
+def hydrate(documents: Iterable[Dict], field: str, collection, projection: Optional[Dict] = None,
+            with_archive: bool = False) -> List[Tuple[Dict, Optional[Dict]]]:
+    """
+    Pair each document of a page with the document its ``field`` references
+
+    Replaces a find_one per document with one fetch_by_ids call for the whole page.
+
+    Returns:
+        (document, referenced document or None) pairs in the original order
+    """
+    documents = list(documents)
+    referenced = fetch_by_ids(collection, (document.get(field) for document in documents), projection, with_archive)
+    return [(document, referenced.get(document.get(field))) for document in documents]
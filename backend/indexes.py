@@ -0,0 +1,317 @@
+"""
+Index registry for AusJobs
+Declares every index the blueprints' queries rely on, reconciles them with the database
+and verifies that the hot query shapes are served by an index
+"""
+import threading
+from datetime import datetime
+from typing import Dict, List
+
+import click
+from flask.cli import AppGroup
+from flask_pymongo import ObjectId
+from pymongo import IndexModel
+
+from extensions import mongo
+from applications.duplicates import UNIQUE_APPLICATION_KEYS
+from applications.events import HISTORY_SORT
+from jobs.enrichment import ENRICHMENT_INDEXES, SALARY_INDEXES
+from jobs.pagination import HIGHEST_SALARY_SORT, NEWEST_FIRST_SORT, SORT_INDEXES
+
+# Indexes per collection: each entry is the key list plus any create_index options
+INDEX_REGISTRY = {
+    "jobs": [
+        # The sorted listings; the plain newest-first index also serves the datePosted range
+        {"keys": keys} for keys in SORT_INDEXES
+    ] + [
+        {"keys": [("slug", 1)]},
+        {"keys": [("employer_id", 1)]},
+        # Serves the radius searches
+        {"keys": [("geo", "2dsphere")]},
+    ] + [{"keys": keys} for keys in ENRICHMENT_INDEXES + SALARY_INDEXES],
+    "applications": [
+        {"keys": [("applicant_id", 1), ("applied_at", -1)]},
+        # One application per applicant and job; submissions rely on it to reject duplicates
+        {"keys": UNIQUE_APPLICATION_KEYS, "options": {"unique": True}},
+        {"keys": [("job_id", 1), ("status", 1)]},
+        # Serves the archival of closed applications
+        {"keys": [("status", 1), ("updated_at", 1)]},
+    ],
+    # Archives are only read by slug or id
+    "jobs_archive": [
+        {"keys": [("slug", 1)]},
+    ],
+    "notifications": [
+        {"keys": [("user_id", 1), ("status", 1), ("created_at", -1)]},
+    ],
+    "tokens": [
+        {"keys": [("token", 1)]},
+    ],
+    "failed_login_attempts": [
+        {"keys": [("identifier", 1), ("timestamp", -1)]},
+    ],
+    "account_lockouts": [
+        {"keys": [("identifier", 1), ("identifier_type", 1), ("is_active", 1), ("locked_until", 1)]},
+    ],
+    "refresh_tokens": [
+        {"keys": [("jti", 1)]},
+        {"keys": [("user_id", 1), ("is_revoked", 1), ("created_at", -1)]},
+    ],
+    "cities": [
+        {"keys": [("city", 1)]},
+        {"keys": [("coordinates", "2dsphere")]},
+    ],
+    "users": [
+        {"keys": [("email", 1)]},
+    ],
+    "saved_searches": [
+        {"keys": [("user_id", 1), ("created_at", -1)]},
+    ],
+    # Employer counters are read by _id
+    "job_application_stats": [
+        {"keys": [("employer_id", 1)]},
+    ],
+    # Status history pages of one application
+    "application_events": [
+        {"keys": [("application_id", 1)] + HISTORY_SORT},
+    ],
+}
+
+# Representative hot-path queries, checked with explain() to catch collection scans and in-memory sorts
+QUERY_SHAPES = [
+    {"collection": "jobs", "filter": {"slug": "barista-sydney-abc123"}},
+    {"collection": "jobs", "filter": {}, "sort": NEWEST_FIRST_SORT},
+    {"collection": "jobs", "filter": {"experience_level": "senior"}, "sort": NEWEST_FIRST_SORT},
+    {"collection": "jobs", "filter": {"location": {"$in": ["Sydney", "Melbourne"]}}, "sort": NEWEST_FIRST_SORT},
+    {"collection": "jobs", "filter": {"created_at": {"$gte": datetime(2024, 1, 1)}}, "sort": NEWEST_FIRST_SORT},
+    {"collection": "jobs", "filter": {}, "sort": HIGHEST_SALARY_SORT},
+    {"collection": "jobs", "filter": {"jobtype": {"$in": ["full-time"]}}, "sort": HIGHEST_SALARY_SORT},
+    {"collection": "jobs", "filter": {"location": {"$in": ["Sydney"]}, "salary_annual": {"$gte": 50000}},
+     "sort": HIGHEST_SALARY_SORT},
+    {"collection": "jobs", "filter": {"location": {"$in": ["Sydney"]}, "salary_annual": {"$gte": 50000}}},
+    {"collection": "applications", "filter": {"applicant_id": ObjectId()}, "sort": [("applied_at", -1)]},
+    {"collection": "applications", "filter": {"job_id": ObjectId(), "status": "pending"}},
+    {"collection": "applications", "filter": {"status": {"$in": ["withdrawn", "rejected", "accepted"]},
+                                              "updated_at": {"$lt": datetime(2024, 1, 1)}}},
+    {"collection": "jobs", "filter": {"employer_id": ObjectId()}},
+    {"collection": "job_application_stats", "filter": {"employer_id": ObjectId()}},
+    {"collection": "application_events", "filter": {"application_id": ObjectId()}, "sort": HISTORY_SORT},
+    {"collection": "jobs_archive", "filter": {"slug": "barista-sydney-abc123"}},
+    {"collection": "notifications", "filter": {"user_id": ObjectId(), "status": "unread"},
+     "sort": [("created_at", -1)]},
+    {"collection": "tokens", "filter": {"token": "token", "type": "password_reset", "used": False}},
+    {"collection": "failed_login_attempts", "filter": {"identifier": "user@example.com", "resolved": False,
+                                                       "timestamp": {"$gte": datetime(2024, 1, 1)}}},
+    {"collection": "account_lockouts", "filter": {"identifier": "user@example.com", "identifier_type": "email",
+                                                  "is_active": True}},
+    {"collection": "refresh_tokens", "filter": {"jti": "jti", "is_revoked": False}},
+    {"collection": "users", "filter": {"email": "user@example.com"}},
+    {"collection": "cities", "filter": {"city": {"$in": ["Sydney"]}}},
+]
+
+
+def _key_list(keys) -> List:
+    # Servers may report numeric directions as floats
+    return [(field, direction if isinstance(direction, str) else int(direction)) for field, direction in keys]
+
+
+def has_unique_index(collection, keys) -> bool:
+    """Whether a collection has a unique index on exactly the given keys"""
+    keys = _key_list(keys)
+    return any(info.get("unique") and _key_list(info["key"]) == keys
+               for info in collection.index_information().values())
+
+
+def make_index_unique(collection, name: str):
+    """
+    Turn an existing index into a unique one in place, without rebuilding it (MongoDB 6.0+)
+
+    prepareUnique makes the index reject new duplicates straight away; the conversion
+    itself fails while duplicates written earlier remain.
+    """
+    collection.database.command("collMod", collection.name, index={"name": name, "prepareUnique": True})
+    collection.database.command("collMod", collection.name, index={"name": name, "unique": True})
+
+
+def reconcile_indexes(db, registry: Dict = None, drop_unknown: bool = False) -> Dict:
+    """
+    Create the registered indexes that are missing from the database
+
+    Indexes are matched on their keys and unique option. Each missing index is built on
+    its own, so one that cannot be built (a unique index over duplicate values) does not
+    hold back the others. An index on the registered keys that is not unique when the
+    registry says it should be is converted in place. Index builds on MongoDB 4.2+ only
+    lock the collection briefly at the start and end, so reads and writes carry on while
+    they run.
+
+    Args:
+        db: Database to reconcile
+        registry: Indexes per collection, INDEX_REGISTRY by default
+        drop_unknown: Also drop indexes that are not in the registry
+
+    Returns:
+        Index names per collection under "created", "converted" (made unique),
+        "unknown" (present but not registered, dropped when drop_unknown is set) and
+        "failed" (each index with its error)
+    """
+    registry = INDEX_REGISTRY if registry is None else registry
+    report = {"created": {}, "converted": {}, "unknown": {}, "failed": {}}
+
+    for collection_name, indexes in registry.items():
+        collection = db[collection_name]
+        try:
+            existing = {name: (_key_list(info["key"]), bool(info.get("unique")))
+                        for name, info in collection.index_information().items()}
+        except Exception as e:
+            report["failed"][collection_name] = [str(e)]
+            continue
+
+        created, converted, failed = [], [], []
+        for index in indexes:
+            keys = _key_list(index["keys"])
+            unique = bool(index.get("options", {}).get("unique"))
+            if (keys, unique) in existing.values():
+                continue
+            model = IndexModel(index["keys"], **index.get("options", {}))
+            name = next((name for name, (existing_keys, _) in existing.items() if existing_keys == keys), None)
+            try:
+                if name is None:
+                    created.extend(collection.create_indexes([model]))
+                elif unique:
+                    make_index_unique(collection, name)
+                    converted.append(name)
+                else:
+                    failed.append(f"{name}: unique, but registered without the unique option")
+            except Exception as e:
+                failed.append(f"{name or model.document['name']}: {e}")
+
+        registered = [_key_list(index["keys"]) for index in indexes]
+        unknown = [name for name, (keys, _) in existing.items() if name != "_id_" and keys not in registered]
+        for key, names in (("created", created), ("converted", converted), ("unknown", unknown), ("failed", failed)):
+            if names:
+                report[key][collection_name] = names
+        if unknown and drop_unknown:
+            for name in unknown:
+                try:
+                    collection.drop_index(name)
+                except Exception as e:
+                    report["failed"].setdefault(collection_name, []).append(f"{name}: {e}")
+
+    return report
+
+
+def _plan_stages(plan):
+    """Yield every stage name in an explain() plan tree"""
+    if isinstance(plan, dict):
+        if "stage" in plan:
+            yield plan["stage"]
+        for value in plan.values():
+            yield from _plan_stages(value)
+    elif isinstance(plan, list):
+        for value in plan:
+            yield from _plan_stages(value)
+
+
+def _is_equality(condition) -> bool:
+    # $in lists count as equality: the planner merges one index range per value
+    return not isinstance(condition, dict) or set(condition) <= {"$eq", "$in"}
+
+
+def sort_index_for(shape: Dict, indexes: List[Dict]):
+    """
+    Find a registered index that returns a sorted query shape in order without an in-memory sort
+
+    The index must start with equality fields of the filter, followed by the sort keys
+    in the same or the fully reversed direction.
+
+    Returns:
+        The registry entry of the index, or None
+    """
+    sort = _key_list(shape["sort"])
+    reverse = [(field, -direction) for field, direction in sort]
+    for index in indexes:
+        keys = _key_list(index["keys"])
+        for split in range(len(keys) - len(sort) + 1):
+            prefix_fields = [field for field, _ in keys[:split]]
+            if keys[split:split + len(sort)] in (sort, reverse) and all(
+                field in shape["filter"] and _is_equality(shape["filter"][field]) for field in prefix_fields
+            ):
+                return index
+    return None
+
+
+def _unindexed_stages(shape: Dict, stages: List[str]) -> bool:
+    # A SORT stage means the results were sorted in memory rather than read in index order
+    return "COLLSCAN" in stages or (bool(shape.get("sort")) and "SORT" in stages)
+
+
+def find_collection_scans(db, query_shapes: List[Dict] = None) -> List[Dict]:
+    """
+    Explain each registered query shape and return the ones that are not served by an index
+
+    A shape fails when its winning plan scans the collection or, for a sorted shape,
+    sorts the results in memory.
+
+    Returns:
+        The offending query shapes, each with its winning plan's stage names
+    """
+    query_shapes = QUERY_SHAPES if query_shapes is None else query_shapes
+    collection_scans = []
+    for shape in query_shapes:
+        cursor = db[shape["collection"]].find(shape["filter"])
+        if shape.get("sort"):
+            cursor = cursor.sort(shape["sort"])
+        winning_plan = cursor.explain()["queryPlanner"]["winningPlan"]
+        stages = list(_plan_stages(winning_plan))
+        if _unindexed_stages(shape, stages):
+            collection_scans.append({**shape, "stages": stages})
+    return collection_scans
+
+
+def print_reconcile_report(report: Dict):
+    for collection_name, names in report["created"].items():
+        print(f"Created indexes on {collection_name}: {', '.join(names)}")
+    for collection_name, names in report["converted"].items():
+        print(f"Made indexes unique on {collection_name}: {', '.join(names)}")
+    for collection_name, names in report["unknown"].items():
+        print(f"Unregistered indexes on {collection_name}: {', '.join(names)}")
+    for collection_name, errors in report["failed"].items():
+        for error in errors:
+            print(f"Failed to reconcile an index on {collection_name}: {error}")
+
+
+def start_index_reconciliation(db) -> threading.Thread:
+    """Reconcile the registered indexes on a background thread so startup is not held up"""
+    def reconcile():
+        try:
+            print_reconcile_report(reconcile_indexes(db))
+        except Exception as e:
+            print(f"Failed to reconcile indexes: {e}")
+
+    thread = threading.Thread(target=reconcile, name="index-reconciliation", daemon=True)
+    thread.start()
+    return thread
+
+
+indexes_cli = AppGroup("indexes", help="Manage the indexes declared in the index registry.")
+
+
+@indexes_cli.command("reconcile")
+@click.option("--drop-unknown", is_flag=True, help="Drop indexes that are not in the registry.")
+def reconcile_command(drop_unknown):
+    """Create missing registered indexes and list unregistered ones"""
+    report = reconcile_indexes(mongo.db, drop_unknown=drop_unknown)
+    print_reconcile_report(report)
+    if not any(report.values()):
+        print("All registered indexes are present")
+
+
+@indexes_cli.command("verify")
+def verify_command():
+    """Report hot query shapes that still fall back to a collection scan or an in-memory sort"""
+    collection_scans = find_collection_scans(mongo.db)
+    for shape in collection_scans:
+        print(f"{' > '.join(shape['stages'])} on {shape['collection']}: "
+              f"filter={shape['filter']} sort={shape.get('sort')}")
+    if not collection_scans:
+        print(f"All {len(QUERY_SHAPES)} query shapes use an index")
@@ -0,0 +1,88 @@
+"""
+Batched field backfills for the jobs collection
+Pages through matching documents by _id, writes each batch with one bulk_write and checkpoints progress
+"""
+import os
+import time
+from datetime import datetime
+from typing import Callable, Dict, List, Optional
+
+# Configuration
+BACKFILL_BATCH_SIZE = int(os.getenv('JOBS_BACKFILL_BATCH_SIZE', '500'))
+
+
+def run_backfill(collection, query: Dict, projection: Dict, build_operations: Callable[[List[Dict]], List],
+                 batch_size: int = BACKFILL_BATCH_SIZE, name: Optional[str] = None, checkpoints=None,
+                 max_batches: Optional[int] = None, progress: Optional[Callable[[Dict], None]] = None) -> Dict:
+    """
+    Update the documents matching a query in _id order, one bulk_write per batch
+
+    When a checkpoint collection and a name are given, the last _id processed is saved
+    after every batch and the next run resumes after it; the checkpoint is removed once
+    the backfill reaches the end of the collection.
+
+    Args:
+        collection: Collection to update
+        query: Filter selecting the documents that still need the backfill
+        projection: Fields build_operations needs
+        build_operations: Turns a batch of documents into write operations; documents
+            without an operation are counted as skipped
+        batch_size: Documents read and written per round trip
+        name: Checkpoint key
+        checkpoints: Collection holding the checkpoints
+        max_batches: Stop after this many batches, leaving the checkpoint for the next run
+        progress: Called with the running totals after each batch
+
+    Returns:
+        Totals with the scanned, modified and skipped counts, the elapsed seconds, the
+        documents scanned per second and whether the end of the collection was reached
+    """
+    use_checkpoint = checkpoints is not None and name is not None
+    last_id = None
+    if use_checkpoint:
+        checkpoint = checkpoints.find_one({"_id": name})
+        if checkpoint:
+            last_id = checkpoint["last_id"]
+
+    report = {"scanned": 0, "modified": 0, "skipped": 0, "seconds": 0.0, "per_second": 0.0, "completed": False}
+    started = time.monotonic()
+    batches = 0
+
+    while max_batches is None or batches < max_batches:
+        batch_query = dict(query)
+        if last_id is not None:
+            batch_query["_id"] = {"$gt": last_id}
+        batch = list(collection.find(batch_query, projection).sort("_id", 1).limit(batch_size))
+        if not batch:
+            report["completed"] = True
+            break
+
+        operations = build_operations(batch)
+        if operations:
+            result = collection.bulk_write(operations, ordered=False)
+            report["modified"] += result.modified_count
+        report["scanned"] += len(batch)
+        report["skipped"] += len(batch) - len(operations)
+        last_id = batch[-1]["_id"]
+        batches += 1
+
+        if use_checkpoint:
+            checkpoints.update_one(
+                {"_id": name},
+                {"$set": {"last_id": last_id, "updated_at": datetime.utcnow()}},
+                upsert=True
+            )
+        _record_elapsed(report, started)
+        if progress:
+            progress(report)
+
+    if use_checkpoint and report["completed"]:
+        checkpoints.delete_one({"_id": name})
+    _record_elapsed(report, started)
+    return report
+
+
+def _record_elapsed(report: Dict, started: float):
+    report["seconds"] = time.monotonic() - started
+    report["per_second"] = report["scanned"] / report["seconds"] if report["seconds"] else 0.0
+
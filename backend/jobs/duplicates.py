@@ -0,0 +1,286 @@
+"""
+Near-duplicate job detection
+Keeps MinHash signatures of title, description, firm and location in a banded LSH index to catch repeat listings
+"""
+import hashlib
+import os
+import random
+import threading
+from array import array
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from flask_pymongo import ObjectId
+from pymongo import UpdateOne
+
+from jobs.backfill import BACKFILL_BATCH_SIZE, run_backfill
+from jobs.result_cache import job_result_cache
+from jobs.search_index import tokenize
+
+# Configuration
+# Estimated Jaccard similarity of the shingle sets above which a job is a near-duplicate
+DUPLICATE_THRESHOLD = float(os.getenv('JOB_DUPLICATE_THRESHOLD', '0.85'))
+# "flag" stores a near-duplicate with duplicate_of set, which leaves it out of listings; "merge" (opt-in)
+# drops it in favour of the job already stored, so /jobs/add answers 409 and bulk loads skip it
+DUPLICATE_POLICY = os.getenv('JOB_DUPLICATE_POLICY', 'flag')
+
+SIGNATURE_FIELDS = ("title", "description", "firm", "location")
+SHINGLE_SIZE = 3
+# 8 bands of 8 rows: pairs at the 0.85 threshold share a band 92% of the time, pairs at 0.5 only 3%
+SIGNATURE_BANDS = 8
+BAND_ROWS = 8
+SIGNATURE_SIZE = SIGNATURE_BANDS * BAND_ROWS
+# Slot ranks take the low 58 bits of a hash; the attempt at which an empty slot found a value goes
+# above them, so a borrowed value never equals an original one
+_RANK_BITS = 58
+# Fixed pseudo-random order in which each empty slot probes the others for a value to borrow
+_PROBE_ORDER = [
+    [other for other in random.Random(slot).sample(range(SIGNATURE_SIZE), SIGNATURE_SIZE) if other != slot]
+    for slot in range(SIGNATURE_SIZE)
+]
+
+
+def _shingle_hashes(job: Dict) -> Iterable[int]:
+    tokens = []
+    for field in SIGNATURE_FIELDS:
+        tokens.extend(tokenize(job.get(field)))
+    if not tokens:
+        return set()
+    # Short jobs are a single shingle rather than none
+    size = min(SHINGLE_SIZE, len(tokens))
+    return {
+        int.from_bytes(hashlib.blake2b(" ".join(tokens[i:i + size]).encode("utf-8"), digest_size=8).digest(), "big")
+        for i in range(len(tokens) - size + 1)
+    }
+
+
+def minhash_signature(job: Dict) -> Optional[array]:
+    """
+    Compute the MinHash signature of a job
+
+    Uses one-permutation hashing: each shingle is hashed once and the hash picks both
+    the signature slot and the value competing for its minimum, so the cost is linear
+    in the job length rather than in the signature size. Empty slots borrow the value
+    of a filled slot picked by a fixed per-slot probe order, which keeps the borrowed
+    slots of two jobs as independent as the filled ones.
+
+    Returns:
+        SIGNATURE_SIZE unsigned values, or None for a job without any text
+    """
+    hashes = _shingle_hashes(job)
+    if not hashes:
+        return None
+    bins = [None] * SIGNATURE_SIZE
+    for value in hashes:
+        slot, rank = value % SIGNATURE_SIZE, value // SIGNATURE_SIZE
+        if bins[slot] is None or rank < bins[slot]:
+            bins[slot] = rank
+
+    signature = array("Q", bytes(8 * SIGNATURE_SIZE))
+    for slot in range(SIGNATURE_SIZE):
+        if bins[slot] is not None:
+            signature[slot] = bins[slot]
+            continue
+        for attempt, other in enumerate(_PROBE_ORDER[slot], 1):
+            if bins[other] is not None:
+                signature[slot] = (attempt << _RANK_BITS) | bins[other]
+                break
+    return signature
+
+
+def estimate_similarity(first: array, second: array) -> float:
+    """Share of signature slots two jobs agree on, an estimate of their Jaccard similarity"""
+    return sum(a == b for a, b in zip(first, second)) / SIGNATURE_SIZE
+
+
+def _band_keys(signature: array):
+    for band in range(SIGNATURE_BANDS):
+        yield hash((band, *signature[band * BAND_ROWS:(band + 1) * BAND_ROWS]))
+
+
+class DuplicateJobsIndex:
+    """
+    Banded LSH index of job signatures
+
+    Each signature is split into bands and every band is hashed into a bucket, so the
+    candidates for a new job are the jobs sharing at least one bucket with it: a few
+    dictionary lookups regardless of the collection size. Candidates are confirmed by
+    comparing full signatures. All public methods are thread-safe. ``version`` is the
+    shared jobs version the contents correspond to.
+    """
+
+    def __init__(self):
+        self._lock = threading.RLock()
+        self._buckets: Dict[int, set] = {}
+        self._signatures: Dict[str, array] = {}
+        self.version: Optional[int] = None
+        self.ready = False
+
+    def __len__(self):
+        return len(self._signatures)
+
+    def _remove_locked(self, doc_id: str):
+        signature = self._signatures.pop(doc_id, None)
+        if signature is None:
+            return
+        for key in _band_keys(signature):
+            bucket = self._buckets.get(key)
+            if bucket is None:
+                continue
+            bucket.discard(doc_id)
+            if not bucket:
+                del self._buckets[key]
+
+    def _add_locked(self, doc_id: str, signature: Optional[array]):
+        self._remove_locked(doc_id)
+        if signature is None:
+            return
+        self._signatures[doc_id] = signature
+        for key in _band_keys(signature):
+            self._buckets.setdefault(key, set()).add(doc_id)
+
+    def build(self, jobs: Iterable[Dict], version: Optional[int] = None):
+        """
+        Replace the index contents with the given job documents
+
+        The new contents are built aside and swapped in at once, so checks keep using the
+        old ones until then.
+        """
+        fresh = DuplicateJobsIndex()
+        for job in jobs:
+            fresh._add_locked(str(job["_id"]), minhash_signature(job))
+        with self._lock:
+            self._buckets = fresh._buckets
+            self._signatures = fresh._signatures
+            self.version = version
+            self.ready = True
+
+    def add(self, doc_id, job: Dict, signature: Optional[array] = None):
+        """Index a job, replacing any previous version of the same document"""
+        with self._lock:
+            self._add_locked(str(doc_id), signature if signature is not None else minhash_signature(job))
+
+    def remove(self, doc_id):
+        """Remove a job from the index"""
+        with self._lock:
+            self._remove_locked(str(doc_id))
+
+    def clear(self):
+        """Remove every document from the index"""
+        with self._lock:
+            self._buckets = {}
+            self._signatures = {}
+
+    def find_duplicate(self, signature: Optional[array], exclude=None) -> Optional[Tuple[str, float]]:
+        """
+        Find the indexed job most similar to a signature, if it is a near-duplicate
+
+        Args:
+            signature: Signature of the job being checked
+            exclude: Id of the job itself, when it is already indexed
+
+        Returns:
+            (job_id, estimated similarity) of the closest job at or above
+            DUPLICATE_THRESHOLD, or None
+        """
+        if signature is None:
+            return None
+        exclude = str(exclude) if exclude is not None else None
+        best = None
+        with self._lock:
+            candidates = set()
+            for key in _band_keys(signature):
+                candidates.update(self._buckets.get(key, ()))
+            candidates.discard(exclude)
+            for doc_id in candidates:
+                similarity = estimate_similarity(signature, self._signatures[doc_id])
+                if similarity < DUPLICATE_THRESHOLD:
+                    continue
+                if best is None or (similarity, doc_id) > (best[1], best[0]):
+                    best = (doc_id, similarity)
+        return best
+
+    def stats(self) -> Dict:
+        """Return index size information"""
+        with self._lock:
+            return {"ready": self.ready, "documents": len(self._signatures), "buckets": len(self._buckets)}
+
+
+# Shared index used by the jobs blueprint and bulk ingestion
+duplicate_jobs_index = DuplicateJobsIndex()
+
+SIGNATURE_PROJECTION = {field: 1 for field in SIGNATURE_FIELDS}
+# Jobs already flagged as duplicates are not the original of anything
+ORIGINAL_JOBS_QUERY = {"duplicate_of": None}
+
+
+def original_jobs(jobs: Iterable[Dict]) -> List[Dict]:
+    """The jobs not flagged as near-duplicates, for jobs read with their duplicate_of field"""
+    return [job for job in jobs if not job.get("duplicate_of")]
+
+
+def build_duplicate_jobs_index(jobs_collection) -> DuplicateJobsIndex:
+    """Load every original job from the collection into the shared duplicate index"""
+    version = job_result_cache.version()
+    duplicate_jobs_index.build(jobs_collection.find(ORIGINAL_JOBS_QUERY, SIGNATURE_PROJECTION), version)
+    return duplicate_jobs_index
+
+
+def drop_archived_originals(index: DuplicateJobsIndex, jobs_collection, signatures: Iterable[Optional[array]]) -> int:
+    """
+    Remove the closest indexed matches of some signatures that are no longer live jobs
+
+    Jobs archived or deleted by another process stay in this process's index, and must
+    not turn a repost into a duplicate. Each round checks the closest match of every
+    signature with one query, until all of them are live.
+
+    Returns:
+        Number of jobs removed from the index
+    """
+    signatures = [signature for signature in signatures if signature is not None]
+    removed = 0
+    while True:
+        candidates = {duplicate[0] for duplicate in map(index.find_duplicate, signatures) if duplicate}
+        if not candidates:
+            return removed
+        live = {str(job["_id"]) for job in jobs_collection.find(
+            {"_id": {"$in": [ObjectId(doc_id) for doc_id in candidates]}}, {"_id": 1}
+        )}
+        stale = candidates - live
+        if not stale:
+            return removed
+        for doc_id in stale:
+            index.remove(doc_id)
+        removed += len(stale)
+
+
+def flag_duplicate_jobs(jobs_collection, batch_size: int = BACKFILL_BATCH_SIZE, **options) -> Dict:
+    """
+    Mark the near-duplicates already stored in the jobs collection
+
+    Jobs are compared in _id order, so the oldest listing stays the original and every
+    later copy gets duplicate_of set to its _id. The index is built as the scan goes,
+    which is why the run always starts from the beginning rather than a checkpoint.
+
+    Args:
+        jobs_collection: Collection to deduplicate
+        batch_size: Jobs read and written per round trip
+        **options: Passed on to run_backfill (max_batches, progress)
+
+    Returns:
+        Backfill report; "modified" is the number of jobs flagged
+    """
+    index = DuplicateJobsIndex()
+
+    def build_operations(batch):
+        operations = []
+        for job in batch:
+            signature = minhash_signature(job)
+            duplicate = index.find_duplicate(signature)
+            if duplicate:
+                operations.append(UpdateOne({"_id": job["_id"]}, {"$set": {"duplicate_of": ObjectId(duplicate[0])}}))
+            else:
+                index.add(job["_id"], job, signature)
+        return operations
+
+    return run_backfill(jobs_collection, ORIGINAL_JOBS_QUERY, SIGNATURE_PROJECTION, build_operations, batch_size,
+                        **options)
@@ -0,0 +1,195 @@
+"""
+Write-time job enrichment
+Derives indexed classification and salary fields from a job so read paths can filter on them directly
+"""
+import re
+from typing import Dict, List, Optional
+
+from pymongo import UpdateOne
+
+from jobs.backfill import BACKFILL_BATCH_SIZE, run_backfill
+
+# Bump when the classification rules change so the backfill re-processes every job
+ENRICHMENT_VERSION = 2
+
+# Text the classifications are derived from
+TEXT_FIELDS = ("title", "description")
+# Fields whose changes require the derived fields to be recomputed
+SOURCE_FIELDS = TEXT_FIELDS + ("remuneration_amount", "remuneration_period")
+
+# Keywords that place a job at an experience level
+EXPERIENCE_KEYWORDS = {
+    "entry": ["entry", "junior", "graduate", "trainee", "beginner"],
+    "mid": ["mid", "intermediate", "experienced", "3-5 years"],
+    "senior": ["senior", "lead", "principal", "5+ years", "expert"],
+    "executive": ["executive", "director", "manager", "head", "chief"]
+}
+
+# Keywords that describe where the work is done
+WORK_ARRANGEMENT_KEYWORDS = {
+    "remote": ["remote", "work from home", "wfh"],
+    "on-site": ["on-site", "office", "in-person"],
+    "hybrid": ["hybrid", "flexible", "mixed"]
+}
+
+# Common technical and business keywords
+IMPORTANT_KEYWORDS = [
+    'python', 'java', 'javascript', 'react', 'nodejs', 'html', 'css', 'sql',
+    'aws', 'azure', 'docker', 'kubernetes', 'git', 'agile', 'scrum',
+    'project management', 'leadership', 'communication', 'teamwork',
+    'analysis', 'problem solving', 'customer service', 'sales', 'marketing'
+]
+
+DEGREE_KEYWORDS = ['bachelor', 'master', 'phd', 'degree', 'diploma']
+
+# Pay periods per year, assuming a 38-hour, 5-day week worked 52 weeks a year
+PERIODS_PER_YEAR = {
+    "hour": 1976, "hourly": 1976, "hr": 1976,
+    "day": 260, "daily": 260,
+    "week": 52, "weekly": 52,
+    "fortnight": 26, "fortnightly": 26,
+    "month": 12, "monthly": 12,
+    "year": 1, "yearly": 1, "annual": 1, "annually": 1, "annum": 1, "pa": 1
+}
+
+# Indexes that serve the equality filters on the derived fields; experience_level and
+# work_arrangement are served by the sorted listing indexes (jobs.pagination.SORT_INDEXES)
+ENRICHMENT_INDEXES = [
+    [("keywords", 1)]
+]
+
+# Compound indexes that serve the salary range filter: equality fields first, then the range.
+# A single location or job type, or no equality filter at all, is served by the
+# highest-salary-first listing indexes
+SALARY_INDEXES = [
+    [("location", 1), ("jobtype", 1), ("salary_annual", 1)]
+]
+
+_AMOUNT_PATTERN = re.compile(r"\d+(?:\.\d+)?")
+
+
+class _KeywordClassifier:
+    """Finds every label whose keywords occur in a text with a single regex scan"""
+
+    def __init__(self, keyword_map: Dict[str, List[str]]):
+        self.labels = list(keyword_map)
+        self.labels_by_keyword: Dict[str, set] = {}
+        for label, keywords in keyword_map.items():
+            for keyword in keywords:
+                self.labels_by_keyword.setdefault(keyword.lower(), set()).add(label)
+        # Longest keywords first so the alternation prefers "work from home" over shorter overlaps;
+        # whole words only so that e.g. "lead" does not fire on "leading"
+        alternation = "|".join(re.escape(k) for k in sorted(self.labels_by_keyword, key=len, reverse=True))
+        self.pattern = re.compile(r"(?<!\w)(?:%s)(?!\w)" % alternation, re.IGNORECASE)
+
+    def classify(self, text: str) -> List[str]:
+        found = set()
+        for match in self.pattern.finditer(text):
+            found.update(self.labels_by_keyword[match.group().lower()])
+            if len(found) == len(self.labels):
+                break
+        return [label for label in self.labels if label in found]
+
+
+_EXPERIENCE_CLASSIFIER = _KeywordClassifier(EXPERIENCE_KEYWORDS)
+_WORK_ARRANGEMENT_CLASSIFIER = _KeywordClassifier(WORK_ARRANGEMENT_KEYWORDS)
+
+
+def _job_text(job: Dict) -> str:
+    return " ".join(str(job.get(field) or "") for field in TEXT_FIELDS)
+
+
+def classify_experience_levels(job: Dict) -> List[str]:
+    """Return every experience level whose keywords appear in the job"""
+    return _EXPERIENCE_CLASSIFIER.classify(_job_text(job))
+
+
+def classify_work_arrangements(job: Dict) -> List[str]:
+    """Return every work arrangement whose keywords appear in the job"""
+    return _WORK_ARRANGEMENT_CLASSIFIER.classify(_job_text(job))
+
+
+def extract_job_keywords(job_description: str) -> List[str]:
+    """Extract important keywords from job description"""
+    job_lower = (job_description or "").lower()
+    found_keywords = []
+
+    for keyword in IMPORTANT_KEYWORDS:
+        if keyword in job_lower:
+            found_keywords.append(keyword)
+
+    # Extract degree requirements
+    for pattern in DEGREE_KEYWORDS:
+        if pattern in job_lower:
+            found_keywords.append(pattern)
+
+    return found_keywords
+
+
+def annualize_salary(amount, period) -> Optional[int]:
+    """
+    Convert a pay rate to a yearly amount
+
+    Args:
+        amount: Number or text such as "$2,500" (the first number is used)
+        period: Pay period such as "hour", "per week" or "month"
+
+    Returns:
+        Yearly amount, or None when either value cannot be interpreted
+    """
+    if isinstance(amount, bool):
+        return None
+    if not isinstance(amount, (int, float)):
+        match = _AMOUNT_PATTERN.search(str(amount or "").replace(",", ""))
+        if not match:
+            return None
+        amount = float(match.group())
+
+    period_words = re.findall(r"[a-z]+", str(period or "").lower())
+    multiplier = next((PERIODS_PER_YEAR[word] for word in period_words if word in PERIODS_PER_YEAR), None)
+    if multiplier is None:
+        return None
+    return round(amount * multiplier)
+
+
+def enrich_job(job: Dict) -> Dict:
+    """
+    Compute the derived fields stored on a job document
+
+    Args:
+        job: Job document (or the merged result of an update)
+
+    Returns:
+        Dictionary of fields to store alongside the job
+    """
+    return {
+        "experience_level": classify_experience_levels(job),
+        "work_arrangement": classify_work_arrangements(job),
+        "keywords": extract_job_keywords(job.get("description")),
+        "salary_annual": annualize_salary(job.get("remuneration_amount"), job.get("remuneration_period")),
+        "enrichment_version": ENRICHMENT_VERSION
+    }
+
+
+def needs_enrichment(update_fields: Dict) -> bool:
+    """Check whether an update touches any field the enrichment is derived from"""
+    return any(field in update_fields for field in SOURCE_FIELDS)
+
+
+def backfill_job_enrichment(jobs_collection, batch_size: int = BACKFILL_BATCH_SIZE, **options) -> int:
+    """
+    Enrich every job whose stored fields are missing or out of date
+
+    Extra keyword arguments are passed to run_backfill.
+
+    Returns:
+        Number of jobs updated
+    """
+    def build_operations(batch):
+        return [UpdateOne({"_id": job["_id"]}, {"$set": enrich_job(job)}) for job in batch]
+
+    query = {"enrichment_version": {"$ne": ENRICHMENT_VERSION}}
+    projection = {field: 1 for field in SOURCE_FIELDS}
+    report = run_backfill(jobs_collection, query, projection, build_operations, batch_size,
+                          name="enrichment", **options)
+    return report["modified"]
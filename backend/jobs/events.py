@@ -0,0 +1,189 @@
+"""
+Write-behind counters for job engagement events
+Buffers view, click and impression events in process memory and applies them to jobs in periodic bulk writes
+"""
+import atexit
+import os
+import threading
+import time
+from collections import Counter
+from typing import Dict, Iterable, Optional, Tuple
+
+from flask_pymongo import ObjectId
+from pymongo import UpdateOne
+from pymongo.errors import BulkWriteError, PyMongoError
+
+# Configuration
+FLUSH_INTERVAL_SECONDS = float(os.getenv('JOB_EVENTS_FLUSH_SECONDS', '5'))
+# Distinct (job, event) counters held before a flush is forced; events beyond this are dropped
+MAX_BUFFERED_COUNTERS = int(os.getenv('JOB_EVENTS_MAX_BUFFERED', '50000'))
+# Events accepted per /jobs/events request
+MAX_EVENTS_PER_REQUEST = 100
+
+# Job field incremented for each event type
+EVENT_FIELDS = {
+    "view": "view_count",
+    "click": "click_count",
+    "impression": "impression_count"
+}
+
+
+class JobEventBuffer:
+    """
+    Per-worker buffer of job event counts
+
+    Recording an event only bumps an in-memory counter. A background thread folds the
+    counters into one $inc per job and applies them with a single unordered bulk_write
+    every FLUSH_INTERVAL_SECONDS. A worker that dies loses at most one interval of
+    events; if the buffer fills up faster than it is flushed, further events are dropped
+    and counted rather than growing memory without bound.
+    """
+
+    def __init__(self, max_counters: int = MAX_BUFFERED_COUNTERS):
+        self.max_counters = max_counters
+        self._lock = threading.Lock()
+        self._counts: Counter = Counter()
+        self._flush_requested = threading.Event()
+        self._stopped = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._collection = None
+        self.totals = {"recorded": 0, "flushed": 0, "dropped": 0, "failed_flushes": 0}
+        self.last_flush_at: Optional[float] = None
+
+    def record(self, job_id, event_type: str, count: int = 1) -> bool:
+        """
+        Count an event against a job
+
+        Returns:
+            False if the event was dropped because the buffer is full
+        """
+        key = (str(job_id), event_type)
+        with self._lock:
+            if key not in self._counts and len(self._counts) >= self.max_counters:
+                self.totals["dropped"] += count
+                self._flush_requested.set()
+                return False
+            self._counts[key] += count
+            self.totals["recorded"] += count
+        return True
+
+    def pending(self) -> int:
+        with self._lock:
+            return sum(self._counts.values())
+
+    def _take(self) -> Counter:
+        with self._lock:
+            counts, self._counts = self._counts, Counter()
+        return counts
+
+    def _restore(self, counts: Counter):
+        """Put back the counts of a failed flush, keeping the buffer within its bound"""
+        with self._lock:
+            for key, count in counts.items():
+                if key in self._counts or len(self._counts) < self.max_counters:
+                    self._counts[key] += count
+                else:
+                    self.totals["dropped"] += count
+
+    @staticmethod
+    def build_operations(counts: Dict[Tuple[str, str], int]):
+        """One $inc per job, in the order the jobs first appear in the counts"""
+        increments: Dict[str, Dict[str, int]] = {}
+        for (job_id, event_type), count in counts.items():
+            increments.setdefault(job_id, {})[EVENT_FIELDS[event_type]] = count
+        return [UpdateOne({"_id": ObjectId(job_id)}, {"$inc": fields}) for job_id, fields in increments.items()]
+
+    def flush(self, collection=None) -> int:
+        """
+        Apply the buffered counts to the jobs collection
+
+        Returns:
+            Number of events written
+        """
+        collection = collection if collection is not None else self._collection
+        counts = self._take()
+        if not counts or collection is None:
+            if counts:
+                self._restore(counts)
+            return 0
+        try:
+            collection.bulk_write(self.build_operations(counts), ordered=False)
+        except BulkWriteError as e:
+            # The unordered batch applied every update without a write error, so only the
+            # failed ones are put back; restoring the rest would count them twice
+            job_ids = list(dict.fromkeys(job_id for job_id, _ in counts))
+            failed_jobs = {job_ids[error["index"]] for error in e.details.get("writeErrors", [])}
+            print(f"Error flushing events of {len(failed_jobs)} jobs: {e}")
+            self.totals["failed_flushes"] += 1
+            self._restore(Counter({key: count for key, count in counts.items() if key[0] in failed_jobs}))
+            counts = Counter({key: count for key, count in counts.items() if key[0] not in failed_jobs})
+        except PyMongoError as e:
+            print(f"Error flushing job events: {e}")
+            self.totals["failed_flushes"] += 1
+            self._restore(counts)
+            return 0
+        flushed = sum(counts.values())
+        self.totals["flushed"] += flushed
+        self.last_flush_at = time.time()
+        return flushed
+
+    def _run(self, interval: float):
+        while not self._stopped.is_set():
+            self._flush_requested.wait(interval)
+            self._flush_requested.clear()
+            self.flush()
+
+    def start(self, collection, interval: float = FLUSH_INTERVAL_SECONDS):
+        """Start the background flusher for a worker, flushing again at exit; later calls are ignored"""
+        self._collection = collection
+        if self._thread is not None:
+            return
+        self._thread = threading.Thread(target=self._run, args=(interval,), name="job-events-flusher", daemon=True)
+        self._thread.start()
+        atexit.register(self.stop)
+
+    def stop(self):
+        """Stop the flusher and write whatever is still buffered"""
+        self._stopped.set()
+        self._flush_requested.set()
+        if self._thread is not None:
+            self._thread.join(timeout=FLUSH_INTERVAL_SECONDS)
+            self._thread = None
+        self.flush()
+
+    def stats(self) -> Dict:
+        return {
+            **self.totals,
+            "pending": self.pending(),
+            "last_flush_at": self.last_flush_at,
+            "running": self._thread is not None
+        }
+
+
+def parse_events(payload) -> Iterable[Tuple[str, str]]:
+    """
+    Validate a /jobs/events payload
+
+    Returns:
+        (job id, event type) pairs
+
+    Raises:
+        ValueError: If the payload is not a list of known events on valid job ids
+    """
+    events = payload.get("events") if isinstance(payload, dict) else None
+    if not isinstance(events, list) or not events:
+        raise ValueError("events must be a non-empty list")
+    if len(events) > MAX_EVENTS_PER_REQUEST:
+        raise ValueError(f"At most {MAX_EVENTS_PER_REQUEST} events per request")
+    parsed = []
+    for event in events:
+        if not isinstance(event, dict) or event.get("type") not in EVENT_FIELDS:
+            raise ValueError(f"Event type must be one of: {', '.join(EVENT_FIELDS)}")
+        if not ObjectId.is_valid(event.get("job_id")):
+            raise ValueError("Invalid job id")
+        parsed.append((event["job_id"], event["type"]))
+    return parsed
+
+
+# Shared buffer used by the jobs blueprint
+job_event_buffer = JobEventBuffer()
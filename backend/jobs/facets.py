@@ -0,0 +1,84 @@
+"""
+Facet counts for the job search filters
+Counts jobs per location, job type, salary band and date-posted window with one $facet aggregation
+"""
+import os
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional
+
+# Configuration
+FACET_LIMIT = int(os.getenv('JOBS_FACET_LIMIT', '20'))
+
+# Lower bounds of the yearly salary bands; the last band is open-ended
+SALARY_BANDS = [0, 40000, 60000, 80000, 100000, 150000]
+
+# datePosted windows in days; the windows overlap, so each is counted separately
+DATE_POSTED_DAYS = {
+    "today": 1,
+    "last3days": 3,
+    "lastWeek": 7,
+    "lastMonth": 30
+}
+
+# Request arguments that page through or order results without changing which jobs match
+NON_FILTER_PARAMETERS = ("cursor", "limit", "sort")
+
+
+def _top_values(field: str) -> List[Dict]:
+    return [
+        {"$group": {"_id": f"${field}", "count": {"$sum": 1}}},
+        {"$sort": {"count": -1, "_id": 1}},
+        {"$limit": FACET_LIMIT}
+    ]
+
+
+def build_facet_pipeline(search_parameters: Dict, now: Optional[datetime] = None) -> List[Dict]:
+    """Aggregation computing every facet for the jobs matching a filter in one pass"""
+    now = now or datetime.utcnow()
+    date_counts = {
+        window: {"$sum": {"$cond": [{"$gte": ["$created_at", now - timedelta(days=days)]}, 1, 0]}}
+        for window, days in DATE_POSTED_DAYS.items()
+    }
+    return [
+        {"$match": search_parameters},
+        {"$facet": {
+            "total": [{"$count": "count"}],
+            "location": _top_values("location"),
+            "jobtype": _top_values("jobtype"),
+            "salary": [
+                {"$match": {"salary_annual": {"$type": "number", "$gte": SALARY_BANDS[0]}}},
+                # Salaries above the last boundary fall into the default (open-ended) band
+                {"$bucket": {
+                    "groupBy": "$salary_annual",
+                    "boundaries": SALARY_BANDS,
+                    "default": SALARY_BANDS[-1],
+                    "output": {"count": {"$sum": 1}}
+                }}
+            ],
+            "date_posted": [{"$group": {"_id": None, **date_counts}}]
+        }}
+    ]
+
+
+def format_facets(result: Dict) -> Dict:
+    """Shape the $facet output as the counts the search filters display"""
+    bands = {bucket["_id"]: bucket["count"] for bucket in result["salary"]}
+    date_counts = result["date_posted"][0] if result["date_posted"] else {}
+    return {
+        "total": result["total"][0]["count"] if result["total"] else 0,
+        "location": [{"value": row["_id"], "count": row["count"]} for row in result["location"] if row["_id"]],
+        "jobtype": [{"value": row["_id"], "count": row["count"]} for row in result["jobtype"] if row["_id"]],
+        "salary": [
+            {"min": low, "max": high, "count": bands.get(low, 0)}
+            for low, high in zip(SALARY_BANDS, SALARY_BANDS[1:] + [None])
+        ],
+        "date_posted": {window: date_counts.get(window, 0) for window in DATE_POSTED_DAYS}
+    }
+
+
+def compute_facets(jobs_collection, search_parameters: Dict) -> Dict:
+    """Run the facet aggregation for a filter and return the formatted counts"""
+    result = next(jobs_collection.aggregate(build_facet_pipeline(search_parameters)), None)
+    if result is None:
+        result = {"total": [], "location": [], "jobtype": [], "salary": [], "date_posted": []}
+    return format_facets(result)
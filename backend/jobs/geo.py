@@ -0,0 +1,111 @@
+"""
+Geospatial job search
+Links jobs to their city's coordinates and builds the $geoNear queries behind radius searches
+"""
+import os
+from typing import Dict, Iterable, List, Optional
+
+from flask_pymongo import ObjectId
+
+from jobs.pagination import InvalidCursorError, decode_cursor
+
+# Configuration
+DEFAULT_RADIUS_KM = float(os.getenv('JOBS_DEFAULT_RADIUS_KM', '50'))
+MAX_RADIUS_KM = float(os.getenv('JOBS_MAX_RADIUS_KM', '500'))
+
+
+class InvalidGeoSearchError(ValueError):
+    """Raised when the near/lat/lng/radius search arguments cannot be used"""
+    pass
+
+
+def geo_point(lat, lng) -> Optional[Dict]:
+    """GeoJSON point for a latitude and longitude, or None if they are not valid coordinates"""
+    try:
+        lat, lng = float(lat), float(lng)
+    except (TypeError, ValueError):
+        return None
+    if not (-90 <= lat <= 90 and -180 <= lng <= 180):
+        return None
+    # GeoJSON puts the longitude first
+    return {"type": "Point", "coordinates": [lng, lat]}
+
+
+def locate_cities(cities_collection, names: Iterable[str]) -> Dict[str, Dict]:
+    """Look up the coordinates of several cities in one query"""
+    names = list({name for name in names if name})
+    if not names:
+        return {}
+    located = {}
+    for city in cities_collection.find({"city": {"$in": names}, "coordinates": {"$ne": None}},
+                                       {"city": 1, "coordinates": 1}):
+        located.setdefault(city["city"], city["coordinates"])
+    return located
+
+
+def parse_geo_search(args, cities_collection) -> Optional[Dict]:
+    """
+    Read a radius search from request arguments
+
+    The centre is either ``near`` (a city name) or ``lat`` and ``lng``; ``radius`` is in km.
+
+    Returns:
+        Dictionary with the centre point and the radius in km, or None when no centre is given
+
+    Raises:
+        InvalidGeoSearchError: If the centre is unknown or the coordinates are invalid
+    """
+    near = args.get("near", "").strip()
+    lat, lng = args.get("lat"), args.get("lng")
+    if not near and lat is None and lng is None:
+        return None
+
+    if near:
+        point = locate_cities(cities_collection, [near]).get(near)
+        if not point:
+            raise InvalidGeoSearchError(f"Unknown city: {near}")
+    else:
+        point = geo_point(lat, lng)
+        if not point:
+            raise InvalidGeoSearchError("lat and lng must be valid coordinates")
+
+    try:
+        radius_km = float(args.get("radius", DEFAULT_RADIUS_KM))
+    except (TypeError, ValueError):
+        raise InvalidGeoSearchError("radius must be a number of km")
+    return {"point": point, "radius_km": max(0.0, min(radius_km, MAX_RADIUS_KM))}
+
+
+def within_radius(point: Dict, radius_km: float) -> Dict:
+    """Filter for jobs within a radius, usable where $near is not (such as count_documents)"""
+    return {"geo": {"$geoWithin": {"$centerSphere": [point["coordinates"], radius_km / 6378.1]}}}
+
+
+def nearest_jobs_pipeline(point: Dict, radius_km: float, search_parameters: Dict, limit: int,
+                          cursor: Optional[str] = None) -> List[Dict]:
+    """
+    Aggregation returning jobs nearest-first within a radius, resuming after a distance cursor
+
+    $geoNear reads the candidates from the 2dsphere index on ``geo``. Jobs in one city share
+    a point, so distance ties are broken by _id to keep the pages stable.
+    """
+    geo_near = {
+        "near": point,
+        "key": "geo",
+        "distanceField": "distance",
+        "maxDistance": radius_km * 1000,
+        "spherical": True,
+        "query": search_parameters
+    }
+    pipeline = [{"$geoNear": geo_near}]
+    if cursor:
+        last_distance, last_id = decode_cursor(cursor, "distance")
+        if not isinstance(last_distance, (int, float)):
+            raise InvalidCursorError("Invalid cursor")
+        geo_near["minDistance"] = last_distance
+        pipeline.append({"$match": {"$or": [
+            {"distance": {"$gt": last_distance}},
+            {"distance": last_distance, "_id": {"$gt": ObjectId(last_id)}}
+        ]}})
+    pipeline += [{"$sort": {"distance": 1, "_id": 1}}, {"$limit": limit}]
+    return pipeline
@@ -0,0 +1,129 @@
+"""
+Background refresh of the per-worker job indexes
+Rebuilds a worker's in-memory job indexes on a background thread when the shared jobs version shows that another worker or a CLI command changed the jobs
+"""
+import os
+import threading
+import time
+from typing import Callable, Dict, Iterable, List, Optional
+
+from jobs.duplicates import SIGNATURE_PROJECTION, duplicate_jobs_index, original_jobs
+from jobs.result_cache import job_result_cache
+from jobs.search_index import INDEXED_FIELDS, job_search_index
+from jobs.similar import INDEXED_FIELDS as SIMILAR_FIELDS, similar_jobs_index
+from jobs.suggestions import SUGGESTION_FIELDS, SUGGESTION_PROJECTION, load_suggestion_indexes
+
+# Configuration
+# Shortest time between the starts of two rebuilds, so constant writes elsewhere do not keep a worker scanning
+REFRESH_INTERVAL_SECONDS = float(os.getenv('JOB_INDEX_REFRESH_SECONDS', '5'))
+
+
+class JobIndexRefresher:
+    """
+    Keeps a worker's job indexes at the shared jobs version
+
+    Each index is registered with the job fields it reads and a function building it
+    from a list of jobs at a version. A request that finds an index behind the shared
+    version starts a rebuild thread and goes on with the old contents; while that thread
+    runs no other rebuild is started. One read of the jobs collection serves every stale
+    index, and each index swaps its new contents in at once.
+    """
+
+    def __init__(self, interval: float = REFRESH_INTERVAL_SECONDS):
+        self.interval = interval
+        self._lock = threading.Lock()
+        self._entries: List = []
+        self._thread: Optional[threading.Thread] = None
+        self._started_at: Optional[float] = None
+
+    def register(self, indexes: Iterable, fields: Dict, build: Callable[[List[Dict], Optional[int]], None]):
+        """
+        Keep some indexes at the shared version
+
+        Args:
+            indexes: Indexes with ready and version attributes, rebuilt together
+            fields: Projection of the job fields the build reads
+            build: Function loading the indexes from the jobs and the version they correspond to
+        """
+        self._entries.append((list(indexes), fields, build))
+
+    def _indexes(self):
+        return [index for indexes, _, _ in self._entries for index in indexes]
+
+    def refresh(self, jobs_collection) -> bool:
+        """
+        Start rebuilding the indexes that are behind the shared jobs version
+
+        Indexes that were never built are left alone, since their callers fall back to
+        querying MongoDB.
+
+        Returns:
+            Whether a rebuild was started
+        """
+        version = job_result_cache.version()
+        if version is None:
+            return False
+        stale = [entry for entry in self._entries
+                 if any(index.ready and index.version != version for index in entry[0])]
+        if not stale:
+            return False
+
+        with self._lock:
+            now = time.monotonic()
+            if self._thread is not None and self._thread.is_alive():
+                return False
+            if self._started_at is not None and now - self._started_at < self.interval:
+                return False
+            self._started_at = now
+            self._thread = threading.Thread(target=self._rebuild, args=(jobs_collection, stale, version),
+                                            name="job-index-refresh", daemon=True)
+            self._thread.start()
+        return True
+
+    def _rebuild(self, jobs_collection, stale, version: int):
+        try:
+            projection = {field: 1 for _, fields, _ in stale for field in fields}
+            jobs = list(jobs_collection.find({}, projection))
+            for _, _, build in stale:
+                build(jobs, version)
+        except Exception as e:
+            print(f"Error refreshing job indexes: {e}")
+
+    def wait(self, timeout: Optional[float] = None):
+        """Wait for a running rebuild to finish"""
+        thread = self._thread
+        if thread is not None:
+            thread.join(timeout)
+
+    def record_change(self, apply: Callable):
+        """
+        Apply a change of the jobs to this worker's indexes and bump the shared version
+
+        An index that was current before the change keeps up with the version when no
+        other worker changed the jobs in the meantime, so a worker's own writes do not
+        force it to rebuild. The version is bumped even if apply raises, since part of
+        the change may have been stored.
+
+        Returns:
+            What apply returns
+        """
+        previous = [(index, index.version) for index in self._indexes()]
+        try:
+            return apply()
+        finally:
+            version = job_result_cache.invalidate()
+            if version is not None:
+                for index, index_version in previous:
+                    # An index rebuilt during the change holds another version and stays as it is
+                    if index_version == version - 1 and index.version == index_version:
+                        index.version = version
+
+
+# Shared refresher used by the jobs blueprint
+job_index_refresher = JobIndexRefresher()
+job_index_refresher.register([job_search_index], INDEXED_FIELDS, job_search_index.build)
+job_index_refresher.register([similar_jobs_index], {**SIMILAR_FIELDS, "duplicate_of": 1},
+                             lambda jobs, version: similar_jobs_index.build(original_jobs(jobs), version))
+job_index_refresher.register([duplicate_jobs_index], {**SIGNATURE_PROJECTION, "duplicate_of": 1},
+                             lambda jobs, version: duplicate_jobs_index.build(original_jobs(jobs), version))
+job_index_refresher.register(SUGGESTION_FIELDS.values(), SUGGESTION_PROJECTION, load_suggestion_indexes)
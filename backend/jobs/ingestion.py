@@ -0,0 +1,368 @@
+"""
+Bulk job ingestion
+Stream-parses NDJSON, CSV and XML job feeds and writes them to the jobs collection in unordered chunks
+"""
+import csv
+import json
+import os
+import re
+import xml.etree.ElementTree as ET
+from datetime import datetime
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from flask_pymongo import ObjectId
+from pymongo.errors import BulkWriteError
+
+from jobs.duplicates import DUPLICATE_POLICY, duplicate_jobs_index, drop_archived_originals, minhash_signature
+from jobs.enrichment import enrich_job
+from jobs.search_index import job_search_index
+from jobs.similar import similar_jobs_index
+from jobs.suggestions import record_job_suggestions
+
+# Configuration
+INGEST_CHUNK_SIZE = int(os.getenv('JOBS_INGEST_CHUNK_SIZE', '1000'))
+MAX_INGEST_CHUNK_SIZE = 10000
+# Only the first errors are reported back so a broken feed cannot produce a huge response
+MAX_REPORTED_ERRORS = 1000
+
+REQUIRED_FIELDS = ("title", "description", "remuneration_amount", "remuneration_period", "firm", "jobtype")
+
+# Old Mac CSV exports end their lines with a carriage return alone
+LONE_CARRIAGE_RETURN = re.compile(r"(?<=\r)(?!\n)")
+
+# Element wrapping each job in an XML feed
+XML_JOB_TAG = "job"
+
+FEED_CONTENT_TYPES = {
+    "application/x-ndjson": "ndjson",
+    "application/jsonl": "ndjson",
+    "text/csv": "csv",
+    "application/xml": "xml",
+    "text/xml": "xml"
+}
+FEED_EXTENSIONS = {
+    ".ndjson": "ndjson",
+    ".jsonl": "ndjson",
+    ".csv": "csv",
+    ".xml": "xml"
+}
+
+
+class InvalidRecordError(ValueError):
+    """Raised when a feed record cannot be turned into a job"""
+    pass
+
+
+def _decode_line(line: bytes, line_number: int) -> str:
+    # A byte order mark can only start the first line
+    return line.decode("utf-8-sig" if line_number == 1 else "utf-8")
+
+
+def iter_ndjson_records(stream) -> Iterator[Tuple[int, object]]:
+    """Yield (line number, record) for each line of a binary NDJSON stream"""
+    for line_number, line in enumerate(stream, start=1):
+        try:
+            line = _decode_line(line, line_number).strip()
+        except UnicodeDecodeError as e:
+            yield line_number, InvalidRecordError(f"Invalid UTF-8: {e}")
+            continue
+        if not line:
+            continue
+        try:
+            yield line_number, json.loads(line)
+        except ValueError as e:
+            yield line_number, InvalidRecordError(f"Invalid JSON: {e}")
+
+
+class _CsvLines:
+    """
+    Lines of a binary CSV stream decoded one at a time, noting those that are not UTF-8
+
+    Lines end at \\n, \\r\\n or a lone \\r, as they do for a file opened with newline="".
+    Undecodable lines are still handed to the reader, with replacement characters, so
+    quoted fields and line numbers stay in step.
+    """
+
+    def __init__(self, stream):
+        self.line_number = 0
+        self.undecodable = set()
+        self._lines = self._decode(stream)
+
+    def _decode(self, stream) -> Iterator[str]:
+        for position, line in enumerate(stream, start=1):
+            try:
+                text, valid = _decode_line(line, position), True
+            except UnicodeDecodeError:
+                text, valid = line.decode("utf-8", errors="replace"), False
+            for part in LONE_CARRIAGE_RETURN.split(text):
+                if part:
+                    self.line_number += 1
+                    if not valid:
+                        self.undecodable.add(self.line_number)
+                    yield part
+
+    def __iter__(self):
+        return self
+
+    def __next__(self) -> str:
+        return next(self._lines)
+
+
+def iter_csv_records(stream) -> Iterator[Tuple[int, object]]:
+    """
+    Yield (line number, record) for each row of a binary CSV stream with a header row
+
+    A row with bytes that are not UTF-8, or that the csv module cannot parse, is
+    yielded as an InvalidRecordError and the rows after it are still read.
+    """
+    lines = _CsvLines(stream)
+    reader = csv.DictReader(lines)
+    first_line = 1
+    while True:
+        try:
+            row = next(reader)
+        except StopIteration:
+            return
+        except csv.Error as e:
+            yield lines.line_number, InvalidRecordError(f"Invalid CSV: {e}")
+        else:
+            # The header is read with the first row, so its lines are checked with it
+            if lines.undecodable.intersection(range(first_line, lines.line_number + 1)):
+                yield lines.line_number, InvalidRecordError("Invalid UTF-8")
+            else:
+                yield lines.line_number, row
+        first_line = lines.line_number + 1
+
+
+def _element_value(element):
+    if len(element):
+        return {child.tag: _element_value(child) for child in element}
+    return (element.text or "").strip()
+
+
+def iter_xml_records(stream) -> Iterator[Tuple[int, object]]:
+    """Yield (position, record) for each <job> element of a binary XML stream"""
+    position = 0
+    try:
+        for _, element in ET.iterparse(stream, events=("end",)):
+            if element.tag != XML_JOB_TAG:
+                continue
+            position += 1
+            yield position, _element_value(element)
+            # Drop parsed jobs so memory stays flat on large feeds
+            element.clear()
+    except ET.ParseError as e:
+        yield position + 1, InvalidRecordError(f"Invalid XML: {e}")
+
+
+FEED_PARSERS = {
+    "ndjson": iter_ndjson_records,
+    "csv": iter_csv_records,
+    "xml": iter_xml_records
+}
+
+
+def detect_feed_format(content_type: Optional[str] = None, filename: Optional[str] = None) -> Optional[str]:
+    """Work out a feed's format from its content type or file name"""
+    if content_type:
+        feed_format = FEED_CONTENT_TYPES.get(content_type.split(";")[0].strip().lower())
+        if feed_format:
+            return feed_format
+    if filename:
+        return FEED_EXTENSIONS.get(os.path.splitext(filename)[1].lower())
+    return None
+
+
+def _parse_number(value):
+    if isinstance(value, str):
+        for convert in (int, float):
+            try:
+                return convert(value.strip())
+            except ValueError:
+                pass
+    return value
+
+
+def prepare_job(record) -> Dict:
+    """
+    Validate a feed record and build the job document stored for it
+
+    Accepts the /jobs/add payload shape, with the city either nested as
+    ``location.city`` or given as a flat ``location`` or ``city`` value.
+
+    Raises:
+        InvalidRecordError: If the record is not an object or misses a mandatory field
+    """
+    if isinstance(record, InvalidRecordError):
+        raise record
+    if not isinstance(record, dict):
+        raise InvalidRecordError("Record must be an object")
+
+    location = record.get("location")
+    city = location.get("city") if isinstance(location, dict) else location or record.get("city")
+    missing = [field for field in REQUIRED_FIELDS if not record.get(field)]
+    if not city:
+        missing.append("location")
+    if missing:
+        raise InvalidRecordError(f"Missing mandatory fields: {', '.join(missing)}")
+
+    job = {
+        "title": record["title"],
+        "description": record["description"],
+        "remuneration_amount": _parse_number(record["remuneration_amount"]),
+        "remuneration_period": record["remuneration_period"],
+        "firm": record["firm"],
+        "shift": record.get("shift", ""),
+        "jobtype": record["jobtype"],
+        "location": city,
+        "created_at": datetime.utcnow(),
+    }
+    job.update(enrich_job(job))
+    return job
+
+
+def assign_slugs(jobs_collection, jobs: List[Dict], make_slug: Callable[[str, str], str]):
+    """Give each job a slug, checking a whole chunk against existing slugs in one query"""
+    slugs = [make_slug(job["title"], job["location"]) for job in jobs]
+    taken = {doc["slug"] for doc in jobs_collection.find({"slug": {"$in": slugs}}, {"slug": 1})}
+    for job, slug in zip(jobs, slugs):
+        while slug in taken:
+            slug = make_slug(job["title"], job["location"])
+        taken.add(slug)
+        job["slug"] = slug
+
+
+class IngestionReport:
+    """Running totals and per-record errors of one ingestion"""
+
+    def __init__(self):
+        self.received = 0
+        self.inserted = 0
+        self.failed = 0
+        self.errors = []
+        self.duplicates = 0
+        self.duplicate_records = []
+
+    def add_error(self, position, message: str):
+        self.failed += 1
+        if len(self.errors) < MAX_REPORTED_ERRORS:
+            self.errors.append({"record": position, "error": message})
+
+    def add_duplicate(self, position, original_id):
+        self.duplicates += 1
+        if len(self.duplicate_records) < MAX_REPORTED_ERRORS:
+            self.duplicate_records.append({"record": position, "duplicate_of": str(original_id)})
+
+    def to_dict(self) -> Dict:
+        return {
+            "received": self.received,
+            "inserted": self.inserted,
+            "failed": self.failed,
+            "errors": self.errors,
+            "errors_truncated": self.failed > len(self.errors),
+            "duplicates": self.duplicates,
+            "duplicate_records": self.duplicate_records
+        }
+
+
+def _check_duplicates(jobs_collection, chunk: List[Tuple[object, Dict]],
+                      report: IngestionReport) -> List[Tuple[object, Dict]]:
+    """
+    Look up each job in the duplicate index, merging or flagging near-duplicates
+
+    Matches that have been archived since they were indexed are dropped first. Jobs that
+    are kept as originals get their _id now and enter the index straight away, so copies
+    later in the same feed are caught too.
+    """
+    if not duplicate_jobs_index.ready:
+        return chunk
+    signatures = [minhash_signature(job) for _, job in chunk]
+    drop_archived_originals(duplicate_jobs_index, jobs_collection, signatures)
+    kept = []
+    for (position, job), signature in zip(chunk, signatures):
+        duplicate = duplicate_jobs_index.find_duplicate(signature)
+        if duplicate:
+            report.add_duplicate(position, duplicate[0])
+            if DUPLICATE_POLICY == "merge":
+                continue
+            job["duplicate_of"] = ObjectId(duplicate[0])
+        else:
+            job["_id"] = ObjectId()
+            duplicate_jobs_index.add(job["_id"], job, signature)
+        kept.append((position, job))
+    return kept
+
+
+def _write_chunk(jobs_collection, chunk: List[Tuple[object, Dict]], make_slug, report: IngestionReport,
+                 locate_cities: Optional[Callable[[Iterable[str]], Dict[str, Dict]]] = None,
+                 on_inserted: Optional[Callable[[List[Dict]], None]] = None):
+    chunk = _check_duplicates(jobs_collection, chunk, report)
+    if not chunk:
+        return
+    jobs = [job for _, job in chunk]
+    assign_slugs(jobs_collection, jobs, make_slug)
+    if locate_cities:
+        points = locate_cities(job["location"] for job in jobs)
+        for job in jobs:
+            job["geo"] = points.get(job["location"])
+
+    failed = {}
+    try:
+        # insert_many sets _id on each document, so successful inserts are known even on error
+        jobs_collection.insert_many(jobs, ordered=False)
+    except BulkWriteError as e:
+        failed = {error["index"]: error.get("errmsg", "Write failed") for error in e.details.get("writeErrors", [])}
+
+    inserted = []
+    for index, (position, job) in enumerate(chunk):
+        if index in failed:
+            report.add_error(position, failed[index])
+            duplicate_jobs_index.remove(job["_id"])
+            continue
+        report.inserted += 1
+        job_search_index.add(job["_id"], job)
+        record_job_suggestions(job)
+        if not job.get("duplicate_of"):
+            similar_jobs_index.add(job["_id"], job)
+            inserted.append(job)
+    if on_inserted and inserted:
+        on_inserted(inserted)
+
+
+def ingest_jobs(jobs_collection, records: Iterable[Tuple[object, object]], make_slug: Callable[[str, str], str],
+                chunk_size: int = INGEST_CHUNK_SIZE,
+                locate_cities: Optional[Callable[[Iterable[str]], Dict[str, Dict]]] = None,
+                on_inserted: Optional[Callable[[List[Dict]], None]] = None) -> Dict:
+    """
+    Validate and insert feed records in unordered chunks
+
+    Once the duplicate index is built, near-duplicates of stored jobs (or of earlier
+    records in the feed) are merged or flagged according to JOB_DUPLICATE_POLICY.
+
+    Args:
+        jobs_collection: Collection the jobs are written to
+        records: (position, record) pairs as produced by the feed parsers
+        make_slug: Function building a slug from a title and a city
+        chunk_size: Number of jobs written per insert_many call
+        locate_cities: Function returning the geo point of each city name, looked up once per chunk
+        on_inserted: Called with the new original (not near-duplicate) jobs of each chunk
+
+    Returns:
+        Report with received, inserted, failed and duplicate totals, the per-record errors
+        and the records recognised as near-duplicates of stored jobs
+    """
+    report = IngestionReport()
+    chunk = []
+    for position, record in records:
+        report.received += 1
+        try:
+            chunk.append((position, prepare_job(record)))
+        except InvalidRecordError as e:
+            report.add_error(position, str(e))
+            continue
+        if len(chunk) >= chunk_size:
+            _write_chunk(jobs_collection, chunk, make_slug, report, locate_cities, on_inserted)
+            chunk = []
+    if chunk:
+        _write_chunk(jobs_collection, chunk, make_slug, report, locate_cities, on_inserted)
+    return report.to_dict()
@@ -1,15 +1,63 @@
 from flask import Blueprint, jsonify, request, session
 from extensions import mongo, bcrypt  # Import from extensions
 from flask_pymongo import ObjectId
-from datetime import datetime
+from datetime import datetime, timedelta
 import constants as c
 import string
 from slugify import slugify
 import random
+import os
+import click
+from itertools import islice
+from urllib.parse import urlencode
+from jobs.search_index import job_search_index
+from jobs.index_refresh import job_index_refresher
+from jobs.similar import similar_jobs_index, DEFAULT_SIMILAR_LIMIT, MAX_SIMILAR_LIMIT
+from jobs.duplicates import (
+    DUPLICATE_POLICY, ORIGINAL_JOBS_QUERY, duplicate_jobs_index, minhash_signature, build_duplicate_jobs_index,
+    flag_duplicate_jobs
+)
+from jobs.result_cache import job_result_cache, normalize_parameters
+from jobs.suggestions import (
+    SUGGESTION_FIELDS, COMBINED_LIMITS, suggestion_indexes_ready, suggestion_indexes_version,
+    record_job_suggestions, forget_job_suggestions, suggest_all
+)
+from jobs.enrichment import (
+    EXPERIENCE_KEYWORDS, WORK_ARRANGEMENT_KEYWORDS,
+    enrich_job, needs_enrichment, backfill_job_enrichment
+)
+from jobs.backfill import BACKFILL_BATCH_SIZE
+from jobs.events import job_event_buffer, parse_events
+from jobs.percolator import build_percolator, notify_saved_search_matches
+from jobs.facets import DATE_POSTED_DAYS, NON_FILTER_PARAMETERS, compute_facets
+from jobs.geo import (
+    InvalidGeoSearchError, locate_cities, parse_geo_search, within_radius, nearest_jobs_pipeline
+)
+from jobs.migrations import migrate_created_at_to_datetime, backfill_missing_slugs, backfill_job_geo
+from jobs.ingestion import (
+    FEED_PARSERS, INGEST_CHUNK_SIZE, MAX_INGEST_CHUNK_SIZE, detect_feed_format, ingest_jobs
+)
+from jobs.pagination import (
+    InvalidCursorError, INDEXED_SORTS, SORT_MODES, EXACT_COUNT_LIMIT, MAX_STREAM_SIZE, parse_page_size,
+    encode_cursor, decode_cursor, sorted_after, ranked_position_after, and_filters
+)
+from utils import wants_ndjson_stream, stream_documents
+from archive import find_one_with_archive
+from applications.snapshots import record_job_change, snapshot_changed
+from http_cache import JOB_CACHE_CONTROL, SUGGESTIONS_CACHE_CONTROL, conditional_json, version_etag
 
 
-jobs_bp = Blueprint("jobs_bp", __name__)
+jobs_bp = Blueprint("jobs_bp", __name__, cli_group="jobs")
 jobs_db = mongo.db.jobs
+cities_db = mongo.db.cities
+backfill_checkpoints_db = mongo.db.backfill_checkpoints
+job_snapshot_outbox_db = mongo.db.job_snapshot_outbox
+
+# Upper bound on the ranked search hits examined to fill one page of results
+JOB_SEARCH_MAX_RESULTS = int(os.getenv('JOB_SEARCH_MAX_RESULTS', '2000'))
+# Batches of the slug backfill run per /jobs/add_slug request
+SLUG_BACKFILL_BATCHES = 10
+MAX_SLUG_BACKFILL_BATCHES = 100
 
 @jobs_bp.route("/add", methods=["POST"])
 def add_job():
@@ -38,7 +86,7 @@ def add_job():
     
     slug = create_slug_with_code(title, city)
     
-    result = jobs_db.insert_one({
+    job = {
         "title": title,
         "description": description,
         "remuneration_amount": remuneration_amount,
@@ -47,14 +95,93 @@ def add_job():
         "shift": shift,
         "jobtype": jobtype,
         "location": city,
-        "created_at": datetime.now().isoformat(),
+        "geo": locate_cities(cities_db, [city]).get(city),
+        "created_at": datetime.utcnow(),
         "slug": slug,
-    })
+    }
+    job.update(enrich_job(job))
+    
+    signature = minhash_signature(job)
+    # Jobs posted through other workers are checked once the refresh started here has finished
+    job_index_refresher.refresh(jobs_db)
+    duplicate = duplicate_jobs_index.find_duplicate(signature) if duplicate_jobs_index.ready else None
+    while duplicate:
+        original = jobs_db.find_one({"_id": ObjectId(duplicate[0])}, {"slug": 1})
+        if original:
+            break
+        # Archived or deleted since this worker indexed it, so it is not a listing to repeat
+        duplicate_jobs_index.remove(duplicate[0])
+        duplicate = duplicate_jobs_index.find_duplicate(signature)
+    if duplicate:
+        if DUPLICATE_POLICY == "merge":
+            return jsonify({
+                "error": "A near-identical job is already listed",
+                "duplicate_of": original.get("slug", duplicate[0])
+            }), 409
+        job["duplicate_of"] = ObjectId(duplicate[0])
+    
+    result = jobs_db.insert_one(job)
     
     if result.inserted_id:
-        return jsonify({"messsage": "Job inserted successfuly"}), 200
+        def update_indexes():
+            job_search_index.add(result.inserted_id, job)
+            if not duplicate:
+                # A near-duplicate would be the closest "similar" job of its own original
+                similar_jobs_index.add(result.inserted_id, job)
+                duplicate_jobs_index.add(result.inserted_id, job, signature)
+            record_job_suggestions(job)
+        
+        job_index_refresher.record_change(update_indexes)
+        if not duplicate:
+            notify_job_alerts([job])
+            return jsonify({"messsage": "Job inserted successfuly"}), 200
+        return jsonify({
+            "messsage": "Job inserted successfuly",
+            "duplicate_of": original.get("slug", duplicate[0])
+        }), 200
     return jsonify({"error": "Could not insert job"}), 400
 
+def notify_job_alerts(jobs):
+    """Notify the owners of saved searches matching new jobs; a failure never fails the insert"""
+    try:
+        notify_saved_search_matches(jobs, mongo.db)
+    except Exception as e:
+        print(f"Error matching jobs against saved searches: {e}")
+
+@jobs_bp.route("/bulk", methods=["POST"])
+def bulk_add_jobs():
+    """
+    Load a feed of jobs in one request
+
+    The feed is the request body (or a multipart "file" upload) in NDJSON, CSV or XML,
+    detected from ?format=, the content type or the file name. Records are validated and
+    inserted in unordered chunks of ?chunk_size= jobs; invalid records are reported by
+    their line (or XML element) number without stopping the load.
+    """
+    upload = request.files.get("file") if request.mimetype == "multipart/form-data" else None
+    if upload:
+        stream = upload.stream
+        feed_format = request.args.get("format") or detect_feed_format(upload.mimetype, upload.filename)
+    else:
+        stream = request.stream
+        feed_format = request.args.get("format") or detect_feed_format(request.content_type)
+    
+    if feed_format not in FEED_PARSERS:
+        return jsonify({"error": "Unsupported feed format, use ndjson, csv or xml"}), 400
+    
+    chunk_size = parse_page_size(request.args.get("chunk_size"), INGEST_CHUNK_SIZE, MAX_INGEST_CHUNK_SIZE)
+    job_index_refresher.refresh(jobs_db)
+    try:
+        report = job_index_refresher.record_change(lambda: ingest_jobs(
+            jobs_db, FEED_PARSERS[feed_format](stream), create_slug_with_code, chunk_size, locate_job_cities,
+            notify_job_alerts
+        ))
+    except Exception as e:
+        print(f"Error ingesting job feed: {e}")
+        return jsonify({"error": "Could not ingest job feed"}), 500
+    
+    return jsonify(report), 200
+
 @jobs_bp.route("/get_one", methods=["GET"])
 def get_one_job():
     data = request.get_json()
@@ -62,9 +189,8 @@ def get_one_job():
     if not job_id:
         return jsonify({"error": "You must specify a job id"}), 400
     
-    job = jobs_db.find_one({"_id": job_id})
-    job["_id"] = str(job["_id"])
-    return jsonify(job)
+    job = find_one_with_archive(jobs_db, {"_id": job_id})
+    return jsonify(serialize_job(job))
 
 @jobs_bp.route("/modify", methods=["PUT"])
 def modify_job():
@@ -90,9 +216,26 @@ def modify_job():
     if not update_fields:
         return jsonify({"error": "No fields to update."}), 400
     
+    if needs_enrichment(update_fields):
+        update_fields.update(enrich_job({**job_to_modify, **update_fields}))
+    if "location" in update_fields:
+        update_fields["geo"] = locate_cities(cities_db, [update_fields["location"]]).get(update_fields["location"])
+    
     result = jobs_db.update_one({"_id": job_id}, {"$set": update_fields})
     
     if result.modified_count == 1:       
+        def update_indexes():
+            job_search_index.add(job_id, {**job_to_modify, **update_fields})
+            if not job_to_modify.get("duplicate_of"):
+                similar_jobs_index.add(job_id, {**job_to_modify, **update_fields})
+                duplicate_jobs_index.add(job_id, {**job_to_modify, **update_fields})
+            forget_job_suggestions(job_to_modify)
+            record_job_suggestions({**job_to_modify, **update_fields})
+        
+        job_index_refresher.record_change(update_indexes)
+        # Applications embed a snapshot of the job; the edit reaches them in the next propagation batch
+        if snapshot_changed(job_to_modify, update_fields):
+            record_job_change(job_snapshot_outbox_db, job_id, {**job_to_modify, **update_fields})
         return jsonify({"message": "Job modified correctly!"}), 200
     else:
         return jsonify({"message": "No changes were made."}), 200
@@ -111,32 +254,63 @@ def delete_job():
     except:
         return jsonify({"error": "Wrong job ID format."}), 400
     
-    result = jobs_db.delete_one({"_id": job_id})
+    # Fetch the suggestion fields while deleting so their counts can be decremented
+    deleted_job = jobs_db.find_one_and_delete({"_id": job_id}, {field: 1 for field in SUGGESTION_FIELDS})
     
-    if result.deleted_count == 1:
+    if deleted_job:
+        def update_indexes():
+            job_search_index.remove(job_id)
+            similar_jobs_index.remove(job_id)
+            duplicate_jobs_index.remove(job_id)
+            forget_job_suggestions(deleted_job)
+        
+        job_index_refresher.record_change(update_indexes)
         return jsonify({"message": "Job deleted correctly."}), 200
     
     else:
         return jsonify({"message": "No jobs removed."}), 200
     
     
-@jobs_bp.route("/get", methods=["GET"])
-def get_jobs():
-    job_title = request.args.get("title", "")
-    location = request.args.get("location", "")
-    job_type = request.args.get("type", "")
+def serialize_job(job):
+    """Convert a job document's ObjectId and datetime values to JSON-friendly strings"""
+    job["_id"] = str(job["_id"])
+    if job.get("duplicate_of"):
+        job["duplicate_of"] = str(job["duplicate_of"])
+    if isinstance(job.get("created_at"), datetime):
+        job["created_at"] = job["created_at"].isoformat()
+    # Radius searches return the distance from the search centre in metres
+    if "distance" in job:
+        job["distance_km"] = round(job.pop("distance") / 1000, 2)
+    return job
+
+
+def locate_job_cities(names):
+    """Coordinates of the given job cities, keyed by city name"""
+    return locate_cities(cities_db, names)
+
+
+def build_job_filters(args, text_regex=False):
+    """
+    Translate /jobs/get query parameters into a Mongo filter
+
+    The free-text ``title`` query is only turned into a regex filter when
+    ``text_regex`` is set; otherwise it is resolved by the search index.
+    """
+    job_title = args.get("title", "")
+    location = args.get("location", "")
+    job_type = args.get("type", "")
     
     # New advanced filter parameters
-    salary_min = request.args.get("salaryMin", "")
-    salary_max = request.args.get("salaryMax", "")
-    job_type_filter = request.args.get("jobType", "")
-    experience_level = request.args.get("experienceLevel", "")
-    date_posted = request.args.get("datePosted", "")
-    work_arrangement = request.args.get("workArrangement", "")
+    salary_min = args.get("salaryMin", "")
+    salary_max = args.get("salaryMax", "")
+    job_type_filter = args.get("jobType", "")
+    experience_level = args.get("experienceLevel", "")
+    date_posted = args.get("datePosted", "")
+    work_arrangement = args.get("workArrangement", "")
 
     search_parameters = {}
 
-    if job_title:
+    if text_regex and job_title:
         search_parameters["$or"] = [
             {"title": {"$regex": job_title, "$options": "i"}},
             {"description": {"$regex": job_title, "$options": "i"}}
@@ -154,7 +328,7 @@ def get_jobs():
     if job_type_filter:
         search_parameters["jobtype"] = {"$regex": job_type_filter, "$options": "i"}
     
-    # Handle salary range filters
+    # Handle salary range filters (yearly amounts, compared with the annualized salary)
     if salary_min or salary_max:
         salary_filter = {}
         if salary_min:
@@ -168,98 +342,391 @@ def get_jobs():
             except ValueError:
                 pass
         if salary_filter:
-            search_parameters["remuneration_amount"] = salary_filter
-    
-    # Handle experience level filter
-    if experience_level:
-        # Map experience levels to keywords that might appear in job descriptions
-        experience_keywords = {
-            "entry": ["entry", "junior", "graduate", "trainee", "beginner"],
-            "mid": ["mid", "intermediate", "experienced", "3-5 years"],
-            "senior": ["senior", "lead", "principal", "5+ years", "expert"],
-            "executive": ["executive", "director", "manager", "head", "chief"]
-        }
-        if experience_level in experience_keywords:
-            keywords = experience_keywords[experience_level]
-            search_parameters["$or"] = search_parameters.get("$or", []) + [
-                {"description": {"$regex": keyword, "$options": "i"}} for keyword in keywords
-            ]
+            search_parameters["salary_annual"] = salary_filter
+    
+    # Handle experience level filter (classified when the job is written)
+    if experience_level in EXPERIENCE_KEYWORDS:
+        search_parameters["experience_level"] = experience_level
     
     # Handle date posted filter
-    if date_posted:
-        from datetime import datetime, timedelta
-        now = datetime.now()
-        date_filters = {
-            "today": now - timedelta(days=1),
-            "last3days": now - timedelta(days=3),
-            "lastWeek": now - timedelta(days=7),
-            "lastMonth": now - timedelta(days=30)
+    if date_posted in DATE_POSTED_DAYS:
+        search_parameters["created_at"] = {
+            "$gte": datetime.utcnow() - timedelta(days=DATE_POSTED_DAYS[date_posted])
         }
-        if date_posted in date_filters:
-            search_parameters["created_at"] = {
-                "$gte": date_filters[date_posted].isoformat()
-            }
     
-    # Handle work arrangement filter
-    if work_arrangement:
-        arrangement_keywords = {
-            "remote": ["remote", "work from home", "wfh"],
-            "on-site": ["on-site", "office", "in-person"],
-            "hybrid": ["hybrid", "flexible", "mixed"]
-        }
-        if work_arrangement in arrangement_keywords:
-            keywords = arrangement_keywords[work_arrangement]
-            arrangement_or = [
-                {"description": {"$regex": keyword, "$options": "i"}} for keyword in keywords
-            ]
-            if "$or" in search_parameters:
-                search_parameters["$and"] = [
-                    {"$or": search_parameters["$or"]},
-                    {"$or": arrangement_or}
-                ]
-                del search_parameters["$or"]
-            else:
-                search_parameters["$or"] = arrangement_or
+    # Handle work arrangement filter (classified when the job is written)
+    if work_arrangement in WORK_ARRANGEMENT_KEYWORDS:
+        search_parameters["work_arrangement"] = work_arrangement
+
+    return search_parameters
+
 
+def listed_job_filters(args, text_regex=False):
+    """build_job_filters for job listings, which leave out jobs flagged as near-duplicates"""
+    return {**build_job_filters(args, text_regex), **ORIGINAL_JOBS_QUERY}
+
+
+@jobs_bp.route("/get", methods=["GET"])
+def get_jobs():
+    job_title = request.args.get("title", "").strip()
+    cursor = request.args.get("cursor")
+    sort_mode = request.args.get("sort", "").strip().lower()
+    if sort_mode and sort_mode not in SORT_MODES:
+        return jsonify({"error": f"sort must be one of: {', '.join(SORT_MODES)}"}), 400
+    try:
+        geo_search = parse_geo_search(request.args, cities_db)
+    except InvalidGeoSearchError as e:
+        return jsonify({"error": str(e)}), 400
+    # Title queries are ranked by relevance unless another order is asked for; radius
+    # searches are always ordered by distance, so their title is matched without ranking
+    if sort_mode in ("", "relevance"):
+        sort_mode = "relevance" if job_title else "newest"
+    use_search_index = sort_mode == "relevance" and job_search_index.ready and not geo_search
+    # Without the search index a relevance request falls back to newest first
+    listing_sort = sort_mode if sort_mode in INDEXED_SORTS else "newest"
+
+    search_parameters = listed_job_filters(request.args, text_regex=not use_search_index)
     print("Search parameters:", search_parameters)
-    jobs_to_retrieve = jobs_db.find(search_parameters)
     
-    final_jobs_to_retrieve = []
-    for job in jobs_to_retrieve:
-        job["_id"] = str(job["_id"])
-        final_jobs_to_retrieve.append(job)
+    try:
+        if wants_ndjson_stream():
+            limit = parse_page_size(request.args.get("limit"), MAX_STREAM_SIZE, MAX_STREAM_SIZE)
+            if geo_search:
+                jobs = jobs_db.aggregate(nearest_jobs_pipeline(
+                    geo_search["point"], geo_search["radius_km"], search_parameters, limit, cursor
+                ))
+            elif use_search_index:
+                jobs = stream_ranked_jobs(job_title, search_parameters, limit, cursor)
+            else:
+                query = sorted_jobs_query(search_parameters, listing_sort, cursor)
+                jobs = jobs_db.find(query).sort(INDEXED_SORTS[listing_sort]).limit(limit)
+            return stream_documents(jobs, transform=serialize_job)
+        
+        page_size = parse_page_size(request.args.get("limit"))
         
-    return jsonify(final_jobs_to_retrieve)
+        def load_page():
+            if geo_search:
+                jobs, next_cursor, total = get_nearest_jobs_page(geo_search, search_parameters, page_size, cursor)
+            elif use_search_index:
+                jobs, next_cursor, total = get_ranked_jobs_page(job_title, search_parameters, page_size, cursor)
+            else:
+                jobs, next_cursor, total = get_sorted_jobs_page(search_parameters, page_size, listing_sort, cursor)
+            return {"jobs": [serialize_job(job) for job in jobs], "next_cursor": next_cursor, "total": total}
+        
+        # Ranked and regex searches can differ, so they are cached separately
+        cache_parameters = {**normalize_parameters(request.args), "ranked": use_search_index}
+        page = job_result_cache.get_or_compute(cache_parameters, load_page)
+    except InvalidCursorError as e:
+        return jsonify({"error": str(e)}), 400
+        
+    response = jsonify(page["jobs"])
+    set_pagination_headers(response, page["next_cursor"], page["total"])
+    return response
+
+
+@jobs_bp.route("/facets", methods=["GET"])
+def get_job_facets():
+    """
+    Counts per location, job type, salary band and date-posted window for the current filters
+
+    Takes the same filters as /jobs/get; a title query is matched with the regex filter and
+    a radius search counts only the jobs within the radius.
+    """
+    try:
+        geo_search = parse_geo_search(request.args, cities_db)
+    except InvalidGeoSearchError as e:
+        return jsonify({"error": str(e)}), 400
+    search_parameters = listed_job_filters(request.args, text_regex=True)
+    if geo_search:
+        search_parameters.update(within_radius(geo_search["point"], geo_search["radius_km"]))
+    cache_parameters = {
+        **{key: value for key, value in normalize_parameters(request.args).items() if key not in NON_FILTER_PARAMETERS},
+        "facets": True
+    }
+    try:
+        facets = job_result_cache.get_or_compute(cache_parameters, lambda: compute_facets(jobs_db, search_parameters))
+    except Exception as e:
+        print(f"Error computing job facets: {e}")
+        return jsonify({"error": "Could not compute facets"}), 500
+    return jsonify(facets)
+
+
+def count_jobs(search_parameters):
+    """Return (total, is_estimate) for a job filter without scanning huge result sets"""
+    if search_parameters == ORIGINAL_JOBS_QUERY:
+        return jobs_db.estimated_document_count(), True
+    total = jobs_db.count_documents(search_parameters, limit=EXACT_COUNT_LIMIT)
+    return total, total >= EXACT_COUNT_LIMIT
+
+
+def sorted_jobs_query(search_parameters, mode="newest", cursor=None):
+    """Restrict a job filter to the documents after a cursor in one of the indexed sort orders"""
+    if not cursor:
+        return search_parameters
+    value, last_id = decode_cursor(cursor, mode)
+    return and_filters(search_parameters, sorted_after(mode, value, last_id))
+
+
+def get_sorted_jobs_page(search_parameters, page_size, mode="newest", cursor=None):
+    """
+    Fetch one newest-first or highest-salary-first page
+
+    Each order has compound indexes with the equality filters first and the sort keys
+    next, so the page is read by walking an index instead of sorting in memory.
+    """
+    sort = INDEXED_SORTS[mode]
+    query = sorted_jobs_query(search_parameters, mode, cursor)
+    jobs = list(jobs_db.find(query).sort(sort).limit(page_size + 1))
+    next_cursor = None
+    if len(jobs) > page_size:
+        jobs = jobs[:page_size]
+        next_cursor = encode_cursor(mode, jobs[-1].get(sort[0][0]), jobs[-1]["_id"])
+    
+    total = None if cursor else count_jobs(search_parameters)
+    return jobs, next_cursor, total
+
+
+def ranked_start_position(ranked, cursor=None):
+    """Position in the ranked hits at which the page after the cursor starts"""
+    if not cursor:
+        return 0
+    last_score, last_id = decode_cursor(cursor, "relevance")
+    return ranked_position_after(ranked, last_score, last_id)
+
+
+def iter_ranked_jobs(search_parameters, ranked, start, end, chunk_size=100):
+    """
+    Yield (position, job) for the ranked hits in [start, end) that pass the filters
+
+    Hits are resolved a chunk at a time so Mongo applies the remaining filters to a
+    bounded $in list while the ranking order is preserved.
+    """
+    for chunk_start in range(start, end, chunk_size):
+        chunk = ranked[chunk_start:min(chunk_start + chunk_size, end)]
+        chunk_filter = {"_id": {"$in": [ObjectId(doc_id) for doc_id, _ in chunk]}}
+        found = {str(job["_id"]): job for job in jobs_db.find({**search_parameters, **chunk_filter})}
+        for offset, (doc_id, _) in enumerate(chunk):
+            if doc_id in found:
+                yield chunk_start + offset, found[doc_id]
+
+
+def get_ranked_jobs_page(job_title, search_parameters, page_size, cursor=None):
+    """
+    Fetch one relevance-ordered page for a text query
+
+    Walks the ranked index hits after the cursor until the page is full or the
+    per-request scan budget is spent. The cursor always points at the last hit examined.
+    """
+    job_index_refresher.refresh(jobs_db)
+    ranked = job_search_index.search(job_title)
+    start = ranked_start_position(ranked, cursor)
+    scan_end = min(len(ranked), start + JOB_SEARCH_MAX_RESULTS)
+    
+    page = []
+    resume_at = scan_end
+    for position, job in iter_ranked_jobs(search_parameters, ranked, start, scan_end, max(page_size * 4, 100)):
+        page.append(job)
+        if len(page) == page_size:
+            resume_at = position + 1
+            break
+    
+    next_cursor = None
+    if resume_at < len(ranked):
+        last_id, last_score = ranked[resume_at - 1]
+        next_cursor = encode_cursor("relevance", last_score, last_id)
+    
+    # Without other filters every hit is a result; otherwise the hit count is an upper bound
+    total = None if cursor else (len(ranked), search_parameters != ORIGINAL_JOBS_QUERY)
+    return page, next_cursor, total
+
+
+def get_nearest_jobs_page(geo_search, search_parameters, page_size, cursor=None):
+    """Fetch one nearest-first page, with the candidates read from the 2dsphere index on geo"""
+    point, radius_km = geo_search["point"], geo_search["radius_km"]
+    jobs = list(jobs_db.aggregate(nearest_jobs_pipeline(point, radius_km, search_parameters, page_size + 1, cursor)))
+    next_cursor = None
+    if len(jobs) > page_size:
+        jobs = jobs[:page_size]
+        next_cursor = encode_cursor("distance", jobs[-1]["distance"], jobs[-1]["_id"])
+    
+    total = None if cursor else count_jobs({**search_parameters, **within_radius(point, radius_km)})
+    return jobs, next_cursor, total
+
+
+def stream_ranked_jobs(job_title, search_parameters, limit, cursor=None):
+    """Relevance-ordered jobs for a streamed response, resolved lazily chunk by chunk"""
+    job_index_refresher.refresh(jobs_db)
+    ranked = job_search_index.search(job_title)
+    start = ranked_start_position(ranked, cursor)
+    jobs = (job for _, job in iter_ranked_jobs(search_parameters, ranked, start, len(ranked)))
+    return islice(jobs, limit)
+
+
+def set_pagination_headers(response, next_cursor, total):
+    """Expose the next-page cursor and result totals as response headers"""
+    if next_cursor:
+        next_args = request.args.to_dict()
+        next_args["cursor"] = next_cursor
+        response.headers["X-Next-Cursor"] = next_cursor
+        response.headers["Link"] = f'<{request.base_url}?{urlencode(next_args)}>; rel="next"'
+    if total is not None:
+        count, is_estimate = total
+        response.headers["X-Total-Count"] = str(count)
+        if is_estimate:
+            response.headers["X-Total-Count-Estimated"] = "true"
+
+
+@jobs_bp.cli.command("backfill-enrichment")
+def backfill_enrichment_command():
+    """Compute experience level, work arrangement, keywords and annual salary for existing jobs"""
+    updated = backfill_job_enrichment(jobs_db, checkpoints=backfill_checkpoints_db, progress=print_backfill_progress)
+    print(f"Enriched {updated} jobs")
+    job_result_cache.invalidate()
+
+
+@jobs_bp.cli.command("migrate-created-at")
+def migrate_created_at_command():
+    """Convert created_at strings on existing jobs to BSON datetimes"""
+    converted, skipped = migrate_created_at_to_datetime(jobs_db, checkpoints=backfill_checkpoints_db,
+                                                        progress=print_backfill_progress)
+    print(f"Converted created_at on {converted} jobs ({skipped} skipped)")
+    job_result_cache.invalidate()
+
+
+@jobs_bp.cli.command("backfill-slugs")
+@click.option("--batch-size", default=BACKFILL_BATCH_SIZE, show_default=True, type=click.IntRange(1),
+              help="Jobs read and written per round trip.")
+def backfill_slugs_command(batch_size):
+    """Give every job without a slug one built from its title and city"""
+    report = backfill_missing_slugs(jobs_db, create_slug_with_code, batch_size, checkpoints=backfill_checkpoints_db,
+                                    progress=print_backfill_progress)
+    print(f"Added slugs to {report['modified']} jobs ({report['skipped']} without a title or city) "
+          f"in {report['seconds']:.1f}s")
+    job_result_cache.invalidate()
+
+
+def print_backfill_progress(report):
+    print(f"  {report['scanned']} jobs scanned, {report['modified']} updated ({report['per_second']:.0f} jobs/s)")
+
+
+@jobs_bp.cli.command("backfill-geo")
+def backfill_geo_command():
+    """Link existing jobs to the coordinates of their city"""
+    report = backfill_job_geo(jobs_db, cities_db, checkpoints=backfill_checkpoints_db,
+                              progress=print_backfill_progress)
+    print(f"Located {report['modified']} jobs ({report['skipped']} in cities without coordinates)")
+    job_result_cache.invalidate()
+
+
+@jobs_bp.cli.command("ingest")
+@click.argument("path", type=click.Path(exists=True, dir_okay=False))
+@click.option("--format", "feed_format", type=click.Choice(sorted(FEED_PARSERS)),
+              help="Feed format; detected from the file extension when omitted.")
+@click.option("--chunk-size", default=INGEST_CHUNK_SIZE, show_default=True,
+              type=click.IntRange(1, MAX_INGEST_CHUNK_SIZE), help="Jobs written per insert.")
+def ingest_command(path, feed_format, chunk_size):
+    """Bulk load jobs from an NDJSON, CSV or XML feed file"""
+    feed_format = feed_format or detect_feed_format(filename=path)
+    if not feed_format:
+        raise click.UsageError("Could not tell the feed format from the file name, pass --format")
+    
+    # Catch copies of jobs that are already stored, not only within the feed
+    build_duplicate_jobs_index(jobs_db)
+    build_percolator(mongo.db.saved_searches)
+    try:
+        with open(path, "rb") as feed:
+            report = ingest_jobs(jobs_db, FEED_PARSERS[feed_format](feed), create_slug_with_code, chunk_size,
+                                 locate_job_cities, notify_job_alerts)
+    finally:
+        job_result_cache.invalidate()
+    
+    print(f"Inserted {report['inserted']} of {report['received']} jobs ({report['failed']} failed, "
+          f"{report['duplicates']} near-duplicates {'merged' if DUPLICATE_POLICY == 'merge' else 'flagged'})")
+    for error in report["errors"]:
+        print(f"  record {error['record']}: {error['error']}")
+    if report["errors_truncated"]:
+        print(f"  ... {report['failed'] - len(report['errors'])} more errors")
+
+
+@jobs_bp.cli.command("dedupe")
+@click.option("--batch-size", default=BACKFILL_BATCH_SIZE, show_default=True, type=click.IntRange(1),
+              help="Jobs read and written per round trip.")
+@click.option("--delete", is_flag=True, help="Delete the flagged near-duplicates instead of keeping them.")
+def dedupe_command(batch_size, delete):
+    """Flag jobs that are near-duplicates of an older job with duplicate_of"""
+    report = flag_duplicate_jobs(jobs_db, batch_size, progress=print_backfill_progress)
+    print(f"Flagged {report['modified']} near-duplicates among {report['scanned']} jobs in {report['seconds']:.1f}s")
+    if delete:
+        deleted = jobs_db.delete_many({"duplicate_of": {"$ne": None}}).deleted_count
+        print(f"Deleted {deleted} near-duplicates")
+    job_result_cache.invalidate()
+
+
+@jobs_bp.route("/cache/stats", methods=["GET"])
+def get_cache_stats():
+    try:
+        return jsonify(job_result_cache.stats())
+    except Exception as e:
+        print(f"Error getting job cache stats: {e}")
+        return jsonify({"error": "Could not read cache stats"}), 500
+
+
+@jobs_bp.route("/events", methods=["POST"])
+def record_job_events():
+    """
+    Record click and impression events for jobs
+
+    Events are buffered in memory and written to the jobs in periodic batches, so the
+    counts lag by up to the flush interval.
+    """
+    try:
+        events = parse_events(request.get_json(silent=True))
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    
+    accepted = sum(job_event_buffer.record(job_id, event_type) for job_id, event_type in events)
+    return jsonify({"accepted": accepted, "dropped": len(events) - accepted}), 202
+
+
+@jobs_bp.route("/events/stats", methods=["GET"])
+def get_job_event_stats():
+    return jsonify(job_event_buffer.stats())
 
 
 @jobs_bp.route("/delete_all", methods=["DELETE"])
 def delete_all_jobs():
     r = jobs_db.delete_many({})
+    
+    def clear_indexes():
+        job_search_index.clear()
+        similar_jobs_index.clear()
+        duplicate_jobs_index.clear()
+        for index in SUGGESTION_FIELDS.values():
+            index.clear()
+    
+    job_index_refresher.record_change(clear_indexes)
     return jsonify({"message": "Deleted all jobs"}), 200
 
 
 @jobs_bp.route("/add_slug", methods=["PUT"])
 def add_slug():
-    jobs = jobs_db.find({})
-    for job in jobs:
-        title = ""
-        location =""
-        try:
-            title = job["title"]
-            location = job["location"]
-        except:
-            print(job)
-        if title and location:
-            slug = create_slug_with_code(title, location)
-            jobs_db.update_one({
-                "_id": job["_id"]
-            }, {"$set": {"slug": slug}})
-            print(f"Updated job {title} with slug {slug}")
-    
-        else:
-            print(f"Unable to slugify job {title}")
-            
-    return jsonify({"message": "Task slugs added correctly!"})  
+    """
+    Fill in missing slugs a bounded number of batches at a time
+
+    Resumes from the last checkpoint, so callers repeat the request until "completed" is true.
+    """
+    max_batches = parse_page_size(request.args.get("batches"), SLUG_BACKFILL_BATCHES, MAX_SLUG_BACKFILL_BATCHES)
+    try:
+        report = backfill_missing_slugs(jobs_db, create_slug_with_code, checkpoints=backfill_checkpoints_db,
+                                        max_batches=max_batches)
+    except Exception as e:
+        print(f"Error backfilling job slugs: {e}")
+        return jsonify({"error": "Could not add slugs"}), 500
+    
+    if report["modified"]:
+        # Slugs are not indexed, so the indexes only move to the new version
+        job_index_refresher.record_change(lambda: None)
+    return jsonify(report), 200
     
 def generate_random_code(length=6):
     return ''.join(random.choices(string.ascii_lowercase + string.digits, k=length))
@@ -270,11 +737,28 @@ def create_slug_with_code(job_title, location):
     return f"{base_slug}-{random_code}"
 
 
+def suggestions_response(build):
+    """Serve suggestions with an ETag tied to the jobs version the counts come from and the query"""
+    query = request.args.get("q", "").strip()
+    job_index_refresher.refresh(jobs_db)
+    # A worker's indexes lag the shared version until its rebuild finishes, and must not
+    # confirm what a worker that is already current answered
+    version = suggestion_indexes_version() if suggestion_indexes_ready() else job_result_cache.version()
+    etag = version_etag("jobs", version, request.path, query)
+    return conditional_json(lambda: build(query), SUGGESTIONS_CACHE_CONTROL, etag)
+
+
 @jobs_bp.route("/suggestions/titles", methods=["GET"])
 def get_title_suggestions():
-    query = request.args.get("q", "").strip()
+    return suggestions_response(title_suggestions)
+
+
+def title_suggestions(query):
     if not query or len(query) < 2:
-        return jsonify([])
+        return []
+    
+    if suggestion_indexes_ready():
+        return SUGGESTION_FIELDS["title"].suggest(query, COMBINED_LIMITS["title"])
     
     try:
         # Aggregate unique job titles that match the query
@@ -308,17 +792,23 @@ def get_title_suggestions():
             for suggestion in suggestions
         ]
         
-        return jsonify(formatted_suggestions)
+        return formatted_suggestions
     except Exception as e:
         print(f"Error getting title suggestions: {e}")
-        return jsonify([])
+        return []
 
 
 @jobs_bp.route("/suggestions/locations", methods=["GET"])
 def get_location_suggestions():
-    query = request.args.get("q", "").strip()
+    return suggestions_response(location_suggestions)
+
+
+def location_suggestions(query):
     if not query or len(query) < 2:
-        return jsonify([])
+        return []
+    
+    if suggestion_indexes_ready():
+        return SUGGESTION_FIELDS["location"].suggest(query, COMBINED_LIMITS["location"])
     
     try:
         # Aggregate unique locations that match the query
@@ -352,17 +842,59 @@ def get_location_suggestions():
             for suggestion in suggestions
         ]
         
-        return jsonify(formatted_suggestions)
+        return formatted_suggestions
     except Exception as e:
         print(f"Error getting location suggestions: {e}")
+        return []
+
+
+@jobs_bp.route("/suggestions", methods=["GET"])
+def get_suggestions():
+    """Combined title, location and job type suggestions for one keystroke"""
+    def combined_suggestions(query):
+        if not query or len(query) < 2 or not suggestion_indexes_ready():
+            return []
+        return suggest_all(query)
+
+    return suggestions_response(combined_suggestions)
+
+
+@jobs_bp.route("/<slug>/similar", methods=["GET"])
+def get_similar_jobs(slug):
+    """
+    Jobs most similar to a job by title, job type and description, best match first
+
+    Jobs flagged as near-duplicates are neither looked up nor returned.
+    """
+    job = jobs_db.find_one({"slug": slug, **ORIGINAL_JOBS_QUERY}, {"_id": 1})
+    if not job:
+        return jsonify({"error": "No job found with the specified slug!"}), 404
+    
+    limit = parse_page_size(request.args.get("limit"), DEFAULT_SIMILAR_LIMIT, MAX_SIMILAR_LIMIT)
+    # Jobs posted through other workers are found once the refresh started here has finished
+    job_index_refresher.refresh(jobs_db)
+    neighbours = similar_jobs_index.similar(job["_id"], limit)
+    if not neighbours:
         return jsonify([])
+    
+    neighbour_ids = [ObjectId(doc_id) for doc_id, _ in neighbours]
+    found = {str(doc["_id"]): doc for doc in jobs_db.find({"_id": {"$in": neighbour_ids}, **ORIGINAL_JOBS_QUERY})}
+    similar_jobs = []
+    for doc_id, score in neighbours:
+        if doc_id in found:
+            similar_job = serialize_job(found[doc_id])
+            similar_job["similarity"] = round(score, 4)
+            similar_jobs.append(similar_job)
+    return jsonify(similar_jobs)
 
 
 @jobs_bp.route("/<slug>", methods= ["GET"])
 def get_job_by_slug(slug):
-    job = jobs_db.find_one({"slug": slug})
+    job = find_one_with_archive(jobs_db, {"slug": slug})
     if job:
-        job["_id"] = str(job["_id"])
-        return jsonify(job)
+        if not job.get("archived_at"):
+            job_event_buffer.record(job["_id"], "view")
+        # The ETag is the hash of the serialized document, so it changes with any field
+        return conditional_json(lambda: serialize_job(job), JOB_CACHE_CONTROL)
     
     return jsonify({"error": "No job found with the specified slug!"})
\ No newline at end of file
@@ -0,0 +1,103 @@
+"""
+Data migrations for the jobs collection
+One-off conversions of stored documents, run through the jobs CLI group
+"""
+from datetime import datetime, timezone
+from typing import Callable, Dict, Optional, Tuple
+
+from pymongo import UpdateOne
+
+from jobs.backfill import BACKFILL_BATCH_SIZE, run_backfill
+from jobs.geo import locate_cities
+from jobs.ingestion import assign_slugs
+
+# Jobs without a usable slug
+MISSING_SLUG_QUERY = {"$or": [{"slug": {"$exists": False}}, {"slug": None}, {"slug": ""}]}
+
+
+def parse_created_at(value: str) -> Optional[datetime]:
+    """
+    Parse a created_at string written by datetime.isoformat()
+
+    Strings without an offset were written in the server's local time; they are
+    converted to naive UTC, which is how PyMongo stores and returns datetimes.
+
+    Returns:
+        The UTC datetime, or None if the string is not an ISO timestamp
+    """
+    try:
+        parsed = datetime.fromisoformat(value.strip())
+    except (AttributeError, ValueError):
+        return None
+    return parsed.astimezone(timezone.utc).replace(tzinfo=None)
+
+
+def migrate_created_at_to_datetime(jobs_collection, batch_size: int = BACKFILL_BATCH_SIZE, **options) -> Tuple[int, int]:
+    """
+    Convert string created_at values to BSON datetimes
+
+    Extra keyword arguments are passed to run_backfill.
+
+    Returns:
+        Tuple of (jobs converted, jobs skipped because their value could not be parsed)
+    """
+    def build_operations(batch):
+        operations = []
+        for job in batch:
+            created_at = parse_created_at(job["created_at"])
+            if created_at is None:
+                print(f"Unable to parse created_at {job['created_at']!r} of job {job['_id']}")
+                continue
+            # Match the original string so a concurrent edit is never overwritten
+            operations.append(UpdateOne(
+                {"_id": job["_id"], "created_at": job["created_at"]},
+                {"$set": {"created_at": created_at}}
+            ))
+        return operations
+
+    report = run_backfill(jobs_collection, {"created_at": {"$type": "string"}}, {"created_at": 1}, build_operations,
+                          batch_size, name="created-at", **options)
+    return report["modified"], report["skipped"]
+
+
+def backfill_missing_slugs(jobs_collection, make_slug: Callable[[str, str], str],
+                           batch_size: int = BACKFILL_BATCH_SIZE, **options) -> Dict:
+    """
+    Give every job without a slug one built from its title and city
+
+    Jobs missing either field are skipped. Each batch is checked against existing slugs
+    in one query. Extra keyword arguments are passed to run_backfill.
+
+    Returns:
+        The run_backfill totals
+    """
+    def build_operations(batch):
+        jobs = [job for job in batch if job.get("title") and job.get("location")]
+        assign_slugs(jobs_collection, jobs, make_slug)
+        # Only fill slugs that are still missing so a concurrent write is never overwritten
+        return [UpdateOne({"_id": job["_id"], **MISSING_SLUG_QUERY}, {"$set": {"slug": job["slug"]}}) for job in jobs]
+
+    return run_backfill(jobs_collection, MISSING_SLUG_QUERY, {"title": 1, "location": 1}, build_operations,
+                        batch_size, name="missing-slugs", **options)
+
+
+def backfill_job_geo(jobs_collection, cities_collection, batch_size: int = BACKFILL_BATCH_SIZE, **options) -> Dict:
+    """
+    Link jobs without a geo point to the coordinates of their city
+
+    The cities of each batch are looked up in one query. Jobs whose city has no
+    coordinates are skipped and picked up again by a later run. Extra keyword
+    arguments are passed to run_backfill.
+
+    Returns:
+        The run_backfill totals
+    """
+    def build_operations(batch):
+        points = locate_cities(cities_collection, (job.get("location") for job in batch))
+        return [
+            UpdateOne({"_id": job["_id"], "location": job["location"]}, {"$set": {"geo": points[job["location"]]}})
+            for job in batch if job.get("location") in points
+        ]
+
+    return run_backfill(jobs_collection, {"geo": None}, {"location": 1}, build_operations, batch_size,
+                        name="geo", **options)
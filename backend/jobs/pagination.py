@@ -0,0 +1,132 @@
+"""
+Keyset pagination helpers for job listings
+Encodes opaque page cursors and turns them into index range filters
+"""
+import base64
+import bisect
+import json
+import os
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+
+from flask_pymongo import ObjectId
+
+# Configuration
+DEFAULT_PAGE_SIZE = int(os.getenv('JOBS_DEFAULT_PAGE_SIZE', '20'))
+MAX_PAGE_SIZE = int(os.getenv('JOBS_MAX_PAGE_SIZE', '100'))
+# Streamed responses are not held in memory, so they may carry far more results per request
+MAX_STREAM_SIZE = int(os.getenv('JOBS_MAX_STREAM_SIZE', '10000'))
+# Counts above this threshold are reported as a lower bound instead of an exact total
+EXACT_COUNT_LIMIT = int(os.getenv('JOBS_EXACT_COUNT_LIMIT', '10000'))
+
+# Newest-first listing order; (created_at, _id) is unique so pages never overlap
+NEWEST_FIRST_SORT = [("created_at", -1), ("_id", -1)]
+# Highest-salary-first listing order, on the annualized salary
+HIGHEST_SALARY_SORT = [("salary_annual", -1), ("_id", -1)]
+
+# Sort modes of /jobs/get served by an index walk, keyed by the cursor mode
+INDEXED_SORTS = {
+    "newest": NEWEST_FIRST_SORT,
+    "salary": HIGHEST_SALARY_SORT
+}
+# Relevance order comes from the in-memory search index and needs a title query
+SORT_MODES = tuple(INDEXED_SORTS) + ("relevance",)
+
+# Equality filters of /jobs/get that lead a sorted index of their own; $in lists on them
+# are walked as a merge of index ranges, so no in-memory sort is needed either
+SORT_INDEX_PREFIXES = [[], [("location", 1)], [("jobtype", 1)], [("experience_level", 1)], [("work_arrangement", 1)]]
+# Equality fields first, then the sort keys, for every indexed sort order
+SORT_INDEXES = [prefix + sort for sort in INDEXED_SORTS.values() for prefix in SORT_INDEX_PREFIXES]
+
+
+class InvalidCursorError(ValueError):
+    """Raised when a client sends a cursor that cannot be decoded"""
+    pass
+
+
+def parse_page_size(value, default: int = DEFAULT_PAGE_SIZE, maximum: int = MAX_PAGE_SIZE) -> int:
+    """Clamp the requested page size to the configured bounds"""
+    try:
+        page_size = int(value)
+    except (TypeError, ValueError):
+        return default
+    return max(1, min(page_size, maximum))
+
+
+def encode_cursor(mode: str, value, doc_id) -> str:
+    """Encode the sort key of the last returned document as an opaque cursor"""
+    cursor = {"m": mode, "v": value, "id": str(doc_id)}
+    if isinstance(value, datetime):
+        cursor["v"] = value.isoformat()
+        cursor["t"] = "date"
+    payload = json.dumps(cursor, separators=(",", ":"))
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str, mode: str) -> Tuple[object, str]:
+    """
+    Decode a cursor produced by encode_cursor
+
+    Returns:
+        Tuple of (sort value, document id)
+
+    Raises:
+        InvalidCursorError: If the cursor is malformed or belongs to another sort mode
+    """
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded.encode()).decode())
+        if payload["m"] != mode:
+            raise InvalidCursorError("Cursor does not match the requested sort order")
+        if not ObjectId.is_valid(payload["id"]):
+            raise InvalidCursorError("Invalid cursor")
+        if payload.get("t") == "date":
+            return datetime.fromisoformat(payload["v"]), payload["id"]
+        return payload["v"], payload["id"]
+    except InvalidCursorError:
+        raise
+    except Exception:
+        raise InvalidCursorError("Invalid cursor")
+
+
+def descending_after(field: str, value, doc_id: str) -> Dict:
+    """
+    Filter selecting the documents that come after the cursor in a (field, _id) descending sort
+
+    Documents without the field sort last in a descending sort, so they are still
+    reachable once the others run out.
+    """
+    object_id = ObjectId(doc_id)
+    if value is None:
+        return {field: None, "_id": {"$lt": object_id}}
+    return {"$or": [
+        {field: {"$lt": value}},
+        {field: value, "_id": {"$lt": object_id}},
+        {field: None}
+    ]}
+
+
+def newest_first_after(created_at, doc_id: str) -> Dict:
+    """Filter selecting the documents that come after the cursor in newest-first order"""
+    return descending_after("created_at", created_at, doc_id)
+
+
+def sorted_after(mode: str, value, doc_id: str) -> Dict:
+    """Filter selecting the documents that come after the cursor in one of the INDEXED_SORTS"""
+    return descending_after(INDEXED_SORTS[mode][0][0], value, doc_id)
+
+
+def ranked_position_after(ranked: List[Tuple[str, float]], score: float, doc_id: str) -> int:
+    """Position in a (doc_id, score) list ordered by score desc, id asc that follows the cursor"""
+    keys = [(-item_score, item_id) for item_id, item_score in ranked]
+    return bisect.bisect_right(keys, (-score, doc_id))
+
+
+def and_filters(*filters: Optional[Dict]) -> Dict:
+    """Combine query filters without clobbering existing $or / $and clauses"""
+    filters = [query for query in filters if query]
+    if not filters:
+        return {}
+    if len(filters) == 1:
+        return filters[0]
+    return {"$and": filters}
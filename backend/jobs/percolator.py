@@ -0,0 +1,260 @@
+"""
+Saved-search percolator
+Indexes job alerts by location, job type, salary band and keyword so each new job is matched against all of them at once
+"""
+import threading
+from bisect import bisect_right
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from flask_pymongo import ObjectId
+
+from http_cache import collection_versions
+from jobs.facets import SALARY_BANDS
+from jobs.search_index import tokenize
+from notification_system import notify_new_job_matches
+
+MAX_SAVED_SEARCHES_PER_USER = 20
+MAX_SEARCH_VALUES = 20
+VERSION_NAME = "saved_searches"
+
+
+def salary_band(amount) -> int:
+    """Index of the SALARY_BANDS band an annual salary falls into"""
+    return max(bisect_right(SALARY_BANDS, amount) - 1, 0)
+
+
+def _string_list(data: Dict, field: str) -> List[str]:
+    values = data.get(field) or []
+    if isinstance(values, str):
+        values = values.split(",")
+    if not isinstance(values, list) or not all(isinstance(value, str) for value in values):
+        raise ValueError(f"{field} must be a list of strings")
+    values = sorted({value.strip().lower() for value in values if value.strip()})
+    if len(values) > MAX_SEARCH_VALUES:
+        raise ValueError(f"At most {MAX_SEARCH_VALUES} values in {field}")
+    return values
+
+
+def parse_saved_search(data) -> Dict:
+    """
+    Validate a saved search payload and reduce it to the predicate the percolator stores
+
+    Returns:
+        Dictionary with name, locations, jobtypes, salary_min and keywords
+
+    Raises:
+        ValueError: If a field is malformed or no criterion is given
+    """
+    if not isinstance(data, dict):
+        raise ValueError("Saved search must be a JSON object")
+    salary_min = data.get("salary_min")
+    if salary_min is not None:
+        if isinstance(salary_min, bool) or not isinstance(salary_min, (int, float)) or salary_min < 0:
+            raise ValueError("salary_min must be a positive number")
+    keywords = data.get("keywords") or ""
+    if isinstance(keywords, list):
+        keywords = " ".join(str(keyword) for keyword in keywords)
+    search = {
+        "name": str(data.get("name") or "").strip()[:100],
+        "locations": _string_list(data, "locations"),
+        "jobtypes": _string_list(data, "jobtypes"),
+        "salary_min": salary_min,
+        "keywords": sorted(set(tokenize(keywords)))[:MAX_SEARCH_VALUES]
+    }
+    if not (search["locations"] or search["jobtypes"] or search["keywords"] or salary_min is not None):
+        raise ValueError("A saved search needs a location, job type, minimum salary or keywords")
+    return search
+
+
+def _anchor_keys(search: Dict) -> List[Tuple]:
+    # A search is filed under its most selective criterion only; the others are checked on match
+    if search["keywords"]:
+        return [("keyword", keyword) for keyword in search["keywords"]]
+    if search["locations"]:
+        return [("location", location) for location in search["locations"]]
+    if search["jobtypes"]:
+        return [("jobtype", jobtype) for jobtype in search["jobtypes"]]
+    return [("salary_band", salary_band(search["salary_min"]))]
+
+
+def _job_keys(job: Dict, tokens: set) -> List[Tuple]:
+    keys = [("keyword", token) for token in tokens]
+    if job.get("location"):
+        keys.append(("location", str(job["location"]).lower()))
+    if job.get("jobtype"):
+        keys.append(("jobtype", str(job["jobtype"]).lower()))
+    if isinstance(job.get("salary_annual"), (int, float)):
+        keys.extend(("salary_band", band) for band in range(salary_band(job["salary_annual"]) + 1))
+    return keys
+
+
+def _match_percentage(search: Dict, job: Dict, tokens: set) -> Optional[int]:
+    """Percentage of the search's keywords found in the job, or None if a criterion fails"""
+    if search["locations"] and str(job.get("location", "")).lower() not in search["locations"]:
+        return None
+    if search["jobtypes"] and str(job.get("jobtype", "")).lower() not in search["jobtypes"]:
+        return None
+    if search["salary_min"] is not None:
+        salary = job.get("salary_annual")
+        if not isinstance(salary, (int, float)) or salary < search["salary_min"]:
+            return None
+    if not search["keywords"]:
+        return 100
+    found = sum(keyword in tokens for keyword in search["keywords"])
+    return round(100 * found / len(search["keywords"])) if found else None
+
+
+class SavedSearchPercolator:
+    """
+    Inverted index of saved searches
+
+    Instead of running every saved search against the jobs collection, each search is
+    filed under the values of its most selective criterion. A new job looks up the
+    buckets for its own location, job type, salary bands and title and description
+    terms, and only the searches found there are checked in full. All public methods
+    are thread-safe.
+    """
+
+    def __init__(self):
+        self._lock = threading.RLock()
+        self._buckets: Dict[Tuple, set] = {}
+        self._searches: Dict[str, Dict] = {}
+        self.version: Optional[int] = None
+        self.ready = False
+
+    def __len__(self):
+        return len(self._searches)
+
+    def _remove_locked(self, search_id: str):
+        search = self._searches.pop(search_id, None)
+        if search is None:
+            return
+        for key in _anchor_keys(search):
+            bucket = self._buckets.get(key)
+            if bucket is not None:
+                bucket.discard(search_id)
+                if not bucket:
+                    del self._buckets[key]
+
+    def _add_locked(self, search: Dict):
+        search_id = str(search["_id"])
+        self._remove_locked(search_id)
+        self._searches[search_id] = search
+        for key in _anchor_keys(search):
+            self._buckets.setdefault(key, set()).add(search_id)
+
+    def build(self, searches: Iterable[Dict], version: Optional[int] = None):
+        """Replace the index contents with the given saved search documents"""
+        with self._lock:
+            self._buckets = {}
+            self._searches = {}
+            for search in searches:
+                self._add_locked(search)
+            self.version = version
+            self.ready = True
+
+    def add(self, search: Dict):
+        """Index a saved search, replacing any previous version of it"""
+        with self._lock:
+            self._add_locked(search)
+
+    def remove(self, search_id):
+        """Remove a saved search from the index"""
+        with self._lock:
+            self._remove_locked(str(search_id))
+
+    def match(self, job: Dict) -> List[Tuple[Dict, int]]:
+        """
+        Find the saved searches a job satisfies
+
+        Returns:
+            (saved search, match percentage) pairs
+        """
+        tokens = set(tokenize(job.get("title"))) | set(tokenize(job.get("description")))
+        with self._lock:
+            candidates = set()
+            for key in _job_keys(job, tokens):
+                candidates.update(self._buckets.get(key, ()))
+            matches = []
+            for search_id in candidates:
+                search = self._searches[search_id]
+                percentage = _match_percentage(search, job, tokens)
+                if percentage is not None:
+                    matches.append((search, percentage))
+        return matches
+
+    def stats(self) -> Dict:
+        with self._lock:
+            return {"ready": self.ready, "searches": len(self._searches), "buckets": len(self._buckets),
+                    "version": self.version}
+
+
+# Shared percolator used by the jobs and saved searches blueprints
+saved_search_percolator = SavedSearchPercolator()
+
+
+def build_percolator(saved_searches_collection) -> SavedSearchPercolator:
+    """Load every saved search into the shared percolator"""
+    saved_search_percolator.build(saved_searches_collection.find({}), collection_versions.get(VERSION_NAME))
+    return saved_search_percolator
+
+
+def refresh_percolator(saved_searches_collection):
+    """Rebuild the shared percolator if another worker changed the saved searches since it was built"""
+    version = collection_versions.get(VERSION_NAME)
+    if version is not None and version != saved_search_percolator.version:
+        build_percolator(saved_searches_collection)
+
+
+def record_saved_search_change(apply):
+    """
+    Apply a saved search change to the shared percolator and bump the shared version
+
+    The percolator keeps its version when no other worker changed the searches in the
+    meantime, so a worker's own writes do not force it to rebuild.
+    """
+    previous = saved_search_percolator.version
+    apply(saved_search_percolator)
+    version = collection_versions.bump(VERSION_NAME)
+    if previous is not None and version == previous + 1:
+        saved_search_percolator.version = version
+
+
+def notify_saved_search_matches(jobs: Iterable[Dict], db) -> int:
+    """
+    Match newly inserted jobs against the saved searches and notify their owners in one batch
+
+    Users who turned off job alerts, or in-app new job match notifications, are skipped.
+
+    Args:
+        jobs: Inserted job documents
+        db: Database holding the saved searches, users and notification preferences
+
+    Returns:
+        Number of notifications created
+    """
+    if not saved_search_percolator.ready:
+        return 0
+    refresh_percolator(db.saved_searches)
+
+    matches = []
+    for job in jobs:
+        # One notification per user and job, even when several of their searches match
+        best = {}
+        for search, percentage in saved_search_percolator.match(job):
+            user_id = search["user_id"]
+            if percentage > best.get(user_id, -1):
+                best[user_id] = percentage
+        matches.extend((user_id, job, percentage) for user_id, percentage in best.items())
+    if not matches:
+        return 0
+
+    user_ids = list({ObjectId(user_id) for user_id, _, _ in matches})
+    opted_out = {str(user["_id"]) for user in db.users.find(
+        {"_id": {"$in": user_ids}, "preferences.job_alerts": False}, {"_id": 1}
+    )}
+    opted_out.update(str(preferences["user_id"]) for preferences in db.notification_preferences.find(
+        {"user_id": {"$in": user_ids}, "preferences.new_job_match.in_app": False}, {"user_id": 1}
+    ))
+    matches = [match for match in matches if str(match[0]) not in opted_out]
+    return notify_new_job_matches(matches)
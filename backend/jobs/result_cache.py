@@ -0,0 +1,194 @@
+"""
+Redis-backed cache for job search results
+Caches /jobs/get pages keyed on the normalized query parameters and invalidates them by version bump
+"""
+import hashlib
+import json
+import os
+import time
+from typing import Callable, Dict, Optional
+
+from flask import current_app
+from redis.exceptions import RedisError
+
+from http_cache import increment_counter, read_counter
+
+# Configuration
+CACHE_ENABLED = os.getenv('JOB_CACHE_ENABLED', 'true').lower() == 'true'
+CACHE_TTL_SECONDS = int(os.getenv('JOB_CACHE_TTL_SECONDS', '60'))
+# How long a worker may hold the right to compute a missing entry
+LOCK_TTL_SECONDS = float(os.getenv('JOB_CACHE_LOCK_SECONDS', '10'))
+# How long other workers wait for that entry before querying Mongo themselves
+LOCK_WAIT_SECONDS = float(os.getenv('JOB_CACHE_WAIT_SECONDS', '2'))
+LOCK_POLL_SECONDS = 0.02
+
+KEY_PREFIX = "jobs:cache"
+VERSION_KEY = f"{KEY_PREFIX}:version"
+STATS_KEY = f"{KEY_PREFIX}:stats"
+
+# Parameters holding comma-separated sets whose order does not change the results
+SET_PARAMETERS = ("location", "type")
+# Parameters matched case-insensitively
+CASE_INSENSITIVE_PARAMETERS = ("title", "jobType")
+
+
+def normalize_parameters(args) -> Dict[str, list]:
+    """
+    Reduce request arguments to a canonical form so equivalent searches share a cache entry
+
+    Only rewrites that cannot change the query are applied: parameter order, the order
+    of comma-separated sets and the case of case-insensitive matches.
+
+    Args:
+        args: Request arguments (a MultiDict or plain dict)
+
+    Returns:
+        Dictionary of parameter name to list of normalized values, with empty values dropped
+    """
+    getlist = args.getlist if hasattr(args, "getlist") else lambda key: [args[key]]
+    normalized = {}
+    for key in sorted(args.keys()):
+        # Only the first value of a parameter is used by the filters
+        values = [str(value) for value in getlist(key)[:1]]
+        if key in SET_PARAMETERS:
+            values = [",".join(sorted(set(value.split(",")))) for value in values]
+        if key in CASE_INSENSITIVE_PARAMETERS:
+            values = [value.lower() for value in values]
+        values = [value for value in values if value]
+        if values:
+            normalized[key] = values
+    return normalized
+
+
+class JobResultCache:
+    """
+    Shared result cache on the Redis instance used for sessions
+
+    Entries are stored under the current collection version, so bumping the version
+    on every write makes all earlier entries unreachable at once; they then expire
+    through their TTL. A short Redis lock per entry lets only one worker run the
+    query for a missing entry while the others wait for its result.
+    """
+
+    def _client(self):
+        if not CACHE_ENABLED:
+            return None
+        return current_app.config.get("SESSION_REDIS")
+
+    @staticmethod
+    def _entry_key(version: int, parameters: Dict) -> str:
+        digest = hashlib.sha1(json.dumps(parameters, sort_keys=True).encode("utf-8")).hexdigest()
+        return f"{KEY_PREFIX}:v{version}:{digest}"
+
+    @staticmethod
+    def _record(client, counter: str):
+        try:
+            client.hincrby(STATS_KEY, counter, 1)
+        except RedisError as e:
+            print(f"Error updating job cache stats: {e}")
+
+    def _wait_for_entry(self, client, key: str) -> Optional[bytes]:
+        deadline = time.monotonic() + LOCK_WAIT_SECONDS
+        while time.monotonic() < deadline:
+            time.sleep(LOCK_POLL_SECONDS)
+            cached = client.get(key)
+            if cached is not None:
+                return cached
+        return None
+
+    def get_or_compute(self, parameters: Dict, compute: Callable[[], Dict]) -> Dict:
+        """
+        Return the cached result for the parameters, computing and storing it on a miss
+
+        Args:
+            parameters: Normalized query parameters identifying the result
+            compute: Function producing a JSON-serializable result
+
+        Returns:
+            The cached or freshly computed result
+        """
+        client = self._client()
+        if client is None:
+            return compute()
+
+        try:
+            version = read_counter(client, VERSION_KEY)
+            key = self._entry_key(version, parameters)
+            cached = client.get(key)
+            if cached is not None:
+                self._record(client, "hits")
+                return json.loads(cached)
+
+            lock_key = f"{key}:lock"
+            holds_lock = bool(client.set(lock_key, "1", nx=True, px=int(LOCK_TTL_SECONDS * 1000)))
+            if not holds_lock:
+                cached = self._wait_for_entry(client, key)
+                if cached is not None:
+                    self._record(client, "coalesced")
+                    return json.loads(cached)
+        except RedisError as e:
+            print(f"Error reading job cache: {e}")
+            return compute()
+
+        self._record(client, "misses")
+        try:
+            result = compute()
+            client.set(key, current_app.json.dumps(result), ex=CACHE_TTL_SECONDS)
+        except RedisError as e:
+            print(f"Error writing job cache: {e}")
+        finally:
+            if holds_lock:
+                try:
+                    client.delete(lock_key)
+                except RedisError as e:
+                    print(f"Error releasing job cache lock: {e}")
+        return result
+
+    def version(self) -> Optional[int]:
+        """Current jobs collection version, or None when the cache is unavailable"""
+        client = self._client()
+        if client is None:
+            return None
+        try:
+            return read_counter(client, VERSION_KEY)
+        except RedisError as e:
+            print(f"Error reading job cache version: {e}")
+            return None
+
+    def invalidate(self) -> Optional[int]:
+        """
+        Make every cached result stale after the jobs collection changes
+
+        Returns:
+            The new jobs collection version, or None when the cache is unavailable
+        """
+        client = self._client()
+        if client is None:
+            return None
+        try:
+            return increment_counter(client, VERSION_KEY)
+        except RedisError as e:
+            print(f"Error invalidating job cache: {e}")
+            return None
+
+    def stats(self) -> Dict:
+        """Hit, miss and coalesced-wait counters shared by all workers"""
+        client = self._client()
+        if client is None:
+            return {"enabled": False}
+        counters = {counter.decode() if isinstance(counter, bytes) else counter: int(value)
+                    for counter, value in client.hgetall(STATS_KEY).items()}
+        hits = counters.get("hits", 0) + counters.get("coalesced", 0)
+        lookups = hits + counters.get("misses", 0)
+        return {
+            "enabled": True,
+            "version": read_counter(client, VERSION_KEY),
+            "hits": counters.get("hits", 0),
+            "coalesced": counters.get("coalesced", 0),
+            "misses": counters.get("misses", 0),
+            "hit_rate": round(hits / lookups, 4) if lookups else None
+        }
+
+
+# Shared cache used by the jobs blueprint
+job_result_cache = JobResultCache()
@@ -0,0 +1,240 @@
+"""
+In-memory full-text search index for jobs
+Maintains a tokenized inverted index over title, firm and description and ranks matches with BM25
+"""
+import bisect
+import math
+import os
+import re
+import threading
+from collections import Counter
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from jobs.result_cache import job_result_cache
+
+# Configuration
+BM25_K1 = float(os.getenv('JOB_SEARCH_BM25_K1', '1.2'))
+BM25_B = float(os.getenv('JOB_SEARCH_BM25_B', '0.75'))
+MAX_PREFIX_EXPANSIONS = int(os.getenv('JOB_SEARCH_MAX_PREFIX_EXPANSIONS', '25'))
+
+# Title matches matter more than firm matches, which matter more than description matches
+FIELD_WEIGHTS = {
+    'title': 3,
+    'firm': 2,
+    'description': 1
+}
+
+# Terms that appear once a query is expanded by prefix score lower than exact term matches
+PREFIX_MATCH_WEIGHT = 0.5
+
+STOP_WORDS = frozenset([
+    'a', 'an', 'and', 'are', 'as', 'at', 'be', 'by', 'for', 'from', 'in', 'is',
+    'it', 'of', 'on', 'or', 'our', 'the', 'to', 'we', 'with', 'you', 'your'
+])
+
+TOKEN_PATTERN = re.compile(r"[a-z0-9]+(?:[+#]+)?")
+
+
+def tokenize(text) -> List[str]:
+    """Split text into lowercase search terms, dropping stop words"""
+    if not text:
+        return []
+    if not isinstance(text, str):
+        text = str(text)
+    return [token for token in TOKEN_PATTERN.findall(text.lower()) if token not in STOP_WORDS]
+
+
+class JobSearchIndex:
+    """
+    Inverted index with BM25 ranking over job documents
+
+    Documents are keyed by the string form of their ``_id``. All public methods are
+    thread-safe so the index can be shared by the request threads of a worker. ``version``
+    is the shared jobs version the contents correspond to, so a worker can tell when
+    another worker has changed the jobs.
+    """
+
+    def __init__(self, k1: float = BM25_K1, b: float = BM25_B):
+        self.k1 = k1
+        self.b = b
+        self._lock = threading.RLock()
+        self._postings: Dict[str, Dict[str, int]] = {}
+        self._doc_terms: Dict[str, Counter] = {}
+        self._doc_lengths: Dict[str, int] = {}
+        self._total_length = 0
+        self._vocabulary: List[str] = []
+        self._vocabulary_dirty = False
+        self.version: Optional[int] = None
+        self.ready = False
+
+    def __len__(self):
+        return len(self._doc_lengths)
+
+    @staticmethod
+    def _term_frequencies(job: Dict) -> Counter:
+        frequencies = Counter()
+        for field, weight in FIELD_WEIGHTS.items():
+            for token in tokenize(job.get(field)):
+                frequencies[token] += weight
+        return frequencies
+
+    def _remove_locked(self, doc_id: str):
+        terms = self._doc_terms.pop(doc_id, None)
+        if terms is None:
+            return
+        for term in terms:
+            postings = self._postings.get(term)
+            if postings is None:
+                continue
+            postings.pop(doc_id, None)
+            if not postings:
+                del self._postings[term]
+                self._vocabulary_dirty = True
+        self._total_length -= self._doc_lengths.pop(doc_id, 0)
+
+    def _add_locked(self, doc_id: str, job: Dict):
+        self._remove_locked(doc_id)
+        frequencies = self._term_frequencies(job)
+        for term, frequency in frequencies.items():
+            postings = self._postings.get(term)
+            if postings is None:
+                postings = self._postings[term] = {}
+                self._vocabulary_dirty = True
+            postings[doc_id] = frequency
+        length = sum(frequencies.values())
+        self._doc_terms[doc_id] = frequencies
+        self._doc_lengths[doc_id] = length
+        self._total_length += length
+
+    def build(self, jobs: Iterable[Dict], version: Optional[int] = None):
+        """
+        Replace the index contents with the given job documents
+
+        The new contents are built aside and swapped in at once, so searches keep using
+        the old ones until then.
+        """
+        fresh = JobSearchIndex(self.k1, self.b)
+        for job in jobs:
+            fresh._add_locked(str(job["_id"]), job)
+        with self._lock:
+            self._postings = fresh._postings
+            self._doc_terms = fresh._doc_terms
+            self._doc_lengths = fresh._doc_lengths
+            self._total_length = fresh._total_length
+            self._vocabulary = []
+            self._vocabulary_dirty = True
+            self.version = version
+            self.ready = True
+
+    def add(self, doc_id, job: Dict):
+        """Index a job, replacing any previous version of the same document"""
+        with self._lock:
+            self._add_locked(str(doc_id), job)
+
+    def remove(self, doc_id):
+        """Remove a job from the index"""
+        with self._lock:
+            self._remove_locked(str(doc_id))
+
+    def clear(self):
+        """Remove every document from the index"""
+        with self._lock:
+            self._postings = {}
+            self._doc_terms = {}
+            self._doc_lengths = {}
+            self._total_length = 0
+            self._vocabulary = []
+            self._vocabulary_dirty = False
+
+    def _expand_term(self, term: str) -> List[Tuple[str, float]]:
+        """Return the indexed terms a query term matches, with their weight"""
+        if self._vocabulary_dirty:
+            self._vocabulary = sorted(self._postings)
+            self._vocabulary_dirty = False
+
+        expansions = []
+        if term in self._postings:
+            expansions.append((term, 1.0))
+
+        start = bisect.bisect_left(self._vocabulary, term)
+        for candidate in self._vocabulary[start:]:
+            if len(expansions) > MAX_PREFIX_EXPANSIONS:
+                break
+            if not candidate.startswith(term):
+                break
+            if candidate != term:
+                expansions.append((candidate, PREFIX_MATCH_WEIGHT))
+        return expansions
+
+    def search(self, query: str, limit: Optional[int] = None) -> List[Tuple[str, float]]:
+        """
+        Rank the jobs that match every term of the query
+
+        Each query term matches the indexed terms it is a prefix of, so "engin"
+        finds "engineer" and "engineering" the way the old substring search did.
+
+        Args:
+            query: Free-text search query
+            limit: Maximum number of results to return
+
+        Returns:
+            List of (job_id, score) tuples ordered by descending score
+        """
+        query_terms = list(dict.fromkeys(tokenize(query)))
+        if not query_terms:
+            return []
+
+        with self._lock:
+            document_count = len(self._doc_lengths)
+            if document_count == 0:
+                return []
+            average_length = self._total_length / document_count
+
+            scores: Optional[Dict[str, float]] = None
+            for query_term in query_terms:
+                term_scores: Dict[str, float] = {}
+                for term, weight in self._expand_term(query_term):
+                    postings = self._postings[term]
+                    idf = math.log(1 + (document_count - len(postings) + 0.5) / (len(postings) + 0.5))
+                    for doc_id, frequency in postings.items():
+                        if scores is not None and doc_id not in scores:
+                            continue
+                        norm = self.k1 * (1 - self.b + self.b * self._doc_lengths[doc_id] / average_length)
+                        score = weight * idf * frequency * (self.k1 + 1) / (frequency + norm)
+                        if score > term_scores.get(doc_id, 0.0):
+                            term_scores[doc_id] = score
+
+                if scores is None:
+                    scores = term_scores
+                else:
+                    scores = {doc_id: scores[doc_id] + score for doc_id, score in term_scores.items()}
+                if not scores:
+                    return []
+
+        ranked = sorted(scores.items(), key=lambda item: (-item[1], item[0]))
+        if limit is not None:
+            ranked = ranked[:limit]
+        return ranked
+
+    def stats(self) -> Dict:
+        """Return index size information"""
+        with self._lock:
+            return {
+                "ready": self.ready,
+                "documents": len(self._doc_lengths),
+                "terms": len(self._postings)
+            }
+
+
+# Shared index used by the jobs blueprint
+job_search_index = JobSearchIndex()
+
+INDEXED_FIELDS = {field: 1 for field in FIELD_WEIGHTS}
+
+
+def build_job_search_index(jobs_collection) -> JobSearchIndex:
+    """Load every job from the collection into the shared search index"""
+    version = job_result_cache.version()
+    job_search_index.build(jobs_collection.find({}, INDEXED_FIELDS), version)
+    return job_search_index
+
@@ -0,0 +1,215 @@
+"""
+In-memory "more like this" index for jobs
+Keeps sparse TF-IDF vectors over title, job type and description and finds the nearest jobs by cosine similarity
+"""
+import heapq
+import math
+import os
+import threading
+import time
+from collections import Counter, OrderedDict
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from jobs.duplicates import ORIGINAL_JOBS_QUERY
+from jobs.result_cache import job_result_cache
+from jobs.search_index import tokenize
+
+# Configuration
+SIMILAR_CACHE_SIZE = int(os.getenv('SIMILAR_JOBS_CACHE_SIZE', '4096'))
+SIMILAR_CACHE_SECONDS = float(os.getenv('SIMILAR_JOBS_CACHE_SECONDS', '300'))
+DEFAULT_SIMILAR_LIMIT = 6
+MAX_SIMILAR_LIMIT = 20
+# Only a job's strongest terms are used to collect candidates
+MAX_QUERY_TERMS = 25
+# Terms found in more than this share of the jobs say little about similarity and are not walked,
+# unless their postings are short enough to walk anyway
+MAX_TERM_DOCUMENT_SHARE = 0.2
+MIN_WALKED_POSTINGS = 1000
+# Candidates re-scored with the full cosine similarity, per neighbour requested
+CANDIDATES_PER_RESULT = 5
+
+# A matching title says more than a matching job type, which says more than the description
+FIELD_WEIGHTS = {
+    'title': 3,
+    'jobtype': 2,
+    'description': 1
+}
+
+
+def _term_weight(frequency: float) -> float:
+    # Sublinear scaling keeps long descriptions from drowning out the title
+    return 1 + math.log(frequency)
+
+
+class SimilarJobsIndex:
+    """
+    Sparse TF-IDF vectors with an inverted index for nearest-neighbour lookups
+
+    Term frequencies are stored per job and IDF weights are applied at query time, so
+    adding or removing a job never requires re-weighting the others. A lookup walks the
+    postings of the job's strongest distinctive terms to collect candidates, then ranks
+    the best of them by exact cosine similarity. Results are cached per job for a short
+    time. All public methods are thread-safe. ``version`` is the shared jobs version the
+    contents correspond to.
+    """
+
+    def __init__(self):
+        self._lock = threading.RLock()
+        # term -> {job id: scaled term frequency}
+        self._postings: Dict[str, Dict[str, float]] = {}
+        self._doc_terms: Dict[str, Dict[str, float]] = {}
+        self._cache: OrderedDict = OrderedDict()
+        self.version: Optional[int] = None
+        self.ready = False
+
+    def __len__(self):
+        return len(self._doc_terms)
+
+    @staticmethod
+    def _term_frequencies(job: Dict) -> Counter:
+        frequencies = Counter()
+        for field, weight in FIELD_WEIGHTS.items():
+            for token in tokenize(job.get(field)):
+                frequencies[token] += weight
+        return frequencies
+
+    def _remove_locked(self, doc_id: str):
+        self._cache.pop(doc_id, None)
+        terms = self._doc_terms.pop(doc_id, None)
+        if terms is None:
+            return
+        for term in terms:
+            postings = self._postings.get(term)
+            if postings is None:
+                continue
+            postings.pop(doc_id, None)
+            if not postings:
+                del self._postings[term]
+
+    def _add_locked(self, doc_id: str, job: Dict):
+        self._remove_locked(doc_id)
+        weights = {term: _term_weight(frequency) for term, frequency in self._term_frequencies(job).items()}
+        for term, weight in weights.items():
+            self._postings.setdefault(term, {})[doc_id] = weight
+        self._doc_terms[doc_id] = weights
+
+    def build(self, jobs: Iterable[Dict], version: Optional[int] = None):
+        """
+        Replace the index contents with the given job documents
+
+        The new contents are built aside and swapped in at once, so lookups keep using
+        the old ones until then.
+        """
+        fresh = SimilarJobsIndex()
+        for job in jobs:
+            fresh._add_locked(str(job["_id"]), job)
+        with self._lock:
+            self._postings = fresh._postings
+            self._doc_terms = fresh._doc_terms
+            self._cache = OrderedDict()
+            self.version = version
+            self.ready = True
+
+    def add(self, doc_id, job: Dict):
+        """Index a job, replacing any previous version of the same document"""
+        with self._lock:
+            self._add_locked(str(doc_id), job)
+
+    def remove(self, doc_id):
+        """Remove a job from the index"""
+        with self._lock:
+            self._remove_locked(str(doc_id))
+
+    def clear(self):
+        """Remove every document from the index"""
+        with self._lock:
+            self._postings = {}
+            self._doc_terms = {}
+            self._cache = OrderedDict()
+
+    def _idf(self, term: str, document_count: int) -> float:
+        return math.log((1 + document_count) / (1 + len(self._postings.get(term, ())))) + 1
+
+    def _vector(self, weights: Dict[str, float], document_count: int) -> Dict[str, float]:
+        return {term: weight * self._idf(term, document_count) for term, weight in weights.items()}
+
+    def _similar_locked(self, doc_id: str, limit: int) -> List[Tuple[str, float]]:
+        document_count = len(self._doc_terms)
+        query = self._vector(self._doc_terms[doc_id], document_count)
+        query_norm = math.sqrt(sum(weight * weight for weight in query.values()))
+        if not query_norm:
+            return []
+
+        # Collect candidates through the postings of the strongest distinctive terms
+        max_postings = max(MIN_WALKED_POSTINGS, int(document_count * MAX_TERM_DOCUMENT_SHARE))
+        partial_scores: Dict[str, float] = {}
+        for term, weight in heapq.nlargest(MAX_QUERY_TERMS, query.items(), key=lambda item: item[1]):
+            postings = self._postings[term]
+            if len(postings) > max_postings:
+                continue
+            for other_id, term_weight in postings.items():
+                partial_scores[other_id] = partial_scores.get(other_id, 0.0) + weight * term_weight
+        partial_scores.pop(doc_id, None)
+
+        candidates = heapq.nlargest(limit * CANDIDATES_PER_RESULT, partial_scores, key=partial_scores.get)
+        scored = []
+        for other_id in candidates:
+            other = self._vector(self._doc_terms[other_id], document_count)
+            other_norm = math.sqrt(sum(weight * weight for weight in other.values()))
+            dot = sum(weight * other[term] for term, weight in query.items() if term in other)
+            scored.append((other_id, dot / (query_norm * other_norm)))
+        return sorted(scored, key=lambda item: (-item[1], item[0]))[:limit]
+
+    def similar(self, doc_id, limit: int = DEFAULT_SIMILAR_LIMIT) -> List[Tuple[str, float]]:
+        """
+        Find the jobs most similar to a job
+
+        Args:
+            doc_id: Id of an indexed job
+            limit: Maximum number of neighbours to return
+
+        Returns:
+            List of (job_id, cosine similarity) tuples ordered by descending similarity,
+            empty if the job is not indexed
+        """
+        doc_id = str(doc_id)
+        now = time.monotonic()
+        with self._lock:
+            if doc_id not in self._doc_terms:
+                return []
+            cached = self._cache.get(doc_id)
+            if cached and cached[0] > now and cached[1] >= limit:
+                self._cache.move_to_end(doc_id)
+                # Neighbours removed since the entry was cached are skipped
+                return [item for item in cached[2] if item[0] in self._doc_terms][:limit]
+
+            computed_limit = max(limit, DEFAULT_SIMILAR_LIMIT)
+            neighbours = self._similar_locked(doc_id, computed_limit)
+            self._cache[doc_id] = (now + SIMILAR_CACHE_SECONDS, computed_limit, neighbours)
+            self._cache.move_to_end(doc_id)
+            while len(self._cache) > SIMILAR_CACHE_SIZE:
+                self._cache.popitem(last=False)
+        return neighbours[:limit]
+
+    def stats(self) -> Dict:
+        """Return index size information"""
+        with self._lock:
+            return {
+                "ready": self.ready,
+                "documents": len(self._doc_terms),
+                "terms": len(self._postings),
+                "cached": len(self._cache)
+            }
+
+
+# Shared index used by the jobs blueprint
+similar_jobs_index = SimilarJobsIndex()
+
+INDEXED_FIELDS = {field: 1 for field in FIELD_WEIGHTS}
+
+
+def build_similar_jobs_index(jobs_collection) -> SimilarJobsIndex:
+    """Load every original job from the collection into the shared similar-jobs index"""
+    version = job_result_cache.version()
+    similar_jobs_index.build(jobs_collection.find(ORIGINAL_JOBS_QUERY, INDEXED_FIELDS), version)
+    return similar_jobs_index
@@ -0,0 +1,335 @@
+"""
+In-memory autocomplete for job search
+Keeps per-field suggestion indexes (titles, locations, job types) with live job counts
+"""
+import bisect
+import heapq
+import math
+import os
+import threading
+import time
+from collections import Counter, OrderedDict
+from typing import Dict, Iterable, List, Optional
+
+from jobs.result_cache import job_result_cache
+
+# Configuration
+MIN_QUERY_LENGTH = 2
+NGRAM_SIZE = 3
+# Share of the query's n-grams a value must contain to be offered as a typo correction
+FUZZY_MIN_OVERLAP = float(os.getenv('SUGGESTIONS_FUZZY_MIN_OVERLAP', '0.3'))
+# Suggestions are searchable from the start of each of their first few words
+MAX_WORD_STARTS = 6
+RESULT_CACHE_SIZE = int(os.getenv('SUGGESTIONS_CACHE_SIZE', '2048'))
+# Prefixes matching more keys than this are answered by scanning values in count order
+WIDE_PREFIX_KEYS = 500
+# How stale the count ordering used for wide prefixes may get under constant writes
+RANKING_REFRESH_SECONDS = float(os.getenv('SUGGESTIONS_RANKING_REFRESH_SECONDS', '1'))
+
+# Number of suggestions of each type returned by the combined endpoint
+COMBINED_LIMITS = {
+    "title": 8,
+    "location": 6,
+    "jobtype": 4
+}
+
+
+def normalize(value) -> str:
+    """Lowercase a value and collapse its whitespace"""
+    if not isinstance(value, str):
+        return ""
+    return " ".join(value.lower().split())
+
+
+def ngrams(text: str) -> set:
+    padded = " " + text
+    return {padded[i:i + NGRAM_SIZE] for i in range(len(padded) - NGRAM_SIZE + 1)}
+
+
+class SuggestionIndex:
+    """
+    Autocomplete index over the distinct values of one job field
+
+    Values are stored once per distinct (normalized) value with the number of jobs
+    carrying it. Lookups bisect a sorted array of word-start keys, so "eng" finds
+    "Software Engineer". Short prefixes that match a large share of the keys are
+    answered by walking the values in count order instead. When the prefix finds
+    nothing, an n-gram overlap search offers close spellings. ``version`` is the shared
+    jobs version the counts correspond to.
+    """
+
+    def __init__(self, kind: str):
+        self.kind = kind
+        self._lock = threading.RLock()
+        self._counts: Dict[str, int] = {}
+        self._display: Dict[str, str] = {}
+        self._keys: List[str] = []
+        self._key_values: List[str] = []
+        self._value_grams: Dict[str, frozenset] = {}
+        self._ngram_postings: Dict[str, set] = {}
+        self._ranking: List[str] = []
+        self._ranking_built_at: Optional[float] = None
+        self._ranking_dirty = False
+        self._cache: OrderedDict = OrderedDict()
+        self.version: Optional[int] = None
+        self.ready = False
+
+    def __len__(self):
+        return len(self._counts)
+
+    @staticmethod
+    def _word_starts(value: str) -> List[str]:
+        words = value.split(" ")
+        return [" ".join(words[i:]) for i in range(min(len(words), MAX_WORD_STARTS))]
+
+    def _insert_value(self, value: str):
+        for key in self._word_starts(value):
+            position = bisect.bisect_left(self._keys, key)
+            while position < len(self._keys) and self._keys[position] == key and self._key_values[position] < value:
+                position += 1
+            self._keys.insert(position, key)
+            self._key_values.insert(position, value)
+        grams = frozenset(ngrams(value))
+        self._value_grams[value] = grams
+        for gram in grams:
+            self._ngram_postings.setdefault(gram, set()).add(value)
+
+    def _delete_value(self, value: str):
+        for key in self._word_starts(value):
+            position = bisect.bisect_left(self._keys, key)
+            while position < len(self._keys) and self._keys[position] == key:
+                if self._key_values[position] == value:
+                    del self._keys[position]
+                    del self._key_values[position]
+                    break
+                position += 1
+        for gram in self._value_grams.pop(value, ()):
+            postings = self._ngram_postings.get(gram)
+            if postings is not None:
+                postings.discard(value)
+                if not postings:
+                    del self._ngram_postings[gram]
+
+    def add(self, raw_value, count: int = 1):
+        """Count ``count`` more jobs carrying the value"""
+        value = normalize(raw_value)
+        if not value or count <= 0:
+            return
+        with self._lock:
+            previous = self._counts.get(value, 0)
+            self._counts[value] = previous + count
+            if previous == 0:
+                self._display[value] = " ".join(raw_value.split())
+                self._insert_value(value)
+                self._ranking.append(value)
+            self._ranking_dirty = True
+            self._cache.clear()
+
+    def remove(self, raw_value, count: int = 1):
+        """Count ``count`` fewer jobs carrying the value"""
+        value = normalize(raw_value)
+        with self._lock:
+            previous = self._counts.get(value)
+            if previous is None:
+                return
+            if previous <= count:
+                del self._counts[value]
+                del self._display[value]
+                self._delete_value(value)
+            else:
+                self._counts[value] = previous - count
+            self._ranking_dirty = True
+            self._cache.clear()
+
+    def build(self, values: Iterable, version: Optional[int] = None):
+        """Replace the index contents with counts of the given values"""
+        counts = Counter()
+        display = {}
+        for raw_value in values:
+            value = normalize(raw_value)
+            if value:
+                counts[value] += 1
+                display.setdefault(value, " ".join(raw_value.split()))
+
+        entries = sorted((key, value) for value in counts for key in self._word_starts(value))
+        value_grams = {value: frozenset(ngrams(value)) for value in counts}
+        ngram_postings: Dict[str, set] = {}
+        for value, grams in value_grams.items():
+            for gram in grams:
+                ngram_postings.setdefault(gram, set()).add(value)
+
+        with self._lock:
+            self._counts = dict(counts)
+            self._display = display
+            self._keys = [key for key, _ in entries]
+            self._key_values = [value for _, value in entries]
+            self._value_grams = value_grams
+            self._ngram_postings = ngram_postings
+            self._ranking = sorted(counts, key=lambda value: (-counts[value], value))
+            self._ranking_built_at = time.monotonic()
+            self._ranking_dirty = False
+            self._cache.clear()
+            self.version = version
+            self.ready = True
+
+    def clear(self):
+        """Remove every value from the index"""
+        with self._lock:
+            self._counts = {}
+            self._display = {}
+            self._keys = []
+            self._key_values = []
+            self._value_grams = {}
+            self._ngram_postings = {}
+            self._ranking = []
+            self._ranking_built_at = None
+            self._ranking_dirty = False
+            self._cache.clear()
+
+    def _ranked_values(self) -> List[str]:
+        """Distinct values ordered by count, re-sorted at most every RANKING_REFRESH_SECONDS"""
+        now = time.monotonic()
+        if self._ranking_built_at is None or (
+                self._ranking_dirty and now - self._ranking_built_at > RANKING_REFRESH_SECONDS):
+            self._ranking = sorted(self._counts, key=lambda value: (-self._counts[value], value))
+            self._ranking_built_at = now
+            self._ranking_dirty = False
+        return self._ranking
+
+    def _matches_prefix(self, value: str, query: str) -> bool:
+        return any(key.startswith(query) for key in self._word_starts(value))
+
+    def _prefix_top(self, query: str, limit: int) -> List[str]:
+        low = bisect.bisect_left(self._keys, query)
+        high = bisect.bisect_left(self._keys, query + "\uffff", low)
+        if high - low <= WIDE_PREFIX_KEYS:
+            matches = set(self._key_values[low:high])
+            return heapq.nsmallest(limit, matches, key=lambda value: (-self._counts[value], value))
+
+        # Most values match a wide prefix, so the most common ones are found within a short walk
+        found = []
+        for value in self._ranked_values():
+            # Values added since the last re-sort are appended and may repeat
+            if value in self._counts and value not in found and self._matches_prefix(value, query):
+                found.append(value)
+                if len(found) == limit:
+                    break
+        return sorted(found, key=lambda value: (-self._counts[value], value))
+
+    def _fuzzy_top(self, query: str, limit: int) -> List[str]:
+        query_grams = ngrams(query)
+        minimum = max(2, math.ceil(FUZZY_MIN_OVERLAP * len(query_grams)))
+        if len(query_grams) < minimum:
+            return []
+
+        # A value sharing `minimum` n-grams with the query must share at least one of
+        # any len - minimum + 1 of them, so only the rarest ones need to be scanned
+        postings = sorted((self._ngram_postings.get(gram, ()) for gram in query_grams), key=len)
+        candidates = set()
+        for values in postings[:len(query_grams) - minimum + 1]:
+            candidates.update(values)
+
+        scored = []
+        for value in candidates:
+            shared = len(query_grams & self._value_grams[value])
+            if shared >= minimum:
+                scored.append((shared, value))
+        best = heapq.nsmallest(limit, scored, key=lambda item: (-item[0], -self._counts[item[1]], item[1]))
+        return [value for _, value in best]
+
+    def suggest(self, query: str, limit: int = 8) -> List[Dict]:
+        """
+        Suggest values for a partially typed query
+
+        Args:
+            query: Text typed so far
+            limit: Maximum number of suggestions
+
+        Returns:
+            List of {"value", "type", "count"} dictionaries, most common first
+        """
+        normalized = normalize(query)
+        if len(normalized) < MIN_QUERY_LENGTH:
+            return []
+
+        cache_key = (normalized, limit)
+        with self._lock:
+            cached = self._cache.get(cache_key)
+            if cached is not None:
+                self._cache.move_to_end(cache_key)
+                return cached
+
+            values = self._prefix_top(normalized, limit)
+            if not values:
+                values = self._fuzzy_top(normalized, limit)
+
+            suggestions = [
+                {"value": self._display[value], "type": self.kind, "count": self._counts[value]}
+                for value in values
+            ]
+            self._cache[cache_key] = suggestions
+            if len(self._cache) > RESULT_CACHE_SIZE:
+                self._cache.popitem(last=False)
+            return suggestions
+
+
+# Shared indexes keyed by the suggestion type, with the job field each one reads
+title_suggestions = SuggestionIndex("title")
+location_suggestions = SuggestionIndex("location")
+jobtype_suggestions = SuggestionIndex("jobtype")
+
+SUGGESTION_FIELDS = {
+    "title": title_suggestions,
+    "location": location_suggestions,
+    "jobtype": jobtype_suggestions
+}
+
+
+SUGGESTION_PROJECTION = {field: 1 for field in SUGGESTION_FIELDS}
+
+
+def suggestion_indexes_ready() -> bool:
+    return all(index.ready for index in SUGGESTION_FIELDS.values())
+
+
+def suggestion_indexes_version() -> Optional[int]:
+    """Shared jobs version the suggestion counts correspond to, or None while the indexes disagree"""
+    versions = {index.version for index in SUGGESTION_FIELDS.values()}
+    return versions.pop() if len(versions) == 1 else None
+
+
+def record_job_suggestions(job: Dict):
+    """Count a newly stored job in every suggestion index"""
+    for field, index in SUGGESTION_FIELDS.items():
+        index.add(job.get(field))
+
+
+def forget_job_suggestions(job: Dict):
+    """Stop counting a removed job in every suggestion index"""
+    for field, index in SUGGESTION_FIELDS.items():
+        index.remove(job.get(field))
+
+
+def suggest_all(query: str, limits: Optional[Dict[str, int]] = None) -> List[Dict]:
+    """Combined as-you-type suggestions across titles, locations and job types"""
+    limits = limits or COMBINED_LIMITS
+    suggestions = []
+    for kind, limit in limits.items():
+        suggestions.extend(SUGGESTION_FIELDS[kind].suggest(query, limit))
+    return suggestions
+
+
+def load_suggestion_indexes(jobs: Iterable[Dict], version: Optional[int] = None):
+    """Replace the contents of every suggestion index with counts over the given jobs"""
+    values = {field: [] for field in SUGGESTION_FIELDS}
+    for job in jobs:
+        for field in SUGGESTION_FIELDS:
+            values[field].append(job.get(field))
+    for field, index in SUGGESTION_FIELDS.items():
+        index.build(values[field], version)
+
+
+def build_suggestion_indexes(jobs_collection):
+    """Load the suggestion indexes from the jobs collection"""
+    version = job_result_cache.version()
+    load_suggestion_indexes(jobs_collection.find({}, SUGGESTION_PROJECTION), version)
@@ -3,19 +3,22 @@ from extensions import mongo, bcrypt  # Import from extensions
 from flask_pymongo import ObjectId
 from datetime import datetime
 import constants as c
+from http_cache import REFERENCE_CACHE_CONTROL, collection_versions, conditional_json, version_etag
 
 jobtypes_bp = Blueprint("jobtypes_bp", __name__)
 jobtypes_db = mongo.db.job_types
 
 @jobtypes_bp.route("/get_all")
 def get_jobtypes():
-    jobtypes = jobtypes_db.find({})
-    final_jobtypes = []
-    for jobtype in jobtypes:
-        jobtype["_id"] = str(jobtype["_id"])
-        final_jobtypes.append(jobtype)
-        
-    return jsonify(final_jobtypes)
+    def list_jobtypes():
+        final_jobtypes = []
+        for jobtype in jobtypes_db.find({}):
+            jobtype["_id"] = str(jobtype["_id"])
+            final_jobtypes.append(jobtype)
+        return final_jobtypes
+
+    etag = version_etag("job_types", collection_versions.get("job_types"), "all")
+    return conditional_json(list_jobtypes, REFERENCE_CACHE_CONTROL, etag)
 
 
 @jobtypes_bp.route("/add", methods=["POST"])
@@ -39,6 +42,7 @@ def add_jobtype():
     
     if not result.inserted_id:
         return jsonify({"error": "No job types inserted"}), 400
+    collection_versions.bump("job_types")
     return jsonify({"message": "Job Type added correctly"}), 200
 
 @jobtypes_bp.route("/remove", methods=["DELETE"])
@@ -51,6 +55,7 @@ def remove_jobtype():
     else:
         result = jobtypes_db.delete_one({"jobtype": type_to_remove})
         if result.deleted_count == 1:
+            collection_versions.bump("job_types")
             return jsonify({"message": "jobtype removed successfully"}), 200
         
 
@@ -64,4 +69,5 @@ def modify_jobtype():
     
     result = jobtypes_db.update_one({"jobtype": jobtype_to_modify}, {"$set": {"avatar": new_avatar}})
     if result.modified_count == 1:
+        collection_versions.bump("job_types")
         return jsonify({"message": "Jobtype picture updated successfully"}), 200
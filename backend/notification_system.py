@@ -58,6 +58,33 @@ class NotificationStatus(Enum):
     READ = "read"
     ARCHIVED = "archived"
 
+def build_notification_document(
+    user_id: str,
+    notification_type: NotificationType,
+    title: str,
+    message: str,
+    priority: NotificationPriority = NotificationPriority.MEDIUM,
+    data: Dict = None,
+    action_url: str = None,
+    expires_at: datetime = None
+) -> Dict:
+    """Build the stored form of a notification"""
+    now = datetime.utcnow()
+    return {
+        'user_id': ObjectId(user_id),
+        'type': notification_type.value,
+        'title': title,
+        'message': message,
+        'priority': priority.value,
+        'status': NotificationStatus.UNREAD.value,
+        'data': data or {},
+        'action_url': action_url,
+        'created_at': now,
+        'updated_at': now,
+        'expires_at': expires_at,
+        'read_at': None
+    }
+
 def create_notification(
     user_id: str,
     notification_type: NotificationType,
@@ -85,22 +112,9 @@ def create_notification(
         Notification ID
     """
     try:
-        now = datetime.utcnow()
-        
-        notification_doc = {
-            'user_id': ObjectId(user_id),
-            'type': notification_type.value,
-            'title': title,
-            'message': message,
-            'priority': priority.value,
-            'status': NotificationStatus.UNREAD.value,
-            'data': data or {},
-            'action_url': action_url,
-            'created_at': now,
-            'updated_at': now,
-            'expires_at': expires_at,
-            'read_at': None
-        }
+        notification_doc = build_notification_document(
+            user_id, notification_type, title, message, priority, data, action_url, expires_at
+        )
         
         result = get_notifications_db().insert_one(notification_doc)
         notification_id = str(result.inserted_id)
@@ -529,6 +543,38 @@ def notify_new_job_match(user_id: str, job_title: str, company: str, match_perce
         f"/jobs/{job_title.lower().replace(' ', '-')}"
     )
 
+def notify_new_job_matches(matches: List[Tuple[str, Dict, float]]) -> int:
+    """
+    Notify users about new job matches with a single write
+    
+    Args:
+        matches: (user_id, job document, match percentage) tuples
+    
+    Returns:
+        Number of notifications created
+    """
+    if not matches:
+        return 0
+    notifications = [
+        build_notification_document(
+            user_id,
+            NotificationType.NEW_JOB_MATCH,
+            "New Job Match Found",
+            f"We found a {match_percentage}% match: {job.get('title')} at {job.get('firm')}",
+            NotificationPriority.MEDIUM,
+            {'job_id': str(job['_id']), 'job_title': job.get('title'), 'company': job.get('firm'),
+             'match_percentage': match_percentage},
+            f"/jobs/{job['slug']}" if job.get('slug') else None
+        )
+        for user_id, job, match_percentage in matches
+    ]
+    try:
+        result = get_notifications_db().insert_many(notifications, ordered=False)
+        return len(result.inserted_ids)
+    except Exception as e:
+        print(f"Error creating job match notifications: {e}")
+        return 0
+
 def notify_resume_analysis_complete(user_id: str, score: int):
     """Notify user when resume analysis is complete"""
     create_notification(
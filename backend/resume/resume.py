@@ -2,6 +2,7 @@ from flask import Blueprint, request, current_app, send_file, session, jsonify
 from extensions import mongo, fs
 from werkzeug.utils import secure_filename
 from bson.objectid import ObjectId
+from datetime import datetime
 import gridfs
 import io
 
@@ -484,10 +485,22 @@ def analyze_job_match():
         from ai_resume_analyzer import match_resume_to_job
         
         data = request.get_json()
-        if not data or not data.get("job_description"):
+        if not data or not (data.get("job_description") or data.get("job_id")):
             return jsonify({"error": "Job description is required"}), 400
         
-        job_description = data["job_description"]
+        job_description = data.get("job_description")
+        job_keywords = None
+        if data.get("job_id"):
+            # Use the keyword profile stored on the job instead of re-extracting it
+            try:
+                job = mongo.db.jobs.find_one({"_id": ObjectId(data["job_id"])}, {"description": 1, "keywords": 1})
+            except Exception:
+                return jsonify({"error": "Invalid job ID format"}), 400
+            if not job:
+                return jsonify({"error": "Job not found"}), 404
+            job_description = job_description or job.get("description", "")
+            job_keywords = job.get("keywords")
+        
         user_id = session.get("user_id")
         
         # Get parsed resume data
@@ -503,7 +516,8 @@ def analyze_job_match():
         match_analysis = match_resume_to_job(
             resume_text, 
             job_description, 
-            parsed_resume['parsed_data']
+            parsed_resume['parsed_data'],
+            job_keywords
         )
         
         return jsonify({
@@ -28,7 +28,30 @@ def run_all_tests():
         'test_users',
         'test_applications',
         'test_cities',
-        'test_email_service'
+        'test_email_service',
+        'test_job_search_index',
+        'test_job_pagination',
+        'test_streaming',
+        'test_job_enrichment',
+        'test_job_suggestions',
+        'test_job_result_cache',
+        'test_job_migrations',
+        'test_job_ingestion',
+        'test_job_backfill',
+        'test_job_facets',
+        'test_job_geo',
+        'test_job_events',
+        'test_job_similar',
+        'test_job_duplicates',
+        'test_conditional_get',
+        'test_archive',
+        'test_job_percolator',
+        'test_hydration',
+        'test_application_snapshots',
+        'test_application_counters',
+        'test_application_submit',
+        'test_application_events',
+        'test_indexes'
     ]
     
     total_tests = 0
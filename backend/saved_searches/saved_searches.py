@@ -0,0 +1,72 @@
+"""
+Saved Searches Blueprint
+Lets job seekers save searches as job alerts that are matched against every newly posted job
+"""
+from flask import Blueprint, request, session
+from extensions import mongo
+from flask_pymongo import ObjectId
+from datetime import datetime
+from utils import standardize_error_response, standardize_success_response, require_auth
+from jobs.percolator import MAX_SAVED_SEARCHES_PER_USER, parse_saved_search, record_saved_search_change
+
+saved_searches_bp = Blueprint("saved_searches_bp", __name__)
+saved_searches_db = mongo.db.saved_searches
+
+
+def format_saved_search(search):
+    return {
+        "id": str(search["_id"]),
+        "name": search.get("name", ""),
+        "locations": search.get("locations", []),
+        "jobtypes": search.get("jobtypes", []),
+        "salary_min": search.get("salary_min"),
+        "keywords": search.get("keywords", []),
+        "created_at": search["created_at"].isoformat() if search.get("created_at") else None
+    }
+
+
+@saved_searches_bp.route("", methods=["GET"])
+@require_auth
+def get_saved_searches():
+    """List the current user's saved searches"""
+    user_id = ObjectId(session.get("user_id"))
+    searches = saved_searches_db.find({"user_id": user_id}).sort("created_at", -1)
+    return standardize_success_response({
+        "saved_searches": [format_saved_search(search) for search in searches]
+    })
+
+
+@saved_searches_bp.route("", methods=["POST"])
+@require_auth
+def create_saved_search():
+    """Save a search; new jobs matching it trigger a new job match notification"""
+    try:
+        search = parse_saved_search(request.get_json(silent=True))
+    except ValueError as e:
+        return standardize_error_response(str(e), 400)
+
+    user_id = ObjectId(session.get("user_id"))
+    if saved_searches_db.count_documents({"user_id": user_id}) >= MAX_SAVED_SEARCHES_PER_USER:
+        return standardize_error_response(f"You can save at most {MAX_SAVED_SEARCHES_PER_USER} searches", 400)
+
+    search.update({"user_id": user_id, "created_at": datetime.utcnow()})
+    result = saved_searches_db.insert_one(search)
+    search["_id"] = result.inserted_id
+    record_saved_search_change(lambda percolator: percolator.add(search))
+
+    return standardize_success_response({"saved_search": format_saved_search(search)}, "Search saved", 201)
+
+
+@saved_searches_bp.route("/<search_id>", methods=["DELETE"])
+@require_auth
+def delete_saved_search(search_id):
+    """Delete one of the current user's saved searches"""
+    if not ObjectId.is_valid(search_id):
+        return standardize_error_response("Invalid saved search ID format", 400)
+
+    result = saved_searches_db.delete_one({"_id": ObjectId(search_id), "user_id": ObjectId(session.get("user_id"))})
+    if not result.deleted_count:
+        return standardize_error_response("Saved search not found", 404)
+
+    record_saved_search_change(lambda percolator: percolator.remove(search_id))
+    return standardize_success_response({"message": "Saved search deleted"})
@@ -39,12 +39,15 @@ def create_app():
          origins=["http://localhost:5173", "http://127.0.0.1:5173", "http://localhost:3000"], 
          supports_credentials=True,
          allow_headers=['Content-Type', 'Authorization', 'X-Requested-With', 'X-XSRF-TOKEN', 'X-Content-Type-Options', 'X-Frame-Options', 'X-XSS-Protection'],
-         methods=['GET', 'POST', 'PUT', 'DELETE', 'OPTIONS'])
+         methods=['GET', 'POST', 'PUT', 'DELETE', 'OPTIONS'],
+         expose_headers=['X-Next-Cursor', 'X-Total-Count', 'X-Total-Count-Estimated', 'Link', 'ETag'])
     
     # Test MongoDB connection
+    mongo_connected = False
     try:
         # The ping command is cheap and does not require auth
         mongo.db.command('ping')
+        mongo_connected = True
         print("Pinged your deployment. You successfully connected to MongoDB!")
     except Exception as e:
         print(f"Failed to connect to MongoDB: {e}")
@@ -66,6 +69,7 @@ def create_app():
     from applications.applications import applications_bp
     from notification_system import notifications_bp
     from notification_preferences import notification_preferences_bp
+    from saved_searches.saved_searches import saved_searches_bp
     
     # Initialize OAuth
     try:
@@ -88,6 +92,66 @@ def create_app():
     app.register_blueprint(applications_bp, url_prefix='/applications')
     app.register_blueprint(notifications_bp, url_prefix='/notifications')
     app.register_blueprint(notification_preferences_bp, url_prefix='/notification-preferences')
+    app.register_blueprint(saved_searches_bp, url_prefix='/saved-searches')
+    
+    from indexes import indexes_cli
+    app.cli.add_command(indexes_cli)
+    from archive import archive_cli
+    app.cli.add_command(archive_cli)
+
+    # Build in-memory search structures from the current collections
+    if mongo_connected:
+        try:
+            from jobs.search_index import build_job_search_index
+            # The jobs version is read from the app's Redis
+            with app.app_context():
+                search_index = build_job_search_index(mongo.db.jobs)
+            print(f"Job search index built with {len(search_index)} jobs")
+        except Exception as e:
+            print(f"Failed to build job search index: {e}")
+            print("Warning: job search will fall back to regex queries")
+        try:
+            from jobs.similar import build_similar_jobs_index
+            with app.app_context():
+                similar_index = build_similar_jobs_index(mongo.db.jobs)
+            print(f"Similar jobs index built with {len(similar_index)} jobs")
+        except Exception as e:
+            print(f"Failed to build similar jobs index: {e}")
+        try:
+            from jobs.duplicates import build_duplicate_jobs_index
+            with app.app_context():
+                duplicate_index = build_duplicate_jobs_index(mongo.db.jobs)
+            print(f"Duplicate jobs index built with {len(duplicate_index)} jobs")
+        except Exception as e:
+            print(f"Failed to build duplicate jobs index: {e}")
+            print("Warning: new jobs will not be checked for near-duplicates")
+        try:
+            from jobs.suggestions import build_suggestion_indexes
+            with app.app_context():
+                build_suggestion_indexes(mongo.db.jobs)
+        except Exception as e:
+            print(f"Failed to build job suggestion indexes: {e}")
+        try:
+            from jobs.percolator import build_percolator
+            # The saved searches version is read from the app's Redis
+            with app.app_context():
+                percolator = build_percolator(mongo.db.saved_searches)
+            print(f"Saved search percolator built with {len(percolator)} searches")
+        except Exception as e:
+            print(f"Failed to build saved search percolator: {e}")
+            print("Warning: new jobs will not be matched against saved searches")
+        from indexes import start_index_reconciliation
+        start_index_reconciliation(mongo.db)
+        
+        # Apply buffered job view/click/impression counts in periodic batches
+        from jobs.events import job_event_buffer
+        job_event_buffer.start(mongo.db.jobs)
+
+        # Apply job edits to the job snapshots embedded in applications and the titles on the
+        # application counters in periodic batches
+        from applications.applications import application_counters
+        from applications.snapshots import start_snapshot_propagation
+        start_snapshot_propagation(mongo.db.job_snapshot_outbox, mongo.db.applications, counters=application_counters)
 
     return app
 
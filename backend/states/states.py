@@ -3,6 +3,8 @@ from extensions import mongo, bcrypt  # Import from extensions
 from flask_pymongo import ObjectId
 from datetime import datetime
 import constants as c
+from utils import wants_ndjson_stream, stream_documents
+from http_cache import REFERENCE_CACHE_CONTROL, collection_versions, conditional_json, version_etag
 
 
 states_bp = Blueprint("states_bp", __name__)
@@ -18,24 +20,33 @@ def add_all_states():
     
     for state in all_states:
         states_db.insert_one({"state":state})
+    collection_versions.bump("states")
         
     return jsonify({"message":"Created correctly!"})
 
 @states_bp.route("/get_all", methods=["GET"])
 def get_all_states():
-    states = states_db.find({})
-    final_states = []
-    for state in states:
-        state["_id"] = str(state["_id"])
-        final_states.append(state)
+    if wants_ndjson_stream():
+        return stream_documents(states_db.find({}))
 
-    return jsonify(final_states)
+    def list_states():
+        final_states = []
+        for state in states_db.find({}):
+            state["_id"] = str(state["_id"])
+            final_states.append(state)
+        return final_states
+
+    etag = version_etag("states", collection_versions.get("states"), "all")
+    response = conditional_json(list_states, REFERENCE_CACHE_CONTROL, etag)
+    response.vary.add("Accept")
+    return response
 
 @states_bp.route("/add_ab", methods=["PUT"])
 def add_states_ab():
     data = request.get_json()
     for state in data:
         state = states_db.update_one({"state": state["state"]}, {"$set": {"ab": state["ab"]}})
+    collection_versions.bump("states")
         
     return jsonify({"message": "Abreviations added correctly!"})
 
@@ -0,0 +1,179 @@
+"""
+Test suite for application counters
+Tests counter transitions, employer statistics from counters and the rebuild
+"""
+import unittest
+from unittest.mock import patch, MagicMock
+import os
+import sys
+import json
+from datetime import datetime
+
+# Add backend directory to path for imports
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from flask import Flask
+from flask_pymongo import ObjectId
+from applications.counters import ApplicationCounters
+
+# Mock extensions before importing blueprint modules
+with patch('extensions.mongo') as mock_mongo, patch('extensions.fs'):
+    from applications.applications import applications_bp
+
+JOB_ID, EMPLOYER_ID = ObjectId(), ObjectId()
+
+
+class TestApplicationCounters(unittest.TestCase):
+    """Test $inc transitions and reads"""
+
+    def setUp(self):
+        self.job_stats, self.employer_stats = MagicMock(), MagicMock()
+        self.counters = ApplicationCounters(self.job_stats, self.employer_stats)
+
+    def test_submission_counts_for_job_and_employer(self):
+        self.counters.record_submission(JOB_ID, EMPLOYER_ID, title="Barista")
+
+        self.job_stats.update_one.assert_called_once_with(
+            {"_id": JOB_ID},
+            {"$inc": {"total": 1, "statuses.pending": 1}, "$set": {"employer_id": EMPLOYER_ID, "title": "Barista"}},
+            upsert=True
+        )
+        self.employer_stats.update_one.assert_called_once_with(
+            {"_id": EMPLOYER_ID}, {"$inc": {"total": 1, "statuses.pending": 1}}, upsert=True
+        )
+
+    def test_status_change_moves_one_count(self):
+        self.counters.record_status_change(JOB_ID, None, "pending", "reviewing")
+        self.assertEqual(self.job_stats.update_one.call_args[0][1],
+                         {"$inc": {"statuses.pending": -1, "statuses.reviewing": 1}, "$set": {"employer_id": None}})
+        # Jobs without an employer only have a job counter
+        self.employer_stats.update_one.assert_not_called()
+
+    def test_unchanged_status_is_not_counted(self):
+        self.counters.record_status_change(JOB_ID, EMPLOYER_ID, "pending", "pending")
+        self.job_stats.update_one.assert_not_called()
+
+    def test_employer_statistics(self):
+        self.employer_stats.find_one.return_value = {"total": 3, "statuses": {"pending": 2, "rejected": 1,
+                                                                              "reviewing": 0}}
+        self.job_stats.find.return_value = [{"_id": JOB_ID, "total": 3, "title": "Barista"}]
+
+        statistics = self.counters.employer_statistics(EMPLOYER_ID)
+
+        self.assertEqual(statistics, {
+            "total_received": 3, "status_breakdown": {"pending": 2, "rejected": 1},
+            "jobs": [{"job_id": str(JOB_ID), "title": "Barista", "application_count": 3}]
+        })
+        self.job_stats.find.assert_called_once_with({"employer_id": EMPLOYER_ID}, {"total": 1, "title": 1})
+
+    def test_record_titles(self):
+        self.counters.record_titles({JOB_ID: "Head Barista"})
+        operation = self.job_stats.bulk_write.call_args[0][0][0]
+        self.assertEqual((operation._filter, operation._doc), ({"_id": JOB_ID}, {"$set": {"title": "Head Barista"}}))
+        self.assertFalse(operation._upsert)
+        self.counters.record_titles({})
+        self.job_stats.bulk_write.assert_called_once()
+
+    def test_employer_without_applications(self):
+        self.employer_stats.find_one.return_value = None
+        self.job_stats.find.return_value = []
+        statistics = self.counters.employer_statistics(EMPLOYER_ID)
+        self.assertEqual((statistics["total_received"], statistics["status_breakdown"]), (0, {}))
+
+    def test_rebuild_sums_live_and_archived_applications(self):
+        other_job = ObjectId()
+        live, archived = MagicMock(), MagicMock()
+        live.aggregate.return_value = [
+            {"_id": {"job_id": JOB_ID, "employer_id": EMPLOYER_ID, "status": "pending"}, "count": 2},
+            {"_id": {"job_id": other_job, "status": "pending"}, "count": 1}
+        ]
+        archived.aggregate.return_value = [
+            {"_id": {"job_id": JOB_ID, "employer_id": EMPLOYER_ID, "status": "rejected"}, "count": 4}
+        ]
+        jobs = MagicMock()
+        jobs.find.return_value = [{"_id": JOB_ID, "title": "Barista"}]
+        jobs.database.__getitem__.return_value.find.return_value = []
+        now = datetime(2024, 5, 1)
+
+        report = self.counters.rebuild([live, archived], jobs, now)
+
+        self.assertEqual(report, {"jobs": 2, "employers": 1})
+        job_counters = {operation._filter["_id"]: operation._doc
+                        for operation in self.job_stats.bulk_write.call_args[0][0]}
+        self.assertEqual(job_counters[JOB_ID], {"employer_id": EMPLOYER_ID, "total": 6, "rebuilt_at": now,
+                                                "statuses": {"pending": 2, "rejected": 4}, "title": "Barista"})
+        self.assertIsNone(job_counters[other_job]["employer_id"])
+        # Titles of jobs found in neither collection are left empty
+        self.assertIsNone(job_counters[other_job]["title"])
+        employer_counter = self.employer_stats.bulk_write.call_args[0][0][0]._doc
+        self.assertEqual(employer_counter["total"], 6)
+        self.job_stats.delete_many.assert_called_once_with({"rebuilt_at": {"$ne": now}})
+
+
+class TestCountedRoutes(unittest.TestCase):
+    """Test that the application routes keep the counters"""
+
+    def setUp(self):
+        self.app = Flask(__name__)
+        self.app.config['TESTING'] = True
+        self.app.secret_key = 'test'
+        self.app.register_blueprint(applications_bp, url_prefix='/applications')
+        self.client = self.app.test_client()
+        self.user_id = ObjectId()
+        with self.client.session_transaction() as session:
+            session['user_id'] = str(self.user_id)
+        self.application = {"_id": ObjectId(), "job_id": JOB_ID, "employer_id": EMPLOYER_ID,
+                            "applicant_id": self.user_id, "status": "reviewing"}
+
+    @patch('applications.applications.application_counters')
+    @patch('applications.applications.applications_db')
+    @patch('utils.mongo')
+    def test_withdraw_counts_the_transition(self, mock_mongo, mock_applications_db, mock_counters):
+        mock_applications_db.find_one.return_value = self.application
+        mock_applications_db.update_one.return_value.modified_count = 1
+
+        response = self.client.post(f'/applications/{self.application["_id"]}/withdraw')
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(mock_applications_db.update_one.call_args[0][0],
+                         {"_id": self.application["_id"], "status": "reviewing"})
+        mock_counters.record_status_change.assert_called_once_with(JOB_ID, EMPLOYER_ID, "reviewing", "withdrawn")
+
+    @patch('applications.applications.application_counters')
+    @patch('applications.applications.applications_db')
+    @patch('utils.mongo')
+    def test_concurrent_status_change_is_not_counted(self, mock_mongo, mock_applications_db, mock_counters):
+        mock_applications_db.find_one.return_value = self.application
+        mock_applications_db.update_one.return_value.modified_count = 0
+
+        response = self.client.post(f'/applications/{self.application["_id"]}/withdraw')
+
+        self.assertEqual(response.status_code, 409)
+        mock_counters.record_status_change.assert_not_called()
+
+    @patch('applications.applications.application_counters')
+    @patch('applications.applications.applications_db')
+    @patch('applications.applications.users_db')
+    @patch('applications.applications.jobs_db')
+    @patch('utils.mongo')
+    def test_employer_statistics_are_read_from_counters(self, mock_mongo, mock_jobs_db, mock_users_db,
+                                                        mock_applications_db, mock_counters):
+        mock_users_db.find_one.return_value = {"_id": self.user_id, "role": "employer"}
+        mock_counters.employer_statistics.return_value = {
+            "total_received": 5, "status_breakdown": {"pending": 5},
+            "jobs": [{"job_id": str(JOB_ID), "title": "Barista", "application_count": 5}]
+        }
+
+        response = self.client.get('/applications/statistics')
+
+        data = json.loads(response.data)
+        self.assertEqual(data["total_received"], 5)
+        self.assertEqual(data["jobs_with_applications"],
+                         [{"job_id": str(JOB_ID), "title": "Barista", "application_count": 5}])
+        mock_jobs_db.find.assert_not_called()
+        mock_applications_db.aggregate.assert_not_called()
+        mock_applications_db.count_documents.assert_not_called()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,198 @@
+"""
+Test suite for application status history
+Tests history pages, the migration of status_history arrays and the routes writing events
+"""
+import unittest
+from unittest.mock import patch, MagicMock
+import os
+import sys
+from datetime import datetime
+
+# Add backend directory to path for imports
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from flask import Flask
+from flask_pymongo import ObjectId
+from applications.events import HISTORY_SORT, status_event, status_history_page, migrate_status_history
+from jobs.pagination import InvalidCursorError
+
+# Mock extensions before importing blueprint modules
+with patch('extensions.mongo') as mock_mongo, patch('extensions.fs'):
+    from applications.applications import applications_bp
+
+APPLICANT_ID = ObjectId()
+APPLICATION = {"_id": ObjectId(), "applicant_id": APPLICANT_ID, "employer_id": ObjectId(),
+               "applied_at": datetime(2024, 5, 1)}
+
+
+def events_returning(*pages):
+    events = MagicMock()
+    events.find.return_value.sort.return_value.limit.side_effect = list(pages)
+    return events
+
+
+class TestStatusHistoryPage(unittest.TestCase):
+    """Test reading history a page at a time"""
+
+    def setUp(self):
+        self.reviewing = {**status_event(APPLICATION["_id"], "reviewing", ObjectId(), "", datetime(2024, 5, 2)),
+                          "_id": ObjectId()}
+        self.interviewed = {**status_event(APPLICATION["_id"], "interviewed", ObjectId(), "", datetime(2024, 5, 3)),
+                            "_id": ObjectId()}
+
+    def test_first_page_starts_with_the_submission(self):
+        events = events_returning([self.reviewing, self.interviewed])
+
+        entries, next_cursor = status_history_page(events, APPLICATION, 2)
+
+        self.assertEqual([entry["status"] for entry in entries], ["pending", "reviewing"])
+        self.assertEqual(entries[0]["changed_at"], APPLICATION["applied_at"])
+        self.assertIsNotNone(next_cursor)
+        events.find.assert_called_once_with({"application_id": APPLICATION["_id"]})
+        events.find.return_value.sort.assert_called_once_with(HISTORY_SORT)
+        # One slot is taken by the submission, one more tells whether there is a next page
+        events.find.return_value.sort.return_value.limit.assert_called_once_with(2)
+
+    def test_next_page_continues_after_the_cursor(self):
+        events = events_returning([self.reviewing, self.interviewed], [self.interviewed])
+        _, cursor = status_history_page(events, APPLICATION, 2)
+
+        entries, next_cursor = status_history_page(events, APPLICATION, 2, cursor)
+
+        self.assertEqual([entry["status"] for entry in entries], ["interviewed"])
+        self.assertIsNone(next_cursor)
+        self.assertEqual(events.find.call_args[0][0]["$or"], [
+            {"changed_at": {"$gt": datetime(2024, 5, 2)}},
+            {"changed_at": datetime(2024, 5, 2), "_id": {"$gt": self.reviewing["_id"]}}
+        ])
+
+    def test_page_ending_on_the_submission(self):
+        events = events_returning([self.reviewing], [self.reviewing])
+
+        entries, cursor = status_history_page(events, APPLICATION, 1)
+        self.assertEqual([entry["status"] for entry in entries], ["pending"])
+
+        entries, next_cursor = status_history_page(events, APPLICATION, 1, cursor)
+        self.assertEqual([entry["status"] for entry in entries], ["reviewing"])
+        self.assertEqual(events.find.call_args[0][0]["$or"][1],
+                         {"changed_at": APPLICATION["applied_at"], "_id": {"$gt": APPLICATION["_id"]}})
+
+    def test_invalid_cursor(self):
+        with self.assertRaises(InvalidCursorError):
+            status_history_page(events_returning([]), APPLICATION, 2, "not-a-cursor")
+
+
+class TestMigrateStatusHistory(unittest.TestCase):
+    """Test moving status_history arrays into the events collection"""
+
+    def test_events_are_upserted_and_arrays_unset(self):
+        application = {**APPLICATION, "status_history": [
+            {"status": "pending", "changed_at": APPLICATION["applied_at"], "notes": "Application submitted"},
+            {"status": "withdrawn", "changed_at": datetime(2024, 5, 2), "changed_by": APPLICANT_ID}
+        ]}
+        applications, events = MagicMock(), MagicMock()
+        applications.find.return_value.sort.return_value.limit.side_effect = [[application], []]
+        applications.bulk_write.return_value.modified_count = 1
+
+        report = migrate_status_history(applications, events)
+
+        self.assertEqual(report["modified"], 1)
+        # The submission is derived from applied_at, so only the withdrawal is moved
+        writes = events.bulk_write.call_args[0][0]
+        self.assertEqual(len(writes), 1)
+        self.assertEqual(writes[0]._filter, {"application_id": APPLICATION["_id"], "status": "withdrawn",
+                                             "changed_at": datetime(2024, 5, 2)})
+        self.assertTrue(writes[0]._upsert)
+        self.assertEqual(applications.bulk_write.call_args[0][0][0]._doc, {"$unset": {"status_history": ""}})
+
+
+class TestHistoryRoutes(unittest.TestCase):
+    """Test that status changes are written as events and read back by page"""
+
+    def setUp(self):
+        self.app = Flask(__name__)
+        self.app.config['TESTING'] = True
+        self.app.secret_key = 'test'
+        self.app.register_blueprint(applications_bp, url_prefix='/applications')
+        self.client = self.app.test_client()
+        with self.client.session_transaction() as session:
+            session['user_id'] = str(APPLICANT_ID)
+
+    @patch('applications.applications.application_events_db')
+    @patch('applications.applications.application_counters')
+    @patch('applications.applications.applications_db')
+    @patch('utils.mongo')
+    def test_withdraw_appends_an_event(self, mock_mongo, mock_applications_db, mock_counters, mock_events):
+        mock_applications_db.find_one.return_value = {**APPLICATION, "job_id": ObjectId(), "status": "pending"}
+        mock_applications_db.update_one.return_value.modified_count = 1
+
+        response = self.client.post(f'/applications/{APPLICATION["_id"]}/withdraw')
+
+        self.assertEqual(response.status_code, 200)
+        self.assertNotIn("$push", mock_applications_db.update_one.call_args[0][1])
+        event = mock_events.insert_one.call_args[0][0]
+        self.assertEqual((event["application_id"], event["status"], event["changed_by"]),
+                         (APPLICATION["_id"], "withdrawn", APPLICANT_ID))
+
+    @patch('applications.applications.application_events_db')
+    @patch('applications.applications.applications_db')
+    @patch('utils.mongo')
+    def test_history_page(self, mock_mongo, mock_applications_db, mock_events):
+        mock_mongo.db.users.find_one.return_value = {"_id": APPLICANT_ID, "role": "job_seeker"}
+        mock_applications_db.find_one.return_value = APPLICATION
+        mock_events.find.return_value.sort.return_value.limit.return_value = [
+            {**status_event(APPLICATION["_id"], "withdrawn", APPLICANT_ID, "", datetime(2024, 5, 2)),
+             "_id": ObjectId()}
+        ]
+
+        response = self.client.get(f'/applications/{APPLICATION["_id"]}/history?limit=5')
+
+        self.assertEqual(response.status_code, 200)
+        data = response.get_json()
+        self.assertEqual([entry["status"] for entry in data["status_history"]], ["pending", "withdrawn"])
+        self.assertIsNone(data["next_cursor"])
+
+    @patch('applications.applications.application_events_db')
+    @patch('applications.applications.applications_db')
+    @patch('utils.mongo')
+    def test_history_one_entry_per_page(self, mock_mongo, mock_applications_db, mock_events):
+        mock_mongo.db.users.find_one.return_value = {"_id": APPLICANT_ID, "role": "job_seeker"}
+        mock_applications_db.find_one.return_value = APPLICATION
+        mock_events.find.return_value.sort.return_value.limit.return_value = [
+            {**status_event(APPLICATION["_id"], "withdrawn", APPLICANT_ID, "", datetime(2024, 5, 2)),
+             "_id": ObjectId()}
+        ]
+
+        response = self.client.get(f'/applications/{APPLICATION["_id"]}/history?limit=1')
+
+        self.assertEqual(response.status_code, 200)
+        data = response.get_json()
+        self.assertEqual([entry["status"] for entry in data["status_history"]], ["pending"])
+        self.assertIsNotNone(data["next_cursor"])
+
+    @patch('applications.applications.application_events_db')
+    @patch('applications.applications.applications_db')
+    @patch('utils.mongo')
+    def test_history_of_someone_elses_application(self, mock_mongo, mock_applications_db, mock_events):
+        mock_mongo.db.users.find_one.return_value = {"_id": APPLICANT_ID, "role": "job_seeker"}
+        mock_applications_db.find_one.return_value = {**APPLICATION, "applicant_id": ObjectId()}
+
+        response = self.client.get(f'/applications/{APPLICATION["_id"]}/history')
+
+        self.assertEqual(response.status_code, 403)
+        mock_events.find.assert_not_called()
+
+    @patch('applications.applications.application_events_db')
+    @patch('applications.applications.applications_db')
+    @patch('utils.mongo')
+    def test_history_with_invalid_cursor(self, mock_mongo, mock_applications_db, mock_events):
+        mock_mongo.db.users.find_one.return_value = {"_id": APPLICANT_ID, "role": "job_seeker"}
+        mock_applications_db.find_one.return_value = APPLICATION
+
+        response = self.client.get(f'/applications/{APPLICATION["_id"]}/history?cursor=bogus')
+
+        self.assertEqual(response.status_code, 400)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,198 @@
+"""
+Test suite for job snapshots embedded in applications
+Tests snapshot contents, outbox propagation, listings without joins and the backfill
+"""
+import unittest
+from unittest.mock import patch, MagicMock
+import os
+import sys
+import json
+import threading
+from datetime import datetime
+
+# Add backend directory to path for imports
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from flask import Flask
+from flask_pymongo import ObjectId
+from applications.snapshots import (
+    SNAPSHOT_FIELDS, job_snapshot, snapshot_changed, record_job_change, propagate_job_snapshots,
+    start_snapshot_propagation, with_job_snapshots, backfill_job_snapshots
+)
+
+# Mock extensions before importing blueprint modules
+with patch('extensions.mongo') as mock_mongo, patch('extensions.fs'):
+    mock_mongo.db.jobs = MagicMock()
+    from applications.applications import applications_bp
+    from jobs.jobs import jobs_bp
+
+JOB = {"_id": ObjectId(), "title": "Barista", "firm": "Bean Co", "location": "Sydney", "jobtype": "hospitality",
+       "remuneration_amount": 30, "remuneration_period": "hour", "description": "Espresso " * 200}
+
+
+class TestJobSnapshot(unittest.TestCase):
+    """Test what a snapshot holds"""
+
+    def test_only_listing_fields_are_copied(self):
+        snapshot = job_snapshot(JOB, datetime(2024, 5, 1))
+        self.assertEqual(set(snapshot), set(SNAPSHOT_FIELDS) | {"synced_at"})
+        self.assertEqual(snapshot["firm"], "Bean Co")
+
+    def test_snapshot_changed(self):
+        self.assertTrue(snapshot_changed(JOB, {"title": "Head Barista"}))
+        self.assertFalse(snapshot_changed(JOB, {"title": "Barista", "description": "New description"}))
+
+
+class TestPropagateJobSnapshots(unittest.TestCase):
+    """Test applying queued job edits to applications"""
+
+    def test_batches_collapse_edits_per_job(self):
+        first_job, second_job = ObjectId(), ObjectId()
+        entries = [
+            {"_id": 1, "job_id": first_job, "snapshot": job_snapshot({"title": "Old"}, datetime(2024, 5, 1))},
+            {"_id": 2, "job_id": second_job, "snapshot": job_snapshot({"title": "Other"}, datetime(2024, 5, 1))},
+            {"_id": 3, "job_id": first_job, "snapshot": job_snapshot({"title": "New"}, datetime(2024, 5, 2))}
+        ]
+        outbox = MagicMock()
+        outbox.find.return_value.sort.return_value.limit.side_effect = [entries, []]
+        applications = MagicMock()
+        applications.bulk_write.return_value.modified_count = 7
+
+        report = propagate_job_snapshots(outbox, applications, batch_size=10)
+
+        self.assertEqual(report, {"entries": 3, "jobs": 2, "modified": 7, "batches": 1})
+        operations = applications.bulk_write.call_args[0][0]
+        self.assertEqual(len(operations), 2)
+        self.assertEqual(operations[0]._filter, {
+            "job_id": first_job, "job.synced_at": {"$not": {"$gt": datetime(2024, 5, 2)}}
+        })
+        self.assertEqual(operations[0]._doc["$set"]["job"]["title"], "New")
+        self.assertFalse(applications.bulk_write.call_args[1]["ordered"])
+        outbox.delete_many.assert_called_once_with({"_id": {"$in": [1, 2, 3]}})
+
+    def test_titles_follow_edits_on_the_counters(self):
+        job_id = ObjectId()
+        outbox = MagicMock()
+        outbox.find.return_value.sort.return_value.limit.side_effect = [
+            [{"_id": 1, "job_id": job_id, "snapshot": job_snapshot({"title": "Head Barista"}, datetime(2024, 5, 1))}],
+            []
+        ]
+        counters = MagicMock()
+
+        propagate_job_snapshots(outbox, MagicMock(), batch_size=10, counters=counters)
+
+        counters.record_titles.assert_called_once_with({job_id: "Head Barista"})
+
+    def test_record_job_change(self):
+        outbox = MagicMock()
+        record_job_change(outbox, JOB["_id"], JOB, datetime(2024, 5, 1))
+        entry = outbox.insert_one.call_args[0][0]
+        self.assertEqual(entry["job_id"], JOB["_id"])
+        self.assertEqual(entry["snapshot"]["synced_at"], datetime(2024, 5, 1))
+
+
+class TestSnapshotPropagationThread(unittest.TestCase):
+    """Test the background propagation of queued job edits"""
+
+    @patch('applications.snapshots._propagation_thread', None)
+    @patch('applications.snapshots.propagate_job_snapshots')
+    def test_one_thread_that_survives_failures(self, mock_propagate):
+        retried = threading.Event()
+
+        def propagate(*args, **kwargs):
+            if mock_propagate.call_count == 1:
+                raise ValueError("Malformed outbox entry")
+            retried.set()
+        mock_propagate.side_effect = propagate
+
+        thread = start_snapshot_propagation(MagicMock(), MagicMock(), interval=0.01)
+
+        self.assertIs(start_snapshot_propagation(MagicMock(), MagicMock()), thread)
+        self.assertTrue(retried.wait(2))
+        self.assertTrue(thread.is_alive())
+
+
+class TestListingWithSnapshots(unittest.TestCase):
+    """Test that listings only read jobs for applications without a snapshot"""
+
+    def test_only_unsnapshotted_jobs_are_fetched(self):
+        legacy_job = {"_id": ObjectId(), "title": "Chef"}
+        applications = [
+            {"_id": 1, "job_id": JOB["_id"], "job": job_snapshot(JOB)},
+            {"_id": 2, "job_id": legacy_job["_id"]}
+        ]
+        jobs = MagicMock()
+        jobs.find.return_value = [legacy_job]
+
+        pairs = with_job_snapshots(applications, jobs)
+
+        self.assertEqual([job["title"] for _, job in pairs], ["Barista", "Chef"])
+        self.assertEqual(jobs.find.call_args[0][0], {"_id": {"$in": [legacy_job["_id"]]}})
+
+    def test_no_job_query_when_every_application_has_a_snapshot(self):
+        jobs = MagicMock()
+        with_job_snapshots([{"_id": 1, "job_id": JOB["_id"], "job": job_snapshot(JOB)}], jobs)
+        jobs.find.assert_not_called()
+
+    def test_backfill_embeds_missing_snapshots(self):
+        application = {"_id": ObjectId(), "job_id": JOB["_id"]}
+        applications, jobs = MagicMock(), MagicMock()
+        applications.find.return_value.sort.return_value.limit.side_effect = [[application], []]
+        applications.bulk_write.return_value.modified_count = 1
+        jobs.find.return_value = [JOB]
+
+        report = backfill_job_snapshots(applications, jobs)
+
+        self.assertEqual(report["modified"], 1)
+        operation = applications.bulk_write.call_args[0][0][0]
+        self.assertEqual(operation._filter, {"_id": application["_id"], "job": None})
+        self.assertEqual(operation._doc["$set"]["job"]["title"], "Barista")
+
+
+class TestSnapshotRoutes(unittest.TestCase):
+    """Test snapshots on submit and modify"""
+
+    def setUp(self):
+        self.app = Flask(__name__)
+        self.app.config['TESTING'] = True
+        self.app.secret_key = 'test'
+        self.app.register_blueprint(applications_bp, url_prefix='/applications')
+        self.app.register_blueprint(jobs_bp, url_prefix='/jobs')
+        self.client = self.app.test_client()
+        self.user_id = ObjectId()
+        with self.client.session_transaction() as session:
+            session['user_id'] = str(self.user_id)
+
+    @patch('applications.applications.unique_application_index_confirmed', True)
+    @patch('applications.applications.application_counters')
+    @patch('applications.applications.applications_db')
+    @patch('applications.applications.jobs_db')
+    @patch('utils.mongo')
+    def test_submit_embeds_the_snapshot(self, mock_mongo, mock_jobs_db, mock_applications_db, mock_counters):
+        mock_jobs_db.find_one.return_value = JOB
+        mock_mongo.db.users.find_one.return_value = {"_id": self.user_id, "email_verified": True}
+        mock_applications_db.insert_one.return_value.inserted_id = ObjectId()
+
+        response = self.client.post('/applications/submit', data=json.dumps({"job_id": str(JOB["_id"])}),
+                                    content_type='application/json')
+
+        self.assertEqual(response.status_code, 201)
+        snapshot = mock_applications_db.insert_one.call_args[0][0]["job"]
+        self.assertEqual(snapshot["title"], "Barista")
+        self.assertNotIn("description", snapshot)
+
+    @patch('jobs.jobs.job_snapshot_outbox_db')
+    @patch('jobs.jobs.jobs_db')
+    def test_modify_queues_snapshot_changes_only(self, mock_jobs_db, mock_outbox):
+        mock_jobs_db.find_one.return_value = dict(JOB)
+        mock_jobs_db.update_one.return_value.modified_count = 1
+        with patch('jobs.jobs.job_result_cache'):
+            self.client.put('/jobs/modify', json={"job_id": str(JOB["_id"]), "description": "Latte art"})
+            mock_outbox.insert_one.assert_not_called()
+            self.client.put('/jobs/modify', json={"job_id": str(JOB["_id"]), "title": "Head Barista"})
+
+        self.assertEqual(mock_outbox.insert_one.call_args[0][0]["snapshot"]["title"], "Head Barista")
+
+
+if __name__ == '__main__':
+    unittest.main()
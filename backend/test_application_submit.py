@@ -0,0 +1,176 @@
+"""
+Test suite for application submission
+Tests the round trips behind a submission and duplicate rejection by the unique index
+"""
+import unittest
+from unittest.mock import patch, MagicMock
+import os
+import sys
+import json
+
+# Add backend directory to path for imports
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from flask import Flask
+from flask_pymongo import ObjectId
+from pymongo.errors import DuplicateKeyError
+from applications.counters import ApplicationCounters
+from applications.duplicates import remove_duplicate_applications
+from indexes import has_unique_index
+
+# Mock extensions before importing blueprint modules
+with patch('extensions.mongo') as mock_mongo, patch('extensions.fs'):
+    from applications import applications as applications_module
+    from applications.applications import applications_bp, SUBMIT_JOB_PROJECTION
+
+JOB = {"_id": ObjectId(), "title": "Barista", "firm": "Bean Co", "employer_id": ObjectId()}
+
+
+class TestSubmitApplication(unittest.TestCase):
+    """Test that a submission reads the job once and leaves duplicates to the index"""
+
+    def setUp(self):
+        self.app = Flask(__name__)
+        self.app.config['TESTING'] = True
+        self.app.secret_key = 'test'
+        self.app.register_blueprint(applications_bp, url_prefix='/applications')
+        self.client = self.app.test_client()
+        self.user_id = ObjectId()
+        with self.client.session_transaction() as session:
+            session['user_id'] = str(self.user_id)
+
+    def submit(self):
+        return self.client.post('/applications/submit', data=json.dumps({"job_id": str(JOB["_id"])}),
+                                content_type='application/json')
+
+    @patch('applications.applications.unique_application_index_confirmed', True)
+    @patch('applications.applications.application_counters')
+    @patch('applications.applications.applications_db')
+    @patch('applications.applications.users_db')
+    @patch('applications.applications.jobs_db')
+    @patch('utils.mongo')
+    def test_submit_round_trips(self, mock_mongo, mock_jobs_db, mock_users_db, mock_applications_db,
+                                mock_counters):
+        mock_mongo.db.users.find_one.return_value = {"_id": self.user_id, "email_verified": True}
+        mock_jobs_db.find_one.return_value = JOB
+        mock_applications_db.insert_one.return_value.inserted_id = ObjectId()
+
+        response = self.submit()
+
+        self.assertEqual(response.status_code, 201)
+        mock_jobs_db.find_one.assert_called_once_with({"_id": JOB["_id"]}, SUBMIT_JOB_PROJECTION)
+        # The user comes from authentication and duplicates from the insert
+        mock_users_db.find_one.assert_not_called()
+        mock_applications_db.find_one.assert_not_called()
+        mock_counters.record_submission.assert_called_once_with(JOB["_id"], JOB["employer_id"], title="Barista")
+
+    @patch('applications.applications.unique_application_index_confirmed', True)
+    @patch('applications.applications.application_counters')
+    @patch('applications.applications.applications_db')
+    @patch('applications.applications.jobs_db')
+    @patch('utils.mongo')
+    def test_duplicate_application_is_rejected(self, mock_mongo, mock_jobs_db, mock_applications_db,
+                                               mock_counters):
+        mock_mongo.db.users.find_one.return_value = {"_id": self.user_id, "email_verified": True}
+        mock_jobs_db.find_one.return_value = JOB
+        mock_applications_db.insert_one.side_effect = DuplicateKeyError("E11000 duplicate key error")
+
+        response = self.submit()
+
+        self.assertEqual(response.status_code, 409)
+        mock_counters.record_submission.assert_not_called()
+
+    @patch('applications.applications.unique_application_index_confirmed', False)
+    @patch('applications.applications.application_counters')
+    @patch('applications.applications.applications_db')
+    @patch('applications.applications.jobs_db')
+    @patch('utils.mongo')
+    def test_existing_application_is_looked_up_without_the_unique_index(self, mock_mongo, mock_jobs_db,
+                                                                       mock_applications_db, mock_counters):
+        mock_mongo.db.users.find_one.return_value = {"_id": self.user_id, "email_verified": True}
+        mock_jobs_db.find_one.return_value = JOB
+        mock_applications_db.index_information.return_value = {"_id_": {"key": [("_id", 1)]}}
+        mock_applications_db.find_one.return_value = {"_id": ObjectId()}
+
+        response = self.submit()
+
+        self.assertEqual(response.status_code, 409)
+        mock_applications_db.find_one.assert_called_once_with(
+            {"applicant_id": self.user_id, "job_id": JOB["_id"]}, {"_id": 1}
+        )
+        mock_applications_db.insert_one.assert_not_called()
+
+    @patch('applications.applications.unique_application_index_confirmed', False)
+    @patch('applications.applications.applications_db')
+    def test_unique_index_is_confirmed_once(self, mock_applications_db):
+        mock_applications_db.index_information.return_value = {
+            "applicant_id_1_job_id_1": {"key": [("applicant_id", 1), ("job_id", 1)], "unique": True}
+        }
+        self.assertTrue(applications_module.unique_application_index_ready())
+        self.assertTrue(applications_module.unique_application_index_ready())
+        mock_applications_db.index_information.assert_called_once()
+
+    @patch('applications.applications.applications_db')
+    @patch('applications.applications.jobs_db')
+    @patch('utils.mongo')
+    def test_unverified_user_is_rejected_before_any_query(self, mock_mongo, mock_jobs_db, mock_applications_db):
+        mock_mongo.db.users.find_one.return_value = {"_id": self.user_id, "email_verified": False}
+
+        response = self.submit()
+
+        self.assertEqual(response.status_code, 403)
+        mock_jobs_db.find_one.assert_not_called()
+        mock_applications_db.insert_one.assert_not_called()
+
+
+class TestBackgroundCounters(unittest.TestCase):
+    """Test counter writes sent through an executor"""
+
+    def test_writes_are_submitted_to_the_executor(self):
+        job_stats, employer_stats, executor = MagicMock(), MagicMock(), MagicMock()
+        counters = ApplicationCounters(job_stats, employer_stats, executor=executor)
+
+        counters.record_submission(JOB["_id"], JOB["employer_id"])
+
+        self.assertEqual(executor.submit.call_count, 2)
+        job_stats.update_one.assert_not_called()
+
+    def test_failed_write_is_not_raised(self):
+        job_stats, employer_stats = MagicMock(), MagicMock()
+        job_stats.update_one.side_effect = DuplicateKeyError("E11000 duplicate key error")
+        counters = ApplicationCounters(job_stats, employer_stats)
+
+        counters.record_submission(JOB["_id"], JOB["employer_id"])
+
+        employer_stats.update_one.assert_called_once()
+
+
+class TestRemoveDuplicateApplications(unittest.TestCase):
+    """Test clearing duplicates so the unique index can be built"""
+
+    def test_keeps_the_latest_application_of_each_pair(self):
+        kept, older, oldest = ObjectId(), ObjectId(), ObjectId()
+        applications, events = MagicMock(), MagicMock()
+        applications.aggregate.return_value = [{"_id": {}, "ids": [kept, older, oldest]}]
+        applications.delete_many.return_value.deleted_count = 2
+
+        report = remove_duplicate_applications(applications, events)
+
+        self.assertEqual(report, {"pairs": 1, "removed": 2})
+        applications.delete_many.assert_called_once_with({"_id": {"$in": [older, oldest]}})
+        events.delete_many.assert_called_once_with({"application_id": {"$in": [older, oldest]}})
+        self.assertEqual(applications.aggregate.call_args[0][0][0], {"$sort": {"updated_at": -1, "_id": -1}})
+
+    def test_has_unique_index(self):
+        collection = MagicMock()
+        collection.index_information.return_value = {
+            "applicant_id_1_job_id_1": {"key": [("applicant_id", 1.0), ("job_id", 1.0)]}
+        }
+        keys = [("applicant_id", 1), ("job_id", 1)]
+        self.assertFalse(has_unique_index(collection, keys))
+        collection.index_information.return_value["applicant_id_1_job_id_1"]["unique"] = True
+        self.assertTrue(has_unique_index(collection, keys))
+
+
+if __name__ == '__main__':
+    unittest.main()
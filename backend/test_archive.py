@@ -0,0 +1,128 @@
+"""
+Test suite for hot/cold tiering
+Tests batched archival, the archive queries and read fall-through to the archive collections
+"""
+import unittest
+from unittest.mock import patch, MagicMock
+import os
+import sys
+from datetime import datetime, timedelta
+
+# Add backend directory to path for imports
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from flask import Flask
+from flask_pymongo import ObjectId
+from archive import (
+    APPLICATION_ARCHIVE_AFTER_DAYS, archive_documents, closed_applications_query, expired_jobs_query,
+    find_one_with_archive, restore_document
+)
+
+# Mock extensions before importing job modules
+with patch('extensions.mongo') as mock_mongo:
+    mock_mongo.db.jobs = MagicMock()
+    from jobs.jobs import jobs_bp
+
+
+def tiered_collection(live=None, archived=None):
+    """Live collection mock whose archive is reachable through collection.database"""
+    collection = MagicMock()
+    collection.name = "jobs"
+    archive = MagicMock()
+    collection.database = {"jobs_archive": archive}
+    collection.find_one.return_value = live
+    archive.find_one.return_value = archived
+    return collection, archive
+
+
+class TestArchiveQueries(unittest.TestCase):
+    """Test what counts as expired or closed"""
+
+    def test_closed_applications_are_terminal_and_old(self):
+        now = datetime(2024, 6, 1)
+        query = closed_applications_query(now)
+        self.assertEqual(set(query["status"]["$in"]), {"withdrawn", "rejected", "accepted"})
+        self.assertEqual(query["updated_at"]["$lt"], now - timedelta(days=APPLICATION_ARCHIVE_AFTER_DAYS))
+
+    def test_expired_jobs_by_age(self):
+        self.assertLess(expired_jobs_query(datetime(2024, 6, 1))["created_at"]["$lt"], datetime(2024, 6, 1))
+
+
+class TestArchiveDocuments(unittest.TestCase):
+    """Test moving documents in batches"""
+
+    def test_copies_then_deletes_each_batch(self):
+        ids = [ObjectId() for _ in range(3)]
+        collection, archive = tiered_collection()
+        collection.find.return_value.sort.return_value.limit.side_effect = [
+            [{"_id": ids[0]}, {"_id": ids[1]}], [{"_id": ids[2]}], []
+        ]
+        collection.delete_many.return_value.deleted_count = 2
+        query = {"status": "rejected"}
+
+        report = archive_documents(collection, query, batch_size=2)
+
+        self.assertTrue(report["completed"])
+        self.assertEqual(archive.bulk_write.call_count, 2)
+        copy = archive.bulk_write.call_args_list[0][0][0][0]
+        self.assertEqual(copy._filter, {"_id": ids[0]})
+        self.assertIn("archived_at", copy._doc)
+        self.assertTrue(copy._upsert)
+        # Documents are only deleted if they still match the query
+        self.assertEqual(collection.delete_many.call_args_list[0][0][0],
+                         {"status": "rejected", "_id": {"$in": ids[:2]}})
+        self.assertEqual(collection.find.call_args_list[1][0][0], {"status": "rejected", "_id": {"$gt": ids[1]}})
+
+    def test_max_batches(self):
+        collection, archive = tiered_collection()
+        collection.find.return_value.sort.return_value.limit.return_value = [{"_id": ObjectId()}]
+        collection.delete_many.return_value.deleted_count = 1
+        report = archive_documents(collection, {}, max_batches=1)
+        self.assertEqual((report["archived"], report["completed"]), (1, False))
+
+
+class TestArchiveReads(unittest.TestCase):
+    """Test fall-through lookups and restores"""
+
+    def test_live_documents_win(self):
+        collection, archive = tiered_collection(live={"_id": 1})
+        self.assertEqual(find_one_with_archive(collection, {"_id": 1}), {"_id": 1})
+        archive.find_one.assert_not_called()
+
+    def test_falls_through_to_archive(self):
+        collection, archive = tiered_collection(archived={"_id": 1, "archived_at": datetime(2024, 1, 1)})
+        self.assertEqual(find_one_with_archive(collection, {"_id": 1})["_id"], 1)
+
+    def test_restore_moves_document_back(self):
+        collection, archive = tiered_collection(archived={"_id": 1, "status": "rejected",
+                                                          "archived_at": datetime(2024, 1, 1)})
+        restored = restore_document(collection, {"_id": 1})
+        self.assertEqual(restored, {"_id": 1, "status": "rejected"})
+        collection.replace_one.assert_called_once_with({"_id": 1}, restored, upsert=True)
+        archive.delete_one.assert_called_once_with({"_id": 1})
+
+
+class TestArchivedJobPage(unittest.TestCase):
+    """Test job pages of archived jobs"""
+
+    def setUp(self):
+        self.app = Flask(__name__)
+        self.app.config['TESTING'] = True
+        self.app.register_blueprint(jobs_bp, url_prefix='/jobs')
+        self.client = self.app.test_client()
+
+    @patch('jobs.jobs.job_event_buffer')
+    def test_archived_job_is_served_without_counting_a_view(self, mock_buffer):
+        job_id = ObjectId()
+        collection, archive = tiered_collection(archived={"_id": job_id, "title": "Barista",
+                                                          "archived_at": datetime(2024, 1, 1)})
+        with patch('jobs.jobs.jobs_db', collection):
+            response = self.client.get('/jobs/barista-sydney-abc123')
+
+        self.assertEqual(response.get_json()["title"], "Barista")
+        self.assertEqual(archive.find_one.call_args[0][0], {"slug": "barista-sydney-abc123"})
+        mock_buffer.record.assert_not_called()
+
+
+if __name__ == '__main__':
+    unittest.main()
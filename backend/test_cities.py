@@ -118,15 +118,16 @@ class TestCitiesAPI(unittest.TestCase):
             response_data = json.loads(response.data)
             self.assertEqual(response_data["message"], "Cities added correctly!")
             
-            # Verify each city was inserted
-            self.assertEqual(mock_cities_db.insert_one.call_count, 3)
+            # Verify all cities were upserted in one bulk write
+            self.assertEqual(mock_cities_db.bulk_write.call_count, 1)
             
             # Verify correct data structure
-            insert_calls = mock_cities_db.insert_one.call_args_list
-            for i, call in enumerate(insert_calls):
-                inserted_data = call[0][0]
-                self.assertEqual(inserted_data["city"], cities_data[i]["city"])
-                self.assertEqual(inserted_data["state"], cities_data[i]["admin_name"])
+            operations = mock_cities_db.bulk_write.call_args[0][0]
+            self.assertEqual(len(operations), 3)
+            for i, operation in enumerate(operations):
+                self.assertEqual(operation._filter["city"], cities_data[i]["city"])
+                self.assertEqual(operation._filter["state"], cities_data[i]["admin_name"])
+                self.assertTrue(operation._upsert)
     
     @patch('cities.cities.cities_db')
     def test_get_cities_empty_result(self, mock_cities_db):
@@ -0,0 +1,173 @@
+"""
+Test suite for conditional GET on public read endpoints
+Tests version ETags, 304 responses, Cache-Control policies and content-hash fallbacks
+"""
+import unittest
+from unittest.mock import patch, MagicMock
+import os
+import sys
+
+# Add backend directory to path for imports
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from flask import Flask
+from flask_pymongo import ObjectId
+from redis.exceptions import ConnectionError as RedisConnectionError
+from http_cache import REFERENCE_CACHE_CONTROL, JOB_CACHE_CONTROL, SUGGESTIONS_CACHE_CONTROL
+
+# Mock extensions before importing blueprint modules
+with patch('extensions.mongo') as mock_mongo:
+    mock_mongo.db.jobs = MagicMock()
+    mock_mongo.db.cities = MagicMock()
+    from jobs.jobs import jobs_bp
+    from cities.cities import cities_bp
+    from jobtypes.jobtypes import jobtypes_bp
+
+
+class CounterRedis:
+    """Stand-in for the Redis counter commands"""
+
+    def __init__(self):
+        self.data = {}
+
+    def get(self, key):
+        return self.data.get(key)
+
+    def set(self, key, value, nx=False):
+        if not (nx and key in self.data):
+            self.data[key] = value
+
+    def incr(self, key):
+        self.data[key] = self.data.get(key, 0) + 1
+        return self.data[key]
+
+
+class ConditionalGetTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.app = Flask(__name__)
+        self.app.config['TESTING'] = True
+        self.app.config['SESSION_REDIS'] = CounterRedis()
+        self.app.register_blueprint(jobs_bp, url_prefix='/jobs')
+        self.app.register_blueprint(cities_bp, url_prefix='/cities')
+        self.app.register_blueprint(jobtypes_bp, url_prefix='/jobtypes')
+        self.client = self.app.test_client()
+
+
+class TestReferenceData(ConditionalGetTestCase):
+    """Test version ETags on cities and job types"""
+
+    @patch('cities.cities.cities_db')
+    def test_matching_etag_skips_the_query(self, mock_cities_db):
+        mock_cities_db.find.return_value = [{"_id": ObjectId(), "city": "Sydney"}]
+        first = self.client.get('/cities/get_all')
+        self.assertEqual(first.status_code, 200)
+        self.assertEqual(first.headers["Cache-Control"], REFERENCE_CACHE_CONTROL)
+        self.assertIn("Accept", first.headers["Vary"])
+        mock_cities_db.find.reset_mock()
+
+        second = self.client.get('/cities/get_all', headers={"If-None-Match": first.headers["ETag"]})
+
+        self.assertEqual(second.status_code, 304)
+        self.assertEqual(second.data, b"")
+        self.assertEqual(second.headers["ETag"], first.headers["ETag"])
+        self.assertEqual(second.headers["Cache-Control"], REFERENCE_CACHE_CONTROL)
+        mock_cities_db.find.assert_not_called()
+
+    @patch('cities.cities.cities_db')
+    def test_routes_have_distinct_etags(self, mock_cities_db):
+        mock_cities_db.find.return_value = []
+        self.assertNotEqual(self.client.get('/cities/get_all').headers["ETag"],
+                            self.client.get('/cities/get_main').headers["ETag"])
+
+    @patch('jobtypes.jobtypes.jobtypes_db')
+    def test_writes_change_the_etag(self, mock_jobtypes_db):
+        mock_jobtypes_db.find.return_value = []
+        etag = self.client.get('/jobtypes/get_all').headers["ETag"]
+        mock_jobtypes_db.insert_one.return_value.inserted_id = ObjectId()
+
+        self.client.post('/jobtypes/add', json={"jobtype": "Barista", "avatar": "cup.png"})
+        response = self.client.get('/jobtypes/get_all', headers={"If-None-Match": etag})
+
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response.headers["ETag"], etag)
+
+    @patch('http_cache.secrets.randbelow')
+    @patch('jobtypes.jobtypes.jobtypes_db')
+    def test_counters_lost_by_redis_do_not_repeat_etags(self, mock_jobtypes_db, mock_randbelow):
+        mock_randbelow.side_effect = [1000, 5000]
+        mock_jobtypes_db.find.return_value = []
+        etag = self.client.get('/jobtypes/get_all').headers["ETag"]
+
+        self.app.config['SESSION_REDIS'].data.clear()
+        response = self.client.get('/jobtypes/get_all', headers={"If-None-Match": etag})
+
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response.headers["ETag"], etag)
+
+    @patch('cities.cities.cities_db')
+    def test_unavailable_counters_fall_back_to_content_hash(self, mock_cities_db):
+        broken = MagicMock()
+        broken.get.side_effect = RedisConnectionError("down")
+        self.app.config['SESSION_REDIS'] = broken
+        mock_cities_db.find.return_value = [{"_id": "1", "city": "Sydney"}]
+        etag = self.client.get('/cities/').headers["ETag"]
+
+        mock_cities_db.find.return_value = [{"_id": "1", "city": "Sydney"}]
+        response = self.client.get('/cities/', headers={"If-None-Match": etag})
+
+        self.assertEqual(response.status_code, 304)
+
+
+class TestJobEndpoints(ConditionalGetTestCase):
+    """Test validators on job pages and suggestions"""
+
+    @patch('jobs.jobs.job_event_buffer')
+    @patch('jobs.jobs.jobs_db')
+    def test_job_page_etag_follows_the_document(self, mock_jobs_db, mock_buffer):
+        job = {"_id": ObjectId(), "slug": "barista-sydney-abc123", "title": "Barista"}
+        mock_jobs_db.find_one.side_effect = lambda query, projection=None: dict(job)
+        first = self.client.get('/jobs/barista-sydney-abc123')
+        self.assertEqual(first.headers["Cache-Control"], JOB_CACHE_CONTROL)
+
+        unchanged = self.client.get('/jobs/barista-sydney-abc123', headers={"If-None-Match": first.headers["ETag"]})
+        self.assertEqual(unchanged.status_code, 304)
+
+        job["title"] = "Head Barista"
+        changed = self.client.get('/jobs/barista-sydney-abc123', headers={"If-None-Match": first.headers["ETag"]})
+        self.assertEqual(changed.status_code, 200)
+        self.assertEqual(changed.get_json()["title"], "Head Barista")
+
+    @patch('jobs.jobs.suggest_all')
+    @patch('jobs.jobs.suggestion_indexes_version')
+    @patch('jobs.jobs.suggestion_indexes_ready', return_value=True)
+    def test_suggestions_revalidate_against_jobs_version(self, mock_ready, mock_version, mock_suggest_all):
+        mock_version.return_value = 3
+        mock_suggest_all.return_value = [{"value": "Barista", "type": "title"}]
+        first = self.client.get('/jobs/suggestions?q=bar')
+        self.assertEqual(first.headers["Cache-Control"], SUGGESTIONS_CACHE_CONTROL)
+
+        cached = self.client.get('/jobs/suggestions?q=bar', headers={"If-None-Match": first.headers["ETag"]})
+        self.assertEqual(cached.status_code, 304)
+        self.assertEqual(mock_suggest_all.call_count, 1)
+
+        other_query = self.client.get('/jobs/suggestions?q=barista', headers={"If-None-Match": first.headers["ETag"]})
+        self.assertEqual(other_query.status_code, 200)
+
+    @patch('jobs.jobs.suggest_all')
+    @patch('jobs.jobs.suggestion_indexes_version')
+    @patch('jobs.jobs.suggestion_indexes_ready', return_value=True)
+    def test_suggestions_etag_follows_the_index_version(self, mock_ready, mock_version, mock_suggest_all):
+        mock_suggest_all.return_value = [{"value": "Barista", "type": "title"}]
+        mock_version.return_value = 4
+        current = self.client.get('/jobs/suggestions?q=bar')
+
+        # A worker still rebuilding its indexes at version 3 cannot confirm what a current one answered
+        mock_version.return_value = 3
+        behind = self.client.get('/jobs/suggestions?q=bar', headers={"If-None-Match": current.headers["ETag"]})
+        self.assertEqual(behind.status_code, 200)
+        self.assertNotEqual(behind.headers["ETag"], current.headers["ETag"])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,136 @@
+"""
+Test suite for batched hydration
+Tests id batching, archive fall-through and the application listings' round trips
+"""
+import unittest
+from unittest.mock import patch, MagicMock
+import os
+import sys
+from datetime import datetime
+
+# Add backend directory to path for imports
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from flask import Flask
+from flask_pymongo import ObjectId
+from hydration import fetch_by_ids, hydrate
+
+# Mock extensions before importing blueprint modules
+with patch('extensions.mongo') as mock_mongo, patch('extensions.fs'):
+    from applications.applications import applications_bp, APPLICANT_PROJECTION
+from applications.snapshots import SNAPSHOT_PROJECTION
+
+
+def collection_of(documents, archived=()):
+    collection = MagicMock()
+    collection.name = "jobs"
+    archive = MagicMock()
+    collection.database = {"jobs_archive": archive}
+    collection.find.side_effect = lambda query, projection=None: [
+        document for document in documents if document["_id"] in query["_id"]["$in"]
+    ]
+    archive.find.side_effect = lambda query, projection=None: [
+        document for document in archived if document["_id"] in query["_id"]["$in"]
+    ]
+    return collection, archive
+
+
+class TestFetchByIds(unittest.TestCase):
+    """Test resolving ids with one query"""
+
+    def test_one_query_for_distinct_ids(self):
+        first, second = {"_id": ObjectId()}, {"_id": ObjectId()}
+        collection, _ = collection_of([first, second])
+
+        found = fetch_by_ids(collection, [first["_id"], None, second["_id"], first["_id"]], {"title": 1})
+
+        self.assertEqual(found, {first["_id"]: first, second["_id"]: second})
+        collection.find.assert_called_once_with({"_id": {"$in": [first["_id"], second["_id"]]}}, {"title": 1})
+
+    def test_no_query_without_ids(self):
+        collection, _ = collection_of([])
+        self.assertEqual(fetch_by_ids(collection, [None]), {})
+        collection.find.assert_not_called()
+
+    def test_archive_is_only_asked_for_missing_ids(self):
+        live, archived = {"_id": ObjectId()}, {"_id": ObjectId(), "archived_at": datetime(2024, 1, 1)}
+        collection, archive = collection_of([live], [archived])
+
+        found = fetch_by_ids(collection, [live["_id"], archived["_id"]], with_archive=True)
+
+        self.assertEqual(set(found), {live["_id"], archived["_id"]})
+        self.assertEqual(archive.find.call_args[0][0], {"_id": {"$in": [archived["_id"]]}})
+
+    def test_hydrate_keeps_order_and_missing_references(self):
+        job = {"_id": ObjectId(), "title": "Barista"}
+        collection, _ = collection_of([job])
+        applications = [{"_id": 1, "job_id": ObjectId()}, {"_id": 2, "job_id": job["_id"]}]
+
+        pairs = hydrate(iter(applications), "job_id", collection)
+
+        self.assertEqual(pairs, [(applications[0], None), (applications[1], job)])
+
+
+class TestApplicationListingRoundTrips(unittest.TestCase):
+    """Test that listings resolve their references with one query per page"""
+
+    def setUp(self):
+        self.app = Flask(__name__)
+        self.app.config['TESTING'] = True
+        self.app.secret_key = 'test'
+        self.app.register_blueprint(applications_bp, url_prefix='/applications')
+        self.client = self.app.test_client()
+        self.user_id = ObjectId()
+        with self.client.session_transaction() as session:
+            session['user_id'] = str(self.user_id)
+        self.jobs = [{"_id": ObjectId(), "title": f"Job {i}", "firm": "Tech Corp"} for i in range(3)]
+        self.applications = [
+            {"_id": ObjectId(), "job_id": job["_id"], "applicant_id": ObjectId(), "status": "pending",
+             "applied_at": datetime(2024, 5, 1), "updated_at": datetime(2024, 5, 1)} for job in self.jobs
+        ]
+
+    @patch('applications.applications.applications_db')
+    @patch('applications.applications.jobs_db')
+    @patch('utils.mongo')
+    def test_my_applications_without_job_snapshots(self, mock_mongo, mock_jobs_db, mock_applications_db):
+        mock_applications_db.count_documents.return_value = 3
+        mock_applications_db.find.return_value.sort.return_value.skip.return_value.limit.return_value = \
+            self.applications
+        mock_jobs_db.find.return_value = self.jobs
+
+        response = self.client.get('/applications/my-applications')
+
+        titles = [application["job"]["title"] for application in response.get_json()["applications"]]
+        self.assertEqual(titles, ["Job 0", "Job 1", "Job 2"])
+        mock_jobs_db.find.assert_called_once_with(
+            {"_id": {"$in": [job["_id"] for job in self.jobs]}}, SNAPSHOT_PROJECTION
+        )
+        mock_jobs_db.find_one.assert_not_called()
+
+    @patch('applications.applications.applications_db')
+    @patch('applications.applications.users_db')
+    @patch('applications.applications.jobs_db')
+    @patch('utils.mongo')
+    def test_job_applications(self, mock_mongo, mock_jobs_db, mock_users_db, mock_applications_db):
+        mock_jobs_db.find_one.return_value = self.jobs[0]
+        mock_users_db.find_one.return_value = {"_id": self.user_id, "role": "employer"}
+        mock_applications_db.count_documents.return_value = 3
+        mock_applications_db.find.return_value.sort.return_value.skip.return_value.limit.return_value = \
+            self.applications
+        mock_users_db.find.return_value = [
+            {"_id": application["applicant_id"], "name": f"Applicant {i}"}
+            for i, application in enumerate(self.applications)
+        ]
+
+        response = self.client.get(f'/applications/job/{self.jobs[0]["_id"]}/applications')
+
+        names = [application["applicant"]["name"] for application in response.get_json()["applications"]]
+        self.assertEqual(names, ["Applicant 0", "Applicant 1", "Applicant 2"])
+        self.assertEqual(mock_users_db.find.call_count, 1)
+        self.assertEqual(mock_users_db.find.call_args[0][1], APPLICANT_PROJECTION)
+        # Only the employer's own record is looked up on its own
+        self.assertEqual(mock_users_db.find_one.call_count, 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,160 @@
+"""
+Test suite for the index registry
+Tests index reconciliation and collection scan detection
+"""
+import unittest
+from unittest.mock import MagicMock
+import os
+import sys
+
+# Add backend directory to path for imports
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from indexes import INDEX_REGISTRY, QUERY_SHAPES, reconcile_indexes, find_collection_scans, sort_index_for
+from jobs.pagination import HIGHEST_SALARY_SORT, NEWEST_FIRST_SORT
+
+
+def mock_db(collections):
+    db = MagicMock()
+    db.__getitem__.side_effect = lambda name: collections[name]
+    return db
+
+
+class TestReconcileIndexes(unittest.TestCase):
+    """Test creation of missing indexes"""
+
+    def setUp(self):
+        self.collection = MagicMock()
+        self.collection.index_information.return_value = {
+            "_id_": {"key": [("_id", 1)]},
+            "slug_1": {"key": [("slug", 1.0)]},
+            "legacy_1": {"key": [("legacy", 1)]}
+        }
+        self.collection.create_indexes.return_value = ["email_1"]
+        self.registry = {"jobs": [{"keys": [("slug", 1)]}, {"keys": [("email", 1)], "options": {"unique": True}}]}
+
+    def test_creates_only_missing_indexes(self):
+        report = reconcile_indexes(mock_db({"jobs": self.collection}), self.registry)
+
+        models = self.collection.create_indexes.call_args[0][0]
+        self.assertEqual([model.document["key"] for model in models], [{"email": 1}])
+        self.assertTrue(models[0].document["unique"])
+        self.assertEqual(report["created"], {"jobs": ["email_1"]})
+        self.assertEqual(report["unknown"], {"jobs": ["legacy_1"]})
+        self.collection.drop_index.assert_not_called()
+
+    def test_drops_unknown_indexes_on_request(self):
+        reconcile_indexes(mock_db({"jobs": self.collection}), self.registry, drop_unknown=True)
+        self.collection.drop_index.assert_called_once_with("legacy_1")
+
+    def test_failures_are_reported_per_collection(self):
+        self.collection.index_information.side_effect = Exception("not authorized")
+        report = reconcile_indexes(mock_db({"jobs": self.collection}), self.registry)
+        self.assertEqual(report["failed"], {"jobs": ["not authorized"]})
+
+    def test_one_failed_build_does_not_block_the_others(self):
+        self.registry["jobs"].append({"keys": [("city", 1)]})
+        self.collection.create_indexes.side_effect = [Exception("duplicate key"), ["city_1"]]
+
+        report = reconcile_indexes(mock_db({"jobs": self.collection}), self.registry)
+
+        self.assertEqual(self.collection.create_indexes.call_count, 2)
+        self.assertEqual(report["created"], {"jobs": ["city_1"]})
+        self.assertEqual(report["failed"], {"jobs": ["email_1: duplicate key"]})
+
+    def test_non_unique_index_on_unique_keys_is_converted(self):
+        self.collection.index_information.return_value["email_1"] = {"key": [("email", 1)]}
+
+        report = reconcile_indexes(mock_db({"jobs": self.collection}), self.registry)
+
+        self.collection.create_indexes.assert_not_called()
+        commands = self.collection.database.command.call_args_list
+        self.assertEqual([c.kwargs["index"] for c in commands],
+                         [{"name": "email_1", "prepareUnique": True}, {"name": "email_1", "unique": True}])
+        self.assertEqual(report["converted"], {"jobs": ["email_1"]})
+        self.assertEqual(report["unknown"], {"jobs": ["legacy_1"]})
+
+    def test_unique_index_counts_as_present(self):
+        self.collection.index_information.return_value["email_1"] = {"key": [("email", 1)], "unique": True}
+
+        report = reconcile_indexes(mock_db({"jobs": self.collection}), self.registry)
+
+        self.collection.create_indexes.assert_not_called()
+        self.collection.database.command.assert_not_called()
+        self.assertEqual(report["failed"], {})
+
+    def test_registry_covers_hot_queries(self):
+        self.assertIn([("slug", 1)], [index["keys"] for index in INDEX_REGISTRY["jobs"]])
+        self.assertIn([("email", 1)], [index["keys"] for index in INDEX_REGISTRY["users"]])
+        self.assertTrue(all(shape["collection"] in INDEX_REGISTRY for shape in QUERY_SHAPES))
+
+
+class TestFindCollectionScans(unittest.TestCase):
+    """Test explain() plan inspection"""
+
+    def test_reports_shapes_with_collscan(self):
+        indexed = MagicMock()
+        indexed.find.return_value.explain.return_value = {"queryPlanner": {"winningPlan": {
+            "stage": "FETCH", "inputStage": {"stage": "IXSCAN"}
+        }}}
+        scanned = MagicMock()
+        scanned.find.return_value.sort.return_value.explain.return_value = {"queryPlanner": {"winningPlan": {
+            "stage": "SORT", "inputStage": {"stage": "COLLSCAN"}
+        }}}
+        shapes = [
+            {"collection": "users", "filter": {"email": "a@b.c"}},
+            {"collection": "notifications", "filter": {"user_id": 1}, "sort": [("created_at", -1)]}
+        ]
+
+        result = find_collection_scans(mock_db({"users": indexed, "notifications": scanned}), shapes)
+
+        self.assertEqual([shape["collection"] for shape in result], ["notifications"])
+        self.assertEqual(result[0]["stages"], ["SORT", "COLLSCAN"])
+
+    def test_reports_in_memory_sorts(self):
+        def collection(plan):
+            collection = MagicMock()
+            collection.find.return_value.sort.return_value.explain.return_value = {
+                "queryPlanner": {"winningPlan": plan}
+            }
+            return collection
+
+        blocking = collection({"stage": "SORT", "inputStage": {"stage": "FETCH", "inputStage": {"stage": "IXSCAN"}}})
+        merged = collection({"stage": "FETCH", "inputStage": {"stage": "SORT_MERGE", "inputStages": [
+            {"stage": "IXSCAN"}, {"stage": "IXSCAN"}
+        ]}})
+        shapes = [
+            {"collection": "jobs", "filter": {"experience_level": "senior"}, "sort": HIGHEST_SALARY_SORT},
+            {"collection": "jobs_archive", "filter": {"location": {"$in": ["Sydney", "Perth"]}},
+             "sort": NEWEST_FIRST_SORT}
+        ]
+
+        result = find_collection_scans(mock_db({"jobs": blocking, "jobs_archive": merged}), shapes)
+
+        self.assertEqual([shape["collection"] for shape in result], ["jobs"])
+
+
+class TestSortIndexes(unittest.TestCase):
+    """Test that sorted queries can be read in index order"""
+
+    def test_every_sorted_query_shape_has_a_sort_index(self):
+        for shape in QUERY_SHAPES:
+            if shape.get("sort"):
+                self.assertIsNotNone(sort_index_for(shape, INDEX_REGISTRY[shape["collection"]]), shape)
+
+    def test_every_sort_mode_has_an_index_per_equality_filter(self):
+        for sort in (NEWEST_FIRST_SORT, HIGHEST_SALARY_SORT):
+            for field in ("location", "jobtype", "experience_level", "work_arrangement"):
+                shape = {"filter": {field: {"$in": ["a", "b"]}}, "sort": sort}
+                self.assertIsNotNone(sort_index_for(shape, INDEX_REGISTRY["jobs"]), (field, sort))
+
+    def test_range_prefix_does_not_provide_the_sort(self):
+        indexes = [{"keys": [("salary_annual", 1), ("created_at", -1), ("_id", -1)]}]
+        self.assertIsNone(sort_index_for(
+            {"filter": {"salary_annual": {"$gte": 50000}}, "sort": NEWEST_FIRST_SORT}, indexes
+        ))
+        self.assertIsNotNone(sort_index_for({"filter": {"salary_annual": 50000}, "sort": NEWEST_FIRST_SORT}, indexes))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,112 @@
+"""
+Test suite for batched job backfills
+Tests the checkpointed backfill engine, the slug backfill and the /jobs/add_slug route
+"""
+import unittest
+from unittest.mock import patch, MagicMock
+import os
+import sys
+
+# Add backend directory to path for imports
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from flask import Flask
+from flask_pymongo import ObjectId
+from jobs.backfill import run_backfill
+from jobs.migrations import MISSING_SLUG_QUERY, backfill_missing_slugs
+
+# Mock extensions before importing job modules
+with patch('extensions.mongo') as mock_mongo:
+    mock_mongo.db.jobs = MagicMock()
+    from jobs.jobs import jobs_bp
+
+
+def paged_collection(*batches):
+    collection = MagicMock()
+    collection.find.return_value.sort.return_value.limit.side_effect = list(batches) + [[]]
+    collection.bulk_write.side_effect = lambda operations, ordered: MagicMock(modified_count=len(operations))
+    return collection
+
+
+class TestRunBackfill(unittest.TestCase):
+    """Test paging, checkpoints and totals"""
+
+    def test_pages_by_id_and_counts_skipped(self):
+        ids = [ObjectId() for _ in range(3)]
+        collection = paged_collection([{"_id": ids[0]}, {"_id": ids[1]}], [{"_id": ids[2]}])
+        progress = MagicMock()
+
+        report = run_backfill(collection, {"field": None}, {"field": 1}, lambda batch: batch[:1], batch_size=2,
+                              progress=progress)
+
+        self.assertEqual((report["scanned"], report["modified"], report["skipped"]), (3, 2, 1))
+        self.assertTrue(report["completed"])
+        self.assertEqual(progress.call_count, 2)
+        self.assertEqual(collection.find.call_args_list[1][0][0], {"field": None, "_id": {"$gt": ids[1]}})
+
+    def test_resumes_from_checkpoint_and_clears_it_when_done(self):
+        last_id = ObjectId()
+        checkpoints = MagicMock()
+        checkpoints.find_one.return_value = {"_id": "job", "last_id": last_id}
+        collection = paged_collection([{"_id": ObjectId()}])
+
+        run_backfill(collection, {}, {}, lambda batch: batch, name="job", checkpoints=checkpoints)
+
+        self.assertEqual(collection.find.call_args_list[0][0][0], {"_id": {"$gt": last_id}})
+        self.assertEqual(checkpoints.update_one.call_count, 1)
+        checkpoints.delete_one.assert_called_once_with({"_id": "job"})
+
+    def test_max_batches_keeps_checkpoint(self):
+        ids = [ObjectId(), ObjectId()]
+        checkpoints = MagicMock()
+        checkpoints.find_one.return_value = None
+        collection = paged_collection([{"_id": ids[0]}], [{"_id": ids[1]}])
+
+        report = run_backfill(collection, {}, {}, lambda batch: batch, batch_size=1, name="job",
+                              checkpoints=checkpoints, max_batches=1)
+
+        self.assertFalse(report["completed"])
+        self.assertEqual(checkpoints.update_one.call_args[0][1]["$set"]["last_id"], ids[0])
+        checkpoints.delete_one.assert_not_called()
+
+
+class TestBackfillMissingSlugs(unittest.TestCase):
+    """Test the slug backfill"""
+
+    def test_only_fills_missing_slugs(self):
+        job_id = ObjectId()
+        collection = paged_collection([{"_id": job_id, "title": "Barista", "location": "Sydney"},
+                                       {"_id": ObjectId(), "title": "Chef"}])
+        collection.find.return_value.__iter__.return_value = []
+
+        report = backfill_missing_slugs(collection, lambda title, city: f"{title}-{city}".lower())
+
+        self.assertEqual(collection.find.call_args_list[0][0][0], MISSING_SLUG_QUERY)
+        operation = collection.bulk_write.call_args[0][0][0]
+        self.assertEqual(operation._filter, {"_id": job_id, **MISSING_SLUG_QUERY})
+        self.assertEqual(operation._doc, {"$set": {"slug": "barista-sydney"}})
+        self.assertEqual((report["modified"], report["skipped"]), (1, 1))
+
+
+class TestAddSlugRoute(unittest.TestCase):
+    """Test the bounded /jobs/add_slug request"""
+
+    def setUp(self):
+        self.app = Flask(__name__)
+        self.app.config['TESTING'] = True
+        self.app.register_blueprint(jobs_bp, url_prefix='/jobs')
+        self.client = self.app.test_client()
+
+    @patch('jobs.jobs.backfill_missing_slugs')
+    def test_runs_limited_batches(self, mock_backfill):
+        mock_backfill.return_value = {"scanned": 5, "modified": 0, "skipped": 5, "completed": True}
+
+        response = self.client.put('/jobs/add_slug?batches=3')
+
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.get_json()["completed"])
+        self.assertEqual(mock_backfill.call_args[1]["max_batches"], 3)
+
+
+if __name__ == '__main__':
+    unittest.main()
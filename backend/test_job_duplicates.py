@@ -0,0 +1,297 @@
+"""
+Test suite for near-duplicate job detection
+Tests MinHash signatures, the LSH index, duplicate handling at ingestion and in /jobs/add, and the batch dedupe
+"""
+import unittest
+from unittest.mock import patch, MagicMock
+import os
+import sys
+import json
+
+# Add backend directory to path for imports
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from flask import Flask
+from flask_pymongo import ObjectId
+from jobs.duplicates import (
+    DuplicateJobsIndex, SIGNATURE_SIZE, duplicate_jobs_index, estimate_similarity, flag_duplicate_jobs,
+    minhash_signature
+)
+from jobs.index_refresh import JobIndexRefresher, job_index_refresher
+from jobs.ingestion import ingest_jobs
+
+# Mock extensions before importing job modules
+with patch('extensions.mongo') as mock_mongo:
+    mock_mongo.db.jobs = MagicMock()
+    from jobs.jobs import jobs_bp, serialize_job
+
+DESCRIPTION = ("Pour espresso and filter coffee for a busy city cafe, keep the bar clean, take orders at the "
+               "register and help train new staff during the morning rush. Weekend shifts available, "
+               "barista experience preferred but full training is provided for the right person.")
+
+
+def listing(**overrides):
+    job = {"title": "Barista", "description": DESCRIPTION, "firm": "Bean Co", "location": "Sydney"}
+    job.update(overrides)
+    return job
+
+
+def make_slug(title, city):
+    return f"{title}-{city}-{ObjectId()}".lower()
+
+
+def ready_index(*jobs):
+    index = DuplicateJobsIndex()
+    index.build(jobs)
+    return index
+
+
+class TestMinHash(unittest.TestCase):
+    """Test signatures and similarity estimates"""
+
+    def test_reposted_listing_is_similar(self):
+        original = minhash_signature(listing())
+        repost = minhash_signature(listing(description=DESCRIPTION + " Apply today!"))
+        other = minhash_signature(listing(title="Line Cook", description="Prep vegetables and run the grill"))
+
+        self.assertEqual(len(original), SIGNATURE_SIZE)
+        self.assertGreaterEqual(estimate_similarity(original, repost), 0.85)
+        self.assertLess(estimate_similarity(original, other), 0.2)
+
+    def test_signature_is_deterministic(self):
+        self.assertEqual(minhash_signature(listing()), minhash_signature(dict(listing())))
+
+    def test_job_without_text_has_no_signature(self):
+        self.assertIsNone(minhash_signature({"title": "", "description": None}))
+
+
+class TestDuplicateJobsIndex(unittest.TestCase):
+    """Test candidate lookup and maintenance"""
+
+    def test_finds_near_duplicate(self):
+        index = ready_index({"_id": "original", **listing()}, {"_id": "cook", **listing(title="Line Cook",
+                                                                                       description="Grill")})
+        duplicate = index.find_duplicate(minhash_signature(listing(description=DESCRIPTION + " Apply today!")))
+        self.assertEqual(duplicate[0], "original")
+        self.assertIsNone(index.find_duplicate(minhash_signature(listing(title="Chef", description="Run the pass"))))
+
+    def test_excludes_itself_and_removed_jobs(self):
+        index = ready_index({"_id": "original", **listing()})
+        signature = minhash_signature(listing())
+        self.assertIsNone(index.find_duplicate(signature, exclude="original"))
+        index.remove("original")
+        self.assertIsNone(index.find_duplicate(signature))
+        self.assertEqual(index.stats()["buckets"], 0)
+
+
+class TestIngestionDuplicates(unittest.TestCase):
+    """Test near-duplicates in bulk feeds"""
+
+    def setUp(self):
+        self.collection = MagicMock()
+        self.collection.find.return_value = []
+        # pymongo assigns an _id to documents inserted without one
+        self.collection.insert_many.side_effect = lambda documents, ordered=True: [
+            document.setdefault("_id", ObjectId()) for document in documents
+        ]
+        self.index = ready_index({"_id": ObjectId(), **listing(title="Line Cook", description="Grill")})
+
+    def records(self):
+        base = {"remuneration_amount": "30", "remuneration_period": "hour", "jobtype": "waiter"}
+        return enumerate([
+            {**base, **listing()},
+            {**base, **listing(description=DESCRIPTION + " Apply today!")},
+            {**base, **listing(title="Chef", description="Run the pass on a busy Friday night")}
+        ], 1)
+
+    @patch('jobs.ingestion.similar_jobs_index', MagicMock())
+    @patch('jobs.ingestion.job_search_index', MagicMock())
+    @patch('jobs.ingestion.record_job_suggestions')
+    @patch('jobs.ingestion.DUPLICATE_POLICY', 'merge')
+    def test_merges_duplicates_within_feed(self, mock_suggestions):
+        with patch('jobs.ingestion.duplicate_jobs_index', self.index):
+            report = ingest_jobs(self.collection, self.records(), make_slug)
+
+        inserted = self.collection.insert_many.call_args[0][0]
+        self.assertEqual([job["title"] for job in inserted], ["Barista", "Chef"])
+        self.assertEqual((report["inserted"], report["duplicates"]), (2, 1))
+        self.assertEqual(report["duplicate_records"], [{"record": 2, "duplicate_of": str(inserted[0]["_id"])}])
+
+    @patch('jobs.ingestion.similar_jobs_index')
+    @patch('jobs.ingestion.job_search_index', MagicMock())
+    @patch('jobs.ingestion.record_job_suggestions')
+    @patch('jobs.ingestion.DUPLICATE_POLICY', 'flag')
+    def test_flags_duplicates(self, mock_suggestions, mock_similar):
+        with patch('jobs.ingestion.duplicate_jobs_index', self.index):
+            ingest_jobs(self.collection, self.records(), make_slug)
+
+        inserted = self.collection.insert_many.call_args[0][0]
+        self.assertEqual(len(inserted), 3)
+        self.assertEqual(inserted[1]["duplicate_of"], inserted[0]["_id"])
+        self.assertNotIn("duplicate_of", inserted[2])
+        # A flagged copy would come back as the most similar job of its original
+        self.assertEqual([call[0][0] for call in mock_similar.add.call_args_list],
+                         [inserted[0]["_id"], inserted[2]["_id"]])
+
+    @patch('jobs.ingestion.similar_jobs_index', MagicMock())
+    @patch('jobs.ingestion.job_search_index', MagicMock())
+    @patch('jobs.ingestion.record_job_suggestions')
+    @patch('jobs.ingestion.DUPLICATE_POLICY', 'merge')
+    def test_archived_original_is_not_a_duplicate(self, mock_suggestions):
+        archived_id = ObjectId()
+        index = ready_index({"_id": archived_id, **listing()})
+
+        with patch('jobs.ingestion.duplicate_jobs_index', index):
+            report = ingest_jobs(self.collection, self.records(), make_slug)
+
+        self.assertEqual(self.collection.find.call_args_list[0][0][0], {"_id": {"$in": [archived_id]}})
+        self.assertEqual((report["inserted"], report["duplicates"]), (2, 1))
+        self.assertNotIn(str(archived_id), index._signatures)
+
+
+class TestAddJobDuplicates(unittest.TestCase):
+    """Test near-duplicate checks in /jobs/add"""
+
+    def setUp(self):
+        self.app = Flask(__name__)
+        self.app.config['TESTING'] = True
+        self.app.register_blueprint(jobs_bp, url_prefix='/jobs')
+        self.client = self.app.test_client()
+
+    @patch('jobs.jobs.DUPLICATE_POLICY', 'merge')
+    @patch('jobs.jobs.cities_db', MagicMock())
+    @patch('jobs.jobs.jobs_db')
+    def test_rejects_near_duplicate(self, mock_jobs_db):
+        original_id = ObjectId()
+        mock_jobs_db.find_one.return_value = {"_id": original_id, "slug": "barista-sydney-abc123"}
+        payload = {**listing(description=DESCRIPTION + " Apply today!"), "location": {"city": "Sydney"},
+                   "remuneration_amount": "30", "remuneration_period": "hour", "jobtype": "waiter", "shift": "am"}
+
+        with patch('jobs.jobs.duplicate_jobs_index', ready_index({"_id": original_id, **listing()})):
+            response = self.client.post('/jobs/add', data=json.dumps(payload), content_type='application/json')
+
+        self.assertEqual(response.status_code, 409)
+        self.assertEqual(response.get_json()["duplicate_of"], "barista-sydney-abc123")
+        mock_jobs_db.insert_one.assert_not_called()
+
+    @patch('jobs.jobs.job_index_refresher')
+    @patch('jobs.jobs.job_search_index', MagicMock())
+    @patch('jobs.jobs.similar_jobs_index')
+    @patch('jobs.jobs.notify_job_alerts')
+    @patch('jobs.jobs.record_job_suggestions', MagicMock())
+    @patch('jobs.jobs.cities_db', MagicMock())
+    @patch('jobs.jobs.jobs_db')
+    def test_near_duplicate_is_flagged_by_default(self, mock_jobs_db, mock_notify, mock_similar, mock_refresher):
+        mock_refresher.record_change.side_effect = lambda apply: apply()
+        original_id = ObjectId()
+        mock_jobs_db.find_one.return_value = {"_id": original_id, "slug": "barista-sydney-abc123"}
+        mock_jobs_db.insert_one.return_value.inserted_id = ObjectId()
+        payload = {**listing(description=DESCRIPTION + " Apply today!"), "location": {"city": "Sydney"},
+                   "remuneration_amount": "30", "remuneration_period": "hour", "jobtype": "waiter", "shift": "am"}
+
+        with patch('jobs.jobs.duplicate_jobs_index', ready_index({"_id": original_id, **listing()})):
+            response = self.client.post('/jobs/add', data=json.dumps(payload), content_type='application/json')
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.get_json()["duplicate_of"], "barista-sydney-abc123")
+        self.assertEqual(mock_jobs_db.insert_one.call_args[0][0]["duplicate_of"], original_id)
+        mock_similar.add.assert_not_called()
+        mock_notify.assert_not_called()
+
+    @patch('jobs.jobs.DUPLICATE_POLICY', 'merge')
+    @patch('jobs.jobs.job_result_cache', MagicMock())
+    @patch('jobs.jobs.notify_job_alerts', MagicMock())
+    @patch('jobs.jobs.record_job_suggestions', MagicMock())
+    @patch('jobs.jobs.cities_db', MagicMock())
+    @patch('jobs.jobs.jobs_db')
+    def test_repost_of_archived_job_is_inserted(self, mock_jobs_db):
+        archived_id = ObjectId()
+        mock_jobs_db.find_one.return_value = None
+        mock_jobs_db.insert_one.return_value.inserted_id = ObjectId()
+        payload = {**listing(), "location": {"city": "Sydney"}, "remuneration_amount": "30",
+                   "remuneration_period": "hour", "jobtype": "waiter", "shift": "am"}
+        index = ready_index({"_id": archived_id, **listing()})
+
+        with patch('jobs.jobs.duplicate_jobs_index', index):
+            response = self.client.post('/jobs/add', data=json.dumps(payload), content_type='application/json')
+
+        self.assertEqual(response.status_code, 200)
+        self.assertNotIn("duplicate_of", mock_jobs_db.insert_one.call_args[0][0])
+        self.assertNotIn(str(archived_id), index._signatures)
+
+
+class TestSharedVersion(unittest.TestCase):
+    """Test that the index picks up jobs stored by other workers"""
+
+    @patch('jobs.index_refresh.job_result_cache')
+    def test_stale_index_is_rebuilt_from_original_jobs(self, mock_cache):
+        original_id, copy_id = ObjectId(), ObjectId()
+        index = ready_index({"_id": ObjectId(), **listing(title="Line Cook", description="Grill")})
+        index.version = 4
+        fields, build = next((fields, build) for indexes, fields, build in job_index_refresher._entries
+                             if duplicate_jobs_index in indexes)
+        refresher = JobIndexRefresher(interval=0)
+        refresher.register([index], fields, build)
+        jobs = MagicMock()
+        jobs.find.return_value = [{"_id": original_id, **listing()},
+                                  {"_id": copy_id, **listing(), "duplicate_of": original_id}]
+        mock_cache.version.return_value = 6
+
+        with patch('jobs.index_refresh.duplicate_jobs_index', index):
+            refresher.refresh(jobs)
+            refresher.wait()
+
+        self.assertEqual((len(index), index.version), (1, 6))
+        repost = minhash_signature(listing(description=DESCRIPTION + " Apply today!"))
+        self.assertEqual(index.find_duplicate(repost)[0], str(original_id))
+
+
+class TestFlagDuplicateJobs(unittest.TestCase):
+    """Test the batch dedupe of stored jobs"""
+
+    def test_flags_later_copies_of_older_jobs(self):
+        original_id, copy_id = ObjectId(), ObjectId()
+        jobs = MagicMock()
+        jobs.find.return_value.sort.return_value.limit.side_effect = [
+            [{"_id": original_id, **listing()}, {"_id": ObjectId(), **listing(title="Chef", description="Grill")}],
+            [{"_id": copy_id, **listing(description=DESCRIPTION + " Apply today!")}],
+            []
+        ]
+        jobs.bulk_write.return_value.modified_count = 1
+
+        report = flag_duplicate_jobs(jobs, batch_size=2)
+
+        operation = jobs.bulk_write.call_args[0][0][0]
+        self.assertEqual(operation._filter, {"_id": copy_id})
+        self.assertEqual(operation._doc, {"$set": {"duplicate_of": original_id}})
+        self.assertEqual((report["scanned"], report["modified"]), (3, 1))
+        self.assertEqual(jobs.bulk_write.call_count, 1)
+
+
+class TestFlaggedJobListings(unittest.TestCase):
+    """Test how jobs flagged as near-duplicates are listed and serialized"""
+
+    def setUp(self):
+        self.app = Flask(__name__)
+        self.app.config['TESTING'] = True
+        self.app.register_blueprint(jobs_bp, url_prefix='/jobs')
+        self.client = self.app.test_client()
+
+    def test_flagged_job_serializes(self):
+        original_id = ObjectId()
+        job = serialize_job({"_id": ObjectId(), **listing(), "duplicate_of": original_id})
+        self.assertEqual(json.loads(json.dumps(job))["duplicate_of"], str(original_id))
+
+    @patch('jobs.jobs.jobs_db')
+    def test_listings_leave_out_flagged_jobs(self, mock_jobs_db):
+        mock_jobs_db.find.return_value.sort.return_value.limit.return_value = []
+        mock_jobs_db.count_documents.return_value = 0
+
+        response = self.client.get('/jobs/get?location=Sydney')
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(mock_jobs_db.find.call_args[0][0], {"location": {"$in": ["Sydney"]}, "duplicate_of": None})
+
+
+if __name__ == '__main__':
+    unittest.main()
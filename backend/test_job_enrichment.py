@@ -0,0 +1,156 @@
+"""
+Test suite for write-time job enrichment
+Tests classification, keyword extraction, the write paths and the backfill
+"""
+import unittest
+from unittest.mock import patch, MagicMock
+import os
+import sys
+import json
+
+# Add backend directory to path for imports
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from flask import Flask
+from flask_pymongo import ObjectId
+from jobs.enrichment import (
+    ENRICHMENT_VERSION, enrich_job, needs_enrichment, extract_job_keywords, annualize_salary,
+    backfill_job_enrichment
+)
+from jobs.search_index import JobSearchIndex
+
+# Mock extensions before importing job modules
+with patch('extensions.mongo') as mock_mongo:
+    mock_mongo.db.jobs = MagicMock()
+    from jobs.jobs import jobs_bp, build_job_filters
+
+
+class TestEnrichJob(unittest.TestCase):
+    """Test derived field computation"""
+
+    def test_classifies_experience_levels(self):
+        job = {"title": "Senior Developer", "description": "Graduate applicants welcome"}
+        self.assertEqual(enrich_job(job)["experience_level"], ["entry", "senior"])
+
+    def test_matches_whole_words_only(self):
+        job = {"title": "Barista", "description": "Leading cafe, we are ahead of the pack"}
+        self.assertEqual(enrich_job(job)["experience_level"], [])
+
+    def test_matches_hyphenated_and_multi_word_keywords(self):
+        job = {"title": "Mid-level Analyst", "description": "Work from home two days a week"}
+        enriched = enrich_job(job)
+        self.assertEqual(enriched["experience_level"], ["mid"])
+        self.assertEqual(enriched["work_arrangement"], ["remote"])
+
+    def test_extracts_keywords_and_version(self):
+        enriched = enrich_job({"title": "Engineer", "description": "Python, SQL and a degree"})
+        self.assertEqual(enriched["keywords"], ["python", "sql", "degree"])
+        self.assertEqual(enriched["enrichment_version"], ENRICHMENT_VERSION)
+
+    def test_extract_job_keywords_handles_missing_description(self):
+        self.assertEqual(extract_job_keywords(None), [])
+
+    def test_needs_enrichment(self):
+        self.assertTrue(needs_enrichment({"description": "new"}))
+        self.assertTrue(needs_enrichment({"remuneration_period": "week"}))
+        self.assertFalse(needs_enrichment({"shift": "night"}))
+
+
+class TestAnnualizeSalary(unittest.TestCase):
+    """Test pay rate normalization"""
+
+    def test_converts_common_periods(self):
+        self.assertEqual(annualize_salary(2500, "month"), 30000)
+        self.assertEqual(annualize_salary(2500, "year"), 2500)
+        self.assertEqual(annualize_salary(30, "hourly"), 59280)
+        self.assertEqual(annualize_salary(1200, "per week"), 62400)
+
+    def test_parses_text_amounts(self):
+        self.assertEqual(annualize_salary("$85,000", "annual"), 85000)
+        self.assertEqual(annualize_salary("32.50", "hr"), 64220)
+
+    def test_unknown_values_are_none(self):
+        self.assertIsNone(annualize_salary(2500, "per shift"))
+        self.assertIsNone(annualize_salary("negotiable", "year"))
+        self.assertIsNone(annualize_salary(None, None))
+
+
+class TestBackfillJobEnrichment(unittest.TestCase):
+    """Test the batched backfill"""
+
+    def test_pages_by_id_and_bulk_writes(self):
+        ids = [ObjectId() for _ in range(3)]
+        collection = MagicMock()
+        collection.find.return_value.sort.return_value.limit.side_effect = [
+            [{"_id": ids[0], "description": "remote"}, {"_id": ids[1], "description": "office"}],
+            [{"_id": ids[2], "description": "hybrid"}],
+            []
+        ]
+        collection.bulk_write.return_value.modified_count = 2
+
+        updated = backfill_job_enrichment(collection, batch_size=2)
+
+        self.assertEqual(updated, 4)
+        self.assertEqual(collection.bulk_write.call_count, 2)
+        second_query = collection.find.call_args_list[1][0][0]
+        self.assertEqual(second_query["_id"], {"$gt": ids[1]})
+        self.assertEqual(second_query["enrichment_version"], {"$ne": ENRICHMENT_VERSION})
+
+
+class TestEnrichmentInJobsBlueprint(unittest.TestCase):
+    """Test that writes store and reads use the derived fields"""
+
+    def setUp(self):
+        self.app = Flask(__name__)
+        self.app.config['TESTING'] = True
+        self.app.register_blueprint(jobs_bp, url_prefix='/jobs')
+        self.client = self.app.test_client()
+
+    def test_filters_are_equality_lookups(self):
+        query = build_job_filters({"experienceLevel": "senior", "workArrangement": "remote"})
+        self.assertEqual(query, {"experience_level": "senior", "work_arrangement": "remote"})
+
+    def test_salary_range_uses_annual_salary(self):
+        query = build_job_filters({"salaryMin": "50000", "salaryMax": "80000"})
+        self.assertEqual(query, {"salary_annual": {"$gte": 50000, "$lte": 80000}})
+
+    def test_unknown_filter_values_are_ignored(self):
+        self.assertEqual(build_job_filters({"experienceLevel": "wizard"}), {})
+
+    @patch('jobs.jobs.job_search_index', JobSearchIndex())
+    @patch('jobs.jobs.jobs_db')
+    def test_add_job_stores_enrichment(self, mock_jobs_db):
+        mock_jobs_db.insert_one.return_value.inserted_id = ObjectId()
+        response = self.client.post('/jobs/add', data=json.dumps({
+            "title": "Senior Barista",
+            "description": "Hybrid role",
+            "remuneration_amount": 2500,
+            "remuneration_period": "month",
+            "firm": "Greeks bar",
+            "jobtype": "waiter",
+            "shift": "night",
+            "location": {"city": "Sydney"}
+        }), content_type='application/json')
+
+        self.assertEqual(response.status_code, 200)
+        stored = mock_jobs_db.insert_one.call_args[0][0]
+        self.assertEqual(stored["experience_level"], ["senior"])
+        self.assertEqual(stored["work_arrangement"], ["hybrid"])
+        self.assertEqual(stored["salary_annual"], 30000)
+
+    @patch('jobs.jobs.job_search_index', JobSearchIndex())
+    @patch('jobs.jobs.jobs_db')
+    def test_modify_job_recomputes_enrichment(self, mock_jobs_db):
+        job_id = ObjectId()
+        mock_jobs_db.find_one.return_value = {"_id": job_id, "title": "Barista", "description": "Office role"}
+        mock_jobs_db.update_one.return_value.modified_count = 1
+
+        self.client.put('/jobs/modify', data=json.dumps({"job_id": str(job_id), "description": "Remote role"}),
+                        content_type='application/json')
+
+        update = mock_jobs_db.update_one.call_args[0][1]["$set"]
+        self.assertEqual(update["work_arrangement"], ["remote"])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,126 @@
+"""
+Test suite for write-behind job event counters
+Tests buffering, batched flushes, loss bounds and the event endpoints
+"""
+import unittest
+from unittest.mock import patch, MagicMock
+import os
+import sys
+import json
+
+# Add backend directory to path for imports
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from flask import Flask
+from flask_pymongo import ObjectId
+from pymongo.errors import BulkWriteError, PyMongoError
+from jobs.events import JobEventBuffer, MAX_EVENTS_PER_REQUEST, parse_events
+
+# Mock extensions before importing job modules
+with patch('extensions.mongo') as mock_mongo:
+    mock_mongo.db.jobs = MagicMock()
+    from jobs.jobs import jobs_bp
+
+
+class TestJobEventBuffer(unittest.TestCase):
+    """Test buffering and flushing"""
+
+    def test_flush_folds_events_into_one_update_per_job(self):
+        job_id = ObjectId()
+        buffer = JobEventBuffer()
+        for event_type in ("view", "view", "click"):
+            buffer.record(job_id, event_type)
+        buffer.record(ObjectId(), "impression")
+        collection = MagicMock()
+
+        self.assertEqual(buffer.flush(collection), 4)
+
+        operations = collection.bulk_write.call_args[0][0]
+        self.assertEqual(len(operations), 2)
+        self.assertEqual(operations[0]._filter, {"_id": job_id})
+        self.assertEqual(operations[0]._doc, {"$inc": {"view_count": 2, "click_count": 1}})
+        self.assertFalse(collection.bulk_write.call_args[1]["ordered"])
+        self.assertEqual(buffer.pending(), 0)
+
+    def test_failed_flush_keeps_counts(self):
+        buffer = JobEventBuffer()
+        buffer.record(ObjectId(), "view")
+        collection = MagicMock()
+        collection.bulk_write.side_effect = PyMongoError("down")
+
+        self.assertEqual(buffer.flush(collection), 0)
+
+        self.assertEqual(buffer.pending(), 1)
+        self.assertEqual(buffer.stats()["failed_flushes"], 1)
+
+    def test_partly_failed_flush_keeps_only_the_failed_counts(self):
+        applied_id, failed_id = ObjectId(), ObjectId()
+        buffer = JobEventBuffer()
+        buffer.record(applied_id, "view")
+        buffer.record(failed_id, "click", 2)
+        collection = MagicMock()
+        collection.bulk_write.side_effect = BulkWriteError({"writeErrors": [{"index": 1, "errmsg": "failed"}]})
+
+        self.assertEqual(buffer.flush(collection), 1)
+
+        self.assertEqual(buffer._take(), {(str(failed_id), "click"): 2})
+        self.assertEqual(buffer.stats()["failed_flushes"], 1)
+
+    def test_full_buffer_drops_new_counters(self):
+        buffer = JobEventBuffer(max_counters=1)
+        job_id = ObjectId()
+        self.assertTrue(buffer.record(job_id, "view"))
+        self.assertTrue(buffer.record(job_id, "view"))
+        self.assertFalse(buffer.record(ObjectId(), "view"))
+        self.assertEqual(buffer.stats()["dropped"], 1)
+        self.assertEqual(buffer.pending(), 2)
+
+    def test_parse_events_validates(self):
+        job_id = str(ObjectId())
+        self.assertEqual(parse_events({"events": [{"job_id": job_id, "type": "click"}]}), [(job_id, "click")])
+        for payload in (None, {"events": []}, {"events": [{"job_id": "x", "type": "click"}]},
+                        {"events": [{"job_id": job_id, "type": "like"}]},
+                        {"events": [{"job_id": job_id, "type": "click"}] * (MAX_EVENTS_PER_REQUEST + 1)}):
+            with self.assertRaises(ValueError):
+                parse_events(payload)
+
+
+class TestJobEventEndpoints(unittest.TestCase):
+    """Test that reads and the events route only touch the buffer"""
+
+    def setUp(self):
+        self.app = Flask(__name__)
+        self.app.config['TESTING'] = True
+        self.app.register_blueprint(jobs_bp, url_prefix='/jobs')
+        self.client = self.app.test_client()
+
+    @patch('jobs.jobs.job_event_buffer')
+    @patch('jobs.jobs.jobs_db')
+    def test_job_page_records_view_without_writing(self, mock_jobs_db, mock_buffer):
+        job_id = ObjectId()
+        mock_jobs_db.find_one.return_value = {"_id": job_id, "slug": "barista-sydney-abc123"}
+
+        self.client.get('/jobs/barista-sydney-abc123')
+
+        mock_buffer.record.assert_called_once_with(job_id, "view")
+        mock_jobs_db.update_one.assert_not_called()
+
+    @patch('jobs.jobs.job_event_buffer', JobEventBuffer())
+    def test_events_route_buffers_events(self):
+        job_id = str(ObjectId())
+        response = self.client.post('/jobs/events', data=json.dumps({"events": [
+            {"job_id": job_id, "type": "click"}, {"job_id": job_id, "type": "impression"}
+        ]}), content_type='application/json')
+
+        self.assertEqual(response.status_code, 202)
+        self.assertEqual(response.get_json(), {"accepted": 2, "dropped": 0})
+        self.assertEqual(self.client.get('/jobs/events/stats').get_json()["pending"], 2)
+
+    def test_events_route_rejects_invalid_payload(self):
+        response = self.client.post('/jobs/events', data=json.dumps({"events": "click"}),
+                                    content_type='application/json')
+        self.assertEqual(response.status_code, 400)
+
+
+if __name__ == '__main__':
+    unittest.main()
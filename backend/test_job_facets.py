@@ -0,0 +1,105 @@
+"""
+Test suite for job search facets
+Tests the $facet pipeline, the count formatting and the /jobs/facets endpoint
+"""
+import unittest
+from unittest.mock import patch, MagicMock
+import os
+import sys
+from datetime import datetime
+
+# Add backend directory to path for imports
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from flask import Flask
+from jobs.facets import SALARY_BANDS, build_facet_pipeline, format_facets
+
+# Mock extensions before importing job modules
+with patch('extensions.mongo') as mock_mongo:
+    mock_mongo.db.jobs = MagicMock()
+    from jobs.jobs import jobs_bp
+
+
+FACET_RESULT = {
+    "total": [{"count": 7}],
+    "location": [{"_id": "Sydney", "count": 5}, {"_id": None, "count": 1}],
+    "jobtype": [{"_id": "waiter", "count": 7}],
+    "salary": [{"_id": 40000, "count": 3}, {"_id": 150000, "count": 1}],
+    "date_posted": [{"_id": None, "today": 1, "last3days": 2, "lastWeek": 4, "lastMonth": 7}]
+}
+
+
+class TestFacetPipeline(unittest.TestCase):
+    """Test the aggregation and its output"""
+
+    def test_one_facet_stage_after_filter(self):
+        now = datetime(2024, 5, 10)
+        pipeline = build_facet_pipeline({"location": {"$in": ["Sydney"]}}, now)
+
+        self.assertEqual(pipeline[0], {"$match": {"location": {"$in": ["Sydney"]}}})
+        facets = pipeline[1]["$facet"]
+        self.assertEqual(set(facets), {"total", "location", "jobtype", "salary", "date_posted"})
+        self.assertEqual(facets["salary"][1]["$bucket"]["boundaries"], SALARY_BANDS)
+        today = facets["date_posted"][0]["$group"]["today"]["$sum"]["$cond"][0]
+        self.assertEqual(today, {"$gte": ["$created_at", datetime(2024, 5, 9)]})
+
+    def test_formats_counts(self):
+        facets = format_facets(FACET_RESULT)
+
+        self.assertEqual(facets["total"], 7)
+        self.assertEqual(facets["location"], [{"value": "Sydney", "count": 5}])
+        self.assertEqual(facets["salary"][1], {"min": 40000, "max": 60000, "count": 3})
+        self.assertEqual(facets["salary"][-1], {"min": 150000, "max": None, "count": 1})
+        self.assertEqual(facets["salary"][0]["count"], 0)
+        self.assertEqual(facets["date_posted"]["lastWeek"], 4)
+
+    def test_formats_empty_result(self):
+        facets = format_facets({"total": [], "location": [], "jobtype": [], "salary": [], "date_posted": []})
+        self.assertEqual(facets["total"], 0)
+        self.assertEqual(facets["date_posted"]["today"], 0)
+
+
+class TestFacetsEndpoint(unittest.TestCase):
+    """Test the /jobs/facets route"""
+
+    def setUp(self):
+        self.app = Flask(__name__)
+        self.app.config['TESTING'] = True
+        self.app.register_blueprint(jobs_bp, url_prefix='/jobs')
+        self.client = self.app.test_client()
+
+    @patch('jobs.jobs.job_result_cache')
+    @patch('jobs.jobs.jobs_db')
+    def test_caches_per_normalized_filter(self, mock_jobs_db, mock_cache):
+        mock_cache.get_or_compute.side_effect = lambda parameters, compute: compute()
+        mock_jobs_db.aggregate.return_value = iter([FACET_RESULT])
+
+        response = self.client.get('/jobs/facets?type=waiter,chef&cursor=abc')
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.get_json()["total"], 7)
+        parameters = mock_cache.get_or_compute.call_args[0][0]
+        self.assertEqual(parameters, {"type": ["chef,waiter"], "facets": True})
+        match = mock_jobs_db.aggregate.call_args[0][0][0]["$match"]
+        self.assertEqual(match, {"jobtype": {"$in": ["waiter", "chef"]}, "duplicate_of": None})
+
+    @patch('jobs.jobs.job_result_cache')
+    @patch('jobs.jobs.jobs_db')
+    def test_radius_search_counts_jobs_within_radius(self, mock_jobs_db, mock_cache):
+        mock_cache.get_or_compute.side_effect = lambda parameters, compute: compute()
+        mock_jobs_db.aggregate.return_value = iter([FACET_RESULT])
+
+        response = self.client.get('/jobs/facets?lat=-33.87&lng=151.21&radius=5')
+
+        self.assertEqual(response.status_code, 200)
+        match = mock_jobs_db.aggregate.call_args[0][0][0]["$match"]
+        self.assertEqual(match["geo"]["$geoWithin"]["$centerSphere"][0], [151.21, -33.87])
+        self.assertIn("lat", mock_cache.get_or_compute.call_args[0][0])
+
+    def test_invalid_radius_search(self):
+        response = self.client.get('/jobs/facets?lat=north&lng=151.21')
+        self.assertEqual(response.status_code, 400)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,143 @@
+"""
+Test suite for geospatial job search
+Tests city coordinates, radius search parsing, the $geoNear pipeline and the geo backfill
+"""
+import unittest
+from unittest.mock import patch, MagicMock
+import os
+import sys
+
+# Add backend directory to path for imports
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from flask import Flask
+from flask_pymongo import ObjectId
+from jobs.geo import (
+    InvalidGeoSearchError, MAX_RADIUS_KM, geo_point, locate_cities, parse_geo_search, nearest_jobs_pipeline
+)
+from jobs.migrations import backfill_job_geo
+from jobs.pagination import InvalidCursorError, encode_cursor
+
+# Mock extensions before importing job modules
+with patch('extensions.mongo') as mock_mongo:
+    mock_mongo.db.jobs = MagicMock()
+    from jobs.jobs import jobs_bp
+
+SYDNEY = {"type": "Point", "coordinates": [151.21, -33.87]}
+
+
+def cities_collection(*cities):
+    collection = MagicMock()
+    collection.find.return_value = list(cities)
+    return collection
+
+
+class TestGeoHelpers(unittest.TestCase):
+    """Test coordinates and search argument parsing"""
+
+    def test_geo_point_is_longitude_first(self):
+        self.assertEqual(geo_point("-33.87", 151.21), SYDNEY)
+        self.assertIsNone(geo_point(95, 10))
+        self.assertIsNone(geo_point(None, None))
+
+    def test_locate_cities_uses_one_query(self):
+        collection = cities_collection({"city": "Sydney", "coordinates": SYDNEY})
+        self.assertEqual(locate_cities(collection, ["Sydney", "Sydney", ""]), {"Sydney": SYDNEY})
+        self.assertEqual(collection.find.call_args[0][0]["city"], {"$in": ["Sydney"]})
+
+    def test_parse_near_city(self):
+        collection = cities_collection({"city": "Sydney", "coordinates": SYDNEY})
+        search = parse_geo_search({"near": "Sydney", "radius": "10000"}, collection)
+        self.assertEqual(search, {"point": SYDNEY, "radius_km": MAX_RADIUS_KM})
+
+    def test_parse_rejects_unknown_city_and_bad_coordinates(self):
+        with self.assertRaises(InvalidGeoSearchError):
+            parse_geo_search({"near": "Atlantis"}, cities_collection())
+        with self.assertRaises(InvalidGeoSearchError):
+            parse_geo_search({"lat": "abc", "lng": "1"}, cities_collection())
+
+    def test_no_centre_is_not_a_geo_search(self):
+        self.assertIsNone(parse_geo_search({"location": "Sydney"}, cities_collection()))
+
+
+class TestNearestJobsPipeline(unittest.TestCase):
+    """Test the nearest-first aggregation"""
+
+    def test_first_page(self):
+        pipeline = nearest_jobs_pipeline(SYDNEY, 10, {"jobtype": "waiter"}, 21)
+        geo_near = pipeline[0]["$geoNear"]
+        self.assertEqual(geo_near["maxDistance"], 10000)
+        self.assertEqual(geo_near["query"], {"jobtype": "waiter"})
+        self.assertEqual(pipeline[1:], [{"$sort": {"distance": 1, "_id": 1}}, {"$limit": 21}])
+
+    def test_cursor_resumes_after_distance_and_id(self):
+        last_id = ObjectId()
+        pipeline = nearest_jobs_pipeline(SYDNEY, 10, {}, 21, encode_cursor("distance", 1500.5, last_id))
+        self.assertEqual(pipeline[0]["$geoNear"]["minDistance"], 1500.5)
+        self.assertEqual(pipeline[1]["$match"]["$or"][1], {"distance": 1500.5, "_id": {"$gt": last_id}})
+
+    def test_rejects_cursor_of_other_mode(self):
+        with self.assertRaises(InvalidCursorError):
+            nearest_jobs_pipeline(SYDNEY, 10, {}, 21, encode_cursor("newest", None, ObjectId()))
+
+
+class TestGeoSearchEndpoint(unittest.TestCase):
+    """Test radius searches on /jobs/get"""
+
+    def setUp(self):
+        self.app = Flask(__name__)
+        self.app.config['TESTING'] = True
+        self.app.register_blueprint(jobs_bp, url_prefix='/jobs')
+        self.client = self.app.test_client()
+
+    @patch('jobs.jobs.job_result_cache')
+    @patch('jobs.jobs.cities_db')
+    @patch('jobs.jobs.jobs_db')
+    def test_radius_search_sorts_by_distance(self, mock_jobs_db, mock_cities_db, mock_cache):
+        mock_cache.get_or_compute.side_effect = lambda parameters, compute: compute()
+        mock_cities_db.find.return_value = [{"city": "Sydney", "coordinates": SYDNEY}]
+        ids = [ObjectId(), ObjectId()]
+        mock_jobs_db.aggregate.return_value = iter([
+            {"_id": ids[0], "title": "Barista", "distance": 1234.0},
+            {"_id": ids[1], "title": "Chef", "distance": 2500.0}
+        ])
+        mock_jobs_db.count_documents.return_value = 2
+
+        response = self.client.get('/jobs/get?near=Sydney&radius=5&limit=1')
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.get_json(), [{"_id": str(ids[0]), "title": "Barista", "distance_km": 1.23}])
+        self.assertIn("X-Next-Cursor", response.headers)
+        count_filter = mock_jobs_db.count_documents.call_args[0][0]
+        self.assertIn("$geoWithin", count_filter["geo"])
+
+    @patch('jobs.jobs.cities_db')
+    def test_unknown_city_is_rejected(self, mock_cities_db):
+        mock_cities_db.find.return_value = []
+        response = self.client.get('/jobs/get?near=Atlantis')
+        self.assertEqual(response.status_code, 400)
+
+
+class TestBackfillJobGeo(unittest.TestCase):
+    """Test linking existing jobs to city coordinates"""
+
+    def test_sets_geo_for_located_cities(self):
+        job_id = ObjectId()
+        jobs = MagicMock()
+        jobs.find.return_value.sort.return_value.limit.side_effect = [
+            [{"_id": job_id, "location": "Sydney"}, {"_id": ObjectId(), "location": "Atlantis"}],
+            []
+        ]
+        jobs.bulk_write.return_value.modified_count = 1
+        cities = cities_collection({"city": "Sydney", "coordinates": SYDNEY})
+
+        report = backfill_job_geo(jobs, cities)
+
+        operation = jobs.bulk_write.call_args[0][0][0]
+        self.assertEqual(operation._doc, {"$set": {"geo": SYDNEY}})
+        self.assertEqual((report["modified"], report["skipped"]), (1, 1))
+        self.assertEqual(jobs.find.call_args_list[0][0][0], {"geo": None})
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,248 @@
+"""
+Test suite for bulk job ingestion
+Tests the feed parsers, record validation, chunked writes and the /jobs/bulk endpoint
+"""
+import unittest
+from unittest.mock import patch, MagicMock
+import os
+import sys
+import io
+
+# Add backend directory to path for imports
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from flask import Flask
+from flask_pymongo import ObjectId
+from pymongo.errors import BulkWriteError
+from jobs.ingestion import (
+    InvalidRecordError, iter_ndjson_records, iter_csv_records, iter_xml_records, detect_feed_format,
+    prepare_job, ingest_jobs
+)
+from jobs.search_index import JobSearchIndex
+
+# Mock extensions before importing job modules
+with patch('extensions.mongo') as mock_mongo:
+    mock_mongo.db.jobs = MagicMock()
+    from jobs.jobs import jobs_bp
+
+
+def feed_record(**overrides):
+    record = {
+        "title": "Barista",
+        "description": "Morning shifts",
+        "remuneration_amount": "30",
+        "remuneration_period": "hour",
+        "firm": "Greeks bar",
+        "jobtype": "waiter",
+        "location": "Sydney"
+    }
+    record.update(overrides)
+    return record
+
+
+def mock_collection(write_error=None):
+    """Collection whose insert_many assigns ids like pymongo does"""
+    collection = MagicMock()
+    collection.find.return_value = []
+
+    def insert_many(documents, ordered=True):
+        for document in documents:
+            document["_id"] = ObjectId()
+        if write_error:
+            raise write_error
+    collection.insert_many.side_effect = insert_many
+    return collection
+
+
+def make_slug(title, city):
+    return f"{title}-{city}".lower()
+
+
+class TestFeedParsers(unittest.TestCase):
+    """Test streaming parsing of each feed format"""
+
+    def test_ndjson_numbers_lines_and_reports_bad_json(self):
+        stream = io.BytesIO(b'{"title": "A"}\n\n{broken\n{"title": "B"}\n')
+        records = list(iter_ndjson_records(stream))
+        self.assertEqual([position for position, _ in records], [1, 3, 4])
+        self.assertEqual(records[0][1], {"title": "A"})
+        self.assertIsInstance(records[1][1], InvalidRecordError)
+
+    def test_csv_rows_use_header(self):
+        stream = io.BytesIO(b"\xef\xbb\xbftitle,location\nBarista,Sydney\nChef,Perth\n")
+        self.assertEqual(list(iter_csv_records(stream)), [
+            (2, {"title": "Barista", "location": "Sydney"}),
+            (3, {"title": "Chef", "location": "Perth"})
+        ])
+
+    def test_ndjson_reports_lines_that_are_not_utf8(self):
+        stream = io.BytesIO(b'{"title": "A"}\n{"title": "Caf\xe9"}\n{"title": "B"}\n')
+        records = list(iter_ndjson_records(stream))
+        self.assertEqual([position for position, _ in records], [1, 2, 3])
+        self.assertIsInstance(records[1][1], InvalidRecordError)
+        self.assertEqual(records[2][1], {"title": "B"})
+
+    def test_csv_reports_bad_rows_and_carries_on(self):
+        stream = io.BytesIO(b"title,location\nBarista,Sydney\nCaf\xe9,Perth\n" + b"x" * 200000
+                            + b",Perth\nChef,Perth\n")
+        records = list(iter_csv_records(stream))
+        self.assertEqual([position for position, _ in records], [2, 3, 4, 5])
+        self.assertEqual(records[0][1], {"title": "Barista", "location": "Sydney"})
+        self.assertIsInstance(records[1][1], InvalidRecordError)
+        self.assertIsInstance(records[2][1], InvalidRecordError)
+        self.assertEqual(records[3][1], {"title": "Chef", "location": "Perth"})
+
+    def test_csv_lines_may_end_with_a_carriage_return(self):
+        stream = io.BytesIO(b"title,location\rBarista,Sydney\r\"Chef\r\nCook\",Perth\r\n")
+        self.assertEqual(list(iter_csv_records(stream)), [
+            (2, {"title": "Barista", "location": "Sydney"}),
+            (4, {"title": "Chef\r\nCook", "location": "Perth"})
+        ])
+
+    def test_xml_jobs_with_nested_location(self):
+        stream = io.BytesIO(b"<jobs><job><title>Barista</title><location><city>Sydney</city></location></job>"
+                            b"<job><title>Chef</title></job></jobs>")
+        self.assertEqual(list(iter_xml_records(stream)), [
+            (1, {"title": "Barista", "location": {"city": "Sydney"}}),
+            (2, {"title": "Chef"})
+        ])
+
+    def test_xml_parse_error_is_reported(self):
+        records = list(iter_xml_records(io.BytesIO(b"<jobs><job><title>A</title></job><job>")))
+        self.assertEqual(records[0], (1, {"title": "A"}))
+        self.assertIsInstance(records[-1][1], InvalidRecordError)
+
+    def test_detect_feed_format(self):
+        self.assertEqual(detect_feed_format("application/x-ndjson; charset=utf-8"), "ndjson")
+        self.assertEqual(detect_feed_format("application/octet-stream", "jobs.CSV"), "csv")
+        self.assertIsNone(detect_feed_format("application/json"))
+
+
+class TestPrepareJob(unittest.TestCase):
+    """Test validation and shaping of feed records"""
+
+    def test_builds_enriched_job(self):
+        job = prepare_job(feed_record(location={"city": "Sydney"}))
+        self.assertEqual(job["location"], "Sydney")
+        self.assertEqual(job["remuneration_amount"], 30)
+        self.assertEqual(job["shift"], "")
+        self.assertEqual(job["salary_annual"], 59280)
+
+    def test_accepts_flat_city(self):
+        record = feed_record(city="Perth")
+        del record["location"]
+        self.assertEqual(prepare_job(record)["location"], "Perth")
+
+    def test_reports_missing_fields(self):
+        with self.assertRaises(InvalidRecordError) as context:
+            prepare_job(feed_record(firm="", location=None))
+        self.assertEqual(str(context.exception), "Missing mandatory fields: firm, location")
+
+    def test_rejects_non_objects(self):
+        with self.assertRaises(InvalidRecordError):
+            prepare_job(["Barista"])
+
+
+class TestIngestJobs(unittest.TestCase):
+    """Test chunked, unordered writes and error reporting"""
+
+    @patch('jobs.ingestion.record_job_suggestions')
+    @patch('jobs.ingestion.job_search_index')
+    def test_writes_in_chunks_and_reports_invalid_records(self, mock_index, mock_suggestions):
+        collection = mock_collection()
+        records = [(1, feed_record()), (2, feed_record(title="")), (3, feed_record(title="Chef")),
+                   (4, feed_record(title="Cook"))]
+
+        report = ingest_jobs(collection, records, make_slug, chunk_size=2)
+
+        self.assertEqual(report["received"], 4)
+        self.assertEqual(report["inserted"], 3)
+        self.assertEqual(report["errors"], [{"record": 2, "error": "Missing mandatory fields: title"}])
+        self.assertEqual([len(call[0][0]) for call in collection.insert_many.call_args_list], [2, 1])
+        self.assertFalse(collection.insert_many.call_args[1]["ordered"])
+        self.assertEqual(mock_index.add.call_count, 3)
+        self.assertEqual(mock_suggestions.call_count, 3)
+
+    @patch('jobs.ingestion.record_job_suggestions')
+    @patch('jobs.ingestion.job_search_index')
+    def test_regenerates_taken_slugs(self, mock_index, mock_suggestions):
+        collection = mock_collection()
+        collection.find.return_value = [{"slug": "barista-sydney"}]
+        slugs = iter(["barista-sydney", "barista-sydney-2"])
+
+        ingest_jobs(collection, [(1, feed_record())], lambda title, city: next(slugs))
+
+        self.assertEqual(collection.insert_many.call_args[0][0][0]["slug"], "barista-sydney-2")
+        self.assertEqual(collection.find.call_count, 1)
+
+    @patch('jobs.ingestion.record_job_suggestions')
+    @patch('jobs.ingestion.job_search_index')
+    def test_links_geo_points_once_per_chunk(self, mock_index, mock_suggestions):
+        collection = mock_collection()
+        locate = MagicMock(return_value={"Sydney": {"type": "Point", "coordinates": [151.21, -33.87]}})
+
+        ingest_jobs(collection, [(1, feed_record()), (2, feed_record(location="Perth"))], make_slug,
+                    locate_cities=locate)
+
+        jobs = collection.insert_many.call_args[0][0]
+        self.assertEqual(jobs[0]["geo"]["coordinates"], [151.21, -33.87])
+        self.assertIsNone(jobs[1]["geo"])
+        self.assertEqual(locate.call_count, 1)
+
+    @patch('jobs.ingestion.record_job_suggestions')
+    @patch('jobs.ingestion.job_search_index')
+    def test_write_errors_are_reported_per_record(self, mock_index, mock_suggestions):
+        collection = mock_collection(BulkWriteError({
+            "writeErrors": [{"index": 1, "errmsg": "duplicate key"}]
+        }))
+
+        report = ingest_jobs(collection, [(1, feed_record()), (2, feed_record(title="Chef"))], make_slug)
+
+        self.assertEqual(report["inserted"], 1)
+        self.assertEqual(report["errors"], [{"record": 2, "error": "duplicate key"}])
+
+
+class TestBulkEndpoint(unittest.TestCase):
+    """Test the /jobs/bulk route"""
+
+    def setUp(self):
+        self.app = Flask(__name__)
+        self.app.config['TESTING'] = True
+        self.app.register_blueprint(jobs_bp, url_prefix='/jobs')
+        self.client = self.app.test_client()
+
+    @patch('jobs.ingestion.job_search_index', JobSearchIndex())
+    @patch('jobs.jobs.jobs_db')
+    def test_ingests_ndjson_body(self, mock_jobs_db):
+        collection = mock_collection()
+        mock_jobs_db.find = collection.find
+        mock_jobs_db.insert_many = collection.insert_many
+
+        response = self.client.post('/jobs/bulk?chunk_size=1', data=b'{"title": "A"}\n',
+                                    content_type='application/x-ndjson')
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.get_json()["failed"], 1)
+
+    @patch('jobs.ingestion.job_search_index', JobSearchIndex())
+    @patch('jobs.jobs.jobs_db')
+    def test_ingests_csv_upload(self, mock_jobs_db):
+        collection = mock_collection()
+        mock_jobs_db.find = collection.find
+        mock_jobs_db.insert_many = collection.insert_many
+        feed = (b"title,description,remuneration_amount,remuneration_period,firm,jobtype,location\n"
+                b"Barista,Mornings,30,hour,Greeks bar,waiter,Sydney\n")
+
+        response = self.client.post('/jobs/bulk', data={"file": (io.BytesIO(feed), "jobs.csv")},
+                                    content_type='multipart/form-data')
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.get_json()["inserted"], 1)
+
+    def test_unknown_format_is_rejected(self):
+        response = self.client.post('/jobs/bulk', data=b'[]', content_type='application/json')
+        self.assertEqual(response.status_code, 400)
+
+
+if __name__ == '__main__':
+    unittest.main()
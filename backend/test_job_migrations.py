@@ -0,0 +1,79 @@
+"""
+Test suite for jobs collection data migrations
+Tests the created_at conversion and the datetime-based date filters
+"""
+import unittest
+from unittest.mock import patch, MagicMock
+import os
+import sys
+from datetime import datetime, timedelta, timezone
+
+# Add backend directory to path for imports
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from flask_pymongo import ObjectId
+from jobs.migrations import parse_created_at, migrate_created_at_to_datetime
+
+# Mock extensions before importing job modules
+with patch('extensions.mongo') as mock_mongo:
+    mock_mongo.db.jobs = MagicMock()
+    from jobs.jobs import build_job_filters, serialize_job
+
+
+class TestParseCreatedAt(unittest.TestCase):
+    """Test parsing of legacy created_at strings"""
+
+    def test_naive_strings_are_local_time(self):
+        local = datetime(2024, 5, 1, 10, 30, 0, 123456)
+        expected = local.astimezone(timezone.utc).replace(tzinfo=None)
+        self.assertEqual(parse_created_at(local.isoformat()), expected)
+
+    def test_offset_strings_are_converted_to_utc(self):
+        self.assertEqual(parse_created_at("2024-05-01T10:00:00+10:00"), datetime(2024, 5, 1, 0, 0, 0))
+
+    def test_invalid_values(self):
+        self.assertIsNone(parse_created_at("yesterday"))
+        self.assertIsNone(parse_created_at(None))
+
+
+class TestMigrateCreatedAt(unittest.TestCase):
+    """Test the batched created_at migration"""
+
+    def test_converts_in_batches_and_skips_unparseable(self):
+        ids = [ObjectId() for _ in range(3)]
+        collection = MagicMock()
+        collection.find.return_value.sort.return_value.limit.side_effect = [
+            [{"_id": ids[0], "created_at": "2024-05-01T10:00:00+00:00"}, {"_id": ids[1], "created_at": "soon"}],
+            [{"_id": ids[2], "created_at": "2024-05-02T10:00:00+00:00"}],
+            []
+        ]
+        collection.bulk_write.return_value.modified_count = 1
+
+        converted, skipped = migrate_created_at_to_datetime(collection, batch_size=2)
+
+        self.assertEqual((converted, skipped), (2, 1))
+        first_batch = collection.bulk_write.call_args_list[0][0][0]
+        self.assertEqual(len(first_batch), 1)
+        self.assertEqual(first_batch[0]._filter, {"_id": ids[0], "created_at": "2024-05-01T10:00:00+00:00"})
+        self.assertEqual(first_batch[0]._doc, {"$set": {"created_at": datetime(2024, 5, 1, 10, 0, 0)}})
+        self.assertEqual(collection.find.call_args_list[1][0][0],
+                         {"created_at": {"$type": "string"}, "_id": {"$gt": ids[1]}})
+
+
+class TestDateFilters(unittest.TestCase):
+    """Test datetime handling in the jobs blueprint"""
+
+    def test_date_posted_compares_datetimes(self):
+        before = datetime.utcnow()
+        cutoff = build_job_filters({"datePosted": "lastWeek"})["created_at"]["$gte"]
+        self.assertIsInstance(cutoff, datetime)
+        self.assertAlmostEqual(cutoff, before - timedelta(days=7), delta=timedelta(seconds=5))
+
+    def test_serialize_job_formats_datetimes(self):
+        job = serialize_job({"_id": ObjectId(), "created_at": datetime(2024, 5, 1, 10, 0, 0)})
+        self.assertEqual(job["created_at"], "2024-05-01T10:00:00")
+        self.assertIsInstance(job["_id"], str)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,237 @@
+"""
+Test suite for keyset pagination of /jobs/get
+Tests cursor encoding, page size bounds, range filters and response headers
+"""
+import unittest
+from unittest.mock import patch, MagicMock
+import os
+import sys
+import json
+from datetime import datetime
+
+# Add backend directory to path for imports
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from flask import Flask
+from flask_pymongo import ObjectId
+from jobs.pagination import (
+    InvalidCursorError, MAX_PAGE_SIZE, DEFAULT_PAGE_SIZE, NEWEST_FIRST_SORT, HIGHEST_SALARY_SORT,
+    parse_page_size, encode_cursor, decode_cursor, newest_first_after, sorted_after, ranked_position_after
+)
+from jobs.search_index import JobSearchIndex
+
+# Mock extensions before importing job modules
+with patch('extensions.mongo') as mock_mongo:
+    mock_mongo.db.jobs = MagicMock()
+    from jobs.jobs import jobs_bp
+
+
+class TestCursorHelpers(unittest.TestCase):
+    """Test cursor encoding and keyset filters"""
+
+    def test_cursor_round_trip(self):
+        doc_id = ObjectId()
+        cursor = encode_cursor("newest", "2024-05-01T10:00:00", doc_id)
+        self.assertEqual(decode_cursor(cursor, "newest"), ("2024-05-01T10:00:00", str(doc_id)))
+
+    def test_cursor_round_trips_datetimes(self):
+        created_at = datetime(2024, 5, 1, 10, 0, 0, 123456)
+        cursor = encode_cursor("newest", created_at, ObjectId())
+        self.assertEqual(decode_cursor(cursor, "newest")[0], created_at)
+
+    def test_cursor_round_trips_float_scores_exactly(self):
+        cursor = encode_cursor("relevance", 1.2345678901234567, ObjectId())
+        self.assertEqual(decode_cursor(cursor, "relevance")[0], 1.2345678901234567)
+
+    def test_cursor_for_other_mode_rejected(self):
+        cursor = encode_cursor("newest", "2024-05-01", ObjectId())
+        with self.assertRaises(InvalidCursorError):
+            decode_cursor(cursor, "relevance")
+
+    def test_garbage_cursor_rejected(self):
+        for cursor in ["not-a-cursor", "", encode_cursor("newest", None, "xyz")]:
+            with self.assertRaises(InvalidCursorError):
+                decode_cursor(cursor, "newest")
+
+    def test_page_size_is_clamped(self):
+        self.assertEqual(parse_page_size(None), DEFAULT_PAGE_SIZE)
+        self.assertEqual(parse_page_size("abc"), DEFAULT_PAGE_SIZE)
+        self.assertEqual(parse_page_size("0"), 1)
+        self.assertEqual(parse_page_size(str(MAX_PAGE_SIZE * 10)), MAX_PAGE_SIZE)
+
+    def test_newest_first_after_uses_range_on_sort_key(self):
+        doc_id = ObjectId()
+        query = newest_first_after("2024-05-01", str(doc_id))
+        self.assertEqual(query["$or"][0], {"created_at": {"$lt": "2024-05-01"}})
+        self.assertEqual(query["$or"][1], {"created_at": "2024-05-01", "_id": {"$lt": doc_id}})
+
+    def test_newest_first_after_undated_job(self):
+        doc_id = ObjectId()
+        self.assertEqual(newest_first_after(None, str(doc_id)), {"created_at": None, "_id": {"$lt": doc_id}})
+
+    def test_sorted_after_salary(self):
+        doc_id = ObjectId()
+        query = sorted_after("salary", 80000, str(doc_id))
+        self.assertEqual(query["$or"][1], {"salary_annual": 80000, "_id": {"$lt": doc_id}})
+        self.assertEqual(query["$or"][2], {"salary_annual": None})
+
+    def test_ranked_position_after(self):
+        ranked = [("a", 3.0), ("b", 2.0), ("c", 2.0), ("d", 1.0)]
+        self.assertEqual(ranked_position_after(ranked, 2.0, "b"), 2)
+        self.assertEqual(ranked_position_after(ranked, 1.0, "d"), 4)
+        # A cursor whose document has since disappeared still resumes in order
+        self.assertEqual(ranked_position_after(ranked, 2.5, "z"), 1)
+
+
+class TestJobsPaginationRoute(unittest.TestCase):
+    """Test paginated /jobs/get responses"""
+
+    def setUp(self):
+        self.app = Flask(__name__)
+        self.app.config['TESTING'] = True
+        self.app.register_blueprint(jobs_bp, url_prefix='/jobs')
+        self.client = self.app.test_client()
+        self.jobs = [
+            {"_id": ObjectId(), "title": f"Job {i}", "created_at": datetime(2024, 5, 30 - i)}
+            for i in range(4)
+        ]
+
+    @patch('jobs.jobs.job_search_index', JobSearchIndex())
+    @patch('jobs.jobs.jobs_db')
+    def test_first_page_returns_cursor_and_total(self, mock_jobs_db):
+        mock_cursor = mock_jobs_db.find.return_value.sort.return_value.limit
+        mock_cursor.return_value = self.jobs[:3]
+        mock_jobs_db.estimated_document_count.return_value = 4
+
+        response = self.client.get('/jobs/get?limit=2')
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(json.loads(response.data)), 2)
+        self.assertEqual(json.loads(response.data)[0]["created_at"], "2024-05-30T00:00:00")
+        mock_jobs_db.find.return_value.sort.assert_called_once_with(NEWEST_FIRST_SORT)
+        mock_cursor.assert_called_once_with(3)
+        self.assertEqual(response.headers["X-Total-Count"], "4")
+        self.assertEqual(response.headers["X-Total-Count-Estimated"], "true")
+
+        cursor = response.headers["X-Next-Cursor"]
+        self.assertEqual(decode_cursor(cursor, "newest"), (datetime(2024, 5, 29), str(self.jobs[1]["_id"])))
+        self.assertIn('rel="next"', response.headers["Link"])
+        mock_jobs_db.find.return_value.skip.assert_not_called()
+
+    @patch('jobs.jobs.job_search_index', JobSearchIndex())
+    @patch('jobs.jobs.jobs_db')
+    def test_next_page_queries_after_cursor(self, mock_jobs_db):
+        mock_jobs_db.find.return_value.sort.return_value.limit.return_value = self.jobs[2:]
+        cursor = encode_cursor("newest", self.jobs[1]["created_at"], self.jobs[1]["_id"])
+
+        response = self.client.get(f'/jobs/get?limit=2&location=Sydney&cursor={cursor}')
+
+        self.assertEqual(response.status_code, 200)
+        self.assertNotIn("X-Next-Cursor", response.headers)
+        self.assertNotIn("X-Total-Count", response.headers)
+        query = mock_jobs_db.find.call_args[0][0]
+        self.assertEqual(query["$and"][0], {"location": {"$in": ["Sydney"]}, "duplicate_of": None})
+        self.assertEqual(query["$and"][1], newest_first_after(self.jobs[1]["created_at"], str(self.jobs[1]["_id"])))
+
+    @patch('jobs.jobs.jobs_db')
+    def test_filtered_count_is_bounded(self, mock_jobs_db):
+        mock_jobs_db.find.return_value.sort.return_value.limit.return_value = []
+        mock_jobs_db.count_documents.return_value = 10
+
+        with patch('jobs.jobs.job_search_index', JobSearchIndex()):
+            response = self.client.get('/jobs/get?location=Perth')
+
+        self.assertEqual(response.headers["X-Total-Count"], "10")
+        self.assertNotIn("X-Total-Count-Estimated", response.headers)
+        self.assertIn("limit", mock_jobs_db.count_documents.call_args[1])
+
+    def test_invalid_cursor_returns_400(self):
+        response = self.client.get('/jobs/get?cursor=bogus')
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(json.loads(response.data)["error"], "Invalid cursor")
+
+    @patch('jobs.jobs.jobs_db')
+    def test_relevance_pages_walk_ranked_hits(self, mock_jobs_db):
+        index = JobSearchIndex()
+        index.build([{"_id": job["_id"], "title": "Barista", "description": "coffee " * (i + 1)}
+                     for i, job in enumerate(self.jobs)])
+        ranked = index.search("barista")
+        by_id = {str(job["_id"]): job for job in self.jobs}
+        mock_jobs_db.find.side_effect = lambda query: [
+            by_id[str(doc_id)] for doc_id in query["_id"]["$in"]
+        ]
+
+        with patch('jobs.jobs.job_search_index', index):
+            first = self.client.get('/jobs/get?title=barista&limit=3')
+            second = self.client.get(f'/jobs/get?title=barista&limit=3&cursor={first.headers["X-Next-Cursor"]}')
+
+        first_ids = [job["_id"] for job in json.loads(first.data)]
+        second_ids = [job["_id"] for job in json.loads(second.data)]
+        self.assertEqual(first_ids + second_ids, [doc_id for doc_id, _ in ranked])
+        self.assertEqual(first.headers["X-Total-Count"], "4")
+        self.assertNotIn("X-Next-Cursor", second.headers)
+
+
+class TestJobsSortModes(unittest.TestCase):
+    """Test the sort parameter of /jobs/get"""
+
+    def setUp(self):
+        self.app = Flask(__name__)
+        self.app.config['TESTING'] = True
+        self.app.register_blueprint(jobs_bp, url_prefix='/jobs')
+        self.client = self.app.test_client()
+        self.jobs = [{"_id": ObjectId(), "title": f"Job {i}", "salary_annual": 90000 - i * 10000} for i in range(3)]
+
+    @patch('jobs.jobs.job_search_index', JobSearchIndex())
+    @patch('jobs.jobs.jobs_db')
+    def test_salary_sort_pages_by_salary(self, mock_jobs_db):
+        mock_jobs_db.find.return_value.sort.return_value.limit.return_value = self.jobs
+        mock_jobs_db.count_documents.return_value = 3
+
+        response = self.client.get('/jobs/get?sort=salary&limit=2&location=Sydney')
+
+        self.assertEqual(response.status_code, 200)
+        mock_jobs_db.find.return_value.sort.assert_called_once_with(HIGHEST_SALARY_SORT)
+        cursor = response.headers["X-Next-Cursor"]
+        self.assertEqual(decode_cursor(cursor, "salary"), (80000, str(self.jobs[1]["_id"])))
+
+        self.client.get(f'/jobs/get?sort=salary&limit=2&location=Sydney&cursor={cursor}')
+        query = mock_jobs_db.find.call_args[0][0]
+        self.assertEqual(query["$and"][1], sorted_after("salary", 80000, str(self.jobs[1]["_id"])))
+
+    @patch('jobs.jobs.jobs_db')
+    def test_newest_sort_with_title_walks_the_index(self, mock_jobs_db):
+        index = MagicMock(ready=True)
+        mock_jobs_db.find.return_value.sort.return_value.limit.return_value = []
+        mock_jobs_db.count_documents.return_value = 0
+
+        with patch('jobs.jobs.job_search_index', index):
+            response = self.client.get('/jobs/get?sort=newest&title=barista')
+
+        self.assertEqual(response.status_code, 200)
+        index.search.assert_not_called()
+        self.assertIn("$or", mock_jobs_db.find.call_args[0][0])
+        mock_jobs_db.find.return_value.sort.assert_called_once_with(NEWEST_FIRST_SORT)
+
+    @patch('jobs.jobs.job_search_index', JobSearchIndex())
+    @patch('jobs.jobs.jobs_db')
+    def test_relevance_without_title_lists_newest_first(self, mock_jobs_db):
+        mock_jobs_db.find.return_value.sort.return_value.limit.return_value = []
+        mock_jobs_db.estimated_document_count.return_value = 0
+        self.client.get('/jobs/get?sort=relevance')
+        mock_jobs_db.find.return_value.sort.assert_called_once_with(NEWEST_FIRST_SORT)
+
+    def test_unknown_sort_returns_400(self):
+        response = self.client.get('/jobs/get?sort=oldest')
+        self.assertEqual(response.status_code, 400)
+        self.assertIn("newest, salary, relevance", json.loads(response.data)["error"])
+
+    @patch('jobs.jobs.job_search_index', JobSearchIndex())
+    def test_cursor_from_another_sort_returns_400(self):
+        cursor = encode_cursor("newest", datetime(2024, 5, 1), ObjectId())
+        response = self.client.get(f'/jobs/get?sort=salary&cursor={cursor}')
+        self.assertEqual(response.status_code, 400)
+
+
+if __name__ == '__main__':
+    unittest.main()
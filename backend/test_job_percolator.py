@@ -0,0 +1,184 @@
+"""
+Test suite for the saved-search percolator
+Tests saved search validation, inverted-index matching, batched notifications and the saved searches endpoints
+"""
+import unittest
+from unittest.mock import patch, MagicMock
+import os
+import sys
+import json
+
+# Add backend directory to path for imports
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from flask import Flask
+from flask_pymongo import ObjectId
+from jobs.percolator import SavedSearchPercolator, notify_saved_search_matches, parse_saved_search
+
+# Mock extensions before importing blueprint modules
+with patch('extensions.mongo') as mock_mongo:
+    mock_mongo.db.saved_searches = MagicMock()
+    from saved_searches.saved_searches import saved_searches_bp
+
+ALICE, BOB = ObjectId(), ObjectId()
+
+
+def saved_search(user_id, **criteria):
+    search = {"_id": ObjectId(), "user_id": user_id, **parse_saved_search(criteria)}
+    return search
+
+
+def job(**fields):
+    document = {"_id": ObjectId(), "title": "Barista", "description": "Espresso and latte art", "firm": "Bean Co",
+                "location": "Sydney", "jobtype": "hospitality", "salary_annual": 55000, "slug": "barista-sydney-abc123"}
+    document.update(fields)
+    return document
+
+
+class TestParseSavedSearch(unittest.TestCase):
+    """Test saved search validation"""
+
+    def test_normalizes_criteria(self):
+        search = parse_saved_search({"locations": "Sydney, melbourne", "keywords": "Latte and Espresso"})
+        self.assertEqual(search["locations"], ["melbourne", "sydney"])
+        self.assertEqual(search["keywords"], ["espresso", "latte"])
+        self.assertIsNone(search["salary_min"])
+
+    def test_rejects_empty_and_malformed_searches(self):
+        for payload in (None, {}, {"name": "Anything"}, {"salary_min": -1}, {"salary_min": "lots"},
+                        {"locations": [1, 2]}):
+            with self.assertRaises(ValueError):
+                parse_saved_search(payload)
+
+
+class TestSavedSearchPercolator(unittest.TestCase):
+    """Test matching jobs against the indexed searches"""
+
+    def setUp(self):
+        self.percolator = SavedSearchPercolator()
+
+    def matched(self, document):
+        return sorted((str(search["user_id"]), percentage) for search, percentage in self.percolator.match(document))
+
+    def test_every_criterion_must_hold(self):
+        self.percolator.build([
+            saved_search(ALICE, locations=["Sydney"], keywords="espresso cocktails"),
+            saved_search(BOB, locations=["Perth"], keywords="espresso")
+        ])
+        self.assertEqual(self.matched(job()), [(str(ALICE), 50)])
+
+    def test_salary_band_searches(self):
+        self.percolator.build([saved_search(ALICE, salary_min=50000), saved_search(BOB, salary_min=90000)])
+        self.assertEqual(self.matched(job()), [(str(ALICE), 100)])
+        self.assertEqual(self.matched(job(salary_annual=None)), [])
+
+    def test_searches_are_checked_only_from_matching_buckets(self):
+        self.percolator.build([saved_search(ALICE, jobtypes=["retail"]), saved_search(BOB, jobtypes=["hospitality"])])
+        with patch('jobs.percolator._match_percentage', return_value=100) as check:
+            self.percolator.match(job())
+        self.assertEqual(check.call_count, 1)
+
+    def test_remove(self):
+        search = saved_search(ALICE, keywords="barista")
+        self.percolator.build([search])
+        self.percolator.remove(search["_id"])
+        self.assertEqual(self.matched(job()), [])
+        self.assertEqual(self.percolator.stats()["buckets"], 0)
+
+
+class TestNotifySavedSearchMatches(unittest.TestCase):
+    """Test batched new job match notifications"""
+
+    def setUp(self):
+        self.percolator = SavedSearchPercolator()
+        self.percolator.build([
+            saved_search(ALICE, keywords="espresso"),
+            saved_search(ALICE, locations=["Sydney"]),
+            saved_search(BOB, keywords="barista")
+        ])
+        self.db = MagicMock()
+        self.db.users.find.return_value = []
+        self.db.notification_preferences.find.return_value = []
+
+    @patch('jobs.percolator.collection_versions')
+    @patch('jobs.percolator.notify_new_job_matches')
+    def test_one_notification_per_user_and_job_in_one_batch(self, mock_notify, mock_versions):
+        mock_versions.get.return_value = None
+        first, second = job(), job(title="Head Barista")
+        with patch('jobs.percolator.saved_search_percolator', self.percolator):
+            notify_saved_search_matches([first, second], self.db)
+
+        mock_notify.assert_called_once()
+        matches = mock_notify.call_args[0][0]
+        self.assertEqual(sorted((str(user_id), document["title"]) for user_id, document, _ in matches), [
+            (str(ALICE), "Barista"), (str(ALICE), "Head Barista"), (str(BOB), "Barista"), (str(BOB), "Head Barista")
+        ])
+        self.assertEqual(self.db.users.find.call_count, 1)
+
+    @patch('jobs.percolator.collection_versions')
+    @patch('jobs.percolator.notify_new_job_matches')
+    def test_opted_out_users_are_skipped(self, mock_notify, mock_versions):
+        mock_versions.get.return_value = None
+        self.db.notification_preferences.find.return_value = [{"user_id": BOB}]
+        with patch('jobs.percolator.saved_search_percolator', self.percolator):
+            notify_saved_search_matches([job()], self.db)
+
+        self.assertEqual([user_id for user_id, _, _ in mock_notify.call_args[0][0]], [ALICE])
+
+    @patch('jobs.percolator.collection_versions')
+    def test_rebuilds_when_another_worker_changed_the_searches(self, mock_versions):
+        mock_versions.get.return_value = 7
+        self.db.saved_searches.find.return_value = []
+        with patch('jobs.percolator.saved_search_percolator', self.percolator):
+            self.assertEqual(notify_saved_search_matches([job()], self.db), 0)
+        self.assertEqual(self.percolator.version, 7)
+
+
+class TestSavedSearchEndpoints(unittest.TestCase):
+    """Test the /saved-searches routes"""
+
+    def setUp(self):
+        self.app = Flask(__name__)
+        self.app.config['TESTING'] = True
+        self.app.secret_key = 'test'
+        self.app.register_blueprint(saved_searches_bp, url_prefix='/saved-searches')
+        self.client = self.app.test_client()
+        with self.client.session_transaction() as session:
+            session['user_id'] = str(ALICE)
+
+    @patch('jobs.percolator.collection_versions')
+    @patch('saved_searches.saved_searches.saved_searches_db')
+    @patch('utils.mongo')
+    def test_create_indexes_the_search(self, mock_mongo, mock_saved_searches_db, mock_versions):
+        mock_saved_searches_db.count_documents.return_value = 0
+        mock_saved_searches_db.insert_one.return_value.inserted_id = ObjectId()
+        percolator = SavedSearchPercolator()
+        with patch('jobs.percolator.saved_search_percolator', percolator):
+            response = self.client.post('/saved-searches', data=json.dumps({"keywords": "barista"}),
+                                        content_type='application/json')
+
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(response.get_json()["saved_search"]["keywords"], ["barista"])
+        self.assertEqual(mock_saved_searches_db.insert_one.call_args[0][0]["user_id"], ALICE)
+        self.assertEqual(len(percolator), 1)
+
+    @patch('saved_searches.saved_searches.saved_searches_db')
+    @patch('utils.mongo')
+    def test_create_rejects_invalid_search(self, mock_mongo, mock_saved_searches_db):
+        response = self.client.post('/saved-searches', data=json.dumps({"name": "Nothing"}),
+                                    content_type='application/json')
+        self.assertEqual(response.status_code, 400)
+        mock_saved_searches_db.insert_one.assert_not_called()
+
+    @patch('saved_searches.saved_searches.saved_searches_db')
+    @patch('utils.mongo')
+    def test_delete_only_own_search(self, mock_mongo, mock_saved_searches_db):
+        mock_saved_searches_db.delete_one.return_value.deleted_count = 0
+        search_id = ObjectId()
+        response = self.client.delete(f'/saved-searches/{search_id}')
+        self.assertEqual(response.status_code, 404)
+        self.assertEqual(mock_saved_searches_db.delete_one.call_args[0][0], {"_id": search_id, "user_id": ALICE})
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,225 @@
+"""
+Test suite for the Redis job search result cache
+Tests key normalization, hits and misses, version invalidation and single-flight loading
+"""
+import unittest
+from unittest.mock import patch, MagicMock
+import os
+import sys
+import json
+import threading
+import time
+
+# Add backend directory to path for imports
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from flask import Flask
+from flask_pymongo import ObjectId
+from redis.exceptions import ConnectionError as RedisConnectionError
+import jobs.result_cache as result_cache
+from jobs.result_cache import JobResultCache, normalize_parameters
+from jobs.search_index import JobSearchIndex
+
+# Mock extensions before importing job modules
+with patch('extensions.mongo') as mock_mongo:
+    mock_mongo.db.jobs = MagicMock()
+    from jobs.jobs import jobs_bp
+
+
+class InMemoryRedis:
+    """Minimal thread-safe stand-in for the Redis commands the cache uses"""
+
+    def __init__(self):
+        self.data = {}
+        self.lock = threading.Lock()
+
+    def get(self, key):
+        with self.lock:
+            value = self.data.get(key)
+            return value.encode() if isinstance(value, str) else value
+
+    def set(self, key, value, nx=False, px=None, ex=None):
+        with self.lock:
+            if nx and key in self.data:
+                return None
+            self.data[key] = value
+            return True
+
+    def delete(self, key):
+        with self.lock:
+            self.data.pop(key, None)
+
+    def incr(self, key):
+        with self.lock:
+            self.data[key] = str(int(self.data.get(key, 0)) + 1)
+            return int(self.data[key])
+
+    def hincrby(self, key, field, amount):
+        with self.lock:
+            counters = self.data.setdefault(key, {})
+            counters[field.encode()] = counters.get(field.encode(), 0) + amount
+
+    def hgetall(self, key):
+        with self.lock:
+            return dict(self.data.get(key, {}))
+
+
+class TestNormalizeParameters(unittest.TestCase):
+    """Test cache key normalization"""
+
+    def test_set_order_and_case_do_not_matter(self):
+        first = normalize_parameters({"title": "Barista", "location": "Sydney,Melbourne"})
+        second = normalize_parameters({"location": "Melbourne,Sydney", "title": "barista"})
+        self.assertEqual(first, second)
+
+    def test_meaningful_differences_are_kept(self):
+        self.assertNotEqual(normalize_parameters({"location": "Sydney"}), normalize_parameters({"location": "sydney"}))
+        self.assertNotEqual(normalize_parameters({"title": "barista "}), normalize_parameters({"title": "barista"}))
+
+    def test_empty_values_are_dropped(self):
+        self.assertEqual(normalize_parameters({"title": "", "type": "retail"}), {"type": ["retail"]})
+
+
+class TestJobResultCache(unittest.TestCase):
+    """Test cache lookups and invalidation"""
+
+    def setUp(self):
+        self.app = Flask(__name__)
+        self.redis = InMemoryRedis()
+        self.app.config["SESSION_REDIS"] = self.redis
+        self.cache = JobResultCache()
+        self.context = self.app.app_context()
+        self.context.push()
+
+    def tearDown(self):
+        self.context.pop()
+
+    def test_miss_then_hit(self):
+        compute = MagicMock(return_value={"jobs": [1, 2]})
+        self.assertEqual(self.cache.get_or_compute({"title": ["barista"]}, compute), {"jobs": [1, 2]})
+        self.assertEqual(self.cache.get_or_compute({"title": ["barista"]}, compute), {"jobs": [1, 2]})
+        compute.assert_called_once()
+
+        stats = self.cache.stats()
+        self.assertEqual((stats["hits"], stats["misses"], stats["hit_rate"]), (1, 1, 0.5))
+
+    def test_invalidate_bumps_version(self):
+        compute = MagicMock(return_value={"jobs": []})
+        self.cache.get_or_compute({}, compute)
+        version = self.cache.stats()["version"]
+        self.cache.invalidate()
+        self.cache.get_or_compute({}, compute)
+        self.assertEqual(compute.call_count, 2)
+        self.assertEqual(self.cache.stats()["version"], version + 1)
+
+    @patch('http_cache.secrets.randbelow')
+    def test_lost_version_restarts_at_a_random_value(self, mock_randbelow):
+        mock_randbelow.side_effect = [1000, 5000]
+        self.assertEqual(self.cache.invalidate(), 1001)
+        self.redis.data.clear()
+        self.assertEqual(self.cache.version(), 5000)
+
+    def test_concurrent_misses_compute_once(self):
+        calls = []
+
+        def slow_compute():
+            calls.append(1)
+            time.sleep(0.1)
+            return {"jobs": ["a"]}
+
+        results = []
+
+        def worker():
+            with self.app.app_context():
+                results.append(self.cache.get_or_compute({"title": ["barista"]}, slow_compute))
+
+        threads = [threading.Thread(target=worker) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(len(calls), 1)
+        self.assertEqual(results, [{"jobs": ["a"]}] * 4)
+        self.assertEqual(self.cache.stats()["coalesced"], 3)
+
+    def test_computes_when_lock_holder_never_finishes(self):
+        compute = MagicMock(return_value={"jobs": []})
+        self.cache.get_or_compute({}, compute)
+        self.cache.invalidate()
+        self.redis.set(f"{self.cache._entry_key(1, {})}:lock", "1")
+        with patch.object(result_cache, 'LOCK_WAIT_SECONDS', 0.05):
+            self.assertEqual(self.cache.get_or_compute({}, compute), {"jobs": []})
+        self.assertEqual(compute.call_count, 2)
+
+    def test_redis_errors_fall_back_to_compute(self):
+        broken = MagicMock()
+        broken.get.side_effect = RedisConnectionError("down")
+        broken.incr.side_effect = RedisConnectionError("down")
+        self.app.config["SESSION_REDIS"] = broken
+        self.assertEqual(self.cache.get_or_compute({}, lambda: {"jobs": [1]}), {"jobs": [1]})
+        self.cache.invalidate()
+
+    def test_without_redis_always_computes(self):
+        self.app.config.pop("SESSION_REDIS")
+        compute = MagicMock(return_value={"jobs": []})
+        self.cache.get_or_compute({}, compute)
+        self.cache.get_or_compute({}, compute)
+        self.assertEqual(compute.call_count, 2)
+        self.assertEqual(self.cache.stats(), {"enabled": False})
+
+
+class TestJobResultCacheRoutes(unittest.TestCase):
+    """Test caching of /jobs/get and invalidation by the write routes"""
+
+    def setUp(self):
+        self.app = Flask(__name__)
+        self.app.config['TESTING'] = True
+        self.app.config["SESSION_REDIS"] = InMemoryRedis()
+        self.app.register_blueprint(jobs_bp, url_prefix='/jobs')
+        self.client = self.app.test_client()
+
+    def mock_page(self, mock_jobs_db):
+        mock_jobs_db.find.return_value.sort.return_value.limit.return_value = [
+            {"_id": ObjectId(), "title": "Barista", "created_at": "2024-01-01T00:00:00"}
+        ]
+        mock_jobs_db.count_documents.return_value = 1
+        mock_jobs_db.estimated_document_count.return_value = 1
+
+    @patch('jobs.jobs.job_search_index', JobSearchIndex())
+    @patch('jobs.jobs.jobs_db')
+    def test_repeated_search_is_served_from_cache(self, mock_jobs_db):
+        self.mock_page(mock_jobs_db)
+        first = self.client.get('/jobs/get?location=Sydney,Perth')
+        second = self.client.get('/jobs/get?location=Perth,Sydney')
+
+        self.assertEqual(json.loads(first.data), json.loads(second.data))
+        self.assertEqual(second.headers["X-Total-Count"], "1")
+        mock_jobs_db.find.assert_called_once()
+
+        stats = json.loads(self.client.get('/jobs/cache/stats').data)
+        self.assertEqual((stats["hits"], stats["misses"]), (1, 1))
+
+    @patch('jobs.jobs.job_search_index', JobSearchIndex())
+    @patch('jobs.jobs.jobs_db')
+    def test_delete_invalidates_cached_results(self, mock_jobs_db):
+        self.mock_page(mock_jobs_db)
+        mock_jobs_db.find_one_and_delete.return_value = {"title": "Barista"}
+
+        self.client.get('/jobs/get')
+        self.client.get('/jobs/delete', data=json.dumps({"_id": str(ObjectId())}), content_type='application/json')
+        self.client.get('/jobs/get')
+
+        self.assertEqual(mock_jobs_db.find.call_count, 2)
+
+    @patch('jobs.jobs.job_search_index', JobSearchIndex())
+    @patch('jobs.jobs.jobs_db')
+    def test_invalid_cursor_is_not_cached(self, mock_jobs_db):
+        response = self.client.get('/jobs/get?cursor=nonsense')
+        self.assertEqual(response.status_code, 400)
+        response = self.client.get('/jobs/get?cursor=nonsense')
+        self.assertEqual(response.status_code, 400)
+
+
+if __name__ == '__main__':
+    unittest.main()
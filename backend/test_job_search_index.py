@@ -0,0 +1,225 @@
+"""
+Test suite for the in-memory job search index
+Tests tokenization, BM25 ranking, incremental updates and the /jobs/get integration
+"""
+import unittest
+from unittest.mock import patch, MagicMock
+import os
+import sys
+import json
+import threading
+
+# Add backend directory to path for imports
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from flask import Flask
+from flask_pymongo import ObjectId
+from jobs.search_index import JobSearchIndex, INDEXED_FIELDS, tokenize
+from jobs.index_refresh import JobIndexRefresher
+
+# Mock extensions before importing job modules
+with patch('extensions.mongo') as mock_mongo:
+    mock_mongo.db.jobs = MagicMock()
+    from jobs.jobs import jobs_bp
+
+
+class TestTokenize(unittest.TestCase):
+    """Test search term extraction"""
+
+    def test_lowercases_and_drops_stop_words(self):
+        self.assertEqual(tokenize("The Senior Barista of Sydney"), ["senior", "barista", "sydney"])
+
+    def test_keeps_language_suffixes(self):
+        self.assertEqual(tokenize("C++ and C# developer"), ["c++", "c#", "developer"])
+
+    def test_handles_missing_values(self):
+        self.assertEqual(tokenize(None), [])
+        self.assertEqual(tokenize(2500), ["2500"])
+
+
+class TestJobSearchIndex(unittest.TestCase):
+    """Test ranking and incremental maintenance"""
+
+    def setUp(self):
+        self.index = JobSearchIndex()
+        self.index.build([
+            {"_id": "1", "title": "Barista", "description": "Make coffee for customers", "firm": "Greeks Bar"},
+            {"_id": "2", "title": "Software Engineer", "description": "Build web applications", "firm": "Tech Corp"},
+            {"_id": "3", "title": "Cafe Manager", "description": "Lead a team of baristas and make coffee", "firm": "Koala Cafe"},
+            {"_id": "4", "title": "Sales Associate", "description": "Engineering supplies retail", "firm": "Tools Co"},
+        ])
+
+    def test_build_marks_index_ready(self):
+        self.assertTrue(self.index.ready)
+        self.assertEqual(len(self.index), 4)
+
+    def test_title_match_ranks_above_description_match(self):
+        results = self.index.search("coffee barista")
+        self.assertEqual([doc_id for doc_id, _ in results], ["1", "3"])
+
+    def test_all_terms_must_match(self):
+        results = self.index.search("software coffee")
+        self.assertEqual(results, [])
+
+    def test_prefix_matches_longer_terms(self):
+        results = [doc_id for doc_id, _ in self.index.search("engin")]
+        self.assertEqual(set(results), {"2", "4"})
+
+    def test_exact_match_ranks_above_prefix_match(self):
+        self.index.add("5", {"title": "Bar Attendant", "description": "Pour drinks", "firm": "Pub"})
+        results = [doc_id for doc_id, _ in self.index.search("bar")]
+        self.assertEqual(results[0], "5")
+
+    def test_add_makes_document_searchable(self):
+        self.index.add("5", {"title": "Electrician", "description": "Wiring", "firm": "Sparks"})
+        self.assertEqual(self.index.search("electrician")[0][0], "5")
+
+    def test_add_replaces_previous_version(self):
+        self.index.add("2", {"title": "Plumber", "description": "Fix pipes", "firm": "Tech Corp"})
+        self.assertEqual(self.index.search("software"), [])
+        self.assertEqual(self.index.search("plumber")[0][0], "2")
+        self.assertEqual(len(self.index), 4)
+
+    def test_remove_drops_document(self):
+        self.index.remove("1")
+        self.assertEqual([doc_id for doc_id, _ in self.index.search("coffee")], ["3"])
+        self.assertEqual(self.index.search("greeks"), [])
+
+    def test_limit_truncates_results(self):
+        self.assertEqual(len(self.index.search("coffee", limit=1)), 1)
+
+    def test_stop_word_query_returns_nothing(self):
+        self.assertEqual(self.index.search("the and"), [])
+
+
+class TestSharedVersion(unittest.TestCase):
+    """Test that workers pick up job changes made by other workers"""
+
+    def setUp(self):
+        self.index = JobSearchIndex()
+        self.index.build([{"_id": ObjectId(), "title": "Barista"}], version=4)
+        self.jobs = MagicMock()
+        self.jobs.find.return_value = [{"_id": ObjectId(), "title": "Barista"}, {"_id": ObjectId(), "title": "Chef"}]
+        self.refresher = JobIndexRefresher(interval=0)
+        self.refresher.register([self.index], INDEXED_FIELDS, self.index.build)
+
+    @patch('jobs.index_refresh.job_result_cache')
+    def test_rebuilds_when_another_worker_changed_jobs(self, mock_cache):
+        mock_cache.version.return_value = 6
+        self.assertTrue(self.refresher.refresh(self.jobs))
+        self.refresher.wait()
+        self.assertEqual((len(self.index), self.index.version), (2, 6))
+        self.assertEqual(len(self.index.search("chef")), 1)
+
+    @patch('jobs.index_refresh.job_result_cache')
+    def test_old_contents_are_served_during_one_rebuild(self, mock_cache):
+        mock_cache.version.return_value = 6
+        reading, release = threading.Event(), threading.Event()
+
+        def slow_find(*args):
+            reading.set()
+            release.wait(5)
+            return [{"_id": ObjectId(), "title": "Chef"}]
+
+        self.jobs.find.side_effect = slow_find
+        self.assertTrue(self.refresher.refresh(self.jobs))
+        self.assertTrue(reading.wait(5))
+        self.assertEqual(len(self.index.search("barista")), 1)
+        self.assertFalse(self.refresher.refresh(self.jobs))
+        release.set()
+        self.refresher.wait()
+
+        self.jobs.find.assert_called_once()
+        self.assertEqual((len(self.index.search("chef")), self.index.version), (1, 6))
+
+    @patch('jobs.index_refresh.job_result_cache')
+    def test_current_index_is_not_rebuilt(self, mock_cache):
+        mock_cache.version.return_value = 4
+        self.assertFalse(self.refresher.refresh(self.jobs))
+        self.jobs.find.assert_not_called()
+
+    @patch('jobs.index_refresh.job_result_cache')
+    def test_rebuilds_are_spaced_out(self, mock_cache):
+        self.refresher.interval = 60
+        mock_cache.version.return_value = 6
+        self.assertTrue(self.refresher.refresh(self.jobs))
+        self.refresher.wait()
+        mock_cache.version.return_value = 7
+        self.assertFalse(self.refresher.refresh(self.jobs))
+
+    @patch('jobs.index_refresh.job_result_cache')
+    def test_own_change_keeps_the_index_current(self, mock_cache):
+        mock_cache.invalidate.return_value = 5
+        self.refresher.record_change(lambda: self.index.add(ObjectId(), {"title": "Chef"}))
+        self.assertEqual(self.index.version, 5)
+        # Another worker wrote in between, so this worker is behind
+        mock_cache.invalidate.return_value = 7
+        self.refresher.record_change(lambda: None)
+        self.assertEqual(self.index.version, 5)
+
+    @patch('jobs.index_refresh.job_result_cache')
+    def test_change_during_a_rebuild_leaves_the_index_stale(self, mock_cache):
+        self.index.version = 3
+        mock_cache.invalidate.return_value = 5
+        # The rebuild swaps in contents read at version 4, before the change
+        self.refresher.record_change(lambda: self.index.build([], version=4))
+        self.assertEqual(self.index.version, 4)
+
+    @patch('jobs.index_refresh.job_result_cache')
+    def test_version_is_bumped_when_the_change_fails(self, mock_cache):
+        def fail():
+            raise RuntimeError("write failed")
+
+        with self.assertRaises(RuntimeError):
+            self.refresher.record_change(fail)
+        mock_cache.invalidate.assert_called_once()
+
+
+class TestJobSearchRoute(unittest.TestCase):
+    """Test that /jobs/get resolves text queries through the index"""
+
+    def setUp(self):
+        self.app = Flask(__name__)
+        self.app.config['TESTING'] = True
+        self.app.register_blueprint(jobs_bp, url_prefix='/jobs')
+        self.client = self.app.test_client()
+        self.barista_id = ObjectId()
+        self.manager_id = ObjectId()
+        self.index = JobSearchIndex()
+        self.index.build([
+            {"_id": self.manager_id, "title": "Cafe Manager", "description": "Supervise the barista team"},
+            {"_id": self.barista_id, "title": "Barista", "description": "Coffee"},
+        ])
+
+    @patch('jobs.jobs.jobs_db')
+    def test_text_query_uses_index_ids_and_ranking(self, mock_jobs_db):
+        mock_jobs_db.find.return_value = [
+            {"_id": self.manager_id, "title": "Cafe Manager"},
+            {"_id": self.barista_id, "title": "Barista"},
+        ]
+
+        with patch('jobs.jobs.job_search_index', self.index):
+            response = self.client.get('/jobs/get?title=barista')
+
+        self.assertEqual(response.status_code, 200)
+        query = mock_jobs_db.find.call_args[0][0]
+        self.assertNotIn("$or", query)
+        self.assertEqual(set(query["_id"]["$in"]), {self.barista_id, self.manager_id})
+        titles = [job["title"] for job in json.loads(response.data)]
+        self.assertEqual(titles, ["Barista", "Cafe Manager"])
+
+    @patch('jobs.jobs.jobs_db')
+    def test_text_query_falls_back_to_regex_when_index_not_built(self, mock_jobs_db):
+        mock_jobs_db.find.return_value.sort.return_value.limit.return_value = []
+        mock_jobs_db.count_documents.return_value = 0
+
+        with patch('jobs.jobs.job_search_index', JobSearchIndex()):
+            response = self.client.get('/jobs/get?title=barista')
+
+        self.assertEqual(response.status_code, 200)
+        query = mock_jobs_db.find.call_args[0][0]
+        self.assertEqual(query["$or"][0]["title"]["$regex"], "barista")
+
+
+if __name__ == '__main__':
+    unittest.main()
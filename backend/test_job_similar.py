@@ -0,0 +1,128 @@
+"""
+Test suite for the similar jobs index
+Tests TF-IDF neighbour ranking, incremental updates, caching and the /jobs/<slug>/similar endpoint
+"""
+import unittest
+from unittest.mock import patch, MagicMock
+import os
+import sys
+
+# Add backend directory to path for imports
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from flask import Flask
+from flask_pymongo import ObjectId
+from jobs.similar import SimilarJobsIndex, similar_jobs_index
+from jobs.index_refresh import JobIndexRefresher, job_index_refresher
+
+# Mock extensions before importing job modules
+with patch('extensions.mongo') as mock_mongo:
+    mock_mongo.db.jobs = MagicMock()
+    from jobs.jobs import jobs_bp
+
+
+JOBS = [
+    {"_id": "barista", "title": "Barista", "jobtype": "hospitality", "description": "Espresso coffee and milk"},
+    {"_id": "head-barista", "title": "Head Barista", "jobtype": "hospitality",
+     "description": "Lead the coffee team, espresso training"},
+    {"_id": "cafe", "title": "Cafe All Rounder", "jobtype": "hospitality", "description": "Coffee and sandwiches"},
+    {"_id": "developer", "title": "Python Developer", "jobtype": "full-time", "description": "Django APIs"},
+]
+
+
+class TestSimilarJobsIndex(unittest.TestCase):
+    """Test neighbour ranking and maintenance"""
+
+    def setUp(self):
+        self.index = SimilarJobsIndex()
+        self.index.build(JOBS)
+
+    def test_ranks_by_cosine_similarity(self):
+        neighbours = self.index.similar("barista")
+        self.assertEqual([doc_id for doc_id, _ in neighbours], ["head-barista", "cafe"])
+        self.assertTrue(0 < neighbours[1][1] < neighbours[0][1] <= 1)
+
+    def test_unknown_job_has_no_neighbours(self):
+        self.assertEqual(self.index.similar("missing"), [])
+
+    def test_incremental_add_and_remove(self):
+        self.index.add("junior-barista", {"title": "Junior Barista", "jobtype": "hospitality",
+                                          "description": "Espresso coffee and milk"})
+        self.assertEqual(self.index.similar("junior-barista")[0][0], "barista")
+
+        self.index.remove("barista")
+        self.assertNotIn("barista", [doc_id for doc_id, _ in self.index.similar("junior-barista")])
+
+    def test_results_are_cached_per_job(self):
+        with patch.object(self.index, "_similar_locked", wraps=self.index._similar_locked) as compute:
+            self.index.similar("barista", 2)
+            self.index.similar("barista", 1)
+            self.assertEqual(compute.call_count, 1)
+
+    def test_cached_results_skip_removed_jobs(self):
+        self.index.similar("barista")
+        self.index.remove("head-barista")
+        self.assertEqual([doc_id for doc_id, _ in self.index.similar("barista")], ["cafe"])
+
+
+class TestSharedVersion(unittest.TestCase):
+    """Test that the index picks up jobs stored by other workers"""
+
+    @patch('jobs.index_refresh.job_result_cache')
+    def test_stale_index_is_rebuilt_from_original_jobs(self, mock_cache):
+        index = SimilarJobsIndex()
+        index.build(JOBS[:1], version=4)
+        fields, build = next((fields, build) for indexes, fields, build in job_index_refresher._entries
+                             if similar_jobs_index in indexes)
+        refresher = JobIndexRefresher(interval=0)
+        refresher.register([index], fields, build)
+        jobs = MagicMock()
+        jobs.find.return_value = JOBS + [{**JOBS[1], "_id": "head-barista-copy", "duplicate_of": "head-barista"}]
+        mock_cache.version.return_value = 6
+
+        with patch('jobs.index_refresh.similar_jobs_index', index):
+            refresher.refresh(jobs)
+            refresher.wait()
+
+        self.assertIn("duplicate_of", jobs.find.call_args[0][1])
+        self.assertEqual((len(index), index.version), (4, 6))
+        self.assertEqual(index.similar("barista")[0][0], "head-barista")
+
+
+class TestSimilarJobsEndpoint(unittest.TestCase):
+    """Test the /jobs/<slug>/similar route"""
+
+    def setUp(self):
+        self.app = Flask(__name__)
+        self.app.config['TESTING'] = True
+        self.app.register_blueprint(jobs_bp, url_prefix='/jobs')
+        self.client = self.app.test_client()
+
+    @patch('jobs.jobs.similar_jobs_index')
+    @patch('jobs.jobs.jobs_db')
+    def test_returns_neighbours_in_similarity_order(self, mock_jobs_db, mock_index):
+        job_id, first, second = ObjectId(), ObjectId(), ObjectId()
+        mock_jobs_db.find_one.return_value = {"_id": job_id}
+        mock_index.similar.return_value = [(str(first), 0.9), (str(second), 0.5)]
+        mock_jobs_db.find.return_value = [{"_id": second, "title": "Cafe"}, {"_id": first, "title": "Head Barista"}]
+
+        response = self.client.get('/jobs/barista-sydney-abc123/similar?limit=2')
+
+        self.assertEqual([job["title"] for job in response.get_json()], ["Head Barista", "Cafe"])
+        self.assertEqual(response.get_json()[0]["similarity"], 0.9)
+        mock_index.similar.assert_called_once_with(job_id, 2)
+        # Near-duplicates are neither looked up nor returned
+        mock_jobs_db.find_one.assert_called_once_with({"slug": "barista-sydney-abc123", "duplicate_of": None},
+                                                      {"_id": 1})
+        self.assertEqual(mock_jobs_db.find.call_args[0][0],
+                         {"_id": {"$in": [first, second]}, "duplicate_of": None})
+
+    @patch('jobs.jobs.jobs_db')
+    def test_unknown_slug(self, mock_jobs_db):
+        mock_jobs_db.find_one.return_value = None
+        response = self.client.get('/jobs/missing/similar')
+        self.assertEqual(response.status_code, 404)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,185 @@
+"""
+Test suite for the in-memory autocomplete indexes
+Tests prefix lookups, counts, typo tolerance and the suggestion endpoints
+"""
+import unittest
+from unittest.mock import patch, MagicMock
+import os
+import sys
+import json
+
+# Add backend directory to path for imports
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from flask import Flask
+from flask_pymongo import ObjectId
+import jobs.suggestions as suggestions
+from jobs.suggestions import SuggestionIndex, SUGGESTION_PROJECTION, load_suggestion_indexes
+from jobs.index_refresh import JobIndexRefresher
+from jobs.search_index import JobSearchIndex
+
+# Mock extensions before importing job modules
+with patch('extensions.mongo') as mock_mongo:
+    mock_mongo.db.jobs = MagicMock()
+    from jobs.jobs import jobs_bp
+
+
+class TestSuggestionIndex(unittest.TestCase):
+    """Test suggestion lookups and maintenance"""
+
+    def setUp(self):
+        self.index = SuggestionIndex("title")
+        self.index.build([
+            "Barista", "Barista", "Barista", "Senior Barista", "Bar Attendant",
+            "Software Engineer", "Software Engineer", "Civil Engineer", "Sales Associate"
+        ])
+
+    def values(self, query, limit=8):
+        return [(item["value"], item["count"]) for item in self.index.suggest(query, limit)]
+
+    def test_prefix_matches_ordered_by_count(self):
+        self.assertEqual(self.values("bar"), [("Barista", 3), ("Bar Attendant", 1), ("Senior Barista", 1)])
+
+    def test_matches_start_of_later_words(self):
+        self.assertEqual(self.values("eng"), [("Software Engineer", 2), ("Civil Engineer", 1)])
+
+    def test_is_case_and_whitespace_insensitive(self):
+        self.assertEqual(self.values("  SOFTWARE   eng"), [("Software Engineer", 2)])
+
+    def test_short_queries_return_nothing(self):
+        self.assertEqual(self.values("b"), [])
+
+    def test_limit(self):
+        self.assertEqual(len(self.values("bar", limit=1)), 1)
+
+    def test_response_format(self):
+        self.assertEqual(self.index.suggest("sales", 8), [{"value": "Sales Associate", "type": "title", "count": 1}])
+
+    def test_add_updates_counts_and_cached_results(self):
+        self.assertEqual(self.values("civil"), [("Civil Engineer", 1)])
+        self.index.add("Civil Engineer")
+        self.index.add("Civil Technician")
+        self.assertEqual(self.values("civil"), [("Civil Engineer", 2), ("Civil Technician", 1)])
+
+    def test_remove_decrements_and_drops_values(self):
+        self.index.remove("Barista")
+        self.assertEqual(self.values("barista")[0], ("Barista", 2))
+        self.index.remove("Sales Associate")
+        self.assertEqual(self.values("sales"), [])
+        self.assertEqual(len(self.index), 5)
+
+    def test_remove_unknown_value_is_ignored(self):
+        self.index.remove("Astronaut")
+        self.index.remove(None)
+        self.assertEqual(len(self.index), 6)
+
+    def test_typo_falls_back_to_ngram_matches(self):
+        self.assertEqual(self.values("barsita")[0], ("Barista", 3))
+        self.assertIn(("Software Engineer", 2), self.values("sofware"))
+
+    def test_unrelated_query_returns_nothing(self):
+        self.assertEqual(self.values("xylophone"), [])
+
+    def test_wide_prefix_uses_count_order(self):
+        index = SuggestionIndex("location")
+        index.build([f"Store {i}" for i in range(suggestions.WIDE_PREFIX_KEYS + 10)] + ["Store 7"] * 5)
+        self.assertEqual(index.suggest("store", 2)[0], {"value": "Store 7", "type": "location", "count": 6})
+
+    def test_wide_prefix_sees_values_added_since_ranking(self):
+        index = SuggestionIndex("location")
+        index.build([f"Store {i}" for i in range(suggestions.WIDE_PREFIX_KEYS + 10)])
+        index.remove("Store 1")
+        index.add("Store 1")
+        index.add("Stockton")
+        values = [item["value"] for item in index.suggest("st", 1000)]
+        self.assertEqual(len(values), len(set(values)))
+        self.assertIn("Stockton", values)
+
+    def test_wide_prefix_after_clear(self):
+        index = SuggestionIndex("location")
+        index.build(["Somewhere"])
+        index.clear()
+        for i in range(suggestions.WIDE_PREFIX_KEYS + 100):
+            index.add(f"Store {i}")
+        self.assertEqual(len(index.suggest("st", 5)), 5)
+
+
+class TestSharedVersion(unittest.TestCase):
+    """Test that the counts pick up jobs changed by other workers and by archiving"""
+
+    @patch('jobs.index_refresh.job_result_cache')
+    def test_stale_indexes_are_recounted(self, mock_cache):
+        indexes = {kind: SuggestionIndex(kind) for kind in ("title", "location", "jobtype")}
+        with patch.dict(suggestions.SUGGESTION_FIELDS, indexes):
+            load_suggestion_indexes([{"title": "Barista", "location": "Sydney"}] * 2, version=4)
+            refresher = JobIndexRefresher(interval=0)
+            refresher.register(indexes.values(), SUGGESTION_PROJECTION, load_suggestion_indexes)
+            jobs = MagicMock()
+            # One of the baristas was archived
+            jobs.find.return_value = [{"title": "Barista", "location": "Sydney"}]
+            mock_cache.version.return_value = 6
+
+            refresher.refresh(jobs)
+            refresher.wait()
+
+            self.assertEqual(indexes["title"].suggest("bar", 8)[0]["count"], 1)
+            self.assertEqual(suggestions.suggestion_indexes_version(), 6)
+
+
+class TestSuggestionRoutes(unittest.TestCase):
+    """Test the suggestion endpoints"""
+
+    def setUp(self):
+        self.app = Flask(__name__)
+        self.app.config['TESTING'] = True
+        self.app.register_blueprint(jobs_bp, url_prefix='/jobs')
+        self.client = self.app.test_client()
+        self.indexes = {kind: SuggestionIndex(kind) for kind in ("title", "location", "jobtype")}
+        self.indexes["title"].build(["Barista", "Bartender"])
+        self.indexes["location"].build(["Sydney", "Brisbane", "Brisbane"])
+        self.indexes["jobtype"].build(["hospitality"])
+        self.patcher = patch.dict(suggestions.SUGGESTION_FIELDS, self.indexes)
+        self.patcher.start()
+
+    def tearDown(self):
+        self.patcher.stop()
+
+    @patch('jobs.jobs.jobs_db')
+    def test_title_suggestions_served_from_index(self, mock_jobs_db):
+        response = self.client.get('/jobs/suggestions/titles?q=bar')
+        self.assertEqual([item["value"] for item in json.loads(response.data)], ["Barista", "Bartender"])
+        mock_jobs_db.aggregate.assert_not_called()
+
+    @patch('jobs.jobs.jobs_db')
+    def test_location_suggestions_served_from_index(self, mock_jobs_db):
+        response = self.client.get('/jobs/suggestions/locations?q=bri')
+        self.assertEqual(json.loads(response.data), [{"value": "Brisbane", "type": "location", "count": 2}])
+        mock_jobs_db.aggregate.assert_not_called()
+
+    def test_combined_suggestions(self):
+        response = self.client.get('/jobs/suggestions?q=bar')
+        types = [item["type"] for item in json.loads(response.data)]
+        self.assertEqual(types, ["title", "title"])
+
+        response = self.client.get('/jobs/suggestions?q=hosp')
+        self.assertEqual(json.loads(response.data)[0]["type"], "jobtype")
+
+    @patch('jobs.jobs.jobs_db')
+    def test_falls_back_to_aggregation_before_build(self, mock_jobs_db):
+        mock_jobs_db.aggregate.return_value = [{"_id": "Barista", "count": 4}]
+        with patch.dict(suggestions.SUGGESTION_FIELDS, {"title": SuggestionIndex("title")}):
+            response = self.client.get('/jobs/suggestions/titles?q=bar')
+        self.assertEqual(json.loads(response.data)[0]["count"], 4)
+        mock_jobs_db.aggregate.assert_called_once()
+
+    @patch('jobs.jobs.job_search_index', JobSearchIndex())
+    @patch('jobs.jobs.jobs_db')
+    def test_delete_job_decrements_counts(self, mock_jobs_db):
+        mock_jobs_db.find_one_and_delete.return_value = {"title": "Barista", "location": "Sydney"}
+        self.client.get('/jobs/delete', data=json.dumps({"_id": str(ObjectId())}), content_type='application/json')
+        self.assertNotIn("Barista", [item["value"] for item in self.indexes["title"].suggest("barista", 8)])
+        self.assertEqual(self.indexes["location"].suggest("syd", 8), [])
+
+
+if __name__ == '__main__':
+    unittest.main()
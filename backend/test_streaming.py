@@ -0,0 +1,132 @@
+"""
+Test suite for streamed NDJSON list responses
+Tests content negotiation and incremental serialization for the large list endpoints
+"""
+import unittest
+from unittest.mock import patch, MagicMock
+import os
+import sys
+import json
+
+# Add backend directory to path for imports
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from flask import Flask
+from flask_pymongo import ObjectId
+from jobs.pagination import NEWEST_FIRST_SORT, MAX_STREAM_SIZE
+from jobs.search_index import JobSearchIndex
+import utils
+
+# Mock extensions before importing blueprint modules
+with patch('extensions.mongo') as mock_mongo:
+    mock_mongo.db.jobs = MagicMock()
+    mock_mongo.db.cities = MagicMock()
+    mock_mongo.db.states = MagicMock()
+    from jobs.jobs import jobs_bp
+    from cities.cities import cities_bp
+    from states.states import states_bp
+    from users.users import users_bp
+
+
+def parse_ndjson(response):
+    return [json.loads(line) for line in response.get_data(as_text=True).splitlines()]
+
+
+class TestStreamingResponses(unittest.TestCase):
+    """Test NDJSON streaming on list endpoints"""
+
+    def setUp(self):
+        self.app = Flask(__name__)
+        self.app.config['TESTING'] = True
+        self.app.register_blueprint(jobs_bp, url_prefix='/jobs')
+        self.app.register_blueprint(cities_bp, url_prefix='/cities')
+        self.app.register_blueprint(states_bp, url_prefix='/states')
+        self.app.register_blueprint(users_bp, url_prefix='/users')
+        self.client = self.app.test_client()
+
+    def test_stream_documents_serializes_lazily(self):
+        consumed = []
+
+        def documents():
+            for i in range(utils.STREAM_CHUNK_SIZE * 2 + 1):
+                consumed.append(i)
+                yield {"_id": ObjectId(), "n": i}
+
+        with self.app.test_request_context():
+            response = utils.stream_documents(documents())
+            self.assertEqual(consumed, [])
+            first_chunk = next(response.response)
+
+        self.assertEqual(len(consumed), utils.STREAM_CHUNK_SIZE)
+        self.assertEqual(len(first_chunk.splitlines()), utils.STREAM_CHUNK_SIZE)
+
+    def test_accept_header_selects_stream(self):
+        with self.app.test_request_context(headers={"Accept": "application/x-ndjson"}):
+            self.assertTrue(utils.wants_ndjson_stream())
+        with self.app.test_request_context("/?stream=1"):
+            self.assertTrue(utils.wants_ndjson_stream())
+        with self.app.test_request_context(headers={"Accept": "application/json"}):
+            self.assertFalse(utils.wants_ndjson_stream())
+
+    @patch('cities.cities.cities_db')
+    def test_cities_stream(self, mock_cities_db):
+        mock_cities_db.find.return_value = iter([
+            {"_id": ObjectId(), "city": "Sydney", "state": "New South Wales"},
+            {"_id": ObjectId(), "city": "Perth", "state": "Western Australia"}
+        ])
+
+        response = self.client.get('/cities/get_all', headers={"Accept": "application/x-ndjson"})
+
+        self.assertEqual(response.mimetype, "application/x-ndjson")
+        self.assertEqual([city["city"] for city in parse_ndjson(response)], ["Sydney", "Perth"])
+
+    @patch('states.states.states_db')
+    def test_states_default_is_json_array(self, mock_states_db):
+        mock_states_db.find.return_value = [{"_id": ObjectId(), "state": "Victoria"}]
+
+        response = self.client.get('/states/get_all')
+
+        self.assertEqual(response.mimetype, "application/json")
+        self.assertEqual(json.loads(response.data)[0]["state"], "Victoria")
+
+    @patch('users.users.get_users_db')
+    def test_users_stream_excludes_passwords(self, mock_get_users_db):
+        mock_get_users_db.return_value.find.return_value = iter([{"_id": ObjectId(), "username": "anna"}])
+
+        response = self.client.get('/users/get_all?stream=1')
+
+        self.assertEqual(parse_ndjson(response)[0]["username"], "anna")
+        self.assertEqual(mock_get_users_db.return_value.find.call_args[0][1], {"password": 0})
+
+    @patch('jobs.jobs.job_search_index', JobSearchIndex())
+    @patch('jobs.jobs.jobs_db')
+    def test_jobs_stream_reads_from_cursor(self, mock_jobs_db):
+        mock_cursor = mock_jobs_db.find.return_value.sort.return_value.limit
+        mock_cursor.return_value = iter([{"_id": ObjectId(), "title": "Barista"}])
+
+        response = self.client.get('/jobs/get?stream=1&location=Sydney')
+
+        self.assertEqual(parse_ndjson(response)[0]["title"], "Barista")
+        mock_jobs_db.find.return_value.sort.assert_called_once_with(NEWEST_FIRST_SORT)
+        mock_cursor.assert_called_once_with(MAX_STREAM_SIZE)
+        mock_jobs_db.count_documents.assert_not_called()
+
+    @patch('jobs.jobs.jobs_db')
+    def test_jobs_stream_ranked_results(self, mock_jobs_db):
+        ids = [ObjectId(), ObjectId()]
+        index = JobSearchIndex()
+        index.build([
+            {"_id": ids[0], "title": "Barista", "description": "coffee"},
+            {"_id": ids[1], "title": "Manager", "description": "barista team"}
+        ])
+        mock_jobs_db.find.side_effect = lambda query: [{"_id": doc_id} for doc_id in query["_id"]["$in"]]
+
+        with patch('jobs.jobs.job_search_index', index):
+            response = self.client.get('/jobs/get?title=barista&limit=1',
+                                       headers={"Accept": "application/x-ndjson"})
+
+        self.assertEqual([job["_id"] for job in parse_ndjson(response)], [str(ids[0])])
+
+
+if __name__ == '__main__':
+    unittest.main()
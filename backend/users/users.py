@@ -3,6 +3,7 @@ from extensions import mongo, bcrypt  # Import from extensions
 from flask_pymongo import ObjectId
 from datetime import datetime
 import constants as c
+from utils import wants_ndjson_stream, stream_documents
 import gridfs
 import io
 from PIL import Image
@@ -93,7 +94,9 @@ def remove_user():
 @users_bp.route("/get_all", methods=["GET"])
 def get_users():
     final_users = []
-    users = get_users_db().find()
+    users = get_users_db().find({}, {"password": 0})
+    if wants_ndjson_stream():
+        return stream_documents(users)
     for user in users:
         user["_id"] = str(user["_id"])
         user.pop("password", None)
@@ -1,7 +1,7 @@
 """
 Utility functions and decorators for the Flask application
 """
-from flask import jsonify, request, session
+from flask import jsonify, request, session, current_app, Response, g
 from functools import wraps
 from extensions import mongo
 from flask_pymongo import ObjectId
@@ -43,7 +43,12 @@ def validate_required_fields(data, required_fields):
     return True, "All required fields present"
 
 def require_auth(f):
-    """Decorator to require authentication for routes"""
+    """
+    Decorator to require authentication for routes
+
+    The authenticated user's document is kept in g.current_user so routes do not
+    have to read it again.
+    """
     @wraps(f)
     def decorated_function(*args, **kwargs):
         user_id = session.get("user_id")
@@ -60,6 +65,8 @@ def require_auth(f):
             session.clear()
             return jsonify({"error": "Invalid session"}), 401
         
+        g.current_user = user
+        g.current_user_id = str(user["_id"])
         return f(*args, **kwargs)
     return decorated_function
 
@@ -86,4 +93,39 @@ def validate_json_request(f):
             return standardize_error_response("Invalid JSON data", 400)
         
         return f(*args, **kwargs)
-    return decorated_function 
\ No newline at end of file
+    return decorated_function
+
+
+NDJSON_MIMETYPE = "application/x-ndjson"
+# Number of documents serialized per chunk written to the response
+STREAM_CHUNK_SIZE = 100
+
+def wants_ndjson_stream():
+    """Check whether the client asked for a streamed NDJSON response"""
+    if request.args.get("stream") in ("1", "true"):
+        return True
+    return request.accept_mimetypes.best == NDJSON_MIMETYPE
+
+def stream_documents(documents, transform=None, headers=None):
+    """
+    Stream documents as newline-delimited JSON
+
+    Documents are serialized one chunk at a time straight from the iterable (usually a
+    PyMongo cursor), so memory use stays flat regardless of the result size.
+    """
+    dumps = current_app.json.dumps
+
+    def generate():
+        chunk = []
+        for document in documents:
+            document["_id"] = str(document["_id"])
+            if transform:
+                document = transform(document)
+            chunk.append(dumps(document))
+            if len(chunk) >= STREAM_CHUNK_SIZE:
+                yield "\n".join(chunk) + "\n"
+                chunk = []
+        if chunk:
+            yield "\n".join(chunk) + "\n"
+
+    return Response(generate(), mimetype=NDJSON_MIMETYPE, headers=headers)